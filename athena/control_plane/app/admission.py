@@ -0,0 +1,174 @@
+# control_plane/app/admission.py
+# Client-side admission control for inference calls, plus goodput/shed accounting.
+#
+# Without a limit, CoreClient sends as many concurrent calls as callers make, and during
+# a spike they all queue in the core and miss their deadlines together. AdmissionLimiter
+# caps in-flight calls per model and rate-limits per model and per tenant, failing the
+# excess at once with RESOURCE_EXHAUSTED and a retry-after hint, like the core does.
+import os
+import time
+import threading
+from typing import Dict, Optional, Tuple
+
+import grpc
+from prometheus_client import Counter
+
+ADMISSION_MAX_INFLIGHT = int(os.getenv("ADMISSION_MAX_INFLIGHT", "0"))  # per model, 0 = unlimited
+ADMISSION_MODEL_RPS = float(os.getenv("ADMISSION_MODEL_RPS", "0"))
+ADMISSION_TENANT_RPS = float(os.getenv("ADMISSION_TENANT_RPS", "0"))
+# tenant buckets kept at most (tenant names come from callers); the rest share one
+ADMISSION_MAX_TENANTS = int(os.getenv("ADMISSION_MAX_TENANTS", "10000"))
+
+INFERENCE_REQUESTS = Counter('inference_requests_total', 'Inference requests by outcome (ok is goodput)',
+                             ['model', 'outcome'])
+INFERENCE_SHED = Counter('inference_shed_total', 'Inference requests shed by admission control',
+                         ['model', 'source', 'reason'])
+
+RESOURCE_EXHAUSTED = grpc.StatusCode.RESOURCE_EXHAUSTED.name
+DEADLINE_EXCEEDED = grpc.StatusCode.DEADLINE_EXCEEDED.name
+
+
+def shed_error(request_id: str, reason: str, retry_after_ms: float) -> Dict:
+    return {"error": f"shed by control plane admission ({reason}): {request_id}", "code": RESOURCE_EXHAUSTED,
+            "retry_after_ms": retry_after_ms, "shed_by": "control_plane", "reason": reason}
+
+
+def record_outcome(model_name: str, result: Dict):
+    """Count a finished run_inference call: ok, shed, deadline or error."""
+    code = result.get("code")
+    if "error" not in result:
+        outcome = "ok"
+    elif code == RESOURCE_EXHAUSTED:
+        outcome = "shed"
+        INFERENCE_SHED.labels(model=model_name, source=result.get("shed_by", "core"),
+                              reason=result.get("reason", "core")).inc()
+    elif code == DEADLINE_EXCEEDED:
+        outcome = "deadline"
+    else:
+        outcome = "error"
+    INFERENCE_REQUESTS.labels(model=model_name, outcome=outcome).inc()
+
+
+class _TokenBucket:
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.refilled = time.monotonic()
+
+    def wait_ms(self, now: float) -> float:
+        """0 if a token is available now, else ms until one is."""
+        self.tokens = min(self.burst, self.tokens + (now - self.refilled) * self.rate)
+        self.refilled = now
+        return max(1.0 - self.tokens, 0.0) / self.rate * 1000.0
+
+    def full_at(self, now: float) -> bool:
+        """Idle long enough to have refilled: no different from a new bucket."""
+        return self.tokens + (now - self.refilled) * self.rate >= self.burst
+
+
+class AdmissionLimiter:
+    """Per-model in-flight cap and token buckets per model and per tenant.
+
+    `admit()` either admits a call, which must later be `release()`d, or returns
+    (reason, retry_after_ms). For the in-flight cap the hint is the model's recent mean
+    call latency, roughly when a slot frees up. Safe to share between threads; the
+    async client uses it from its event loop.
+    """
+
+    def __init__(self, max_inflight: int = ADMISSION_MAX_INFLIGHT, model_rps: float = ADMISSION_MODEL_RPS,
+                 tenant_rps: float = ADMISSION_TENANT_RPS, burst_s: float = 1.0,
+                 max_tenants: int = ADMISSION_MAX_TENANTS):
+        self.max_inflight = max_inflight
+        self.model_rps = model_rps
+        self.tenant_rps = tenant_rps
+        self.burst_s = burst_s
+        self.max_tenants = max(max_tenants, 1)
+        self._inflight: Dict[str, int] = {}
+        self._latency_ms: Dict[str, float] = {}  # EWMA of call latency per model
+        self._model_buckets: Dict[str, _TokenBucket] = {}
+        self._tenant_buckets: Dict[str, _TokenBucket] = {}
+        self._overflow_bucket: Optional[_TokenBucket] = None  # tenants over max_tenants
+        self._last_sweep = 0.0
+        self._admitted: Dict[str, int] = {}
+        self._shed: Dict[Tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "AdmissionLimiter":
+        return cls()
+
+    def enabled(self) -> bool:
+        return self.max_inflight > 0 or self.model_rps > 0 or self.tenant_rps > 0
+
+    def _bucket(self, buckets: Dict[str, _TokenBucket], key: str, rate: float) -> _TokenBucket:
+        bucket = buckets.get(key)
+        if bucket is None:
+            bucket = buckets[key] = _TokenBucket(rate, max(rate * self.burst_s, 1.0))
+        return bucket
+
+    def _tenant_bucket(self, tenant: str, now: float) -> _TokenBucket:
+        # at the cap, drop buckets that refilled while idle (at most once a second);
+        # tenants that still find no room share the overflow bucket
+        bucket = self._tenant_buckets.get(tenant)
+        if bucket is not None:
+            return bucket
+        if len(self._tenant_buckets) >= self.max_tenants and now - self._last_sweep >= 1.0:
+            self._last_sweep = now
+            self._tenant_buckets = {t: b for t, b in self._tenant_buckets.items() if not b.full_at(now)}
+        if len(self._tenant_buckets) >= self.max_tenants:
+            if self._overflow_bucket is None:
+                self._overflow_bucket = _TokenBucket(self.tenant_rps, max(self.tenant_rps * self.burst_s, 1.0))
+            return self._overflow_bucket
+        return self._bucket(self._tenant_buckets, tenant, self.tenant_rps)
+
+    def admit(self, model_name: str, tenant: str = "") -> Optional[Tuple[str, float]]:
+        now = time.monotonic()
+        with self._lock:
+            reason, retry_after_ms = None, 0.0
+            inflight = self._inflight.get(model_name, 0)
+            tenant_bucket = self._tenant_bucket(tenant, now) if self.tenant_rps > 0 else None
+            model_bucket = self._bucket(self._model_buckets, model_name, self.model_rps) if self.model_rps > 0 else None
+            tenant_wait = tenant_bucket.wait_ms(now) if tenant_bucket else 0.0
+            model_wait = model_bucket.wait_ms(now) if model_bucket else 0.0
+            if self.max_inflight > 0 and inflight >= self.max_inflight:
+                reason, retry_after_ms = "inflight", self._latency_ms.get(model_name, 1.0)
+            elif tenant_wait > 0:
+                reason, retry_after_ms = "tenant_rate", tenant_wait
+            elif model_wait > 0:
+                reason, retry_after_ms = "model_rate", model_wait
+            if reason is not None:
+                self._shed[(model_name, reason)] = self._shed.get((model_name, reason), 0) + 1
+                return reason, max(retry_after_ms, 1.0)
+            for bucket in (tenant_bucket, model_bucket):
+                if bucket is not None:
+                    bucket.tokens -= 1.0
+            self._inflight[model_name] = inflight + 1
+            self._admitted[model_name] = self._admitted.get(model_name, 0) + 1
+            return None
+
+    def release(self, model_name: str, latency_s: Optional[float] = None):
+        with self._lock:
+            self._inflight[model_name] -= 1
+            if latency_s is not None:
+                prev = self._latency_ms.get(model_name)
+                ms = latency_s * 1000.0
+                self._latency_ms[model_name] = ms if prev is None else 0.8 * prev + 0.2 * ms
+
+    def stats(self) -> Dict:
+        with self._lock:
+            models = sorted(set(self._admitted) | {m for m, _ in self._shed})
+            return {
+                "max_inflight": self.max_inflight,
+                "model_rps": self.model_rps,
+                "tenant_rps": self.tenant_rps,
+                "tenant_buckets": len(self._tenant_buckets),
+                "models": {
+                    m: {
+                        "inflight": self._inflight.get(m, 0),
+                        "admitted": self._admitted.get(m, 0),
+                        "shed": {r: n for (model, r), n in sorted(self._shed.items()) if model == m},
+                    }
+                    for m in models
+                },
+            }
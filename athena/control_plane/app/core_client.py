@@ -1,67 +1,952 @@
-# control_plane/app/core_client.py
-import os
-import grpc
-import time
-from typing import List
-
-# generated proto stubs — ensure you generated these with grpc_tools.protoc
-try:
-    from control_plane import inference_pb2, inference_pb2_grpc
-except Exception:
-    # fallback import path if module layout differs
-    import inference_pb2, inference_pb2_grpc
-
-DEFAULT_HOST = os.getenv("CORE_GRPC_HOST", "localhost")
-DEFAULT_PORT = os.getenv("CORE_GRPC_PORT", "50051")
-DEFAULT_TARGET = f"{DEFAULT_HOST}:{DEFAULT_PORT}"
-
-class CoreClient:
-    def __init__(self, target: str = None, timeout_s: float = 5.0):
-        self.target = target or DEFAULT_TARGET
-        self.timeout = timeout_s
-        self.channel = grpc.insecure_channel(self.target)
-        self.stub = inference_pb2_grpc.InferenceServiceStub(self.channel)
-
-    def load_model(self, model_name: str, version: str):
-        req = inference_pb2.ModelRef(model_name=model_name, version=version)
-        try:
-            resp = self.stub.LoadModel(req, timeout=self.timeout)
-            return {"ok": resp.ok, "message": resp.message}
-        except grpc.RpcError as e:
-            return {"ok": False, "message": e.details() if hasattr(e, "details") else str(e)}
-
-    def unload_model(self, model_name: str, version: str):
-        req = inference_pb2.ModelRef(model_name=model_name, version=version)
-        try:
-            resp = self.stub.UnloadModel(req, timeout=self.timeout)
-            return {"ok": resp.ok, "message": resp.message}
-        except grpc.RpcError as e:
-            return {"ok": False, "message": e.details() if hasattr(e, "details") else str(e)}
-
-    def get_model_status(self, model_name: str, version: str):
-        req = inference_pb2.ModelRef(model_name=model_name, version=version)
-        try:
-            resp = self.stub.GetModelStatus(req, timeout=self.timeout)
-            return {"model_name": resp.model_name, "version": resp.version, "status": resp.status}
-        except grpc.RpcError as e:
-            return {"error": e.details() if hasattr(e, "details") else str(e)}
-
-    def run_inference(self, request_id: str, inputs: List[float], model_name: str = "", model_version: str = ""):
-        req = inference_pb2.InferenceRequest(
-            request_id=request_id,
-            inputs=inputs,
-            model_name=model_name,
-            model_version=model_version
-        )
-        start = time.time()
-        try:
-            resp = self.stub.RunInference(req, timeout=self.timeout)
-            latency_ms = (time.time() - start) * 1000.0
-            return {
-                "request_id": resp.request_id,
-                "outputs": list(resp.outputs),
-                "latency_ms": latency_ms,
-                "status": resp.status
-            }
-        except grpc.RpcError as e:
-            return {"error": e.details() if hasattr(e, "details") else str(e)}
+# control_plane/app/core_client.py
+import os
+import grpc
+import time
+import queue
+import random
+import asyncio
+import itertools
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import AsyncIterable, AsyncIterator, Callable, Collection, Dict, List, Optional, Sequence, Union
+
+# generated proto stubs — ensure you generated these with grpc_tools.protoc
+try:
+    from control_plane import inference_pb2, inference_pb2_grpc
+except Exception:
+    # fallback import path if module layout differs
+    import inference_pb2, inference_pb2_grpc
+
+from .admission import RESOURCE_EXHAUSTED, AdmissionLimiter, record_outcome, shed_error
+from .local_transport import ShmRing, parse_target
+from .placement import PlacementEngine, PlacementError
+from .result_cache import ResultCache
+from .single_flight import SingleFlight
+from .tensor import TensorLike, from_tensor, is_tensor_like, to_tensor
+from .tracing import end_rpc_span, rpc_metadata, rpc_span
+
+DEFAULT_HOST = os.getenv("CORE_GRPC_HOST", "localhost")
+DEFAULT_PORT = os.getenv("CORE_GRPC_PORT", "50051")
+DEFAULT_TARGET = f"{DEFAULT_HOST}:{DEFAULT_PORT}"
+# how long UnloadModel may wait for the version's in-flight requests before giving up
+UNLOAD_DRAIN_TIMEOUT_MS = int(os.getenv("CORE_UNLOAD_DRAIN_TIMEOUT_MS", "30000"))
+# comma-separated list of core endpoints for the async pool, e.g. "core-0:50051,core-1:50051";
+# unix:///path and shm:///path select the local transports (see local_transport.py)
+DEFAULT_TARGETS = [t.strip() for t in os.getenv("CORE_GRPC_TARGETS", DEFAULT_TARGET).split(",") if t.strip()]
+
+# keepalive pings keep idle pooled channels warm and detect dead cores early
+KEEPALIVE_OPTIONS = [
+    ("grpc.keepalive_time_ms", 10000),
+    ("grpc.keepalive_timeout_ms", 5000),
+    ("grpc.keepalive_permit_without_calls", 1),
+    ("grpc.http2.max_pings_without_data", 0),
+]
+
+def _rpc_error_message(e: grpc.RpcError) -> str:
+    return e.details() if hasattr(e, "details") else str(e)
+
+def _retry_after_ms(e: grpc.RpcError) -> Optional[float]:
+    # set by the core's admission control alongside RESOURCE_EXHAUSTED
+    try:
+        metadata = e.trailing_metadata() or ()
+    except Exception:
+        return None
+    for key, value in metadata:
+        if key == "retry-after-ms":
+            return float(value)
+    return None
+
+def _rpc_error(e: grpc.RpcError) -> Dict:
+    # the status code lets callers tell a missed deadline from a real failure
+    code = e.code() if hasattr(e, "code") else None
+    error = {"error": _rpc_error_message(e), "code": code.name if code else "UNKNOWN"}
+    if code == grpc.StatusCode.RESOURCE_EXHAUSTED:
+        retry_after_ms = _retry_after_ms(e)
+        if retry_after_ms is not None:
+            error["retry_after_ms"] = retry_after_ms
+    return error
+
+def _deadline_error(request_id: str) -> Dict:
+    return {"error": f"deadline expired before send: {request_id}", "code": grpc.StatusCode.DEADLINE_EXCEEDED.name}
+
+def _remaining_ms(deadline: Optional[float]) -> Optional[float]:
+    # budget left until an absolute time.monotonic() deadline
+    return None if deadline is None else max(deadline - time.monotonic(), 0.0) * 1000.0
+
+def _retry_delay_s(result: Dict, attempt: int, max_retries: int, deadline: Optional[float]) -> Optional[float]:
+    """Back-off before retrying a shed (RESOURCE_EXHAUSTED) call, or None to give up."""
+    if attempt >= max_retries or result.get("code") != RESOURCE_EXHAUSTED:
+        return None
+    # honour the retry-after hint, with jitter so shed callers don't come back in lockstep
+    delay_s = result.get("retry_after_ms", 10.0) / 1000.0 * random.uniform(1.0, 1.5)
+    if deadline is not None and time.monotonic() + delay_s >= deadline:
+        return None  # the retry could not finish in time anyway
+    return delay_s
+
+def build_inference_request(request_id: str, inputs: Union[List[float], TensorLike],
+                            model_name: str = "", model_version: str = "", tenant: str = ""):
+    """Plain lists travel as `repeated float`; NumPy arrays and buffers as a packed Tensor."""
+    if is_tensor_like(inputs):
+        return inference_pb2.InferenceRequest(request_id=request_id, input_tensor=to_tensor(inputs),
+                                              model_name=model_name, model_version=model_version, tenant=tenant)
+    return inference_pb2.InferenceRequest(request_id=request_id, inputs=inputs,
+                                          model_name=model_name, model_version=model_version, tenant=tenant)
+
+def _reply_to_dict(resp, latency_ms: float, outputs=None) -> Dict:
+    # packed replies come back as a zero-copy ndarray/memoryview instead of a list;
+    # `outputs` is set when they came back through shared memory
+    if outputs is None:
+        outputs = from_tensor(resp.output_tensor) if resp.HasField("output_tensor") else list(resp.outputs)
+    reply = {
+        "request_id": resp.request_id,
+        "outputs": outputs,
+        "latency_ms": latency_ms,
+        "status": resp.status,
+        "model_version": resp.model_version,
+    }
+    if resp.HasField("timings"):  # only for traced requests
+        t = resp.timings
+        reply["timings"] = {"queue_ms": t.queue_ms, "batch_ms": t.batch_ms, "exec_ms": t.exec_ms, "total_ms": t.total_ms}
+    return reply
+
+
+def _model_status_to_dict(resp) -> Dict:
+    return {"model_name": resp.model_name, "version": resp.version, "status": resp.status,
+            "active_version": resp.active_version, "in_flight": resp.in_flight}
+
+
+def _batcher_stats_to_dict(resp) -> Dict:
+    return {f.name: getattr(resp, f.name) for f in resp.DESCRIPTOR.fields}
+
+def _histogram_to_dict(h) -> Dict:
+    return {"bounds": list(h.bounds), "counts": list(h.counts), "count": h.count, "sum": h.sum}
+
+def _runtime_stats_to_dict(resp) -> Dict:
+    return {
+        "uptime_s": resp.uptime_s,
+        "queue_depth": resp.queue_depth,
+        "expired_total": resp.expired_total,
+        "rejected_total": resp.rejected_total,
+        "batch_sizes": _histogram_to_dict(resp.batch_sizes),
+        "models": [
+            {"model_name": m.model_name, "version": m.version, "latency_ms": _histogram_to_dict(m.latency_ms)}
+            for m in resp.models
+        ],
+        "batcher": _batcher_stats_to_dict(resp.batcher),
+        "queues": [
+            {"model_name": q.model_name, "version": q.version, "batcher": _batcher_stats_to_dict(q.batcher)}
+            for q in resp.queues
+        ],
+        "admitted_total": resp.admitted_total,
+        "shed_total": resp.shed_total,
+        "shed": [
+            {"model_name": d.model_name, "version": d.version, "reason": d.reason, "count": d.count}
+            for d in resp.shed
+        ],
+    }
+
+
+class MicroBatcher:
+    """Collects concurrent single requests and ships them as one RunInferenceBatch RPC.
+
+    A flusher thread takes the first waiting request, then keeps collecting for up to
+    `window_ms` or until `max_batch_size` requests are queued. The batch is handed to
+    `send_batch` on a small executor so the next batch can form while one is in flight.
+    Each caller blocks only on its own Future and gets its own reply back.
+
+    Requests submitted with a deadline are dropped at flush time if it has already
+    passed, and the batch RPC is sent with the tightest remaining deadline.
+    """
+
+    def __init__(self, send_batch: Callable[[List, Optional[float]], List[Dict]], max_batch_size: int = 32,
+                 window_ms: float = 2.0, max_inflight_batches: int = 4):
+        self._send_batch = send_batch
+        self.max_batch_size = max_batch_size
+        self.window_s = window_ms / 1000.0
+        self._queue: "queue.Queue" = queue.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=max_inflight_batches, thread_name_prefix="core-batch")
+        self._closed = False
+        self._thread = threading.Thread(target=self._loop, name="core-microbatcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, req, timeout_s: Optional[float] = None) -> Dict:
+        if self._closed:
+            raise RuntimeError("MicroBatcher is closed")
+        fut: Future = Future()
+        deadline = None if timeout_s is None else time.monotonic() + timeout_s
+        self._queue.put((req, fut, deadline))
+        return fut.result()
+
+    def _loop(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.window_s
+            stop = False
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            self._executor.submit(self._flush, batch)
+            if stop:
+                return
+
+    def _flush(self, batch):
+        now = time.monotonic()
+        live = []
+        for req, fut, deadline in batch:
+            if deadline is not None and deadline <= now:
+                fut.set_result(_deadline_error(req.request_id))
+            else:
+                live.append((req, fut, deadline))
+        if not live:
+            return
+        deadlines = [d for _, _, d in live if d is not None]
+        timeout_s = min(deadlines) - now if deadlines else None
+        try:
+            results = self._send_batch([req for req, _, _ in live], timeout_s)
+        except Exception as e:  # never leave a caller hanging
+            results = [{"error": str(e)} for _ in live]
+        for (_, fut, _), result in zip(live, results):
+            fut.set_result(result)
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            self._queue.put(None)
+            self._thread.join()
+            self._executor.shutdown(wait=True)
+
+
+class CoreClient:
+    """Blocking client for one core. `target` is host:port, or unix:///path/to/socket /
+    shm:///path/to/socket for a core on the same host (see local_transport.py)."""
+
+    def __init__(self, target: str = None, timeout_s: float = 5.0,
+                 batch_window_ms: float = 0.0, max_batch_size: int = 32, cache: Optional[ResultCache] = None,
+                 single_flight: Optional[SingleFlight] = None, admission: Optional[AdmissionLimiter] = None,
+                 overload_retries: int = 0):
+        self.target = target or DEFAULT_TARGET
+        self.timeout = timeout_s
+        # replies of models enabled in `cache` are reused for identical inputs
+        self.cache = cache
+        # concurrent identical calls to models enabled in `single_flight` share one core call
+        self.single_flight = single_flight
+        # calls over `admission`'s limits fail fast with RESOURCE_EXHAUSTED instead of queueing
+        self.admission = admission
+        # shed calls are retried up to this many times after their retry-after hint
+        self.overload_retries = overload_retries
+        grpc_target, use_shm = parse_target(self.target)
+        self.channel = grpc.insecure_channel(grpc_target)
+        self.stub = inference_pb2_grpc.InferenceServiceStub(self.channel)
+        # shm:// targets pass RunInference tensors through this ring once the core maps it
+        self.shm = ShmRing() if use_shm else None
+        # batch_window_ms > 0 turns on client-side micro-batching of run_inference calls
+        self._batcher = None
+        if batch_window_ms > 0:
+            self._batcher = MicroBatcher(self._send_batch, max_batch_size=max_batch_size, window_ms=batch_window_ms)
+
+    def close(self):
+        if self._batcher is not None:
+            self._batcher.close()
+        if self.shm is not None:
+            if self.shm.registered:
+                try:
+                    self.stub.UnregisterShmRegion(self.shm.region(), timeout=self.timeout)
+                except grpc.RpcError:
+                    pass
+            self.shm.close()
+        self.channel.close()
+
+    def _shm_ready(self) -> bool:
+        shm = self.shm
+        if shm is None or shm.disabled:
+            return False
+        if not shm.registered:
+            with shm.lock:
+                if not shm.registered and not shm.disabled:
+                    try:
+                        for region in shm.stale_regions():
+                            self.stub.UnregisterShmRegion(region, timeout=self.timeout)
+                            shm.on_unregistered(region)
+                        shm.on_registered(self.stub.RegisterShmRegion(shm.region(), timeout=self.timeout))
+                    except grpc.RpcError:
+                        return False  # core not reachable yet: inline for now, retry next call
+        return shm.usable()
+
+    def load_model(self, model_name: str, version: str):
+        req = inference_pb2.ModelRef(model_name=model_name, version=version)
+        try:
+            resp = self.stub.LoadModel(req, timeout=self.timeout)
+            if resp.ok and self.cache is not None:
+                self.cache.invalidate(model_name)
+            return {"ok": resp.ok, "message": resp.message}
+        except grpc.RpcError as e:
+            return {"ok": False, "message": e.details() if hasattr(e, "details") else str(e)}
+
+    def unload_model(self, model_name: str, version: str, drain_timeout_ms: int = UNLOAD_DRAIN_TIMEOUT_MS):
+        """Unload once the version's in-flight requests have finished (up to drain_timeout_ms)."""
+        req = inference_pb2.ModelRef(model_name=model_name, version=version, drain_timeout_ms=drain_timeout_ms)
+        try:
+            resp = self.stub.UnloadModel(req, timeout=self.timeout + drain_timeout_ms / 1000.0)
+            if resp.ok and self.cache is not None:
+                self.cache.invalidate(model_name)
+            return {"ok": resp.ok, "message": resp.message}
+        except grpc.RpcError as e:
+            return {"ok": False, "message": e.details() if hasattr(e, "details") else str(e)}
+
+    def set_active_version(self, model_name: str, version: str):
+        """Route requests that name no version to `version` (which must be loaded)."""
+        req = inference_pb2.ModelRef(model_name=model_name, version=version)
+        try:
+            resp = self.stub.SetActiveVersion(req, timeout=self.timeout)
+            if resp.ok and self.cache is not None:
+                self.cache.invalidate(model_name)
+            return {"ok": resp.ok, "message": resp.message}
+        except grpc.RpcError as e:
+            return {"ok": False, "message": e.details() if hasattr(e, "details") else str(e)}
+
+    def get_model_status(self, model_name: str, version: str):
+        req = inference_pb2.ModelRef(model_name=model_name, version=version)
+        try:
+            return _model_status_to_dict(self.stub.GetModelStatus(req, timeout=self.timeout))
+        except grpc.RpcError as e:
+            return {"error": e.details() if hasattr(e, "details") else str(e)}
+
+    def get_batcher_stats(self):
+        """Current batch window and counters of the core's dynamic batcher."""
+        try:
+            return _batcher_stats_to_dict(self.stub.GetBatcherStats(inference_pb2.Empty(), timeout=self.timeout))
+        except grpc.RpcError as e:
+            return {"error": _rpc_error_message(e)}
+
+    def get_runtime_stats(self):
+        """Queue depth, batch sizes, per-model latency and shed counts from the core."""
+        try:
+            return _runtime_stats_to_dict(self.stub.GetRuntimeStats(inference_pb2.RuntimeStatsRequest(), timeout=self.timeout))
+        except grpc.RpcError as e:
+            return {"error": _rpc_error_message(e)}
+
+    def run_inference(self, request_id: str, inputs: Union[List[float], TensorLike], model_name: str = "",
+                      model_version: str = "", deadline_ms: Optional[float] = None, tenant: str = "",
+                      use_cache: bool = True, coalesce: bool = True):
+        """`deadline_ms` is this request's latency budget. It becomes the gRPC deadline, so
+        the core can run it earliest-deadline-first and shed it once it has expired;
+        without it the client-wide `timeout_s` applies. `tenant` keys per-tenant rate
+        limits. Overloaded calls fail with code RESOURCE_EXHAUSTED and `retry_after_ms`.
+        `use_cache=False` neither reads nor fills the result cache, and `coalesce=False`
+        always makes its own core call (synthetic traffic such as warm-up)."""
+        req = build_inference_request(request_id, inputs, model_name, model_version, tenant)
+        token = None
+        if self.cache is not None and use_cache:
+            cached, token = self.cache.lookup(req)
+            if cached is not None:
+                record_outcome(model_name, cached)
+                return cached
+        if coalesce and self.single_flight is not None and self.single_flight.enabled(model_name):
+            deadline = None if deadline_ms is None else time.monotonic() + deadline_ms / 1000.0
+            try:
+                result = self.single_flight.run(req, lambda: self._run_inference(req, _remaining_ms(deadline)),
+                                                None if deadline_ms is None else deadline_ms / 1000.0)
+            except FutureTimeoutError:
+                return _deadline_error(request_id)
+        else:
+            result = self._run_inference(req, deadline_ms)
+        if token is not None and not result.get("coalesced"):
+            self.cache.store(token, result)
+        record_outcome(model_name, result)
+        return result
+
+    def _run_inference(self, req, deadline_ms: Optional[float]) -> Dict:
+        deadline = None if deadline_ms is None else time.monotonic() + deadline_ms / 1000.0
+        attempt = 0
+        while True:
+            result = self._admit_and_send(req, _remaining_ms(deadline))
+            delay_s = _retry_delay_s(result, attempt, self.overload_retries, deadline)
+            if delay_s is None:
+                return result
+            attempt += 1
+            time.sleep(delay_s)
+
+    def _admit_and_send(self, req, deadline_ms: Optional[float]) -> Dict:
+        if self.admission is None:
+            return self._send_inference(req, deadline_ms)
+        shed = self.admission.admit(req.model_name, req.tenant)
+        if shed is not None:
+            return shed_error(req.request_id, *shed)
+        start = time.monotonic()
+        try:
+            return self._send_inference(req, deadline_ms)
+        finally:
+            self.admission.release(req.model_name, time.monotonic() - start)
+
+    def _send_inference(self, req, deadline_ms: Optional[float]) -> Dict:
+        if deadline_ms is not None and deadline_ms <= 0:
+            return _deadline_error(req.request_id)
+        if self._batcher is not None:
+            return self._batcher.submit(req, None if deadline_ms is None else deadline_ms / 1000.0)
+        timeout = self.timeout if deadline_ms is None else deadline_ms / 1000.0
+        start = time.time()
+        span = rpc_span("RunInference", self.target)
+        trace = {"metadata": rpc_metadata(span)} if span is not None else {}
+        wire, slot = self.shm.encode(req) if self._shm_ready() else (req, None)
+        try:
+            try:
+                resp = self.stub.RunInference(wire, timeout=timeout, **trace)
+            except grpc.RpcError as e:
+                if slot is None:
+                    raise
+                self.shm.release(slot, e.code())
+                if e.code() != grpc.StatusCode.INVALID_ARGUMENT:
+                    raise
+                # the core lost the region (restarted?): this call goes inline, the next re-registers
+                slot = None
+                resp = self.stub.RunInference(req, timeout=max(timeout - (time.time() - start), 0.0), **trace)
+        except grpc.RpcError as e:
+            return end_rpc_span(span, _rpc_error(e))
+        latency_ms = (time.time() - start) * 1000.0
+        outputs = None if slot is None else self.shm.outputs(resp, slot, req.HasField("input_tensor"))
+        return end_rpc_span(span, _reply_to_dict(resp, latency_ms, outputs))
+
+    def run_inference_batch(self, requests: List[Dict]):
+        """Run many predictions in one RPC. Each item takes run_inference's keyword arguments."""
+        return self._send_batch([build_inference_request(**r) for r in requests])
+
+    def _send_batch(self, reqs, timeout_s: Optional[float] = None) -> List[Dict]:
+        start = time.time()
+        try:
+            resp = self.stub.RunInferenceBatch(inference_pb2.InferenceBatchRequest(requests=reqs),
+                                               timeout=self.timeout if timeout_s is None else timeout_s)
+        except grpc.RpcError as e:
+            return [_rpc_error(e) for _ in reqs]
+        latency_ms = (time.time() - start) * 1000.0
+        if len(resp.replies) != len(reqs):
+            error = f"core returned {len(resp.replies)} replies for {len(reqs)} requests"
+            return [{"error": error} for _ in reqs]
+        # replies come back in request order; match by position, not request_id
+        return [_reply_to_dict(r, latency_ms) for r in resp.replies]
+
+
+class _PooledChannel:
+    """One grpc.aio channel to a core endpoint plus its in-flight cap and health flag.
+    Channels to the same shm:// target share that target's ShmRing."""
+
+    def __init__(self, target: str, max_inflight: int, shm: Optional[ShmRing] = None):
+        self.target = target
+        self.channel = grpc.aio.insecure_channel(parse_target(target)[0], options=KEEPALIVE_OPTIONS)
+        self.stub = inference_pb2_grpc.InferenceServiceStub(self.channel)
+        self.slots = asyncio.Semaphore(max_inflight)
+        self.healthy = True
+        self.shm = shm
+        self.outstanding = 0  # calls issued and not yet answered, waiting for a slot included
+
+    def check_health(self) -> bool:
+        state = self.channel.get_state(try_to_connect=True)
+        self.healthy = state not in (grpc.ChannelConnectivity.TRANSIENT_FAILURE, grpc.ChannelConnectivity.SHUTDOWN)
+        return self.healthy
+
+
+class InferenceStream:
+    """A long-lived StreamInference call shared by many concurrent callers.
+
+    `submit()` writes a request and returns a Future resolved when the reply with the
+    same request_id arrives, whatever order the core answers in. At most
+    `max_outstanding` requests may be unanswered; further submits wait for a slot, and
+    `write()` itself waits on HTTP/2 flow control, so a slow core pushes back on callers
+    instead of growing buffers.
+    """
+
+    def __init__(self, call, slot: "_PooledChannel", max_outstanding: int = 128):
+        self._call = call
+        self._slot = slot
+        self._credits = asyncio.Semaphore(max_outstanding)
+        self._pending: Dict[str, tuple] = {}
+        self._write_lock = asyncio.Lock()
+        self._closed = False  # no more replies will arrive
+        self._closing = False  # close() was called; it gives the channel slot back once
+        self._reader = asyncio.create_task(self._read_replies())
+
+    async def _read_replies(self):
+        error = "stream closed"
+        try:
+            async for resp in self._call:
+                entry = self._pending.pop(resp.request_id, None)
+                if entry is None:
+                    continue  # reply for a request we no longer track
+                fut, sent_at = entry
+                self._credits.release()
+                if not fut.done():
+                    fut.set_result(_reply_to_dict(resp, (time.time() - sent_at) * 1000.0))
+        except grpc.RpcError as e:
+            if e.code() == grpc.StatusCode.UNAVAILABLE:
+                self._slot.healthy = False
+            error = _rpc_error_message(e)
+        except asyncio.CancelledError:
+            pass
+        self._closed = True
+        for fut, _ in self._pending.values():
+            if not fut.done():
+                fut.set_result({"error": error})
+            self._credits.release()
+        self._pending.clear()
+
+    async def submit(self, request_id: str, inputs: Union[List[float], TensorLike], model_name: str = "", model_version: str = "") -> asyncio.Future:
+        if self._closed:
+            raise RuntimeError("inference stream is closed")
+        if request_id in self._pending:
+            raise ValueError(f"request_id {request_id!r} is already in flight on this stream")
+        await self._credits.acquire()
+        fut = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = (fut, time.time())
+        req = build_inference_request(request_id, inputs, model_name, model_version)
+        try:
+            # grpc.aio allows one outstanding write per call
+            async with self._write_lock:
+                await self._call.write(req)
+        except Exception as e:
+            if self._pending.pop(request_id, None) is not None:
+                self._credits.release()
+            fut.set_result({"error": str(e)})
+        return fut
+
+    async def infer(self, request_id: str, inputs: Union[List[float], TensorLike], model_name: str = "", model_version: str = ""):
+        return await (await self.submit(request_id, inputs, model_name, model_version))
+
+    async def close(self):
+        if self._closing:
+            await self._reader
+            return
+        self._closing = True
+        try:
+            if not self._closed:
+                async with self._write_lock:
+                    await self._call.done_writing()
+            # let in-flight replies drain; the reader resolves anything left with an error
+            await self._reader
+        finally:
+            self._slot.slots.release()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+
+class AsyncCoreClient:
+    """asyncio-native client for the core, safe to await from FastAPI handlers.
+
+    Keeps `channels_per_target` grpc.aio channels per core endpoint and round-robins
+    calls across the healthy ones. Each channel admits at most `max_inflight_per_channel`
+    concurrent calls; further callers wait for a free slot instead of piling onto HTTP/2.
+
+    With a `placement` engine the endpoints are core replicas that each host a subset of
+    the models: lifecycle calls go to the replicas the engine assigns a version to, and
+    inference for a placed model goes to whichever of its hosts has the fewest
+    outstanding calls.
+    Channels are bound to the event loop that created them, so the pool is built lazily
+    on first use and rebuilt if the running loop changes (e.g. under TestClient).
+    """
+
+    def __init__(self, targets: Optional[Sequence[str]] = None, timeout_s: float = 5.0,
+                 channels_per_target: int = 2, max_inflight_per_channel: int = 64,
+                 health_check_interval_s: float = 5.0, cache: Optional[ResultCache] = None,
+                 single_flight: Optional[SingleFlight] = None, admission: Optional[AdmissionLimiter] = None,
+                 overload_retries: int = 0, placement: Optional[PlacementEngine] = None):
+        if isinstance(targets, str):
+            targets = [targets]
+        self.targets = list(targets or DEFAULT_TARGETS)
+        self.timeout = timeout_s
+        self.cache = cache
+        self.single_flight = single_flight
+        self.admission = admission
+        self.overload_retries = overload_retries
+        self.placement = placement
+        self.channels_per_target = channels_per_target
+        self.max_inflight_per_channel = max_inflight_per_channel
+        self.health_check_interval = health_check_interval_s
+        self._channels: List[_PooledChannel] = []
+        # one shared-memory ring per shm:// target, kept across event loops
+        self._shm: Dict[str, ShmRing] = {t: ShmRing() for t in dict.fromkeys(self.targets) if parse_target(t)[1]}
+        self._rr = itertools.count()
+        self._loop = None
+        self._health_task = None
+
+    def _ensure_pool(self):
+        loop = asyncio.get_running_loop()
+        if self._channels and self._loop is loop:
+            return
+        # channels from another (possibly closed) loop cannot be reused; drop them
+        self._channels = [
+            _PooledChannel(t, self.max_inflight_per_channel, self._shm.get(t))
+            for t in self.targets
+            for _ in range(self.channels_per_target)
+        ]
+        self._loop = loop
+        self._health_task = None
+
+    def _pick(self, targets: Optional[Collection[str]] = None) -> _PooledChannel:
+        """Next healthy channel round-robin, or, given `targets`, a channel to the target
+        with the fewest outstanding calls."""
+        self._ensure_pool()
+        if targets:
+            candidates = [ch for ch in self._channels if ch.target in targets]
+            candidates = [ch for ch in candidates if ch.healthy] or candidates
+            if candidates:
+                load: Dict[str, int] = {}
+                for ch in candidates:
+                    load[ch.target] = load.get(ch.target, 0) + ch.outstanding
+                # rotate first so ties don't all land on the first channel
+                start = next(self._rr) % len(candidates)
+                rotated = candidates[start:] + candidates[:start]
+                return min(rotated, key=lambda ch: (load[ch.target], ch.outstanding))
+        n = len(self._channels)
+        start = next(self._rr)
+        for i in range(n):
+            ch = self._channels[(start + i) % n]
+            if ch.healthy:
+                return ch
+        # nothing healthy: keep rotating so grpc can attempt reconnects
+        return self._channels[start % n]
+
+    async def start(self):
+        """Build the pool and start the background health checker."""
+        self._ensure_pool()
+        if self._health_task is None:
+            self._health_task = asyncio.create_task(self._health_loop())
+
+    async def _health_loop(self):
+        while True:
+            outstanding: Dict[str, int] = {}
+            for ch in self._channels:
+                ch.check_health()
+                outstanding[ch.target] = outstanding.get(ch.target, 0) + ch.outstanding
+            if self.placement is not None:
+                for target, n in outstanding.items():
+                    self.placement.observe_load(target, n)
+            await asyncio.sleep(self.health_check_interval)
+
+    async def close(self):
+        if self._health_task is not None:
+            self._health_task.cancel()
+            self._health_task = None
+        channels, self._channels = self._channels, []
+        registered = {ch.target: ch for ch in channels if ch.shm is not None and ch.shm.registered}
+        for ch in registered.values():
+            try:
+                await ch.stub.UnregisterShmRegion(ch.shm.region(), timeout=self.timeout)
+            except grpc.RpcError:
+                pass
+            ch.shm.registered = False  # re-registered if the client is used again
+        for ch in channels:
+            await ch.channel.close()
+
+    def healthy_targets(self) -> List[str]:
+        return sorted({ch.target for ch in self._channels if ch.healthy})
+
+    async def _call(self, method: str, req, deadline: Optional[float] = None, ch: Optional[_PooledChannel] = None,
+                    metadata=None):
+        """`deadline` is an absolute time.monotonic() bound on the whole call, waiting for a
+        pool slot included; the core receives whatever is left of it as the gRPC deadline."""
+        ch = ch or self._pick()
+        ch.outstanding += 1
+        try:
+            timeout = self.timeout
+            if deadline is not None:
+                # raises asyncio.TimeoutError if no slot frees up in time
+                await asyncio.wait_for(ch.slots.acquire(), max(deadline - time.monotonic(), 0.0))
+                timeout = deadline - time.monotonic()
+            else:
+                await ch.slots.acquire()
+            try:
+                if timeout <= 0:
+                    raise asyncio.TimeoutError
+                if metadata is None:
+                    return await getattr(ch.stub, method)(req, timeout=timeout)
+                return await getattr(ch.stub, method)(req, timeout=timeout, metadata=metadata)
+            except grpc.RpcError as e:
+                if e.code() == grpc.StatusCode.UNAVAILABLE:
+                    ch.healthy = False
+                raise
+            finally:
+                ch.slots.release()
+        finally:
+            ch.outstanding -= 1
+
+    def _hosts(self, model_name: str, version: str = "") -> Optional[List[str]]:
+        """Replicas to route `model_name:version` to; None if it is not placed anywhere."""
+        if self.placement is None or not model_name:
+            return None
+        return self.placement.hosts(model_name, version) or None
+
+    def _lifecycle_targets(self, model_name: str, version: str) -> Optional[List[str]]:
+        # every replica when the engine does not know the version (e.g. loaded before it ran)
+        if self.placement is None:
+            return None
+        return self._hosts(model_name, version) or list(dict.fromkeys(self.targets))
+
+    async def _lifecycle_call(self, method: str, req, targets: Optional[Sequence[str]] = None,
+                              deadline: Optional[float] = None) -> Dict[Optional[str], Dict]:
+        """`method` on one channel to each of `targets` (one call to any replica if None),
+        concurrently. {target: {"ok", "message"}}."""
+        async def one(target: Optional[str]) -> Dict:
+            ch = self._pick([target]) if target else self._pick()
+            span = rpc_span(method, ch.target)
+            try:
+                resp = await self._call(method, req, deadline, ch, rpc_metadata(span))
+                result = {"ok": resp.ok, "message": resp.message}
+            except grpc.RpcError as e:
+                result = {"ok": False, "message": _rpc_error_message(e)}
+            except asyncio.TimeoutError:
+                result = {"ok": False, "message": f"timed out: {method} {req.model_name}:{req.version}"}
+            if span is not None:
+                if not result["ok"]:
+                    span.set_error(result["message"])
+                span.end()
+            return result
+
+        targets = list(targets) if targets is not None else [None]
+        return dict(zip(targets, await asyncio.gather(*(one(t) for t in targets))))
+
+    @staticmethod
+    def _merge(results: Dict[Optional[str], Dict]) -> Dict:
+        # a single replica's reply as is; several are ok only if all are
+        if len(results) == 1:
+            return dict(next(iter(results.values())))
+        failed = [f"{t}: {r['message']}" for t, r in results.items() if not r["ok"]]
+        return {"ok": not failed, "message": "; ".join(failed) or next(iter(results.values()))["message"]}
+
+    async def load_model(self, model_name: str, version: str):
+        """Load on the replicas the placement engine picks, topping the version up or
+        trimming it to its replication factor (on any one replica without an engine).
+        With an engine the reply lists the `replicas` now hosting the version; it is ok
+        if at least one does."""
+        req = inference_pb2.ModelRef(model_name=model_name, version=version)
+        if self.placement is None:
+            result = self._merge(await self._lifecycle_call("LoadModel", req))
+        else:
+            try:
+                targets = self.placement.place(model_name, version)
+            except PlacementError as e:
+                return {"ok": False, "message": str(e), "replicas": self.placement.hosts(model_name, version)}
+            # loading is idempotent: replicas that already host the version are asked
+            # again in case they restarted and lost it
+            results = await self._lifecycle_call("LoadModel", req, targets)
+            loaded = [t for t in targets if results[t]["ok"]]
+            extra = [t for t in self.placement.hosts(model_name, version) if t not in targets]
+            result = self._merge(results)
+            result["ok"] = bool(loaded)
+            if loaded:
+                # stop routing to replicas above the replication factor before unloading them
+                self.placement.assign(model_name, version, loaded)
+                if extra:
+                    await self._lifecycle_call("UnloadModel", inference_pb2.ModelRef(
+                        model_name=model_name, version=version, drain_timeout_ms=UNLOAD_DRAIN_TIMEOUT_MS), extra,
+                        deadline=time.monotonic() + self.timeout + UNLOAD_DRAIN_TIMEOUT_MS / 1000.0)
+            result["replicas"] = self.placement.hosts(model_name, version)
+        if result["ok"] and self.cache is not None:
+            self.cache.invalidate(model_name)
+        return result
+
+    async def unload_model(self, model_name: str, version: str, drain_timeout_ms: int = UNLOAD_DRAIN_TIMEOUT_MS):
+        """Unload once the version's in-flight requests have finished (up to drain_timeout_ms),
+        from every replica hosting it."""
+        req = inference_pb2.ModelRef(model_name=model_name, version=version, drain_timeout_ms=drain_timeout_ms)
+        results = await self._lifecycle_call("UnloadModel", req, self._lifecycle_targets(model_name, version),
+                                             deadline=time.monotonic() + self.timeout + drain_timeout_ms / 1000.0)
+        if self.placement is not None:
+            self.placement.remove(model_name, version, [t for t, r in results.items() if r["ok"]])
+        result = self._merge(results)
+        if result["ok"] and self.cache is not None:
+            self.cache.invalidate(model_name)
+        return result
+
+    async def set_active_version(self, model_name: str, version: str):
+        """Route requests that name no version to `version` (which must be loaded)."""
+        req = inference_pb2.ModelRef(model_name=model_name, version=version)
+        result = self._merge(await self._lifecycle_call("SetActiveVersion", req,
+                                                        self._lifecycle_targets(model_name, version)))
+        if result["ok"] and self.placement is not None:
+            self.placement.set_active(model_name, version)
+        if result["ok"] and self.cache is not None:
+            self.cache.invalidate(model_name)
+        return result
+
+    async def get_model_status(self, model_name: str, version: str):
+        req = inference_pb2.ModelRef(model_name=model_name, version=version)
+        hosts = self._hosts(model_name, version)
+        try:
+            return _model_status_to_dict(await self._call("GetModelStatus", req, ch=self._pick(hosts) if hosts else None))
+        except grpc.RpcError as e:
+            return {"error": _rpc_error_message(e)}
+
+    async def get_batcher_stats(self):
+        try:
+            return _batcher_stats_to_dict(await self._call("GetBatcherStats", inference_pb2.Empty()))
+        except grpc.RpcError as e:
+            return {"error": _rpc_error_message(e)}
+
+    async def get_runtime_stats(self):
+        try:
+            return _runtime_stats_to_dict(await self._call("GetRuntimeStats", inference_pb2.RuntimeStatsRequest()))
+        except grpc.RpcError as e:
+            return {"error": _rpc_error_message(e)}
+
+    async def stream_runtime_stats(self, interval_ms: int = 1000) -> AsyncIterator[Dict]:
+        """Yield a runtime stats snapshot every `interval_ms` until cancelled. Unlike the
+        other calls, RPC failures are raised so the consumer can reconnect."""
+        ch = self._pick()
+        call = ch.stub.StreamRuntimeStats(inference_pb2.RuntimeStatsRequest(interval_ms=interval_ms))
+        try:
+            async for resp in call:
+                yield _runtime_stats_to_dict(resp)
+        except grpc.RpcError as e:
+            if e.code() == grpc.StatusCode.UNAVAILABLE:
+                ch.healthy = False
+            raise
+        finally:
+            call.cancel()
+
+    async def run_inference(self, request_id: str, inputs: Union[List[float], TensorLike], model_name: str = "",
+                            model_version: str = "", deadline_ms: Optional[float] = None, tenant: str = "",
+                            use_cache: bool = True, coalesce: bool = True):
+        """See CoreClient.run_inference; the budget also covers waiting for a pool slot."""
+        req = build_inference_request(request_id, inputs, model_name, model_version, tenant)
+        token = None
+        if self.cache is not None and use_cache:
+            cached, token = self.cache.lookup(req)
+            if cached is not None:
+                record_outcome(model_name, cached)
+                return cached
+        if coalesce and self.single_flight is not None and self.single_flight.enabled(model_name):
+            deadline = None if deadline_ms is None else time.monotonic() + deadline_ms / 1000.0
+            try:
+                result = await self.single_flight.run_async(req, lambda: self._run_inference(req, _remaining_ms(deadline)),
+                                                            None if deadline_ms is None else deadline_ms / 1000.0)
+            except asyncio.TimeoutError:
+                return _deadline_error(request_id)
+        else:
+            result = await self._run_inference(req, deadline_ms)
+        if token is not None and not result.get("coalesced"):
+            self.cache.store(token, result)
+        record_outcome(model_name, result)
+        return result
+
+    async def _run_inference(self, req, deadline_ms: Optional[float]) -> Dict:
+        deadline = None if deadline_ms is None else time.monotonic() + deadline_ms / 1000.0
+        attempt = 0
+        while True:
+            result = await self._admit_and_send(req, _remaining_ms(deadline))
+            delay_s = _retry_delay_s(result, attempt, self.overload_retries, deadline)
+            if delay_s is None:
+                return result
+            attempt += 1
+            await asyncio.sleep(delay_s)
+
+    async def _admit_and_send(self, req, deadline_ms: Optional[float]) -> Dict:
+        if self.admission is None:
+            return await self._send_inference(req, deadline_ms)
+        shed = self.admission.admit(req.model_name, req.tenant)
+        if shed is not None:
+            return shed_error(req.request_id, *shed)
+        start = time.monotonic()
+        try:
+            return await self._send_inference(req, deadline_ms)
+        finally:
+            self.admission.release(req.model_name, time.monotonic() - start)
+
+    async def _shm_ready(self, ch: _PooledChannel) -> bool:
+        shm = ch.shm
+        if shm is None or shm.disabled:
+            return False
+        if not shm.registered:
+            try:
+                for region in shm.stale_regions():
+                    await ch.stub.UnregisterShmRegion(region, timeout=self.timeout)
+                    shm.on_unregistered(region)
+                shm.on_registered(await ch.stub.RegisterShmRegion(shm.region(), timeout=self.timeout))
+            except grpc.RpcError:
+                return False  # core not reachable yet: inline for now, retry next call
+        return shm.usable()
+
+    async def _send_inference(self, req, deadline_ms: Optional[float]) -> Dict:
+        start = time.time()
+        deadline = None if deadline_ms is None else time.monotonic() + deadline_ms / 1000.0
+        ch = self._pick(self._hosts(req.model_name, req.model_version))
+        span = rpc_span("RunInference", ch.target)
+        metadata = rpc_metadata(span)
+        wire, slot = ch.shm.encode(req) if await self._shm_ready(ch) else (req, None)
+        try:
+            try:
+                resp = await self._call("RunInference", wire, deadline, ch, metadata)
+            except (asyncio.TimeoutError, grpc.RpcError) as e:
+                if slot is None:
+                    raise
+                code = e.code() if isinstance(e, grpc.RpcError) else None
+                ch.shm.release(slot, code)
+                if code != grpc.StatusCode.INVALID_ARGUMENT:
+                    raise
+                # the core lost the region (restarted?): this call goes inline, the next re-registers
+                slot = None
+                resp = await self._call("RunInference", req, deadline, ch, metadata)
+        except asyncio.TimeoutError:
+            return end_rpc_span(span, _deadline_error(req.request_id))
+        except grpc.RpcError as e:
+            return end_rpc_span(span, _rpc_error(e))
+        latency_ms = (time.time() - start) * 1000.0
+        outputs = None if slot is None else ch.shm.outputs(resp, slot, req.HasField("input_tensor"))
+        return end_rpc_span(span, _reply_to_dict(resp, latency_ms, outputs))
+
+    async def open_stream(self, max_outstanding: int = 128) -> InferenceStream:
+        """Open a StreamInference call on a pooled channel. The stream holds one of the
+        channel's in-flight slots until it is closed."""
+        ch = self._pick()
+        await ch.slots.acquire()
+        try:
+            call = ch.stub.StreamInference()
+            return InferenceStream(call, ch, max_outstanding)
+        except BaseException:
+            ch.slots.release()  # no stream took the slot, so nothing else will free it
+            raise
+
+    async def stream_inference(self, requests: AsyncIterable[Dict], max_outstanding: int = 128) -> AsyncIterator[Dict]:
+        """Send `requests` (dicts of run_inference's arguments) over one open stream and
+        yield replies as they arrive, which may differ from submission order."""
+        async with await self.open_stream(max_outstanding) as stream:
+            completed: asyncio.Queue = asyncio.Queue()
+            submitted = 0
+
+            async def feed():
+                nonlocal submitted
+                try:
+                    async for r in requests:
+                        fut = await stream.submit(**r)
+                        submitted += 1
+                        fut.add_done_callback(completed.put_nowait)
+                finally:
+                    completed.put_nowait(None)  # feeder finished
+
+            feeder = asyncio.create_task(feed())
+            yielded = 0
+            fed = False
+            try:
+                while not fed or yielded < submitted:
+                    fut = await completed.get()
+                    if fut is None:
+                        fed = True
+                        continue
+                    yielded += 1
+                    yield fut.result()
+                await feeder  # surface errors from the request iterator
+            finally:
+                feeder.cancel()
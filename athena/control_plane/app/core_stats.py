@@ -0,0 +1,167 @@
+# control_plane/app/core_stats.py
+# Background sampling of the core's GetRuntimeStats / StreamRuntimeStats.
+#
+# CoreStatsSampler keeps the latest snapshot in memory; CoreStatsCollector republishes it
+# as Prometheus metrics at scrape time. Neither /metrics nor /api/metrics ever waits on
+# a gRPC call, and a dead core only makes the numbers stale (see core_stats_age_seconds).
+import os
+import time
+import asyncio
+import logging
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily, HistogramMetricFamily
+
+logger = logging.getLogger(__name__)
+
+CORE_STATS_INTERVAL_S = float(os.getenv("CORE_STATS_INTERVAL_S", "1.0"))
+CORE_STATS_STREAM = os.getenv("CORE_STATS_STREAM", "1") not in ("0", "false", "no")
+
+
+class CoreStatsSampler:
+    """Latest core runtime stats, refreshed every `interval_s` by a background task.
+
+    With `stream=True` one StreamRuntimeStats call is held open and the core pushes
+    snapshots; otherwise GetRuntimeStats is polled. Failures are retried after
+    `interval_s`, keeping the last good snapshot.
+    """
+
+    def __init__(self, client, interval_s: float = CORE_STATS_INTERVAL_S, stream: bool = CORE_STATS_STREAM):
+        self.client = client
+        self.interval_s = interval_s
+        self.stream = stream
+        self.latest: Optional[Dict] = None
+        self.updated_at: Optional[float] = None
+        self.errors = 0
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def _run(self):
+        while True:
+            try:
+                if self.stream:
+                    async for snapshot in self.client.stream_runtime_stats(int(self.interval_s * 1000)):
+                        self._update(snapshot)
+                else:
+                    snapshot = await self.client.get_runtime_stats()
+                    if "error" in snapshot:
+                        raise RuntimeError(snapshot["error"])
+                    self._update(snapshot)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.errors += 1
+                logger.debug("core stats sample failed: %s", e)
+            await asyncio.sleep(self.interval_s)
+
+    def _update(self, snapshot: Dict):
+        self.latest = snapshot
+        self.updated_at = time.time()
+
+    def age_s(self) -> Optional[float]:
+        return None if self.updated_at is None else time.time() - self.updated_at
+
+    def summary(self) -> Dict:
+        """Cached headline numbers for /api/metrics (zeros until the first sample)."""
+        s = self.latest or {}
+        batcher = s.get("batcher", {})
+        return {
+            "queue_depth": s.get("queue_depth", 0),
+            "expired_total": s.get("expired_total", 0),
+            "rejected_total": s.get("rejected_total", 0),
+            "shed_total": s.get("shed_total", 0),
+            "batch_window": {
+                "max_batch_size": batcher.get("max_batch_size", 0),
+                "max_wait_ms": batcher.get("max_wait_ms", 0.0),
+            },
+            "age_s": self.age_s(),
+        }
+
+
+def _cumulative_buckets(hist: Dict, scale: float = 1.0) -> Tuple[List[Tuple[str, float]], float]:
+    # core histograms carry per-bucket counts; Prometheus wants cumulative "le" buckets
+    buckets, running = [], 0
+    for bound, count in zip(hist["bounds"], hist["counts"]):
+        running += count
+        buckets.append((repr(bound * scale), running))
+    buckets.append(("+Inf", hist["count"]))
+    return buckets, hist["sum"] * scale
+
+
+class CoreStatsCollector:
+    """Prometheus collector exposing a CoreStatsSampler's cached snapshot."""
+
+    def __init__(self, sampler: CoreStatsSampler):
+        self.sampler = sampler
+
+    def describe(self):
+        # fixed metric names, so registration doesn't need a snapshot
+        return [
+            GaugeMetricFamily('dispatcher_queue_depth', 'Queue depth in C++ core dispatcher'),
+            GaugeMetricFamily('core_stats_age_seconds', 'Age of the last core runtime stats sample'),
+            CounterMetricFamily('core_requests_expired', 'Requests shed by the core after their deadline passed'),
+            CounterMetricFamily('core_requests_rejected', 'Requests refused by the core before queueing'),
+            CounterMetricFamily('core_requests_admitted', 'Requests passed by the core admission control'),
+            CounterMetricFamily('core_requests_shed', 'Requests shed by the core admission control',
+                                labels=['model', 'version', 'reason']),
+            GaugeMetricFamily('core_batch_window_size', 'Current max batch size of the core batcher'),
+            GaugeMetricFamily('core_batch_window_wait_seconds', 'Current batch wait window of the core batcher'),
+            GaugeMetricFamily('core_model_queue_depth', 'Queued requests per model in the core', labels=['model', 'version']),
+            HistogramMetricFamily('core_batch_size', 'Batch sizes executed by the core'),
+            HistogramMetricFamily('core_inference_latency_seconds', 'Core inference latency per model',
+                                  labels=['model', 'version']),
+        ]
+
+    def collect(self) -> Iterator:
+        s = self.sampler.latest
+        if s is None:
+            return
+        yield GaugeMetricFamily('dispatcher_queue_depth', 'Queue depth in C++ core dispatcher', value=s["queue_depth"])
+        yield GaugeMetricFamily('core_stats_age_seconds', 'Age of the last core runtime stats sample',
+                                value=self.sampler.age_s())
+        yield CounterMetricFamily('core_requests_expired', 'Requests shed by the core after their deadline passed',
+                                  value=s["expired_total"])
+        yield CounterMetricFamily('core_requests_rejected', 'Requests refused by the core before queueing',
+                                  value=s["rejected_total"])
+        yield CounterMetricFamily('core_requests_admitted', 'Requests passed by the core admission control',
+                                  value=s.get("admitted_total", 0))
+        shed = CounterMetricFamily('core_requests_shed', 'Requests shed by the core admission control',
+                                   labels=['model', 'version', 'reason'])
+        for d in s.get("shed", []):
+            shed.add_metric([d["model_name"], d["version"], d["reason"]], d["count"])
+        yield shed
+        yield GaugeMetricFamily('core_batch_window_size', 'Current max batch size of the core batcher',
+                                value=s["batcher"]["max_batch_size"])
+        yield GaugeMetricFamily('core_batch_window_wait_seconds', 'Current batch wait window of the core batcher',
+                                value=s["batcher"]["max_wait_ms"] / 1000.0)
+
+        queue_depth = GaugeMetricFamily('core_model_queue_depth', 'Queued requests per model in the core',
+                                        labels=['model', 'version'])
+        for q in s.get("queues", []):
+            queue_depth.add_metric([q["model_name"], q["version"]], q["batcher"]["queue_depth"])
+        yield queue_depth
+
+        batch_sizes = HistogramMetricFamily('core_batch_size', 'Batch sizes executed by the core')
+        if s["batch_sizes"]["bounds"]:
+            buckets, total = _cumulative_buckets(s["batch_sizes"])
+            batch_sizes.add_metric([], buckets, total)
+        yield batch_sizes
+
+        latency = HistogramMetricFamily('core_inference_latency_seconds', 'Core inference latency per model',
+                                        labels=['model', 'version'])
+        for m in s["models"]:
+            buckets, total = _cumulative_buckets(m["latency_ms"], scale=0.001)
+            latency.add_metric([m["model_name"], m["version"]], buckets, total)
+        yield latency
@@ -1,21 +1,159 @@
 # control_plane/app/crud.py
-from sqlalchemy.orm import Session
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
 from . import models
 from .models import ModelStatus
+from .model_cache import (
+    _MISSING, ModelRecord, cache_for, REGISTRY_VERSION_BUMP, REGISTRY_VERSION_SELECT,
+)
 
-def get_model_by_name(db: Session, name: str):
-    return db.query(models.Model).filter(models.Model.name == name).order_by(models.Model.id.desc()).first()
+async def _sync_cache(db: AsyncSession):
+    # Cheap cross-replica coherence: compare the registry version counter at most
+    # every coherence interval, and drop everything if another writer bumped it.
+    cache = cache_for(db.get_bind())
+    if cache.needs_sync():
+        cache.observe_version((await db.execute(REGISTRY_VERSION_SELECT)).scalar() or 0)
+    return cache
 
-def create_or_update_model(db: Session, name: str, version: str, status: ModelStatus):
-    model = db.query(models.Model).filter(models.Model.name == name, models.Model.version == version).first()
+async def _bump_registry_version(db: AsyncSession):
+    if (await db.execute(REGISTRY_VERSION_BUMP)).rowcount == 0:
+        db.add(models.RegistryVersion(id=1, version=1))
+
+async def get_model_by_name(db: AsyncSession, name: str):
+    cache = await _sync_cache(db)
+    key = ("by_name", name)
+    cached = cache.get("get_model_by_name", key)
+    if cached is not _MISSING:
+        return cached
+    result = await db.execute(
+        select(models.Model).where(models.Model.name == name).order_by(models.Model.id.desc()).limit(1)
+    )
+    model = result.scalars().first()
+    record = ModelRecord.from_orm(model) if model else None
+    cache.put(key, record)
+    return record
+
+async def create_or_update_model(db: AsyncSession, name: str, version: str, status: ModelStatus):
+    result = await db.execute(
+        select(models.Model).where(models.Model.name == name, models.Model.version == version)
+    )
+    model = result.scalars().first()
     if model:
         model.status = status
     else:
         model = models.Model(name=name, version=version, status=status)
         db.add(model)
-    db.commit()
-    db.refresh(model)
+    await _bump_registry_version(db)
+    await db.commit()
+    await db.refresh(model)
+    cache_for(db.get_bind()).invalidate()
     return model
 
-def list_models(db: Session, limit: int = 100):
-    return db.query(models.Model).order_by(models.Model.created_at.desc()).limit(limit).all()
+async def get_active_version(db: AsyncSession, name: str) -> Optional[str]:
+    cache = await _sync_cache(db)
+    key = ("active", name)
+    cached = cache.get("get_active_version", key)
+    if cached is not _MISSING:
+        return cached
+    row = await db.get(models.ActiveVersion, name)
+    version = row.version if row else None
+    cache.put(key, version)
+    return version
+
+async def activate_version(db: AsyncSession, name: str, version: str, previous: Optional[str] = None):
+    """Point `name` at `version` (now LOADED) and mark `previous` DRAINING, in one commit."""
+    row = await db.get(models.ActiveVersion, name)
+    if row:
+        row.version = version
+    else:
+        db.add(models.ActiveVersion(name=name, version=version))
+    for v, status in ((version, ModelStatus.LOADED), (previous, ModelStatus.DRAINING)):
+        if v is None:
+            continue
+        model = (await db.execute(
+            select(models.Model).where(models.Model.name == name, models.Model.version == v)
+        )).scalars().first()
+        if model:
+            model.status = status
+        else:
+            db.add(models.Model(name=name, version=v, status=status))
+    await _bump_registry_version(db)
+    await db.commit()
+    cache_for(db.get_bind()).invalidate()
+
+async def clear_active_version(db: AsyncSession, name: str, version: str):
+    """Drop the pointer if it names `version`, e.g. after that version was unloaded."""
+    result = await db.execute(
+        delete(models.ActiveVersion).where(models.ActiveVersion.name == name, models.ActiveVersion.version == version)
+    )
+    if result.rowcount:
+        await _bump_registry_version(db)
+    await db.commit()
+    if result.rowcount:
+        cache_for(db.get_bind()).invalidate()
+
+async def list_models(db: AsyncSession, limit: int = 100):
+    cache = await _sync_cache(db)
+    key = ("list", limit)
+    cached = cache.get("list_models", key)
+    if cached is not _MISSING:
+        return cached
+    result = await db.execute(select(models.Model).order_by(models.Model.created_at.desc()).limit(limit))
+    records = [ModelRecord.from_orm(m) for m in result.scalars().all()]
+    cache.put(key, records)
+    return records
+
+# dialect-specific INSERT constructs that support ON CONFLICT
+_UPSERT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+async def bulk_upsert_models(db: AsyncSession, items: Iterable[Tuple[str, str, ModelStatus]]) -> List[ModelRecord]:
+    """Write many name:version statuses in one INSERT ... ON CONFLICT DO UPDATE and one commit."""
+    # ON CONFLICT cannot touch the same row twice in one statement; last write wins
+    rows = {(name, version): status for name, version, status in items}
+    if not rows:
+        return []
+    insert = _UPSERT_INSERTS[db.get_bind().dialect.name]
+    stmt = insert(models.Model).values([
+        {"name": name, "version": version, "status": status} for (name, version), status in rows.items()
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[models.Model.name, models.Model.version],
+        set_={"status": stmt.excluded.status, "updated_at": func.now()},
+    ).returning(*models.Model.__table__.columns)
+    result = await db.execute(stmt)
+    records = [ModelRecord(r.id, r.name, r.version, r.status, r.created_at, r.updated_at) for r in result]
+    await _bump_registry_version(db)
+    await db.commit()
+    cache_for(db.get_bind()).invalidate()
+    return records
+
+async def list_placements(db: AsyncSession) -> List[Tuple[str, str, str, float]]:
+    """Every (name, version, replica, memory_mb) assignment, for PlacementEngine.restore()."""
+    result = await db.execute(select(models.ModelPlacement).order_by(models.ModelPlacement.id))
+    return [(p.name, p.version, p.replica, p.memory_mb) for p in result.scalars().all()]
+
+async def list_active_versions(db: AsyncSession) -> Dict[str, str]:
+    result = await db.execute(select(models.ActiveVersion))
+    return {row.name: row.version for row in result.scalars().all()}
+
+async def set_placements(db: AsyncSession, name: str, version: str, replicas: Iterable[str], memory_mb: float = 0.0):
+    """Record that name:version is loaded on exactly `replicas` (none: drop its rows)."""
+    replicas = set(replicas)
+    result = await db.execute(
+        select(models.ModelPlacement).where(models.ModelPlacement.name == name, models.ModelPlacement.version == version)
+    )
+    existing = {p.replica: p for p in result.scalars().all()}
+    if set(existing) == replicas and all(p.memory_mb == memory_mb for p in existing.values()):
+        return
+    for replica, placement in existing.items():
+        if replica not in replicas:
+            await db.delete(placement)
+        else:
+            placement.memory_mb = memory_mb
+    for replica in replicas - set(existing):
+        db.add(models.ModelPlacement(name=name, version=version, replica=replica, memory_mb=memory_mb))
+    await _bump_registry_version(db)
+    await db.commit()
+    cache_for(db.get_bind()).invalidate()
@@ -0,0 +1,199 @@
+# control_plane/app/latency.py
+# Streaming latency statistics for /api/metrics.
+#
+# LatencyHistogram is a fixed-size log-linear (HDR-style) histogram over microseconds:
+# recording is one bit_length() and one list increment, and quantiles are read with a
+# single scan of ~700 buckets with ~1.5% relative error. RollingLatency keeps one
+# histogram per time slice in a ring, so window queries cost the same no matter how
+# much traffic was recorded. Slices are allocated when first written, and
+# LatencyRegistry caps its series so arbitrary request paths cannot grow it.
+import time
+import threading
+from typing import Dict, List, Optional
+
+SUB_BUCKET_BITS = 6                      # 2^6 linear sub-buckets per power of two
+_HALF = 1 << (SUB_BUCKET_BITS - 1)
+MAX_TRACKABLE_US = 60 * 1000 * 1000      # larger values are clamped to 60 s
+
+
+def _bucket_index(us: int) -> int:
+    shift = max(us.bit_length() - SUB_BUCKET_BITS, 0)
+    return shift * _HALF + (us >> shift)
+
+
+def _bucket_value(index: int) -> float:
+    """Midpoint (in microseconds) of the values that map to `index`."""
+    if index < 2 * _HALF:
+        return float(index)
+    shift = index // _HALF - 1
+    low = (index - shift * _HALF) << shift
+    return low + ((1 << shift) - 1) / 2.0
+
+
+BUCKET_COUNT = _bucket_index(MAX_TRACKABLE_US) + 1
+
+
+class LatencyHistogram:
+    __slots__ = ("counts", "total", "sum_us", "max_us")
+
+    def __init__(self):
+        self.counts = [0] * BUCKET_COUNT
+        self.total = 0
+        self.sum_us = 0
+        self.max_us = 0
+
+    def record(self, seconds: float):
+        us = min(max(int(seconds * 1e6), 0), MAX_TRACKABLE_US)
+        self.counts[_bucket_index(us)] += 1
+        self.total += 1
+        self.sum_us += us
+        if us > self.max_us:
+            self.max_us = us
+
+    def record_corrected(self, seconds: float, expected_interval_s: float):
+        """record() plus coordinated-omission back-fill (as in HdrHistogram): a response
+        slower than the expected interval between requests held back the requests that
+        should have been sent meanwhile, so their latencies are recorded too."""
+        self.record(seconds)
+        if expected_interval_s <= 0:
+            return
+        missing = seconds - expected_interval_s
+        while missing >= expected_interval_s:
+            self.record(missing)
+            missing -= expected_interval_s
+
+    def reset(self):
+        self.counts = [0] * BUCKET_COUNT
+        self.total = 0
+        self.sum_us = 0
+        self.max_us = 0
+
+    def merge(self, other: "LatencyHistogram"):
+        if not other.total:
+            return
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.total += other.total
+        self.sum_us += other.sum_us
+        self.max_us = max(self.max_us, other.max_us)
+
+    def quantiles_ms(self, qs: List[float]) -> List[float]:
+        """Values at each quantile in `qs` (ascending), in milliseconds."""
+        if not self.total:
+            return [0.0] * len(qs)
+        out = []
+        ranks = [max(1, int(q * self.total + 0.5)) for q in qs]
+        seen = 0
+        r = 0
+        for index, count in enumerate(self.counts):
+            if not count:
+                continue
+            seen += count
+            while r < len(ranks) and seen >= ranks[r]:
+                out.append(min(_bucket_value(index), self.max_us) / 1000.0)
+                r += 1
+            if r == len(ranks):
+                break
+        return out
+
+    def mean_ms(self) -> float:
+        return self.sum_us / self.total / 1000.0 if self.total else 0.0
+
+    def buckets_ms(self) -> List[List[float]]:
+        """Non-empty buckets as [value_ms, count] pairs, for export."""
+        return [[_bucket_value(i) / 1000.0, c] for i, c in enumerate(self.counts) if c]
+
+
+class RollingLatency:
+    """Ring of per-slice histograms covering the last `slices * slice_s` seconds."""
+
+    def __init__(self, slice_s: float = 1.0, slices: int = 60):
+        self.slice_s = slice_s
+        self._slices: List[Optional[LatencyHistogram]] = [None] * slices  # allocated on first write
+        self._epochs = [-1] * slices  # which slice number each ring entry currently holds
+
+    def record(self, seconds: float, now: Optional[float] = None):
+        epoch = int((time.time() if now is None else now) / self.slice_s)
+        i = epoch % len(self._slices)
+        hist = self._slices[i]
+        if hist is None:
+            hist = self._slices[i] = LatencyHistogram()
+            self._epochs[i] = epoch
+        elif self._epochs[i] != epoch:
+            # entry still holds an old slice; recycle it
+            hist.reset()
+            self._epochs[i] = epoch
+        hist.record(seconds)
+
+    def window(self, seconds: float, now: Optional[float] = None, offset_s: float = 0.0) -> LatencyHistogram:
+        """Merged histogram of the slices in (now - offset - seconds, now - offset]."""
+        current = int((time.time() if now is None else now) / self.slice_s)
+        newest = current - int(offset_s / self.slice_s)
+        count = min(max(int(seconds / self.slice_s), 1), len(self._slices))
+        merged = LatencyHistogram()
+        for epoch in range(newest - count + 1, newest + 1):
+            i = epoch % len(self._slices)
+            if self._epochs[i] == epoch and self._slices[i] is not None:
+                merged.merge(self._slices[i])
+        return merged
+
+
+class LatencyRegistry:
+    """Rolling latency per endpoint plus an "all" series; safe to record from any thread.
+
+    At most `max_series` endpoints get their own series; later ones are recorded under
+    OTHER. Callers record requests that matched no route under UNMATCHED.
+    """
+
+    ALL = "all"
+    UNMATCHED = "<unmatched>"
+    OTHER = "<other>"
+
+    def __init__(self, slice_s: float = 1.0, slices: int = 60, max_series: int = 256):
+        self.slice_s = slice_s
+        self.slices = slices
+        self.max_series = max_series
+        self._series: Dict[str, RollingLatency] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, endpoint: str) -> RollingLatency:
+        series = self._series.get(endpoint)
+        if series is None:
+            if len(self._series) >= self.max_series and endpoint not in (self.ALL, self.OTHER):
+                return self._get(self.OTHER)
+            series = self._series[endpoint] = RollingLatency(self.slice_s, self.slices)
+        return series
+
+    def record(self, endpoint: str, seconds: float, now: Optional[float] = None):
+        now = time.time() if now is None else now
+        with self._lock:
+            self._get(self.ALL).record(seconds, now)
+            self._get(endpoint).record(seconds, now)
+
+    def endpoints(self) -> List[str]:
+        with self._lock:
+            return [e for e in self._series if e != self.ALL]
+
+    def summary(self, endpoint: str = ALL, window_s: float = 10.0, now: Optional[float] = None,
+                offset_s: float = 0.0) -> Dict[str, float]:
+        """P50/P95/P99 (ms), mean and request rate over the last `window_s` seconds."""
+        with self._lock:
+            series = self._series.get(endpoint)
+            hist = series.window(window_s, now, offset_s) if series else LatencyHistogram()
+        p50, p95, p99 = hist.quantiles_ms([0.50, 0.95, 0.99])
+        return {
+            "count": hist.total,
+            "rps": hist.total / window_s,
+            "p50": p50,
+            "p95": p95,
+            "p99": p99,
+            "mean": hist.mean_ms(),
+        }
+
+    def history(self, endpoint: str = ALL, points: int = 10, step_s: float = 5.0,
+                now: Optional[float] = None) -> List[Dict[str, float]]:
+        """`points` consecutive windows of `step_s` seconds, oldest first."""
+        now = time.time() if now is None else now
+        return [
+            self.summary(endpoint, step_s, now, offset_s=(points - 1 - i) * step_s)
+            for i in range(points)
+        ]
@@ -0,0 +1,201 @@
+# control_plane/app/local_transport.py
+# Transports for clients on the same host as the core, selected by the target string:
+#
+#   unix:///run/athena/core.sock   gRPC over a Unix domain socket instead of TCP loopback
+#   shm:///run/athena/core.sock    the same socket for control messages, with RunInference
+#                                  inputs and outputs passed through a shared-memory ring
+#
+# `unix://` and `shm://` without a path use CORE_UNIX_SOCKET (the path the core was
+# started with). The shared-memory ring is a file under /dev/shm that the core maps
+# once (RegisterShmRegion); requests then carry (region, offset, length) references
+# instead of the tensors, so large payloads skip protobuf encoding and the socket.
+import os
+import mmap
+import array
+import secrets
+import weakref
+import threading
+import itertools
+import collections
+from typing import List, Optional, Tuple
+
+import grpc
+from prometheus_client import Gauge
+
+try:
+    from control_plane import inference_pb2
+except Exception:
+    import inference_pb2
+
+from .tensor import from_buffer
+
+DEFAULT_UNIX_SOCKET = os.getenv("CORE_UNIX_SOCKET", "/tmp/athena-core.sock")
+SHM_DIR = os.getenv("CORE_SHM_DIR", "/dev/shm")
+SHM_SLOTS = int(os.getenv("CORE_SHM_SLOTS", "64"))
+SHM_SLOT_BYTES = int(os.getenv("CORE_SHM_SLOT_BYTES", str(1 << 20)))
+
+_ALIGN = 64
+_ids = itertools.count()
+
+SHM_SLOTS_RETIRED = Gauge('core_shm_slots_retired',
+                          'Shared-memory ring slots held back until their region name is unregistered')
+
+# refusals the core sends before the request is queued: it will never write the slot
+_SLOT_UNTOUCHED = {grpc.StatusCode.NOT_FOUND, grpc.StatusCode.INVALID_ARGUMENT,
+                   grpc.StatusCode.RESOURCE_EXHAUSTED, grpc.StatusCode.UNIMPLEMENTED}
+
+
+def parse_target(target: str) -> Tuple[str, bool]:
+    """The gRPC target for a core target string, and whether it asks for shared memory."""
+    for scheme, shm in (("shm://", True), ("unix://", False)):
+        if target.startswith(scheme):
+            return f"unix:{target[len(scheme):] or DEFAULT_UNIX_SOCKET}", shm
+    return target, False
+
+
+def _region_name() -> str:
+    return f"athena-{os.getpid()}-{next(_ids)}-{secrets.token_hex(4)}"
+
+
+def _unlink(path: str):
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+class ShmRing:
+    """Fixed-size slots in one shared-memory region, one per in-flight RunInference.
+
+    A call writes its float32 inputs at the start of a free slot and reserves the rest
+    of it (from the next 64-byte boundary) for the core to write the outputs into. Calls
+    whose inputs are not float32 or do not fit a slot, and calls that find every slot
+    busy, go inline instead. A slot whose call failed in a way that may still let the
+    core write to it (e.g. the client's deadline passed while it was queued) is retired
+    rather than reused. Once a quarter of the ring is retired it is re-registered under
+    a new name: the core stops writing to a region when it unregisters it, so
+    unregistering the old name gives those slots back.
+
+    Until `registered` the ring is not used; `disabled` means the core refused it (e.g.
+    it runs on another host) and calls stay inline.
+    """
+
+    def __init__(self, slots: int = SHM_SLOTS, slot_bytes: int = SHM_SLOT_BYTES):
+        self.slot_bytes = slot_bytes - slot_bytes % _ALIGN
+        self.size = slots * self.slot_bytes
+        self.name = _region_name()
+        self.path = os.path.join(SHM_DIR, self.name)
+        fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_RDWR, 0o600)
+        try:
+            os.ftruncate(fd, self.size)
+            self._mm = mmap.mmap(fd, self.size)
+        finally:
+            os.close(fd)
+        # the core keeps its own mapping; the name only matters for (re-)registration
+        self._finalizer = weakref.finalize(self, _unlink, self.path)
+        self._free = collections.deque(range(slots))
+        self._names: List[Optional[str]] = [None] * slots  # region name each slot was last sent under
+        self._retired: List[Tuple[int, str]] = []  # (slot, that name) of retired slots
+        self.reclaim_at = max(slots // 4, 1)
+        self.registered = False
+        self.disabled = False
+        self.lock = threading.Lock()  # serialises registration
+
+    def region(self):
+        return inference_pb2.ShmRegion(name=self.name, size=self.size)
+
+    @property
+    def retired(self) -> int:
+        return len(self._retired)
+
+    def stale_regions(self):
+        """Before (re-)registering: the regions to unregister to get retired slots back.
+        If slots were retired under the current name, the ring moves to a new one."""
+        if any(name == self.name for _, name in self._retired):
+            name = _region_name()
+            path = os.path.join(SHM_DIR, name)
+            os.rename(self.path, path)  # same memory, so the core's old mapping still sees it
+            self._finalizer.detach()
+            self._finalizer = weakref.finalize(self, _unlink, path)
+            self.name, self.path = name, path
+        names = sorted({name for _, name in self._retired})
+        return [inference_pb2.ShmRegion(name=name, size=self.size) for name in names]
+
+    def on_unregistered(self, region):
+        """The core no longer has `region`, so slots retired under it can be reused."""
+        keep = [(slot, name) for slot, name in self._retired if name != region.name]
+        self._free.extend(slot for slot, name in self._retired if name == region.name)
+        SHM_SLOTS_RETIRED.dec(len(self._retired) - len(keep))
+        self._retired = keep
+
+    def on_registered(self, reply):
+        self.registered = reply.ok
+        self.disabled = not reply.ok
+
+    def usable(self) -> bool:
+        return self.registered and not self.disabled
+
+    def encode(self, req):
+        """A copy of `req` whose inputs live in a slot, and the slot; `(req, None)` when it
+        has to go inline."""
+        if req.HasField("input_tensor"):
+            if req.input_tensor.dtype != inference_pb2.DT_FLOAT32:
+                return req, None
+            data, shape = req.input_tensor.data, list(req.input_tensor.shape)
+        else:
+            data, shape = array.array("f", req.inputs).tobytes(), [len(req.inputs)]
+        if len(data) + _ALIGN > self.slot_bytes:
+            return req, None
+        try:
+            slot = self._free.popleft()
+        except IndexError:
+            return req, None
+        offset = slot * self.slot_bytes
+        self._mm[offset:offset + len(data)] = data
+        out = offset + (len(data) + _ALIGN - 1) // _ALIGN * _ALIGN
+        name = self._names[slot] = self.name
+        wire = inference_pb2.InferenceRequest(
+            request_id=req.request_id, model_name=req.model_name, model_version=req.model_version, tenant=req.tenant,
+            input_shm=inference_pb2.ShmTensorRef(region=name, offset=offset, length=len(data),
+                                                 dtype=inference_pb2.DT_FLOAT32, shape=shape),
+            output_shm=inference_pb2.ShmTensorRef(region=name, offset=out,
+                                                  length=offset + self.slot_bytes - out,
+                                                  dtype=inference_pb2.DT_FLOAT32))
+        return wire, slot
+
+    def outputs(self, resp, slot: int, as_tensor: bool):
+        """Copy the outputs the core wrote to `slot` out of the ring and free the slot.
+        None if the reply carried them inline."""
+        try:
+            if not resp.HasField("output_shm"):
+                return None
+            ref = resp.output_shm
+            start = slot * self.slot_bytes
+            if ref.region != self._names[slot] or not start <= ref.offset <= ref.offset + ref.length <= start + self.slot_bytes:
+                raise ValueError(f"core wrote outputs outside slot {slot} of {self.name}")
+            data = self._mm[ref.offset:ref.offset + ref.length]
+        finally:
+            self._free.append(slot)
+        if as_tensor:
+            return from_buffer(data, ref.dtype, ref.shape)
+        return array.array("f", data).tolist()
+
+    def release(self, slot: int, code: Optional[grpc.StatusCode]):
+        """Give back the slot of a call that got no reply; `code` is None if it was never sent."""
+        if code is None or code in _SLOT_UNTOUCHED:
+            self._free.append(slot)
+        else:
+            self._retired.append((slot, self._names[slot]))
+            SHM_SLOTS_RETIRED.inc()
+            if len(self._retired) >= self.reclaim_at:
+                self.registered = False  # the next call re-registers the ring
+        if code == grpc.StatusCode.INVALID_ARGUMENT:
+            self.registered = False  # e.g. the core restarted and lost the region
+
+    def close(self):
+        self.registered = False
+        self.disabled = True
+        SHM_SLOTS_RETIRED.dec(len(self._retired))
+        self._retired = []
+        self._finalizer()
+        self._mm.close()
@@ -0,0 +1,119 @@
+# control_plane/app/log_bus.py
+# Async pub/sub bus behind /stream/logs.
+#
+# publish() never blocks and never awaits: it appends to each matching subscriber's
+# bounded ring buffer (dropping that subscriber's oldest entry when full) and wakes the
+# subscriber's event loop. A slow or stalled dashboard therefore only loses its own
+# old log lines; it can never hold up a request handler or another subscriber.
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import AsyncIterator, Iterable, Optional, Set
+
+from prometheus_client import Counter, Gauge
+
+LOG_BUS_PUBLISHED = Counter('log_bus_published_total', 'Log lines published to the log bus', ['level'])
+LOG_BUS_DROPPED = Counter('log_bus_dropped_total', 'Log lines dropped from full subscriber buffers')
+LOG_BUS_SUBSCRIBERS = Gauge('log_bus_subscribers', 'Connected log stream subscribers')
+
+
+class LogRecord:
+    __slots__ = ("ts", "level", "message", "model")
+
+    def __init__(self, level: str, message: str, model: Optional[str] = None):
+        self.ts = time.time()
+        self.level = level
+        self.message = message
+        self.model = model
+
+    def format(self) -> str:
+        return f"[{self.level}] {self.message}"
+
+
+class Subscription:
+    def __init__(self, bus: "LogBus", maxlen: int, levels: Optional[Set[str]], model: Optional[str]):
+        self._bus = bus
+        self._buffer: deque = deque(maxlen=maxlen)
+        self._event = asyncio.Event()
+        self._loop = asyncio.get_running_loop()
+        self.levels = levels
+        self.model = model
+        self.dropped = 0
+
+    def matches(self, record: LogRecord) -> bool:
+        if self.levels is not None and record.level not in self.levels:
+            return False
+        return self.model is None or record.model == self.model
+
+    def _push(self, record: LogRecord):
+        if len(self._buffer) == self._buffer.maxlen:
+            self.dropped += 1
+            LOG_BUS_DROPPED.inc()
+        self._buffer.append(record)  # deque(maxlen) discards the oldest entry
+        try:
+            if asyncio.get_running_loop() is self._loop:
+                self._event.set()
+                return
+        except RuntimeError:
+            pass  # published from a worker thread (sync endpoint)
+        try:
+            self._loop.call_soon_threadsafe(self._event.set)
+        except RuntimeError:
+            pass  # subscriber's loop already closed
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[LogRecord]:
+        """Next record, or None if nothing arrived within `timeout` seconds."""
+        while not self._buffer:
+            self._event.clear()
+            if self._buffer:
+                break
+            try:
+                await asyncio.wait_for(self._event.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        return self._buffer.popleft()
+
+    def close(self):
+        self._bus._unsubscribe(self)
+
+    async def __aiter__(self) -> AsyncIterator[LogRecord]:
+        while True:
+            yield await self.get()
+
+
+class LogBus:
+    def __init__(self, buffer_size: int = 1000):
+        self.buffer_size = buffer_size
+        self._subscribers: Set[Subscription] = set()
+        self._lock = threading.Lock()
+
+    def publish(self, level: str, message: str, model: Optional[str] = None):
+        """Fan a log line out to every matching subscriber. Safe from any thread, O(subscribers)."""
+        LOG_BUS_PUBLISHED.labels(level=level).inc()
+        with self._lock:
+            if not self._subscribers:
+                return
+            subscribers = list(self._subscribers)
+        record = LogRecord(level, message, model)
+        for sub in subscribers:
+            if sub.matches(record):
+                sub._push(record)
+
+    def subscribe(self, levels: Optional[Iterable[str]] = None, model: Optional[str] = None,
+                  buffer_size: Optional[int] = None) -> Subscription:
+        """Register a subscriber on the running loop; call close() when done."""
+        level_set = {lvl.strip().upper() for lvl in levels if lvl.strip()} if levels else None
+        sub = Subscription(self, buffer_size or self.buffer_size, level_set or None, model or None)
+        with self._lock:
+            self._subscribers.add(sub)
+            LOG_BUS_SUBSCRIBERS.set(len(self._subscribers))
+        return sub
+
+    def _unsubscribe(self, sub: Subscription):
+        with self._lock:
+            self._subscribers.discard(sub)
+            LOG_BUS_SUBSCRIBERS.set(len(self._subscribers))
+
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
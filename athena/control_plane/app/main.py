@@ -1,204 +1,576 @@
-# athena/control_plane/app/main.py
-from fastapi import FastAPI, Depends, HTTPException
-from pydantic import BaseModel
-from typing import List, Dict, Any
-from sqlalchemy.orm import Session
-import asyncio
-import time
-import logging
-from sse_starlette.sse import EventSourceResponse # Import for SSE
-
-from .db import get_db, engine, Base
-from . import crud, models
-from .models import ModelStatus
-from .core_client import CoreClient # <-- IMPORT ADDED
-
-# --- NEW: Imports for Metrics ---
-from prometheus_client import Counter, Histogram, Gauge, generate_latest, CONTENT_TYPE_LATEST
-import threading
-import queue
-# --- END NEW: Imports for Metrics ---
-
-# Make sure DB metadata exists (for local dev). In prod use alembic migrations.
-Base.metadata.create_all(bind=engine)
-
-# ----------------------------------------------------
-# Core Client Initialization
-# ----------------------------------------------------
-# Initialize the client to communicate with the C++ core service.
-# Target 'core:50051' is used when running inside a Docker/Kubernetes network.
-core_client = CoreClient(target="athena-core:50051") # Changed from 'core:50051' to match docker-compose service name
-# ----------------------------------------------------
-
-# --- NEW: Metrics Definitions and State ---
-# Metrics definitions
-REQUEST_COUNT = Counter('http_requests_total', 'Total HTTP Requests', ['method', 'endpoint'])
-REQUEST_LATENCY = Histogram('http_request_duration_seconds', 'HTTP Request Latency', ['endpoint'])
-ACTIVE_REQUESTS = Gauge('http_active_requests', 'Active HTTP Requests', ['endpoint'])
-CORE_GRPC_REQUESTS = Counter('core_grpc_requests_total', 'Total gRPC Requests to Core', ['method'])
-CORE_GRPC_LATENCY = Histogram('core_grpc_duration_seconds', 'gRPC Request Latency to Core', ['method'])
-
-# Simple in-memory state for metrics (in production, use a more robust system)
-request_times = queue.deque(maxlen=1000)  # Store last 1000 request times for P95 calc
-queue_depth_gauge = Gauge('dispatcher_queue_depth', 'Estimated queue depth in C++ core dispatcher')
-
-# --- NEW: Log Stream State ---
-log_queue = queue.Queue(maxsize=1000) # Thread-safe queue for logs
-# --- END NEW: Log Stream State ---
-
-app = FastAPI(title="athena-control-plane", version="0.1.0")
-
-class Health(BaseModel):
-    status: str
-
-class LoadModelReq(BaseModel):
-    model_name: str
-    version: str
-
-class ModelOut(BaseModel):
-    id: int
-    name: str
-    version: str
-    status: str
-
-# --- NEW: Metrics endpoint ---
-@app.get("/metrics", tags=["Observability"])
-async def get_metrics():
-    # In a real system, you'd collect actual P95, RPS, Queue Depth from your core/observability stack
-    # Here, we'll use Prometheus client library for internal metrics and mock others based on our state
-    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
-
-# --- NEW: Mock Metrics Calculation Endpoint (for UI) ---
-@app.get("/api/metrics", tags=["Observability"])
-async def get_mock_metrics():
-    # Calculate P95 latency from stored request times
-    p95_latency = 0.0
-    rps = 0.0
-    queue_depth = 0 # Mock value - in reality, you'd get this from the C++ core via gRPC or shared memory
-    if request_times:
-        sorted_times = sorted(request_times)
-        n = len(sorted_times)
-        p95_index = int(0.95 * (n - 1))
-        p95_latency = sorted_times[p95_index] * 1000 # Convert to ms
-
-        # Calculate RPS based on the last 10 seconds of stored times
-        now = time.time()
-        recent_times = [t for t in sorted_times if now - t < 10]
-        if recent_times:
-             rps = len(recent_times) / 10.0
-
-    # Update the queue depth gauge (mock)
-    queue_depth_gauge.set(queue_depth)
-
-    # Mock history for the chart (last 10 points)
-    history = []
-    for i in range(10):
-        history.append({"t": f"T-{9-i}", "latency": p95_latency * (0.8 + 0.4 * (i/10))}) # Simulate slight variation
-
-    return {
-        "p95": f"{p95_latency:.2f}ms",
-        "p95_delta": "+0.00ms", # Mock delta
-        "rps": f"{rps:.2f}",
-        "queue_depth": queue_depth,
-        "history": history
-    }
-# --- END NEW: Mock Metrics Endpoint ---
-
-# --- NEW: SSE Log Stream Endpoint ---
-@app.get("/stream/logs", tags=["Observability"])
-async def stream_logs():
-    async def event_generator():
-        while True:
-            try:
-                # Wait for a log message from the queue with a timeout
-                log_msg = log_queue.get(timeout=1.0) # Wait 1 second, then loop again
-                # Yield the log message as an SSE event
-                yield {"event": "log", "data": log_msg}
-            except queue.Empty:
-                # Yield a ping event to keep the connection alive
-                yield {"event": "ping", "data": "keepalive"}
-
-    return EventSourceResponse(event_generator(), media_type="text/plain")
-# --- END NEW: SSE Log Stream Endpoint ---
-
-# --- NEW: List Models Endpoint ---
-@app.get("/api/models", tags=["Models"], response_model=List[ModelOut])
-async def list_models(db: Session = Depends(get_db)):
-    db_models = crud.list_models(db)
-    return [ModelOut(id=m.id, name=m.name, version=m.version, status=m.status.value) for m in db_models]
-# --- END NEW: List Models Endpoint ---
-
-@app.get("/", tags=["Root"])
-def read_root():
-    # Log the request
-    log_queue.put(f"[INFO] Received request on /")
-    return {"message": "Welcome to the Athena Control Plane! Use /docs for API details."}
-
-@app.get("/health", response_model=Health, tags=["Health"])
-async def health():
-    # Log the request
-    log_queue.put(f"[HEALTH] Health check requested")
-    return {"status": "ok"}
-
-@app.post("/models/load", tags=["Models"], response_model=ModelOut)
-async def load_model(req: LoadModelReq, db: Session = Depends(get_db)):
-    # Log the request
-    log_queue.put(f"[MODEL] Loading model: {req.model_name}:{req.version}")
-
-    # 1. Call core to load model via gRPC
-    start_time = time.time()
-    resp = core_client.load_model(req.model_name, req.version)
-    grpc_latency = (time.time() - start_time) * 1000 # in ms
-    CORE_GRPC_LATENCY.labels(method="LoadModel").observe(grpc_latency / 1000) # Prometheus
-    CORE_GRPC_REQUESTS.labels(method="LoadModel").inc() # Prometheus
-
-    # Check for success from the C++ core service
-    if not resp.get("ok"):
-        log_queue.put(f"[ERROR] Core failed to load model {req.model_name}:{req.version} - {resp.get('message')}")
-        raise HTTPException(status_code=500, detail=f"core error: {resp.get('message')}")
-
-    # 2. Persist model metadata as LOADED in the control plane DB
-    model = crud.create_or_update_model(db, req.model_name, req.version, ModelStatus.LOADED)
-    log_queue.put(f"[MODEL] Model {model.name}:{model.version} loaded successfully in DB")
-    return ModelOut(id=model.id, name=model.name, version=model.version, status=model.status.value)
-
-@app.post("/models/unload", tags=["Models"])
-async def unload_model(req: LoadModelReq, db: Session = Depends(get_db)):
-    # Log the request
-    log_queue.put(f"[MODEL] Unloading model: {req.model_name}:{req.version}")
-
-    # TODO: Call core_client.unload_model(req.model_name, req.version) here
-    start_time = time.time()
-    # resp = core_client.unload_model(req.model_name, req.version) # Uncomment when implemented
-    grpc_latency = (time.time() - start_time) * 1000 # in ms
-    # CORE_GRPC_LATENCY.labels(method="UnloadModel").observe(grpc_latency / 1000) # Prometheus
-    # CORE_GRPC_REQUESTS.labels(method="UnloadModel").inc() # Prometheus
-
-    # Persist model metadata as NOT_LOADED in the control plane DB
-    model = crud.create_or_update_model(db, req.model_name, req.version, ModelStatus.NOT_LOADED)
-    log_queue.put(f"[MODEL] Model {model.name}:{model.version} unloaded successfully in DB")
-    return {"unloaded": f"{model.name}:{model.version}"}
-
-@app.get("/models/{model_name}", tags=["Models"])
-async def get_model(model_name: str, db: Session = Depends(get_db)):
-    # Log the request
-    log_queue.put(f"[MODEL] Getting status for model: {model_name}")
-    model = crud.get_model_by_name(db, model_name)
-    if not model:
-        log_queue.put(f"[MODEL] Model {model_name} not found in DB")
-        return {"model": model_name, "status": "not_loaded"}
-    log_queue.put(f"[MODEL] Found model {model.name}:{model.version} with status {model.status.value}")
-    return {"model": model.name, "version": model.version, "status": model.status.value}
-
-# --- NEW: Middleware to capture request times for metrics ---
-@app.middleware("http")
-async def add_process_time_header(request, call_next):
-    start_time = time.time()
-    response = await call_next(request)
-    process_time = time.time() - start_time
-    REQUEST_LATENCY.labels(endpoint=request.url.path).observe(process_time)
-    REQUEST_COUNT.labels(method=request.method, endpoint=request.url.path).inc()
-    # Store the request time for P95 calculation
-    request_times.append(process_time)
-    return response
+# athena/control_plane/app/main.py
+from fastapi import FastAPI, Depends, HTTPException
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel, Field
+from typing import List, Dict, Any, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+import asyncio
+import os
+import time
+import logging
+from sse_starlette.sse import EventSourceResponse # Import for SSE
+
+from .db import get_db, engine, sync_engine, Base, AsyncSessionLocal
+from . import crud, models
+from .models import ModelStatus
+from .admission import AdmissionLimiter
+from .core_client import AsyncCoreClient
+from .core_stats import CoreStatsCollector, CoreStatsSampler
+from .latency import LatencyRegistry
+from .log_bus import LogBus
+from .placement import PlacementEngine
+from .result_cache import ResultCache
+from .single_flight import SingleFlight
+from .tracing import InMemorySpanExporter, Tracer
+from .warmup import WarmupConfig, WarmupTracker, warm_up_model
+from contextlib import asynccontextmanager
+
+# --- NEW: Imports for Metrics ---
+from prometheus_client import Counter, Histogram, Gauge, REGISTRY, generate_latest, CONTENT_TYPE_LATEST
+# --- END NEW: Imports for Metrics ---
+
+# Make sure DB metadata exists (for local dev). In prod use alembic migrations.
+Base.metadata.create_all(bind=sync_engine)
+with sync_engine.begin() as conn:
+    models.ensure_model_unique_index(conn)  # models tables created before it existed
+with sync_engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+    models.ensure_model_status_values(conn)  # modelstatus types created before WARMING/DRAINING
+sync_engine.dispose()  # request path uses the async engine only
+
+# ----------------------------------------------------
+# Core Client Initialization
+# ----------------------------------------------------
+# Initialize the client to communicate with the C++ core service.
+# The async client pools grpc.aio channels so a slow core call never blocks the event loop.
+# CORE_GRPC_TARGETS (comma-separated) overrides the default docker-compose service name.
+# Results of models listed in RESULT_CACHE_MODELS (or enabled at load time) are reused for
+# identical inputs until their TTL passes or the model is loaded/unloaded again.
+result_cache = ResultCache.from_env()
+# Concurrent identical requests to models listed in COALESCE_MODELS share one core call.
+single_flight = SingleFlight.from_env()
+# Calls beyond ADMISSION_MAX_INFLIGHT per model (or the ADMISSION_*_RPS rates) fail fast with
+# RESOURCE_EXHAUSTED; shed calls are retried CORE_OVERLOAD_RETRIES times after the retry-after hint.
+admission = AdmissionLimiter.from_env()
+# Each target is a core replica; the placement engine decides which replicas load each model
+# (PLACEMENT_REPLICATION for hot models) and inference goes to the least busy of its hosts.
+core_targets = [t.strip() for t in os.getenv("CORE_GRPC_TARGETS", "athena-core:50051").split(",") if t.strip()]
+placement = PlacementEngine.from_env(core_targets)
+core_client = AsyncCoreClient(targets=core_targets,
+                              cache=result_cache, single_flight=single_flight,
+                              admission=admission if admission.enabled() else None,
+                              overload_retries=int(os.getenv("CORE_OVERLOAD_RETRIES", "1")),
+                              placement=placement)
+# TRACE_SAMPLE_RATE of requests (or those the caller's traceparent marks sampled) are traced
+# from here through the core's queue, batch window and execution, to TRACE_EXPORTER.
+tracer = Tracer.from_env()
+# ----------------------------------------------------
+
+# --- NEW: Metrics Definitions and State ---
+# Metrics definitions
+REQUEST_COUNT = Counter('http_requests_total', 'Total HTTP Requests', ['method', 'endpoint'])
+REQUEST_LATENCY = Histogram('http_request_duration_seconds', 'HTTP Request Latency', ['endpoint'])
+ACTIVE_REQUESTS = Gauge('http_active_requests', 'Active HTTP Requests', ['endpoint'])
+CORE_GRPC_REQUESTS = Counter('core_grpc_requests_total', 'Total gRPC Requests to Core', ['method'])
+CORE_GRPC_LATENCY = Histogram('core_grpc_duration_seconds', 'gRPC Request Latency to Core', ['method'])
+
+# Rolling per-endpoint latency histograms (1 s slices, last 60 s) backing /api/metrics
+latency_stats = LatencyRegistry(slice_s=1.0, slices=60)
+METRICS_WINDOW_S = 10.0
+# Core runtime stats (queue depth, batch sizes, per-model latency, shed counts) sampled in
+# the background and exported at scrape time, so neither /metrics nor /api/metrics calls the core
+core_stats = CoreStatsSampler(core_client)
+REGISTRY.register(CoreStatsCollector(core_stats))
+
+# Warm-ups running on this replica gate /health/ready
+warmups = WarmupTracker()
+warmup_config = WarmupConfig.from_env()
+
+# --- NEW: Log Stream State ---
+log_bus = LogBus(buffer_size=1000) # Non-blocking fan-out to /stream/logs subscribers
+# --- END NEW: Log Stream State ---
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Placements made by earlier runs (or other replicas of the control plane)
+    async with AsyncSessionLocal() as db:
+        placement.restore(await crud.list_placements(db), await crud.list_active_versions(db))
+    await core_client.start()
+    await core_stats.start()
+    yield
+    await core_stats.close()
+    await core_client.close()
+    await engine.dispose()
+
+app = FastAPI(title="athena-control-plane", version="0.1.0", lifespan=lifespan)
+
+class Health(BaseModel):
+    status: str
+
+class LoadModelReq(BaseModel):
+    model_name: str
+    version: str
+    warmup: bool = False  # run synthetic warm-up traffic before marking the model LOADED
+    cache: Optional[bool] = None  # turn the result cache on/off for this model; None keeps the current setting
+    replicas: Optional[int] = Field(default=None, ge=1)  # core replicas to load this model on; None keeps the current setting
+    memory_mb: Optional[float] = Field(default=None, ge=0)  # memory one copy takes on a core replica, for placement
+
+class ModelOut(BaseModel):
+    id: int
+    name: str
+    version: str
+    status: str
+
+class SwapModelReq(BaseModel):
+    model_name: str
+    version: str  # becomes the active version
+    warmup: bool = True  # warm the new version up before it takes traffic
+    drain_timeout_ms: int = Field(default=30000, ge=0)  # how long the old version may take to drain
+
+class SwapOut(BaseModel):
+    model_name: str
+    active_version: str
+    previous_version: Optional[str] = None
+    drained: bool  # previous version finished its in-flight requests and was unloaded
+    message: str = ""
+
+class ReplicasReq(BaseModel):
+    replicas: int = Field(ge=1)
+    version: Optional[str] = None  # defaults to the active version, else the latest registered one
+
+class BulkModelsReq(BaseModel):
+    models: List[LoadModelReq]
+    concurrency: int = Field(default=8, ge=1, le=64)  # max concurrent core calls
+
+class BulkItemOut(BaseModel):
+    model_name: str
+    version: str
+    ok: bool
+    status: str
+    message: str = ""
+    id: Optional[int] = None
+
+class BulkOut(BaseModel):
+    succeeded: int
+    failed: int
+    results: List[BulkItemOut]
+
+# --- NEW: Metrics endpoint ---
+@app.get("/metrics", tags=["Observability"])
+async def get_metrics():
+    # Control-plane metrics plus the cached core runtime stats (see CoreStatsCollector)
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+# --- Metrics summary endpoint (for UI) ---
+@app.get("/api/metrics", tags=["Observability"])
+async def get_ui_metrics(endpoint: str = LatencyRegistry.ALL):
+    # Served from rolling histograms, so the cost is fixed regardless of traffic rate
+    core = core_stats.summary()  # last background sample, never a live RPC
+    now = time.time()
+    current = latency_stats.summary(endpoint, METRICS_WINDOW_S, now)
+    previous = latency_stats.summary(endpoint, METRICS_WINDOW_S, now, offset_s=METRICS_WINDOW_S)
+
+    # Chart history: P95 of the last 10 five-second windows
+    history = [
+        {"t": f"T-{9-i}", "latency": point["p95"], "rps": point["rps"]}
+        for i, point in enumerate(latency_stats.history(endpoint, points=10, step_s=5.0, now=now))
+    ]
+
+    return {
+        "p50": f"{current['p50']:.2f}ms",
+        "p95": f"{current['p95']:.2f}ms",
+        "p99": f"{current['p99']:.2f}ms",
+        "p95_delta": f"{current['p95'] - previous['p95']:+.2f}ms",
+        "rps": f"{current['rps']:.2f}",
+        "queue_depth": core["queue_depth"],
+        "core": core,
+        "history": history,
+        "endpoints": latency_stats.endpoints(),
+    }
+# --- END Metrics summary endpoint ---
+
+@app.get("/api/batcher", tags=["Observability"])
+async def get_batcher_stats():
+    # Live batch window of the core's dynamic batcher, for the dashboard chart
+    stats = await core_client.get_batcher_stats()
+    if "error" in stats:
+        raise HTTPException(status_code=502, detail=f"core error: {stats['error']}")
+    return stats
+
+@app.get("/api/cache", tags=["Observability"])
+async def get_result_cache_stats():
+    # Per-model hit rates and memory use of the inference result cache
+    return result_cache.stats()
+
+@app.get("/api/coalescing", tags=["Observability"])
+async def get_coalescing_stats():
+    # Core calls made vs. identical requests that shared them, per model
+    return single_flight.stats()
+
+@app.get("/api/placement", tags=["Observability"])
+async def get_placement():
+    # Models, memory and load of each core replica as the placement engine sees them
+    return placement.snapshot()
+
+@app.get("/api/traces", tags=["Observability"])
+async def get_traces(trace_id: Optional[str] = None, limit: int = 200):
+    # Latest sampled spans (OTLP/JSON), when they are kept in memory (TRACE_EXPORTER=memory)
+    if not isinstance(tracer.exporter, InMemorySpanExporter):
+        raise HTTPException(status_code=404, detail="traces are not kept in memory (TRACE_EXPORTER=memory)")
+    spans = tracer.exporter.get_finished_spans(trace_id)
+    return {"spans": [s.to_otlp() for s in spans[-limit:]]}
+
+@app.get("/api/admission", tags=["Observability"])
+async def get_admission_stats():
+    # Requests shed by the control plane's limiter and by the core's admission control
+    core = core_stats.latest or {}
+    return {
+        "control_plane": admission.stats(),
+        "core": {"admitted_total": core.get("admitted_total", 0), "shed_total": core.get("shed_total", 0),
+                 "shed": core.get("shed", [])},
+    }
+
+# --- NEW: SSE Log Stream Endpoint ---
+@app.get("/stream/logs", tags=["Observability"])
+async def stream_logs(level: Optional[str] = None, model: Optional[str] = None):
+    # Optional filters: ?level=ERROR,MODEL and/or ?model=fraud-detector
+    subscription = log_bus.subscribe(levels=level.split(",") if level else None, model=model)
+
+    async def event_generator():
+        try:
+            while True:
+                record = await subscription.get(timeout=15.0)
+                if record is None:
+                    # Yield a ping event to keep the connection alive
+                    yield {"event": "ping", "data": "keepalive"}
+                else:
+                    yield {"event": "log", "data": record.format()}
+        finally:
+            subscription.close()
+
+    return EventSourceResponse(event_generator(), media_type="text/plain")
+# --- END NEW: SSE Log Stream Endpoint ---
+
+# --- NEW: List Models Endpoint ---
+@app.get("/api/models", tags=["Models"], response_model=List[ModelOut])
+async def list_models(db: AsyncSession = Depends(get_db)):
+    db_models = await crud.list_models(db)
+    return [ModelOut(id=m.id, name=m.name, version=m.version, status=m.status.value) for m in db_models]
+# --- END NEW: List Models Endpoint ---
+
+@app.get("/", tags=["Root"])
+def read_root():
+    # Log the request
+    log_bus.publish("INFO", "Received request on /")
+    return {"message": "Welcome to the Athena Control Plane! Use /docs for API details."}
+
+@app.get("/health", response_model=Health, tags=["Health"])
+async def health():
+    # Log the request
+    log_bus.publish("HEALTH", "Health check requested")
+    return {"status": "ok"}
+
+@app.get("/health/ready", tags=["Health"])
+async def readiness():
+    # Not ready while any model on this replica is still warming up
+    warming = warmups.in_progress()
+    if warming:
+        return JSONResponse(status_code=503, content={"status": "warming", "models": warming})
+    return {"status": "ready"}
+
+async def _warm_up_and_mark(model_name: str, version: str):
+    result = warmups.result(model_name, version)
+    status = ModelStatus.FAILED
+    try:
+        await warm_up_model(core_client, model_name, version, warmup_config, result)
+        status = ModelStatus.LOADED if result.ok else ModelStatus.FAILED
+        log_bus.publish("MODEL", f"Warm-up of {model_name}:{version} finished after {len(result.curve_ms)} rounds "
+                        f"(settled={result.settled}, last={result.curve_ms[-1] if result.curve_ms else 0:.2f}ms)", model=model_name)
+    except Exception as e:
+        log_bus.publish("ERROR", f"Warm-up of {model_name}:{version} failed - {e}", model=model_name)
+    finally:
+        warmups.finish(result)
+        async with AsyncSessionLocal() as db:
+            await crud.create_or_update_model(db, model_name, version, status)
+
+def _apply_cache_setting(req: LoadModelReq):
+    if req.cache is True:
+        result_cache.enable(req.model_name)
+    elif req.cache is False:
+        result_cache.disable(req.model_name)
+
+def _apply_placement_setting(req: LoadModelReq):
+    if req.replicas is not None:
+        placement.set_replication(req.model_name, req.replicas)
+    if req.memory_mb is not None:
+        placement.set_memory(req.model_name, req.memory_mb)
+
+async def _save_placement(db: AsyncSession, model_name: str, version: str):
+    # Mirror the engine's view of name:version into the registry
+    await crud.set_placements(db, model_name, version, placement.hosts(model_name, version),
+                              placement.memory_for(model_name))
+
+def _start_warmup(model_name: str, version: str):
+    warmups.begin(model_name, version)
+    warmups.track(asyncio.create_task(_warm_up_and_mark(model_name, version)))
+
+@app.post("/models/load", tags=["Models"], response_model=ModelOut)
+async def load_model(req: LoadModelReq, db: AsyncSession = Depends(get_db)):
+    # Log the request
+    log_bus.publish("MODEL", f"Loading model: {req.model_name}:{req.version}", model=req.model_name)
+
+    # 1. Call core to load model via gRPC, on the replicas the placement engine picks
+    _apply_placement_setting(req)
+    start_time = time.time()
+    resp = await core_client.load_model(req.model_name, req.version)
+    grpc_latency = (time.time() - start_time) * 1000 # in ms
+    CORE_GRPC_LATENCY.labels(method="LoadModel").observe(grpc_latency / 1000) # Prometheus
+    CORE_GRPC_REQUESTS.labels(method="LoadModel").inc() # Prometheus
+
+    # Check for success from the C++ core service
+    if not resp.get("ok"):
+        log_bus.publish("ERROR", f"Core failed to load model {req.model_name}:{req.version} - {resp.get('message')}", model=req.model_name)
+        raise HTTPException(status_code=500, detail=f"core error: {resp.get('message')}")
+
+    _apply_cache_setting(req)
+    await _save_placement(db, req.model_name, req.version)
+
+    # 2. Persist model metadata in the control plane DB: WARMING until warm-up settles, else LOADED
+    status = ModelStatus.WARMING if req.warmup else ModelStatus.LOADED
+    model = await crud.create_or_update_model(db, req.model_name, req.version, status)
+    if req.warmup:
+        _start_warmup(req.model_name, req.version)
+    log_bus.publish("MODEL", f"Model {model.name}:{model.version} {status.value} in DB", model=model.name)
+    return ModelOut(id=model.id, name=model.name, version=model.version, status=model.status.value)
+
+@app.get("/models/{model_name}/warmup", tags=["Models"])
+async def get_warmup(model_name: str, version: str):
+    # Warm-up latency curve recorded by this replica
+    result = warmups.result(model_name, version)
+    if result is None:
+        raise HTTPException(status_code=404, detail=f"no warm-up recorded for {model_name}:{version}")
+    return result.to_dict()
+
+@app.post("/models/unload", tags=["Models"])
+async def unload_model(req: LoadModelReq, db: AsyncSession = Depends(get_db)):
+    # Log the request
+    log_bus.publish("MODEL", f"Unloading model: {req.model_name}:{req.version}", model=req.model_name)
+
+    # 1. The core stops routing to the version and returns once its in-flight requests finished
+    start_time = time.time()
+    resp = await core_client.unload_model(req.model_name, req.version)
+    grpc_latency = (time.time() - start_time) * 1000 # in ms
+    CORE_GRPC_LATENCY.labels(method="UnloadModel").observe(grpc_latency / 1000) # Prometheus
+    CORE_GRPC_REQUESTS.labels(method="UnloadModel").inc() # Prometheus
+    if not resp.get("ok"):
+        log_bus.publish("ERROR", f"Core failed to unload model {req.model_name}:{req.version} - {resp.get('message')}", model=req.model_name)
+        raise HTTPException(status_code=500, detail=f"core error: {resp.get('message')}")
+
+    # Cached results of the unloaded model must not be served any more
+    result_cache.invalidate(req.model_name)
+    await _save_placement(db, req.model_name, req.version)
+
+    # 2. Persist model metadata as NOT_LOADED in the control plane DB
+    model = await crud.create_or_update_model(db, req.model_name, req.version, ModelStatus.NOT_LOADED)
+    await crud.clear_active_version(db, req.model_name, req.version)
+    log_bus.publish("MODEL", f"Model {model.name}:{model.version} unloaded successfully in DB", model=model.name)
+    return {"unloaded": f"{model.name}:{model.version}"}
+
+# One swap per model at a time; the second would race the first for the active pointer
+_swap_locks: Dict[str, asyncio.Lock] = {}
+
+async def _timed_core_call(call, method: str, *args):
+    start_time = time.time()
+    resp = await call(*args)
+    CORE_GRPC_LATENCY.labels(method=method).observe(time.time() - start_time) # Prometheus
+    CORE_GRPC_REQUESTS.labels(method=method).inc() # Prometheus
+    return resp
+
+@app.post("/models/swap", tags=["Models"], response_model=SwapOut)
+async def swap_model(req: SwapModelReq, db: AsyncSession = Depends(get_db)):
+    # Zero-downtime version switch: load and warm the new version next to the active one,
+    # move the active pointer in one step, then let the old version drain and unload it.
+    # Requests that name no version never see a missing model in between.
+    name, version = req.model_name, req.version
+    async with _swap_locks.setdefault(name, asyncio.Lock()):
+        previous = await crud.get_active_version(db, name)
+        if previous is None:
+            # never swapped: a version loaded through /models/load was made active by the core
+            status = await _timed_core_call(core_client.get_model_status, "GetModelStatus", name, version)
+            previous = status.get("active_version") or None
+        if previous == version:
+            return SwapOut(model_name=name, active_version=version, previous_version=previous, drained=False,
+                           message="already active")
+        log_bus.publish("MODEL", f"Swapping {name} from {previous or '-'} to {version}", model=name)
+
+        # 1. Load next to the active version; nothing is routed to it yet
+        resp = await _timed_core_call(core_client.load_model, "LoadModel", name, version)
+        if not resp.get("ok"):
+            log_bus.publish("ERROR", f"Core failed to load model {name}:{version} - {resp.get('message')}", model=name)
+            raise HTTPException(status_code=500, detail=f"core error: {resp.get('message')}")
+        await _save_placement(db, name, version)
+        await crud.create_or_update_model(db, name, version, ModelStatus.WARMING if req.warmup else ModelStatus.LOADED)
+
+        # 2. Warm up before switching. Not tracked in `warmups`: the replica keeps serving
+        #    the old version meanwhile and must stay ready.
+        if req.warmup:
+            result = await warm_up_model(core_client, name, version, warmup_config)
+            if not result.ok:
+                await _timed_core_call(core_client.unload_model, "UnloadModel", name, version)
+                await _save_placement(db, name, version)
+                await crud.create_or_update_model(db, name, version, ModelStatus.FAILED)
+                log_bus.publish("ERROR", f"Warm-up of {name}:{version} failed; {previous or 'nothing'} stays active", model=name)
+                raise HTTPException(status_code=500, detail=f"warm-up of {name}:{version} failed")
+
+        # 3. Switch in one step; the core resolves each request's version once, on arrival
+        resp = await _timed_core_call(core_client.set_active_version, "SetActiveVersion", name, version)
+        if not resp.get("ok"):
+            log_bus.publish("ERROR", f"Core failed to activate {name}:{version} - {resp.get('message')}", model=name)
+            raise HTTPException(status_code=500, detail=f"core error: {resp.get('message')}")
+        result_cache.invalidate(name)
+        await crud.activate_version(db, name, version, previous)
+        log_bus.publish("MODEL", f"Model {name}:{version} is active", model=name)
+
+        # 4. The old version finishes what it already accepted, then goes away
+        drained, message = previous is None, ""
+        if previous is not None:
+            resp = await _timed_core_call(core_client.unload_model, "UnloadModel", name, previous, req.drain_timeout_ms)
+            drained, message = bool(resp.get("ok")), resp.get("message", "")
+            if drained:
+                await _save_placement(db, name, previous)
+                await crud.create_or_update_model(db, name, previous, ModelStatus.NOT_LOADED)
+                log_bus.publish("MODEL", f"Model {name}:{previous} drained and unloaded", model=name)
+            else:
+                # still DRAINING; a later /models/unload finishes the job
+                log_bus.publish("ERROR", f"Model {name}:{previous} did not drain - {message}", model=name)
+        return SwapOut(model_name=name, active_version=version, previous_version=previous, drained=drained,
+                       message=message)
+
+async def _bulk_core_calls(refs: List[LoadModelReq], call, method: str, concurrency: int):
+    # Fan out to the core with at most `concurrency` calls in flight; one result per ref
+    limit = asyncio.Semaphore(concurrency)
+
+    async def one(ref: LoadModelReq):
+        async with limit:
+            start_time = time.time()
+            resp = await call(ref.model_name, ref.version)
+            CORE_GRPC_LATENCY.labels(method=method).observe(time.time() - start_time) # Prometheus
+            CORE_GRPC_REQUESTS.labels(method=method).inc() # Prometheus
+            return resp
+
+    return await asyncio.gather(*(one(ref) for ref in refs))
+
+async def _bulk_lifecycle(req: BulkModelsReq, db: AsyncSession, call, method: str,
+                          ok_status: ModelStatus, fail_status: Optional[ModelStatus]):
+    responses = await _bulk_core_calls(req.models, call, method, req.concurrency)
+    # fail_status=None leaves the registry row untouched when the core call failed
+    statuses = [ok_status if resp.get("ok") else fail_status for resp in responses]
+    if ok_status is ModelStatus.LOADED:
+        statuses = [ModelStatus.WARMING if status is ModelStatus.LOADED and ref.warmup else status
+                    for ref, status in zip(req.models, statuses)]
+
+    # All status changes land in one transaction
+    records = await crud.bulk_upsert_models(
+        db, [(ref.model_name, ref.version, status) for ref, status in zip(req.models, statuses) if status]
+    )
+    written = {(r.name, r.version): r for r in records}
+    for r in records:
+        if r.status is ModelStatus.WARMING:
+            _start_warmup(r.name, r.version)
+    if ok_status is ModelStatus.LOADED:
+        for ref, resp in zip(req.models, responses):
+            if resp.get("ok"):
+                _apply_cache_setting(ref)
+    for name, version in {(ref.model_name, ref.version) for ref in req.models}:
+        await _save_placement(db, name, version)
+
+    results = []
+    for ref, resp in zip(req.models, responses):
+        ok = bool(resp.get("ok"))
+        if not ok:
+            log_bus.publish("ERROR", f"Core failed {method} {ref.model_name}:{ref.version} - {resp.get('message')}", model=ref.model_name)
+        record = written.get((ref.model_name, ref.version))
+        results.append(BulkItemOut(model_name=ref.model_name, version=ref.version, ok=ok,
+                                   status=record.status.value if record else "unchanged",
+                                   message=resp.get("message", ""), id=record.id if record else None))
+    succeeded = sum(r.ok for r in results)
+    log_bus.publish("MODEL", f"Bulk {method}: {succeeded}/{len(results)} succeeded")
+    return BulkOut(succeeded=succeeded, failed=len(results) - succeeded, results=results)
+
+@app.post("/models/load/bulk", tags=["Models"], response_model=BulkOut)
+async def bulk_load_models(req: BulkModelsReq, db: AsyncSession = Depends(get_db)):
+    log_bus.publish("MODEL", f"Bulk loading {len(req.models)} models (concurrency={req.concurrency})")
+    for ref in req.models:
+        _apply_placement_setting(ref)
+    return await _bulk_lifecycle(req, db, core_client.load_model, "LoadModel",
+                                 ModelStatus.LOADED, ModelStatus.FAILED)
+
+@app.post("/models/unload/bulk", tags=["Models"], response_model=BulkOut)
+async def bulk_unload_models(req: BulkModelsReq, db: AsyncSession = Depends(get_db)):
+    log_bus.publish("MODEL", f"Bulk unloading {len(req.models)} models (concurrency={req.concurrency})")
+    out = await _bulk_lifecycle(req, db, core_client.unload_model, "UnloadModel",
+                                ModelStatus.NOT_LOADED, None)
+    for item in out.results:
+        if item.ok:
+            await crud.clear_active_version(db, item.model_name, item.version)
+    return out
+
+@app.put("/models/{model_name}/replicas", tags=["Models"])
+async def set_model_replicas(model_name: str, req: ReplicasReq, db: AsyncSession = Depends(get_db)):
+    # Scale a hot model out to more core replicas (or back in); later loads keep the setting
+    version = req.version or await crud.get_active_version(db, model_name)
+    if version is None:
+        model = await crud.get_model_by_name(db, model_name)
+        if model is None:
+            raise HTTPException(status_code=404, detail=f"model {model_name} is not registered")
+        version = model.version
+    log_bus.publish("MODEL", f"Placing {model_name}:{version} on {req.replicas} replicas", model=model_name)
+    placement.set_replication(model_name, req.replicas)
+    resp = await _timed_core_call(core_client.load_model, "LoadModel", model_name, version)
+    if not resp.get("ok"):
+        log_bus.publish("ERROR", f"Core failed to place {model_name}:{version} - {resp.get('message')}", model=model_name)
+        raise HTTPException(status_code=500, detail=f"core error: {resp.get('message')}")
+    await _save_placement(db, model_name, version)
+    return {"model_name": model_name, "version": version, "replicas": placement.hosts(model_name, version)}
+
+@app.get("/models/{model_name}", tags=["Models"])
+async def get_model(model_name: str, db: AsyncSession = Depends(get_db)):
+    # Log the request
+    log_bus.publish("MODEL", f"Getting status for model: {model_name}", model=model_name)
+    model = await crud.get_model_by_name(db, model_name)
+    if not model:
+        log_bus.publish("MODEL", f"Model {model_name} not found in DB", model=model_name)
+        return {"model": model_name, "status": "not_loaded"}
+    log_bus.publish("MODEL", f"Found model {model.name}:{model.version} with status {model.status.value}", model=model_name)
+    return {"model": model.name, "version": model.version, "status": model.status.value,
+            "active_version": await crud.get_active_version(db, model_name),
+            "replicas": placement.hosts(model.name, model.version)}
+
+# --- NEW: Middleware to capture request times for metrics ---
+@app.middleware("http")
+async def add_process_time_header(request, call_next):
+    start_time = time.time()
+    # Sampled requests run inside a span; core calls made for them become its children
+    span = tracer.start_span(f"{request.method} {request.url.path}", request.headers.get("traceparent"),
+                             {"http.request.method": request.method, "url.path": request.url.path})
+    if span is not None:
+        with span:
+            response = await call_next(request)
+            route = request.scope.get("route")
+            if route:
+                span.name = f"{request.method} {route.path}"
+                span.set_attribute("http.route", route.path)
+            span.set_attribute("http.response.status_code", response.status_code)
+            if response.status_code >= 500:
+                span.set_error(f"HTTP {response.status_code}")
+            response.headers["traceparent"] = span.traceparent()
+    else:
+        response = await call_next(request)
+    process_time = time.time() - start_time
+    # Keyed by route template to bound cardinality; paths no route matched (404s) share one key
+    route = request.scope.get("route")
+    endpoint = route.path if route else LatencyRegistry.UNMATCHED
+    REQUEST_LATENCY.labels(endpoint=endpoint).observe(process_time)
+    REQUEST_COUNT.labels(method=request.method, endpoint=endpoint).inc()
+    latency_stats.record(endpoint, process_time)
+    return response
 # --- END NEW: Middleware ---
\ No newline at end of file
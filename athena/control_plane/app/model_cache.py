@@ -0,0 +1,122 @@
+# control_plane/app/model_cache.py
+# In-process read-through cache for model registry lookups.
+#
+# Entries are immutable ModelRecord snapshots (not ORM instances), bounded by a TTL and
+# an LRU size limit. Local writes clear the cache immediately; writes made by other
+# replicas are picked up by polling the single-row `registry_version` counter at most
+# every `coherence_interval_s`, which costs one tiny query per interval instead of one
+# per lookup.
+import os
+import time
+import threading
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Hashable, Optional, Tuple
+
+from prometheus_client import Counter
+from sqlalchemy import select, update
+
+from . import models
+from .models import ModelStatus
+
+MODEL_CACHE_TTL_S = float(os.getenv("MODEL_CACHE_TTL_S", "2.0"))
+MODEL_CACHE_MAX_ENTRIES = int(os.getenv("MODEL_CACHE_MAX_ENTRIES", "1024"))
+MODEL_CACHE_COHERENCE_S = float(os.getenv("MODEL_CACHE_COHERENCE_S", "0.5"))
+
+MODEL_CACHE_REQUESTS = Counter('model_cache_requests_total', 'Model registry cache lookups', ['op', 'result'])
+MODEL_CACHE_INVALIDATIONS = Counter('model_cache_invalidations_total', 'Model registry cache invalidations', ['reason'])
+
+_MISSING = object()
+
+
+@dataclass(frozen=True)
+class ModelRecord:
+    id: int
+    name: str
+    version: str
+    status: ModelStatus
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+
+    @classmethod
+    def from_orm(cls, m: "models.Model") -> "ModelRecord":
+        return cls(m.id, m.name, m.version, m.status, m.created_at, m.updated_at)
+
+    def to_dict(self):
+        return models.Model.to_dict(self)
+
+
+class ModelCache:
+    def __init__(self, ttl_s: float = MODEL_CACHE_TTL_S, max_entries: int = MODEL_CACHE_MAX_ENTRIES,
+                 coherence_interval_s: float = MODEL_CACHE_COHERENCE_S):
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+        self.coherence_interval_s = coherence_interval_s
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._registry_version: Optional[int] = None
+        self._last_sync = float("-inf")
+
+    def get(self, op: str, key: Hashable) -> Any:
+        """Cached value for `key`, or _MISSING."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                MODEL_CACHE_REQUESTS.labels(op=op, result="hit").inc()
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+        MODEL_CACHE_REQUESTS.labels(op=op, result="miss").inc()
+        return _MISSING
+
+    def put(self, key: Hashable, value: Any):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_s, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, reason: str = "local_write"):
+        with self._lock:
+            self._entries.clear()
+        MODEL_CACHE_INVALIDATIONS.labels(reason=reason).inc()
+
+    def needs_sync(self) -> bool:
+        return time.monotonic() - self._last_sync >= self.coherence_interval_s
+
+    def observe_version(self, version: int):
+        """Record the registry version read from the DB; a change means another writer."""
+        self._last_sync = time.monotonic()
+        if self._registry_version is not None and version != self._registry_version:
+            self.invalidate(reason="remote_write")
+        self._registry_version = version
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# One cache per database engine, so separate databases (e.g. per-test SQLite engines)
+# never see each other's rows.
+_caches: "weakref.WeakKeyDictionary[Any, ModelCache]" = weakref.WeakKeyDictionary()
+_caches_lock = threading.Lock()
+
+
+def cache_for(bind) -> ModelCache:
+    engine = getattr(bind, "engine", bind)
+    with _caches_lock:
+        cache = _caches.get(engine)
+        if cache is None:
+            cache = _caches[engine] = ModelCache()
+        return cache
+
+
+REGISTRY_VERSION_SELECT = select(models.RegistryVersion.version).where(models.RegistryVersion.id == 1)
+REGISTRY_VERSION_BUMP = (
+    update(models.RegistryVersion)
+    .where(models.RegistryVersion.id == 1)
+    .values(version=models.RegistryVersion.version + 1)
+)
@@ -1,15 +1,19 @@
 # control_plane/app/models.py
-from sqlalchemy import Column, Integer, String, DateTime, func, Enum
+from sqlalchemy import Column, Integer, String, DateTime, Float, func, Enum, UniqueConstraint, delete, inspect, select, text
 from .db import Base
 import enum
 
 class ModelStatus(str, enum.Enum):
     NOT_LOADED = "not_loaded"
     LOADED = "loaded"
+    WARMING = "warming"  # loaded in the core, warm-up traffic still running
     FAILED = "failed"
+    DRAINING = "draining"  # replaced by a newer version, finishing its in-flight requests
 
 class Model(Base):
     __tablename__ = "models"
+    # one row per name:version; bulk upserts rely on this as their ON CONFLICT target
+    __table_args__ = (UniqueConstraint("name", "version", name="uq_models_name_version"),)
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), nullable=False, index=True)
     version = Column(String(255), nullable=False)
@@ -26,3 +30,59 @@ class Model(Base):
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "updated_at": self.updated_at.isoformat() if self.updated_at else None,
         }
+
+def ensure_model_unique_index(conn):
+    """Give a `models` table created before uq_models_name_version its unique index.
+
+    create_all() does not alter existing tables, so without this the bulk upserts have no
+    ON CONFLICT target on such databases. Duplicate name:version rows are removed first,
+    keeping the newest (highest id). Idempotent; run on a sync connection after create_all().
+    """
+    inspector = inspect(conn)
+    if not inspector.has_table(Model.__tablename__):
+        return
+    columns = ["name", "version"]
+    if any(u["column_names"] == columns for u in inspector.get_unique_constraints(Model.__tablename__)) or \
+            any(i["unique"] and i["column_names"] == columns for i in inspector.get_indexes(Model.__tablename__)):
+        return
+    newest = select(func.max(Model.id)).group_by(Model.name, Model.version)
+    conn.execute(delete(Model).where(Model.id.not_in(newest)))
+    conn.execute(text("CREATE UNIQUE INDEX IF NOT EXISTS uq_models_name_version ON models (name, version)"))
+
+def ensure_model_status_values(conn):
+    """Add statuses newer than an existing Postgres `modelstatus` type to it.
+
+    On Postgres the status column is a native enum type, which create_all() creates but
+    never alters, so on databases created before WARMING and DRAINING existed, writing
+    either fails. Idempotent; other dialects store the status as a string. Run outside a
+    transaction: before Postgres 12, ALTER TYPE ... ADD VALUE cannot run inside one.
+    """
+    if conn.dialect.name != "postgresql":
+        return
+    type_name = Model.__table__.c.status.type.name
+    for status in ModelStatus:
+        conn.execute(text(f"ALTER TYPE {type_name} ADD VALUE IF NOT EXISTS '{status.name}'"))
+
+class ModelPlacement(Base):
+    """A core replica (CORE_GRPC_TARGETS entry) that a model version is loaded on; see placement.py."""
+    __tablename__ = "model_placements"
+    __table_args__ = (UniqueConstraint("name", "version", "replica", name="uq_model_placements_name_version_replica"),)
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(255), nullable=False, index=True)
+    version = Column(String(255), nullable=False)
+    replica = Column(String(255), nullable=False)
+    memory_mb = Column(Float, nullable=False, default=0.0)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+class ActiveVersion(Base):
+    """Version of a model that requests naming no version are routed to; moved by a swap."""
+    __tablename__ = "active_versions"
+    name = Column(String(255), primary_key=True)
+    version = Column(String(255), nullable=False)
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
+
+class RegistryVersion(Base):
+    """Single-row counter bumped on every registry write; replicas poll it to drop stale caches."""
+    __tablename__ = "registry_version"
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
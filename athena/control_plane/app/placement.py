@@ -0,0 +1,182 @@
+# control_plane/app/placement.py
+# Which core replicas each model version is loaded on.
+#
+# Every target in CORE_GRPC_TARGETS is a core replica with its own model registry. The
+# placement engine keeps, per replica, the versions it hosts, the memory they take and
+# an EWMA of the requests outstanding on it, and decides where a version is loaded:
+# on as many replicas as its replication factor (PLACEMENT_REPLICATION, e.g.
+# "fraud-detector=3" for a hot model; PLACEMENT_DEFAULT_REPLICAS otherwise), preferring
+# replicas that already host it or another version of the same model (so a swap keeps
+# both versions side by side), then the least loaded replicas with room for it.
+# Assignments are persisted next to models.Model (model_placements) and restored at
+# startup; AsyncCoreClient routes each request to the least busy of the model's hosts.
+import os
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# memory budget of one core replica and the default footprint of a model version;
+# 0 disables memory accounting (replicas only limited by replication)
+PLACEMENT_REPLICA_MEMORY_MB = float(os.getenv("PLACEMENT_REPLICA_MEMORY_MB", "0"))
+PLACEMENT_MODEL_MEMORY_MB = float(os.getenv("PLACEMENT_MODEL_MEMORY_MB", "0"))
+PLACEMENT_DEFAULT_REPLICAS = int(os.getenv("PLACEMENT_DEFAULT_REPLICAS", "1"))
+PLACEMENT_REPLICATION = os.getenv("PLACEMENT_REPLICATION", "")  # "model=replicas,..."
+# weight of the newest outstanding-requests sample in a replica's load average
+PLACEMENT_LOAD_ALPHA = 0.3
+
+
+class PlacementError(Exception):
+    """No set of replicas has room for the model version."""
+
+
+def parse_replication(spec: str) -> Dict[str, int]:
+    """Parse "a=3,b=2" into {"a": 3, "b": 2}."""
+    replication = {}
+    for item in spec.split(","):
+        name, sep, count = item.strip().rpartition("=")
+        if sep and name.strip():
+            replication[name.strip()] = int(count)
+    return replication
+
+
+class ReplicaState:
+    """What the control plane knows about one core replica."""
+
+    def __init__(self, target: str, memory_mb: float):
+        self.target = target
+        self.memory_mb = memory_mb  # 0 = unlimited
+        self.models: Dict[Tuple[str, str], float] = {}  # (name, version) -> memory_mb
+        self.load = 0.0  # EWMA of outstanding requests
+
+    @property
+    def used_mb(self) -> float:
+        return sum(self.models.values())
+
+    def fits(self, memory_mb: float) -> bool:
+        return self.memory_mb <= 0 or self.used_mb + memory_mb <= self.memory_mb
+
+    def hosts_model(self, name: str) -> bool:
+        return any(n == name for n, _ in self.models)
+
+    def to_dict(self) -> Dict:
+        return {"target": self.target, "memory_mb": self.memory_mb, "used_mb": self.used_mb,
+                "load": round(self.load, 3),
+                "models": [{"model_name": n, "version": v, "memory_mb": m} for (n, v), m in sorted(self.models.items())]}
+
+
+class PlacementEngine:
+    """Assigns model versions to core replicas. Safe to share between threads.
+
+    `place()` only decides; the caller loads the version on the chosen replicas and
+    records the ones that succeeded with `assign()`.
+    """
+
+    def __init__(self, targets: Sequence[str], replica_memory_mb: float = PLACEMENT_REPLICA_MEMORY_MB,
+                 model_memory_mb: float = PLACEMENT_MODEL_MEMORY_MB, default_replicas: int = PLACEMENT_DEFAULT_REPLICAS,
+                 replication: Optional[Dict[str, int]] = None):
+        self.replicas: Dict[str, ReplicaState] = {t: ReplicaState(t, replica_memory_mb) for t in dict.fromkeys(targets)}
+        self.model_memory_mb = model_memory_mb
+        self.default_replicas = max(default_replicas, 1)
+        self._replication: Dict[str, int] = dict(replication or {})
+        self._memory: Dict[str, float] = {}  # model -> footprint set at load time
+        self._active: Dict[str, str] = {}  # model -> version unversioned requests go to
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, targets: Sequence[str]) -> "PlacementEngine":
+        return cls(targets, replication=parse_replication(PLACEMENT_REPLICATION))
+
+    def replication_for(self, name: str) -> int:
+        return min(self._replication.get(name, self.default_replicas), len(self.replicas))
+
+    def set_replication(self, name: str, replicas: int):
+        """Replicas that later placements of `name` ask for; hot models get more."""
+        with self._lock:
+            self._replication[name] = max(replicas, 1)
+
+    def memory_for(self, name: str) -> float:
+        return self._memory.get(name, self.model_memory_mb)
+
+    def set_memory(self, name: str, memory_mb: float):
+        with self._lock:
+            self._memory[name] = memory_mb
+
+    def set_active(self, name: str, version: str):
+        with self._lock:
+            self._active[name] = version
+
+    def hosts(self, name: str, version: str = "") -> List[str]:
+        """Replicas hosting `name:version`. Without a version: the hosts of the active
+        version, or of any version of `name` if that is unknown or placed nowhere."""
+        with self._lock:
+            if version:
+                return [t for t, r in self.replicas.items() if (name, version) in r.models]
+            active = self._active.get(name)
+            hosts = [t for t, r in self.replicas.items() if (name, active) in r.models] if active else []
+            return hosts or [t for t, r in self.replicas.items() if r.hosts_model(name)]
+
+    def place(self, name: str, version: str) -> List[str]:
+        """Replicas `name:version` should be on: the ones already hosting it first, topped
+        up or trimmed to its replication factor."""
+        want = self.replication_for(name)
+        memory_mb = self.memory_for(name)
+        with self._lock:
+            current = [r for r in self.replicas.values() if (name, version) in r.models]
+            candidates = [r for r in self.replicas.values()
+                          if (name, version) not in r.models and r.fits(memory_mb)]
+            # another version of the model first, then the least loaded, least full and
+            # fewest models (memory may not be accounted)
+            candidates.sort(key=lambda r: (not r.hosts_model(name), r.load, r.used_mb, len(r.models), r.target))
+            current.sort(key=lambda r: (r.load, r.target))
+            chosen = (current + candidates)[:want]
+        if len(chosen) < want:
+            raise PlacementError(f"{name}:{version} needs {want} replicas with {memory_mb:g} MB free, "
+                                 f"only {len(chosen)} have room")
+        return [r.target for r in chosen]
+
+    def assign(self, name: str, version: str, targets: Iterable[str], memory_mb: Optional[float] = None):
+        """Record that `name:version` is loaded on `targets` (and only there)."""
+        memory_mb = self.memory_for(name) if memory_mb is None else memory_mb
+        targets = set(targets)
+        with self._lock:
+            for t, r in self.replicas.items():
+                if t in targets:
+                    r.models[(name, version)] = memory_mb
+                else:
+                    r.models.pop((name, version), None)
+
+    def remove(self, name: str, version: str, targets: Optional[Iterable[str]] = None):
+        """Forget `name:version` on `targets` (default: everywhere)."""
+        targets = set(self.replicas if targets is None else targets)
+        with self._lock:
+            for t in targets & set(self.replicas):
+                self.replicas[t].models.pop((name, version), None)
+
+    def restore(self, rows: Iterable[Tuple[str, str, str, float]], active: Optional[Dict[str, str]] = None):
+        """Reload persisted (name, version, replica, memory_mb) rows and active versions.
+        Replicas no longer in the target list are skipped."""
+        with self._lock:
+            self._active.update(active or {})
+            copies: Dict[Tuple[str, str], int] = {}
+            for name, version, target, memory_mb in rows:
+                replica = self.replicas.get(target)
+                if replica is not None:
+                    replica.models[(name, version)] = memory_mb
+                    copies[(name, version)] = copies.get((name, version), 0) + 1
+            # a model scaled up at runtime keeps its replicas across restarts
+            for (name, _), n in copies.items():
+                if n > self._replication.get(name, self.default_replicas):
+                    self._replication[name] = n
+
+    def observe_load(self, target: str, outstanding: int):
+        replica = self.replicas.get(target)
+        if replica is not None:
+            replica.load += PLACEMENT_LOAD_ALPHA * (outstanding - replica.load)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                "default_replicas": self.default_replicas,
+                "replication": dict(self._replication),
+                "active": dict(self._active),
+                "replicas": [r.to_dict() for r in self.replicas.values()],
+            }
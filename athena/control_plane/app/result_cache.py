@@ -0,0 +1,180 @@
+# control_plane/app/result_cache.py
+# Client-side cache of inference results for idempotent requests.
+#
+# Retries and duplicate webhooks often resend the exact same feature vector within
+# seconds. For models that opt in, replies are cached under (model, version, hash of
+# inputs) with a TTL, inside an LRU bounded by an approximate byte budget. Loading or
+# unloading a model drops its entries; a per-model generation number keeps a reply that
+# was already in flight during that change from being stored afterwards.
+import os
+import time
+import array
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, Iterable, Optional, Tuple
+
+from prometheus_client import Counter, Gauge
+
+RESULT_CACHE_MODELS = os.getenv("RESULT_CACHE_MODELS", "")  # comma-separated, "*" for every model
+RESULT_CACHE_TTL_S = float(os.getenv("RESULT_CACHE_TTL_S", "10.0"))
+RESULT_CACHE_MAX_BYTES = int(os.getenv("RESULT_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+RESULT_CACHE_REQUESTS = Counter('result_cache_requests_total', 'Inference result cache lookups', ['model', 'result'])
+RESULT_CACHE_EVICTIONS = Counter('result_cache_evictions_total', 'Inference result cache evictions', ['reason'])
+RESULT_CACHE_BYTES = Gauge('result_cache_bytes', 'Approximate size of cached inference results')
+
+# per-entry bookkeeping (key tuple, OrderedDict node, reply fields), roughly
+_ENTRY_OVERHEAD_BYTES = 256
+_ALL = "*"
+
+
+def _outputs_nbytes(outputs) -> int:
+    nbytes = getattr(outputs, "nbytes", None)
+    if nbytes is not None:
+        return int(nbytes)
+    return 32 * len(outputs)  # list slot + boxed float
+
+
+def copy_outputs(outputs):
+    # callers may mutate lists and ndarrays; memoryviews of packed replies are read-only
+    if isinstance(outputs, list):
+        return list(outputs)
+    copy = getattr(outputs, "copy", None)
+    return copy() if copy is not None else outputs
+
+
+def inputs_digest(req) -> bytes:
+    """Hash of an InferenceRequest's inputs, as sent on the wire (float32 / packed tensor)."""
+    if req.HasField("input_tensor"):
+        data = req.input_tensor.SerializeToString(deterministic=True)
+    else:
+        data = array.array("f", req.inputs).tobytes()
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+class ResultCache:
+    """LRU + TTL cache of successful replies, enabled per model.
+
+    `lookup()` returns a cached reply carrying the caller's own request_id, or a token
+    to pass to `store()` once the core has answered. Safe to share between threads.
+    """
+
+    def __init__(self, max_bytes: int = RESULT_CACHE_MAX_BYTES, ttl_s: float = RESULT_CACHE_TTL_S,
+                 models: Iterable[str] = ()):
+        self.max_bytes = max_bytes
+        self.ttl_s = ttl_s
+        self._models: Dict[str, float] = {}  # model -> ttl_s
+        self._entries: "OrderedDict[Hashable, Tuple[float, int, object, str]]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._hits: Dict[str, int] = {}
+        self._misses: Dict[str, int] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        for model in models:
+            self.enable(model)
+
+    @classmethod
+    def from_env(cls) -> "ResultCache":
+        models = [m.strip() for m in RESULT_CACHE_MODELS.split(",") if m.strip()]
+        return cls(models=models)
+
+    def enable(self, model_name: str, ttl_s: Optional[float] = None):
+        """Cache results of `model_name` ("*" for every model) for `ttl_s` seconds."""
+        self._models[model_name] = self.ttl_s if ttl_s is None else ttl_s
+
+    def disable(self, model_name: str):
+        self._models.pop(model_name, None)
+        self.invalidate(model_name, reason="disabled")
+
+    def enabled(self, model_name: str) -> bool:
+        return model_name in self._models or _ALL in self._models
+
+    def _ttl(self, model_name: str) -> float:
+        return self._models.get(model_name, self._models.get(_ALL, self.ttl_s))
+
+    def lookup(self, req) -> Tuple[Optional[Dict], Optional[tuple]]:
+        """(cached reply, None) on a hit, (None, token) on a miss, (None, None) if the
+        model is not cached."""
+        model = req.model_name
+        if not self.enabled(model):
+            return None, None
+        start = time.perf_counter()
+        key = (model, req.model_version, inputs_digest(req))
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= now:
+                self._evict(key, "ttl")
+                entry = None
+            if entry is None:
+                self._misses[model] = self._misses.get(model, 0) + 1
+                token = (key, self._generations.get(model, 0))
+            else:
+                self._entries.move_to_end(key)
+                self._hits[model] = self._hits.get(model, 0) + 1
+        if entry is None:
+            RESULT_CACHE_REQUESTS.labels(model=model, result="miss").inc()
+            return None, token
+        RESULT_CACHE_REQUESTS.labels(model=model, result="hit").inc()
+        _, _, outputs, status = entry
+        return {
+            "request_id": req.request_id,
+            "outputs": copy_outputs(outputs),
+            "latency_ms": (time.perf_counter() - start) * 1000.0,
+            "status": status,
+            "cached": True,
+        }, None
+
+    def store(self, token: Optional[tuple], reply: Dict):
+        """Cache `reply` for the miss that produced `token`; errors are never cached."""
+        if token is None or "error" in reply:
+            return
+        key, generation = token
+        model = key[0]
+        outputs = copy_outputs(reply["outputs"])
+        nbytes = _outputs_nbytes(outputs) + _ENTRY_OVERHEAD_BYTES
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            if not self.enabled(model) or self._generations.get(model, 0) != generation:
+                return  # the model changed while this request was in flight
+            if key in self._entries:
+                self._evict(key, "replaced")
+            self._entries[key] = (time.monotonic() + self._ttl(model), nbytes, outputs, reply.get("status", ""))
+            self._bytes += nbytes
+            while self._bytes > self.max_bytes:
+                self._evict(next(iter(self._entries)), "lru")
+            RESULT_CACHE_BYTES.set(self._bytes)
+
+    def _evict(self, key, reason: str):
+        # _lock held
+        _, nbytes, _, _ = self._entries.pop(key)
+        self._bytes -= nbytes
+        RESULT_CACHE_EVICTIONS.labels(reason=reason).inc()
+
+    def invalidate(self, model_name: str, reason: str = "model_change"):
+        """Drop every cached version of `model_name`, e.g. after LoadModel/UnloadModel."""
+        with self._lock:
+            self._generations[model_name] = self._generations.get(model_name, 0) + 1
+            for key in [k for k in self._entries if k[0] == model_name]:
+                self._evict(key, reason)
+            RESULT_CACHE_BYTES.set(self._bytes)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            models = sorted(set(self._hits) | set(self._misses))
+            per_model = {}
+            for m in models:
+                hits, misses = self._hits.get(m, 0), self._misses.get(m, 0)
+                per_model[m] = {"hits": hits, "misses": misses, "hit_rate": hits / (hits + misses)}
+            return {
+                "enabled_models": sorted(self._models),
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "models": per_model,
+            }
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,121 @@
+# control_plane/app/single_flight.py
+# Single-flight coalescing of identical in-flight inference calls.
+#
+# When a burst of requests with the same model, version and inputs arrives before any
+# result exists (so the result cache cannot help yet), the first caller makes the core
+# call and the rest wait for its reply, each getting a copy under its own request_id.
+# Only enable it for deterministic models: followers never see a separate computation.
+import os
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Awaitable, Callable, Dict, Iterable, Optional
+
+from prometheus_client import Counter
+
+from .result_cache import copy_outputs, inputs_digest
+
+COALESCE_MODELS = os.getenv("COALESCE_MODELS", "")  # comma-separated, "*" for every model
+
+SINGLE_FLIGHT_CALLS = Counter('single_flight_calls_total', 'Core inference calls made by single-flight leaders', ['model'])
+COALESCED_REQUESTS = Counter('coalesced_requests_total', 'Inference requests answered by an identical in-flight call', ['model'])
+
+_ALL = "*"
+
+
+def _follower_reply(result: Dict, request_id: str) -> Dict:
+    reply = dict(result)
+    if "outputs" in reply:
+        reply["outputs"] = copy_outputs(reply["outputs"])
+    if "request_id" in reply:
+        reply["request_id"] = request_id
+    reply["coalesced"] = True
+    return reply
+
+
+def _retry_alone(result: Dict) -> bool:
+    # the leader's own (possibly tighter) deadline ran out; a follower may still have time
+    return result.get("code") == "DEADLINE_EXCEEDED"
+
+
+class SingleFlight:
+    """In-flight calls keyed by (model, version, inputs hash), for threads and asyncio.
+
+    `run()` / `run_async()` take the caller's request and a zero-argument function doing
+    its core call. The first caller for a key runs it; callers arriving while it is in
+    flight wait up to `timeout_s` for the same result. The key is released as soon as
+    the result is in, so later requests make a fresh call (or hit the result cache).
+    """
+
+    def __init__(self, models: Iterable[str] = ()):
+        self._models = set(models)
+        self._futures: Dict[tuple, Future] = {}
+        self._tasks: Dict[tuple, asyncio.Task] = {}
+        self._lock = threading.Lock()
+        self._calls: Dict[str, int] = {}
+        self._coalesced: Dict[str, int] = {}
+
+    @classmethod
+    def from_env(cls) -> "SingleFlight":
+        return cls(models=[m.strip() for m in COALESCE_MODELS.split(",") if m.strip()])
+
+    def enable(self, model_name: str):
+        self._models.add(model_name)
+
+    def disable(self, model_name: str):
+        self._models.discard(model_name)
+
+    def enabled(self, model_name: str) -> bool:
+        return model_name in self._models or _ALL in self._models
+
+    def _count(self, model: str, leader: bool):
+        with self._lock:
+            counts = self._calls if leader else self._coalesced
+            counts[model] = counts.get(model, 0) + 1
+        (SINGLE_FLIGHT_CALLS if leader else COALESCED_REQUESTS).labels(model=model).inc()
+
+    def run(self, req, call: Callable[[], Dict], timeout_s: Optional[float] = None) -> Dict:
+        """Blocking variant; a follower past `timeout_s` raises concurrent.futures.TimeoutError."""
+        key = (req.model_name, req.model_version, inputs_digest(req))
+        with self._lock:
+            fut = self._futures.get(key)
+            leader = fut is None
+            if leader:
+                fut = self._futures[key] = Future()
+        self._count(req.model_name, leader)
+        if leader:
+            try:
+                result = call()
+            except Exception as e:  # never leave a follower hanging
+                result = {"error": str(e)}
+            with self._lock:
+                del self._futures[key]
+            fut.set_result(result)
+            return result
+        result = fut.result(timeout_s)
+        return call() if _retry_alone(result) else _follower_reply(result, req.request_id)
+
+    async def run_async(self, req, call: Callable[[], Awaitable[Dict]], timeout_s: Optional[float] = None) -> Dict:
+        """asyncio variant; a follower past `timeout_s` raises asyncio.TimeoutError. The
+        shared call runs as its own task, so cancelling the leader's caller does not
+        cancel it for the followers."""
+        key = (req.model_name, req.model_version, inputs_digest(req))
+        task = self._tasks.get(key)
+        leader = task is None or task.done()
+        self._count(req.model_name, leader)
+        if leader:
+            task = self._tasks[key] = asyncio.ensure_future(call())
+            task.add_done_callback(lambda t: self._tasks.pop(key, None) if self._tasks.get(key) is t else None)
+            return await asyncio.shield(task)
+        result = await asyncio.wait_for(asyncio.shield(task), timeout_s)
+        return await call() if _retry_alone(result) else _follower_reply(result, req.request_id)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            models = sorted(set(self._calls) | set(self._coalesced))
+            return {
+                "enabled_models": sorted(self._models),
+                "in_flight": len(self._futures) + len(self._tasks),
+                "models": {m: {"calls": self._calls.get(m, 0), "coalesced": self._coalesced.get(m, 0)}
+                           for m in models},
+            }
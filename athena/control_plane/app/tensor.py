@@ -0,0 +1,81 @@
+# control_plane/app/tensor.py
+# Packing/unpacking of the proto `Tensor` message (dtype + shape + raw little-endian bytes).
+# NumPy is optional: without it tensors are read and written through memoryviews.
+import sys
+import array
+from typing import Sequence, Union
+
+try:
+    import numpy as np
+except ImportError:  # numpy is an optional speed-up, not a requirement
+    np = None
+
+try:
+    from control_plane import inference_pb2
+except Exception:
+    import inference_pb2
+
+# proto DataType -> (struct/memoryview format, numpy little-endian dtype string)
+_DTYPES = {
+    inference_pb2.DT_FLOAT32: ("f", "<f4"),
+    inference_pb2.DT_FLOAT64: ("d", "<f8"),
+    inference_pb2.DT_INT32: ("i", "<i4"),
+    inference_pb2.DT_INT64: ("q", "<i8"),
+    inference_pb2.DT_UINT8: ("B", "|u1"),
+    inference_pb2.DT_FLOAT16: ("e", "<f2"),
+}
+_BY_FORMAT = {fmt: dt for dt, (fmt, _) in _DTYPES.items()}
+_BY_NUMPY = {np_dtype: dt for dt, (_, np_dtype) in _DTYPES.items()}
+
+_LITTLE_ENDIAN = sys.byteorder == "little"
+
+TensorLike = Union["np.ndarray", memoryview, array.array, bytes, bytearray]
+
+
+def is_tensor_like(value) -> bool:
+    """True for buffers that should travel as a packed Tensor instead of `repeated float`."""
+    if np is not None and isinstance(value, np.ndarray):
+        return True
+    return isinstance(value, (memoryview, array.array, bytes, bytearray))
+
+
+def to_tensor(value: TensorLike, shape: Sequence[int] = None):
+    """Build a proto Tensor from a NumPy array or a typed buffer (memoryview, array.array).
+
+    The element type comes from the array dtype / buffer format, so plain bytes are
+    uint8; use `memoryview(buf).cast("f")` to send raw float32 bytes. The data is
+    copied once into the message's bytes field, with no per-element boxing.
+    """
+    if np is not None and isinstance(value, np.ndarray):
+        dtype = _BY_NUMPY.get(value.dtype.newbyteorder("<").str if value.dtype.itemsize > 1 else value.dtype.str)
+        if dtype is None:
+            raise TypeError(f"unsupported tensor dtype {value.dtype}")
+        arr = np.ascontiguousarray(value, dtype=_DTYPES[dtype][1])
+        return inference_pb2.Tensor(dtype=dtype, shape=arr.shape if shape is None else shape, data=arr.tobytes())
+
+    mv = memoryview(value)
+    dtype = _BY_FORMAT.get(mv.format.lstrip("@=<"))
+    if dtype is None:
+        raise TypeError(f"unsupported buffer format {mv.format!r}")
+    if not _LITTLE_ENDIAN and mv.itemsize > 1:
+        raise ValueError("packing raw buffers requires a little-endian host; pass a numpy array instead")
+    return inference_pb2.Tensor(dtype=dtype, shape=mv.shape if shape is None else shape, data=mv.tobytes())
+
+
+def from_tensor(tensor, as_numpy: bool = True):
+    """View a proto Tensor's bytes as a NumPy array (if available) or a typed memoryview.
+
+    Both are zero-copy views over the message's bytes, so they are read-only.
+    """
+    return from_buffer(tensor.data, tensor.dtype, tensor.shape, as_numpy)
+
+
+def from_buffer(data: bytes, dtype: int, shape: Sequence[int], as_numpy: bool = True):
+    """Like from_tensor, for raw bytes of a proto DataType (e.g. read from shared memory)."""
+    fmt, np_dtype = _DTYPES[dtype]
+    shape = tuple(shape)
+    if as_numpy and np is not None:
+        return np.frombuffer(data, dtype=np_dtype).reshape(shape)
+    if not _LITTLE_ENDIAN and fmt != "B":
+        raise ValueError("memoryview tensors require a little-endian host; install numpy")
+    return memoryview(data).cast(fmt, shape)
@@ -0,0 +1,242 @@
+# control_plane/app/tracing.py
+# Sampled distributed tracing from the HTTP handler down to the core's batcher.
+#
+# Trace context travels as a W3C `traceparent`, the format OpenTelemetry propagates by
+# default: in from HTTP callers (their sampling decision is kept), out to the core as
+# gRPC metadata. The core answers a traced RunInference with per-stage timings (queue
+# wait, batch wait, execution), which become child spans of the RPC span here, so the
+# core needs no tracing SDK. Spans follow OpenTelemetry's data model and are exported
+# with OTLP/JSON field names, one per line by FileSpanExporter, or kept by
+# InMemorySpanExporter.
+#
+# The sampling decision is made once per trace, before any span exists: an unsampled
+# request costs one random() call and carries no context, so the core does no extra
+# work for it either. TRACE_SAMPLE_RATE=0.01 is meant to stay on in production.
+import os
+import json
+import time
+import random
+import threading
+import collections
+import contextvars
+from typing import Deque, Dict, List, Optional, Tuple
+
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0.01"))
+TRACE_EXPORTER = os.getenv("TRACE_EXPORTER", "none")  # none | memory | file
+TRACE_FILE = os.getenv("TRACE_FILE", "/tmp/athena-traces.jsonl")
+TRACE_MEMORY_SPANS = int(os.getenv("TRACE_MEMORY_SPANS", "10000"))
+
+_HEX = frozenset("0123456789abcdef")
+_current: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("athena_current_span", default=None)
+
+
+def parse_traceparent(header: Optional[str]) -> Optional[Tuple[str, str, bool]]:
+    """(trace_id, parent_span_id, sampled) of a valid `traceparent`, else None."""
+    if not header:
+        return None
+    parts = header.strip().split("-")
+    if len(parts) < 4 or len(parts[0]) != 2 or parts[0] == "ff" or (parts[0] == "00" and len(parts) != 4):
+        return None
+    version, trace_id, span_id, flags = parts[:4]
+    if (len(trace_id), len(span_id), len(flags)) != (32, 16, 2) or not _HEX.issuperset(version + trace_id + span_id + flags):
+        return None
+    if trace_id == "0" * 32 or span_id == "0" * 16:
+        return None
+    return trace_id, span_id, bool(int(flags, 16) & 1)
+
+
+def _span_id() -> str:
+    return f"{random.getrandbits(64) or 1:016x}"
+
+
+def current_span() -> Optional["Span"]:
+    """The span of the request being handled, if it is sampled."""
+    return _current.get()
+
+
+class Span:
+    """One timed operation of a sampled trace. Ending it hands it to the tracer's exporter."""
+
+    __slots__ = ("tracer", "name", "trace_id", "span_id", "parent_span_id", "start_ns", "end_ns",
+                 "attributes", "error", "_token")
+
+    def __init__(self, tracer: "Tracer", name: str, trace_id: str, parent_span_id: str = "",
+                 start_ns: Optional[int] = None, attributes: Optional[Dict] = None):
+        self.tracer = tracer
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = _span_id()
+        self.parent_span_id = parent_span_id
+        self.start_ns = time.time_ns() if start_ns is None else start_ns
+        self.end_ns: Optional[int] = None
+        self.attributes = dict(attributes or {})
+        self.error: Optional[str] = None
+        self._token = None
+
+    def traceparent(self) -> str:
+        """Context for calls made on behalf of this span (always sampled)."""
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+    def set_error(self, message: str):
+        self.error = message
+
+    def child(self, name: str, start_ns: Optional[int] = None, attributes: Optional[Dict] = None) -> "Span":
+        return Span(self.tracer, name, self.trace_id, self.span_id, start_ns, attributes)
+
+    def end(self, end_ns: Optional[int] = None):
+        if self.end_ns is None:
+            self.end_ns = time.time_ns() if end_ns is None else end_ns
+            self.tracer.export(self)
+
+    def to_otlp(self) -> Dict:
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_span_id,
+            "name": self.name,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in self.attributes.items()],
+            "status": {"code": "STATUS_CODE_ERROR", "message": self.error} if self.error else {"code": "STATUS_CODE_UNSET"},
+        }
+
+    # `with span:` makes it the current span and ends it on the way out
+    def __enter__(self) -> "Span":
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _current.reset(self._token)
+        if exc is not None and self.error is None:
+            self.set_error(f"{exc_type.__name__}: {exc}")
+        self.end()
+
+
+def _otlp_value(value) -> Dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class InMemorySpanExporter:
+    """Keeps the last `max_spans` finished spans, e.g. for tests or /api/traces."""
+
+    def __init__(self, max_spans: int = TRACE_MEMORY_SPANS):
+        self._spans: Deque[Span] = collections.deque(maxlen=max_spans)
+
+    def export(self, span: Span):
+        self._spans.append(span)  # deque appends are atomic
+
+    def get_finished_spans(self, trace_id: Optional[str] = None) -> List[Span]:
+        return [s for s in list(self._spans) if trace_id is None or s.trace_id == trace_id]
+
+    def clear(self):
+        self._spans.clear()
+
+
+class FileSpanExporter:
+    """Appends each finished span to `path` as one line of OTLP/JSON."""
+
+    def __init__(self, path: str = TRACE_FILE):
+        self.path = path
+        self._file = open(path, "a", buffering=1)  # line-buffered: readable while running
+        self._lock = threading.Lock()
+
+    def export(self, span: Span):
+        line = json.dumps(span.to_otlp(), separators=(",", ":"))
+        with self._lock:
+            self._file.write(line + "\n")
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class Tracer:
+    """Starts traces for incoming requests: parent-based sampling when the caller sent
+    a `traceparent`, otherwise `sample_rate` of new traces. Without an exporter nothing
+    is sampled."""
+
+    def __init__(self, exporter=None, sample_rate: float = TRACE_SAMPLE_RATE):
+        self.exporter = exporter
+        self.sample_rate = sample_rate if exporter is not None else 0.0
+
+    @classmethod
+    def from_env(cls) -> "Tracer":
+        exporters = {"memory": InMemorySpanExporter, "file": FileSpanExporter}
+        factory = exporters.get(TRACE_EXPORTER)
+        return cls(factory() if factory else None)
+
+    def start_span(self, name: str, traceparent: Optional[str] = None, attributes: Optional[Dict] = None) -> Optional[Span]:
+        """A root (or remote-parented) span, or None if the request is not sampled."""
+        if self.exporter is None:
+            return None
+        parent = parse_traceparent(traceparent)
+        if parent is not None:
+            trace_id, parent_span_id, sampled = parent
+            if not sampled:
+                return None
+        elif random.random() < self.sample_rate:
+            trace_id, parent_span_id = f"{random.getrandbits(128) or 1:032x}", ""
+        else:
+            return None
+        return Span(self, name, trace_id, parent_span_id, attributes=attributes)
+
+    def export(self, span: Span):
+        if self.exporter is not None:
+            self.exporter.export(span)
+
+
+def rpc_span(method: str, target: str) -> Optional[Span]:
+    """Child span for a core RPC made while handling a sampled request."""
+    parent = _current.get()
+    if parent is None:
+        return None
+    return parent.child(f"athena.core/{method}", attributes={"rpc.system": "grpc", "rpc.method": method,
+                                                             "server.address": target})
+
+
+def rpc_metadata(span: Optional[Span]):
+    return (("traceparent", span.traceparent()),) if span is not None else None
+
+
+def end_rpc_span(span: Optional[Span], result: Dict) -> Dict:
+    """End the span of an inference RPC with its client-side `result`, adding the core's
+    stage spans if it reported `timings`. Returns `result`."""
+    if span is not None:
+        if "error" in result:
+            span.set_error(str(result["error"]))
+        elif result.get("timings"):
+            add_stage_spans(span, result["timings"], time.time_ns())
+        span.end()
+    return result
+
+
+def add_stage_spans(rpc: Span, timings: Dict, end_ns: int):
+    """Core-side spans under `rpc` (ending at `end_ns`) from the core's stage timings.
+
+    Durations are the core's own; positions are estimated on this host's clock: the
+    network time is split evenly around the core's total, and the stages run back to
+    back up to the end of execution.
+    """
+    ms = 1_000_000
+    total_ns = int(timings["total_ms"] * ms)
+    core_start = rpc.start_ns + max(end_ns - rpc.start_ns - total_ns, 0) // 2
+    core = rpc.child("athena.core/server", start_ns=core_start)
+    core_end = core_start + total_ns
+    cursor = core_end
+    spans = []
+    for name, key in (("exec", "exec_ms"), ("batch_wait", "batch_ms"), ("queue_wait", "queue_ms")):
+        start = max(cursor - int(timings[key] * ms), core_start)
+        spans.append((core.child(f"athena.core/{name}", start_ns=start), cursor))
+        cursor = start
+    for span, stage_end in reversed(spans):
+        span.end(stage_end)
+    core.end(core_end)
@@ -0,0 +1,133 @@
+# control_plane/app/warmup.py
+# Post-load warm-up: push synthetic traffic through the core until per-round latency
+# stops moving, so cold caches, lazy allocation and JIT work are paid before real
+# requests arrive. While a model warms up it is WARMING and /health/ready reports 503.
+import os
+import time
+import asyncio
+import statistics
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+
+@dataclass
+class WarmupConfig:
+    batch_size: int = 8             # concurrent synthetic requests per round
+    features: int = 16              # length of the synthetic input vector
+    min_rounds: int = 3
+    max_rounds: int = 50
+    settle_rounds: int = 3          # consecutive rounds that must agree
+    settle_tolerance: float = 0.10  # ... to within +/-10% of their mean
+
+    @classmethod
+    def from_env(cls) -> "WarmupConfig":
+        return cls(
+            batch_size=int(os.getenv("WARMUP_BATCH_SIZE", cls.batch_size)),
+            features=int(os.getenv("WARMUP_FEATURES", cls.features)),
+            min_rounds=int(os.getenv("WARMUP_MIN_ROUNDS", cls.min_rounds)),
+            max_rounds=int(os.getenv("WARMUP_MAX_ROUNDS", cls.max_rounds)),
+            settle_rounds=int(os.getenv("WARMUP_SETTLE_ROUNDS", cls.settle_rounds)),
+            settle_tolerance=float(os.getenv("WARMUP_SETTLE_TOLERANCE", cls.settle_tolerance)),
+        )
+
+
+@dataclass
+class WarmupResult:
+    model_name: str
+    version: str
+    curve_ms: List[float] = field(default_factory=list)  # median latency per round
+    settled: bool = False
+    aborted: bool = False  # a whole round failed
+    errors: int = 0
+    started_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+
+    @property
+    def ok(self) -> bool:
+        return bool(self.curve_ms) and not self.aborted
+
+    def to_dict(self):
+        return {
+            "model_name": self.model_name,
+            "version": self.version,
+            "rounds": len(self.curve_ms),
+            "curve_ms": [round(v, 3) for v in self.curve_ms],
+            "settled": self.settled,
+            "aborted": self.aborted,
+            "errors": self.errors,
+            "in_progress": self.finished_at is None,
+            "duration_s": (self.finished_at or time.time()) - self.started_at,
+        }
+
+
+def _settled(curve: List[float], cfg: WarmupConfig) -> bool:
+    if len(curve) < max(cfg.min_rounds, cfg.settle_rounds):
+        return False
+    tail = curve[-cfg.settle_rounds:]
+    mean = statistics.fmean(tail)
+    return all(abs(v - mean) <= cfg.settle_tolerance * mean for v in tail)
+
+
+async def warm_up_model(client, model_name: str, version: str, cfg: WarmupConfig,
+                        result: Optional[WarmupResult] = None) -> WarmupResult:
+    """Run warm-up rounds through `client.run_inference` until latency settles or
+    `max_rounds` is reached. A round where every request fails aborts the warm-up."""
+    result = result or WarmupResult(model_name, version)
+    inputs = [0.0] * cfg.features
+
+    async def one(i: int, r: int) -> Optional[float]:
+        start = time.perf_counter()
+        # a cached reply would time the cache instead of the core, and take its budget;
+        # coalesced calls would collapse the round into one and never load the batcher
+        resp = await client.run_inference(f"warmup-{model_name}-{r}-{i}", inputs, model_name, version,
+                                          use_cache=False, coalesce=False)
+        if "error" in resp:
+            return None
+        return (time.perf_counter() - start) * 1000.0
+
+    for r in range(cfg.max_rounds):
+        latencies = await asyncio.gather(*(one(i, r) for i in range(cfg.batch_size)))
+        good = [v for v in latencies if v is not None]
+        result.errors += len(latencies) - len(good)
+        if not good:
+            result.aborted = True
+            break
+        result.curve_ms.append(statistics.median(good))
+        if _settled(result.curve_ms, cfg):
+            result.settled = True
+            break
+    result.finished_at = time.time()
+    return result
+
+
+class WarmupTracker:
+    """Warm-ups on this replica: in-flight ones gate readiness; finished ones keep their curve."""
+
+    def __init__(self):
+        self._results: Dict[Tuple[str, str], WarmupResult] = {}
+        self._tasks = set()
+
+    def begin(self, model_name: str, version: str) -> WarmupResult:
+        result = self._results[(model_name, version)] = WarmupResult(model_name, version)
+        return result
+
+    def is_warming(self, model_name: str, version: str) -> bool:
+        r = self._results.get((model_name, version))
+        return r is not None and r.finished_at is None
+
+    def track(self, task: "asyncio.Task"):
+        # keep a strong reference so the task is not garbage-collected mid-flight
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def in_progress(self) -> List[str]:
+        return [f"{n}:{v}" for (n, v), r in self._results.items() if r.finished_at is None]
+
+    def result(self, model_name: str, version: str) -> Optional[WarmupResult]:
+        return self._results.get((model_name, version))
+
+    def finish(self, result: WarmupResult):
+        # also covers warm-ups that died on an exception
+        if result.finished_at is None:
+            result.aborted = True
+            result.finished_at = time.time()
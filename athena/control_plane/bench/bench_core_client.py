@@ -0,0 +1,71 @@
+# control_plane/bench/bench_core_client.py
+# Control-plane throughput under concurrent load: blocking CoreClient (as main.py used it)
+# versus the pooled AsyncCoreClient, both against the in-process stub core.
+#
+#   cd athena && python -m control_plane.bench.bench_core_client --concurrency 64 --delay-ms 20
+import time
+import asyncio
+import argparse
+
+from control_plane.app.core_client import CoreClient, AsyncCoreClient
+from control_plane.bench.stub_core import serve
+
+
+async def run_sync_client(target: str, concurrency: int, total: int) -> float:
+    # what the old handlers did: a blocking gRPC call inside an async def
+    client = CoreClient(target=target)
+    done = 0
+
+    async def handler():
+        nonlocal done
+        while done < total:
+            done += 1
+            client.load_model("bench-model", "v1")
+            await asyncio.sleep(0)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(handler() for _ in range(concurrency)))
+    return total / (time.perf_counter() - start)
+
+
+async def run_async_client(target: str, concurrency: int, total: int, channels: int) -> float:
+    client = AsyncCoreClient(targets=[target], channels_per_target=channels)
+    await client.start()
+    done = 0
+
+    async def handler():
+        nonlocal done
+        while done < total:
+            done += 1
+            await client.load_model("bench-model", "v1")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(handler() for _ in range(concurrency)))
+    rps = total / (time.perf_counter() - start)
+    await client.close()
+    return rps
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark CoreClient vs AsyncCoreClient throughput")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--delay-ms", type=float, default=5.0, help="simulated core service time per call")
+    parser.add_argument("--channels", type=int, default=2, help="async pool channels per target")
+    args = parser.parse_args()
+
+    server, port = serve(delay_ms=args.delay_ms, max_workers=max(args.concurrency, 8))
+    target = f"127.0.0.1:{port}"
+    try:
+        sync_rps = asyncio.run(run_sync_client(target, args.concurrency, args.requests))
+        async_rps = asyncio.run(run_async_client(target, args.concurrency, args.requests, args.channels))
+    finally:
+        server.stop(None)
+
+    print(f"concurrency={args.concurrency} requests={args.requests} core_delay={args.delay_ms}ms")
+    print(f"  CoreClient (blocking):   {sync_rps:10.1f} req/s")
+    print(f"  AsyncCoreClient (pool):  {async_rps:10.1f} req/s  ({async_rps / sync_rps:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+# control_plane/bench/bench_core_server.py
+# Throughput versus concurrency of the core's RunInference, synchronous server (one
+# thread parked per in-flight call) against the async completion-queue server (calls
+# answered from the batcher's workers), both going through the same batcher and engine.
+#
+# Starts the core binary once per mode (CORE_GRPC_MODE=sync / async) and drives it with
+# closed-loop callers at each concurrency level:
+#
+#   cd athena && python -m control_plane.bench.bench_core_server --server-bin core/build/server \
+#       --concurrency 1,8,64,256,1024
+#
+# or measures cores that are already running:
+#
+#   python -m control_plane.bench.bench_core_server --target sync=localhost:50051 --target async=localhost:50052
+#
+# The Python load generator tops out at a few thousand requests/s; past that the
+# client, not the server, is what is measured. --stub runs against the Python stub
+# core, to try the script without building the core.
+import os
+import time
+import asyncio
+import argparse
+import subprocess
+
+from control_plane.app.core_client import AsyncCoreClient
+from control_plane.bench.stub_core import serve
+
+
+def percentile(sorted_ms, q):
+    if not sorted_ms:
+        return 0.0
+    return sorted_ms[min(len(sorted_ms) - 1, int(q * len(sorted_ms)))]
+
+
+async def drive(target: str, concurrency: int, duration_s: float, features: int, model: str):
+    """Closed loop: `concurrency` callers, each sending its next request when the last
+    returns. Returns (requests/s, sorted latencies in ms, errors)."""
+    client = AsyncCoreClient(targets=[target], channels_per_target=4, max_inflight_per_channel=100000)
+    await client.start()
+    inputs = [0.5] * features
+    latencies, errors = [], 0
+    stop_at = time.perf_counter() + duration_s
+
+    async def caller(c):
+        nonlocal errors
+        i = 0
+        while time.perf_counter() < stop_at:
+            start = time.perf_counter()
+            resp = await client.run_inference(f"c{c}-{i}", inputs, model)
+            if "error" in resp:
+                errors += 1
+            else:
+                latencies.append((time.perf_counter() - start) * 1000.0)
+            i += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(caller(c) for c in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    await client.close()
+    latencies.sort()
+    return len(latencies) / elapsed, latencies, errors
+
+
+def start_core(server_bin: str, mode: str, port: int):
+    env = dict(os.environ, CORE_GRPC_MODE=mode)
+    proc = subprocess.Popen([server_bin], env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    time.sleep(1.0)  # let it bind
+    return proc, f"127.0.0.1:{port}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RunInference throughput vs concurrency, sync vs async core server")
+    parser.add_argument("--server-bin", help="core server binary; started once per mode")
+    parser.add_argument("--port", type=int, default=50051, help="port the core binary listens on")
+    parser.add_argument("--target", action="append", default=[], metavar="LABEL=HOST:PORT",
+                        help="an already running core to measure (repeatable)")
+    parser.add_argument("--stub", action="store_true", help="measure the Python stub core instead")
+    parser.add_argument("--concurrency", default="1,8,64,256", help="comma-separated caller counts")
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per level")
+    parser.add_argument("--features", type=int, default=16)
+    parser.add_argument("--model", default="bench-model")
+    args = parser.parse_args()
+    levels = [int(c) for c in args.concurrency.split(",") if c]
+
+    runs = [tuple(t.split("=", 1)) for t in args.target]
+    if args.server_bin:
+        runs += [("sync", None), ("async", None)]
+    stub = None
+    if args.stub:
+        stub, port = serve(delay_ms=3.0, max_workers=max(levels) + 8)
+        runs.append(("stub", f"127.0.0.1:{port}"))
+    if not runs:
+        parser.error("give --server-bin, --target or --stub")
+
+    results = {}
+    for label, target in runs:
+        proc = None
+        if target is None:
+            proc, target = start_core(args.server_bin, label, args.port)
+        try:
+            for c in levels:
+                rps, lat, errors = asyncio.run(drive(target, c, args.duration, args.features, args.model))
+                results[(label, c)] = rps
+                print(f"{label:>6} concurrency={c:5d}  {rps:9.0f} req/s  p50={percentile(lat, 0.50):7.2f}ms  "
+                      f"p99={percentile(lat, 0.99):7.2f}ms  errors={errors}")
+        finally:
+            if proc is not None:
+                proc.terminate()
+                proc.wait()
+    if stub is not None:
+        stub.stop(None)
+
+    labels = [label for label, _ in runs]
+    if "sync" in labels and "async" in labels:
+        print("\nasync / sync throughput:")
+        for c in levels:
+            print(f"  concurrency={c:5d}  {results[('async', c)] / max(results[('sync', c)], 1e-9):5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
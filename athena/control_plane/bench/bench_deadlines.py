@@ -0,0 +1,104 @@
+# control_plane/bench/bench_deadlines.py
+# Load-test scenario for deadline propagation: an open-loop spike above the core's
+# capacity, mixing interactive requests (tight budget) with background ones (loose
+# budget), run three ways against the stub core:
+#
+#   no-deadline  every call uses the client-wide timeout; everyone queues FIFO
+#   fifo         budgets are sent as gRPC deadlines, but the core still serves FIFO
+#   edf+shed     the core serves earliest-deadline-first and sheds expired requests,
+#                like core/src/dispatcher.cpp
+#
+# With EDF the tight requests jump the backlog, so their P95 stays within budget while
+# the loose ones absorb the queueing.
+#
+#   cd athena && python -m control_plane.bench.bench_deadlines --rate 300 --budget-ms 50
+import time
+import random
+import asyncio
+import argparse
+
+from control_plane.app.core_client import AsyncCoreClient
+from control_plane.bench.stub_core import serve
+
+
+def _quantile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+async def spike(target: str, rate: float, duration_s: float, features: int, budgets, send_deadlines: bool):
+    """`budgets[i]` is request i's latency budget in ms. Returns per-budget (latencies, errors)."""
+    client = AsyncCoreClient(targets=[target], channels_per_target=2, max_inflight_per_channel=100000)
+    await client.start()
+    inputs = [0.5] * features
+    results = {b: ([], 0) for b in set(budgets)}
+
+    async def one(i, budget):
+        start = time.perf_counter()
+        resp = await client.run_inference(f"req-{i}", inputs, "fraud-detector", "v0.1",
+                                          deadline_ms=budget if send_deadlines else None)
+        lat, errors = results[budget]
+        if "error" in resp:
+            results[budget] = (lat, errors + 1)
+        else:
+            lat.append((time.perf_counter() - start) * 1000.0)
+
+    # open loop: send on schedule whether or not earlier calls have finished
+    tasks = []
+    start = time.perf_counter()
+    for i, budget in enumerate(budgets):
+        delay = start + i / rate - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(one(i, budget)))
+    await asyncio.gather(*tasks)
+    await client.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Deadline propagation and EDF shedding under an overload spike")
+    parser.add_argument("--rate", type=float, default=300.0, help="offered load, requests/s")
+    parser.add_argument("--duration", type=float, default=3.0, help="length of the spike, seconds")
+    parser.add_argument("--budget-ms", type=float, default=50.0, help="budget of interactive requests")
+    parser.add_argument("--loose-budget-ms", type=float, default=5000.0, help="budget of background requests")
+    parser.add_argument("--tight-fraction", type=float, default=0.5, help="share of interactive requests")
+    parser.add_argument("--delay-ms", type=float, default=20.0, help="simulated per-request service time")
+    parser.add_argument("--workers", type=int, default=4, help="concurrent executions in the stub core")
+    parser.add_argument("--features", type=int, default=32)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    total = int(args.rate * args.duration)
+    budgets = [args.budget_ms if rng.random() < args.tight_fraction else args.loose_budget_ms for _ in range(total)]
+
+    capacity = args.workers * 1000.0 / args.delay_ms
+    print(f"offered={args.rate:.0f} req/s  capacity~{capacity:.0f} req/s  duration={args.duration}s  "
+          f"budgets: {args.tight_fraction:.0%} at {args.budget_ms}ms, rest at {args.loose_budget_ms}ms")
+    scenarios = [
+        ("no-deadline", False, dict(max_workers=args.workers, shed_expired=False)),
+        ("fifo", True, dict(max_workers=args.workers, shed_expired=False)),
+        ("edf+shed", True, dict(max_workers=max(total, 64), deadline_slots=args.workers)),
+    ]
+    for name, send_deadlines, stub_args in scenarios:
+        server, port = serve(delay_ms=args.delay_ms, **stub_args)
+        try:
+            results = asyncio.run(spike(f"127.0.0.1:{port}", args.rate, args.duration, args.features,
+                                        budgets, send_deadlines))
+            shed = server.servicer.shed
+        finally:
+            server.stop(None)
+        print(f"  {name} (core shed={shed})")
+        for budget in sorted(results):
+            lat, errors = results[budget]
+            lat.sort()
+            on_time = sum(1 for v in lat if v <= budget)
+            sent = budgets.count(budget)
+            print(f"    budget={budget:6.0f}ms  within budget={on_time:5d}/{sent}  errors={errors:5d}  "
+                  f"p50={_quantile(lat, 0.50):7.1f}ms  p95={_quantile(lat, 0.95):7.1f}ms  p99={_quantile(lat, 0.99):7.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+# control_plane/bench/bench_local_transport.py
+# RunInference latency and throughput of a co-located client over each transport:
+#   tcp    gRPC over TCP loopback (host:port), the default
+#   unix   gRPC over a Unix domain socket (unix://)
+#   shm    Unix socket for control messages, tensors through a shared-memory ring (shm://)
+# for small and large float32 payloads. Latency is one caller sending back to back;
+# throughput is --threads callers for --duration seconds.
+#
+# Against the in-process Python stub core (the default), which does the same shm
+# reads/writes as the core:
+#
+#   cd athena && python -m control_plane.bench.bench_local_transport --features 16,4096,262144
+#
+# or against a core started with CORE_UNIX_SOCKET=/tmp/athena-core.sock:
+#
+#   python -m control_plane.bench.bench_local_transport --tcp localhost:50051 --socket /tmp/athena-core.sock
+import os
+import time
+import argparse
+import tempfile
+import threading
+
+import numpy as np
+
+from control_plane.app.core_client import CoreClient
+from control_plane.app.local_transport import SHM_SLOT_BYTES, ShmRing
+from control_plane.bench.stub_core import serve
+
+
+def _quantile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def latency(client: CoreClient, inputs, iterations: int):
+    """Sorted per-call latencies in ms of one caller."""
+    samples = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        resp = client.run_inference(f"lat-{i}", inputs, "bench-model")
+        samples.append((time.perf_counter() - start) * 1000.0)
+        if "error" in resp:
+            raise RuntimeError(resp["error"])
+    samples.sort()
+    return samples
+
+
+def throughput(client: CoreClient, inputs, threads: int, duration_s: float) -> float:
+    count = [0] * threads
+    stop_at = time.perf_counter() + duration_s
+
+    def caller(t):
+        i = 0
+        while time.perf_counter() < stop_at:
+            client.run_inference(f"t{t}-{i}", inputs, "bench-model")
+            i += 1
+        count[t] = i
+
+    workers = [threading.Thread(target=caller, args=(t,)) for t in range(threads)]
+    start = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    return sum(count) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RunInference over TCP, Unix socket and shared memory")
+    parser.add_argument("--features", default="16,4096,262144", help="comma-separated float32 payload sizes")
+    parser.add_argument("--iterations", type=int, default=500, help="latency samples per payload")
+    parser.add_argument("--threads", type=int, default=8, help="throughput callers")
+    parser.add_argument("--duration", type=float, default=2.0, help="seconds of throughput per payload")
+    parser.add_argument("--tcp", help="host:port of a running core (default: start the stub core)")
+    parser.add_argument("--socket", help="its CORE_UNIX_SOCKET path")
+    args = parser.parse_args()
+    sizes = [int(f) for f in args.features.split(",") if f]
+
+    server = None
+    if args.tcp:
+        if not args.socket:
+            parser.error("--tcp needs --socket")
+        tcp, socket = args.tcp, args.socket
+    else:
+        socket = os.path.join(tempfile.mkdtemp(), "core.sock")
+        server, port = serve(max_workers=args.threads + 8, unix_socket=socket)
+        tcp = f"127.0.0.1:{port}"
+
+    # slots big enough for the largest payload and its outputs
+    slot_bytes = max(SHM_SLOT_BYTES, 8 * max(sizes) + 4096)
+    transports = [("tcp", tcp), ("unix", f"unix://{socket}"), ("shm", f"shm://{socket}")]
+    print(f"{'features':>9} {'transport':>9} {'p50(ms)':>9} {'p99(ms)':>9} {'req/s':>9}")
+    try:
+        for n in sizes:
+            inputs = np.random.default_rng(0).random(n, dtype=np.float32)
+            base = None
+            for label, target in transports:
+                client = CoreClient(target=target)
+                if client.shm is not None and client.shm.slot_bytes < slot_bytes:
+                    client.shm.close()
+                    client.shm = ShmRing(slots=2 * args.threads, slot_bytes=slot_bytes)
+                client.run_inference("warmup", inputs, "bench-model")
+                lat = latency(client, inputs, args.iterations)
+                rps = throughput(client, inputs, args.threads, args.duration)
+                client.close()
+                base = base or rps
+                print(f"{n:9d} {label:>9} {_quantile(lat, 0.50):9.3f} {_quantile(lat, 0.99):9.3f} {rps:9.0f}"
+                      f"  ({rps / base:4.2f}x tcp)")
+    finally:
+        if server is not None:
+            server.stop(None)
+
+
+if __name__ == "__main__":
+    main()
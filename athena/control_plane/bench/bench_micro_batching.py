@@ -0,0 +1,60 @@
+# control_plane/bench/bench_micro_batching.py
+# Unary RunInference per call versus CoreClient's client-side micro-batcher
+# (RunInferenceBatch), with many threads issuing concurrent predictions.
+#
+#   cd athena && python -m control_plane.bench.bench_micro_batching --threads 64 --window-ms 2
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+from control_plane.app.core_client import CoreClient
+from control_plane.bench.stub_core import serve
+
+
+def run(client: CoreClient, threads: int, total: int, features: int):
+    inputs = [0.5] * features
+
+    def one(i):
+        return client.run_inference(f"req-{i}", inputs, "fraud-detector", "v0.1")
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(one, range(total)))
+    elapsed = time.perf_counter() - start
+    errors = sum(1 for r in results if "error" in r)
+    return total / elapsed, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark unary vs micro-batched RunInference")
+    parser.add_argument("--threads", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--features", type=int, default=32)
+    parser.add_argument("--window-ms", type=float, default=2.0)
+    parser.add_argument("--max-batch", type=int, default=64)
+    parser.add_argument("--delay-ms", type=float, default=0.5, help="simulated per-RPC service time")
+    args = parser.parse_args()
+
+    server, port = serve(delay_ms=args.delay_ms, max_workers=max(args.threads, 8))
+    target = f"127.0.0.1:{port}"
+    try:
+        unary = CoreClient(target=target)
+        unary_rps, unary_err = run(unary, args.threads, args.requests, args.features)
+        unary_calls = server.servicer.calls
+        unary.close()
+
+        batched = CoreClient(target=target, batch_window_ms=args.window_ms, max_batch_size=args.max_batch)
+        batched_rps, batched_err = run(batched, args.threads, args.requests, args.features)
+        batched_calls = server.servicer.calls - unary_calls
+        batched.close()
+    finally:
+        server.stop(None)
+
+    print(f"threads={args.threads} requests={args.requests} features={args.features} window={args.window_ms}ms")
+    print(f"  unary:         {unary_rps:10.1f} req/s  rpcs={unary_calls:6d}  errors={unary_err}")
+    print(f"  micro-batched: {batched_rps:10.1f} req/s  rpcs={batched_calls:6d}  errors={batched_err}"
+          f"  avg batch={args.requests / max(batched_calls, 1):.1f}")
+
+
+if __name__ == "__main__":
+    main()
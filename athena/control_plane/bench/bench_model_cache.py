@@ -0,0 +1,62 @@
+# control_plane/bench/bench_model_cache.py
+# DB load removed by the model registry cache: sidecar-style polling of
+# GET /models/{name} and /api/models lookups, with and without the cache.
+#
+#   cd athena && python -m control_plane.bench.bench_model_cache --lookups 20000
+import os
+import time
+import asyncio
+import argparse
+import tempfile
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from control_plane.app.db import Base, make_async_engine, to_async_url
+from control_plane.app import crud, models
+from control_plane.app.model_cache import cache_for
+
+
+async def run(url: str, lookups: int, ttl_s: float):
+    engine = make_async_engine(to_async_url(url))
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    statements = [0]
+    event.listen(engine.sync_engine, "before_cursor_execute",
+                 lambda *a: statements.__setitem__(0, statements[0] + 1))
+    async with async_sessionmaker(engine, expire_on_commit=False)() as db:
+        cache_for(db.get_bind()).ttl_s = ttl_s
+        for i in range(10):
+            await crud.create_or_update_model(db, f"model-{i}", "v1", models.ModelStatus.LOADED)
+
+        statements[0] = 0
+        start = time.perf_counter()
+        for i in range(lookups):
+            await crud.get_model_by_name(db, f"model-{i % 10}")
+            if i % 10 == 0:
+                await crud.list_models(db)
+        elapsed = time.perf_counter() - start
+    await engine.dispose()
+    return lookups / elapsed, statements[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark model registry lookups with and without the cache")
+    parser.add_argument("--lookups", type=int, default=20000)
+    parser.add_argument("--url", default=None, help="database URL (default: temporary SQLite file)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        def url(name):
+            return args.url or f"sqlite:///{os.path.join(tmp, name)}"
+        uncached_rate, uncached_queries = asyncio.run(run(url("uncached.db"), args.lookups, ttl_s=0.0))
+        cached_rate, cached_queries = asyncio.run(run(url("cached.db"), args.lookups, ttl_s=2.0))
+
+    print(f"lookups={args.lookups} (+{args.lookups // 10} list_models)")
+    print(f"  no cache:   {uncached_rate:10.1f} lookups/s  db statements={uncached_queries}")
+    print(f"  with cache: {cached_rate:10.1f} lookups/s  db statements={cached_queries}"
+          f"  ({100.0 * (1 - cached_queries / max(uncached_queries, 1)):.1f}% fewer)")
+
+
+if __name__ == "__main__":
+    main()
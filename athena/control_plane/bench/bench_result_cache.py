@@ -0,0 +1,86 @@
+# control_plane/bench/bench_result_cache.py
+# Latency and throughput of AsyncCoreClient with and without the result cache, at
+# several duplicate ratios. A duplicate resends one of the last `--recent` feature
+# vectors, like a retry or a redelivered webhook; everything else is a fresh vector.
+#
+#   cd athena && python -m control_plane.bench.bench_result_cache --requests 4000 --delay-ms 5
+import time
+import random
+import asyncio
+import argparse
+
+from control_plane.app.core_client import AsyncCoreClient
+from control_plane.app.result_cache import ResultCache
+from control_plane.bench.stub_core import serve
+
+
+def _quantile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def make_inputs(n: int, features: int, dup_ratio: float, recent: int, seed: int):
+    rng = random.Random(seed)
+    out = []
+    for _ in range(n):
+        if out and rng.random() < dup_ratio:
+            out.append(rng.choice(out[-recent:]))
+        else:
+            out.append([rng.random() for _ in range(features)])
+    return out
+
+
+async def run(target: str, inputs, concurrency: int, cache):
+    client = AsyncCoreClient(targets=[target], channels_per_target=2, max_inflight_per_channel=concurrency,
+                             cache=cache)
+    await client.start()
+    latencies = []
+    next_i = 0
+
+    async def worker():
+        nonlocal next_i
+        while next_i < len(inputs):
+            i = next_i
+            next_i += 1
+            start = time.perf_counter()
+            await client.run_inference(f"req-{i}", inputs[i], "fraud-detector", "v1")
+            latencies.append((time.perf_counter() - start) * 1000.0)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    await client.close()
+    latencies.sort()
+    return len(inputs) / elapsed, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Result cache benchmark at different duplicate ratios")
+    parser.add_argument("--requests", type=int, default=4000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--delay-ms", type=float, default=5.0, help="simulated core service time")
+    parser.add_argument("--features", type=int, default=32)
+    parser.add_argument("--recent", type=int, default=50, help="duplicates repeat one of the last N vectors")
+    parser.add_argument("--ratios", default="0,0.25,0.5,0.9")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    server, port = serve(delay_ms=args.delay_ms)
+    target = f"127.0.0.1:{port}"
+    print(f"{'dup ratio':>9} {'cache':>6} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'hit rate':>9}")
+    try:
+        for ratio in (float(r) for r in args.ratios.split(",")):
+            inputs = make_inputs(args.requests, args.features, ratio, args.recent, args.seed)
+            for enabled in (False, True):
+                cache = ResultCache(models=["fraud-detector"]) if enabled else None
+                rps, lat = asyncio.run(run(target, inputs, args.concurrency, cache))
+                hit_rate = cache.stats()["models"]["fraud-detector"]["hit_rate"] if cache else 0.0
+                print(f"{ratio:9.2f} {'on' if enabled else 'off':>6} {rps:9.0f} {_quantile(lat, 0.50):8.2f} "
+                      f"{_quantile(lat, 0.99):8.2f} {hit_rate:9.1%}")
+    finally:
+        server.stop(None)
+
+
+if __name__ == "__main__":
+    main()
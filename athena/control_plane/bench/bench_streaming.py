@@ -0,0 +1,82 @@
+# control_plane/bench/bench_streaming.py
+# Unary RunInference versus one long-lived StreamInference call: throughput and tail
+# latency with many concurrent callers, against the in-process stub core.
+#
+#   cd athena && python -m control_plane.bench.bench_streaming --concurrency 32 --requests 20000
+import time
+import asyncio
+import argparse
+
+from control_plane.app.core_client import AsyncCoreClient
+from control_plane.bench.stub_core import serve
+
+
+def percentile(sorted_ms, q):
+    if not sorted_ms:
+        return 0.0
+    return sorted_ms[min(len(sorted_ms) - 1, int(q * len(sorted_ms)))]
+
+
+async def drive(call, concurrency: int, total: int, features: int):
+    inputs = [0.5] * features
+    latencies = []
+    next_id = 0
+
+    async def worker():
+        nonlocal next_id
+        while next_id < total:
+            i = next_id
+            next_id += 1
+            start = time.perf_counter()
+            await call(f"req-{i}", inputs)
+            latencies.append((time.perf_counter() - start) * 1000.0)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return total / elapsed, latencies
+
+
+async def run_unary(target, args):
+    client = AsyncCoreClient(targets=[target], channels_per_target=1, max_inflight_per_channel=args.concurrency)
+    result = await drive(client.run_inference, args.concurrency, args.requests, args.features)
+    await client.close()
+    return result
+
+
+async def run_stream(target, args):
+    client = AsyncCoreClient(targets=[target], channels_per_target=1)
+    async with await client.open_stream(max_outstanding=args.concurrency) as stream:
+        result = await drive(stream.infer, args.concurrency, args.requests, args.features)
+    await client.close()
+    return result
+
+
+def report(name, rps, lat):
+    print(f"  {name:<10} {rps:10.1f} req/s   p50={percentile(lat, 0.50):7.3f}ms"
+          f"  p95={percentile(lat, 0.95):7.3f}ms  p99={percentile(lat, 0.99):7.3f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark unary vs streaming inference")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=10000)
+    parser.add_argument("--features", type=int, default=16)
+    args = parser.parse_args()
+
+    server, port = serve(max_workers=max(args.concurrency, 8))
+    target = f"127.0.0.1:{port}"
+    try:
+        unary = asyncio.run(run_unary(target, args))
+        stream = asyncio.run(run_stream(target, args))
+    finally:
+        server.stop(None)
+
+    print(f"concurrency={args.concurrency} requests={args.requests} features={args.features}")
+    report("unary", *unary)
+    report("streaming", *stream)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+# control_plane/bench/bench_swap.py
+# Latency trace of a hot model version swap under steady open-loop traffic that names
+# no version, against the stub core with its model registry on. The swap is what
+# POST /models/swap does: load v2 next to v1, switch the active pointer, then drain and
+# unload v1.
+#
+# Prints one row per interval: requests sent, errors, p50/p99 and the versions that
+# served them. The rows around the swap should show no errors and no latency spike.
+#
+#   cd athena && python -m control_plane.bench.bench_swap --rate 200 --delay-ms 5
+import time
+import asyncio
+import argparse
+
+from control_plane.app.core_client import AsyncCoreClient
+from control_plane.bench.stub_core import serve
+
+
+def _quantile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+async def hot_swap(client, model: str):
+    await client.load_model(model, "v2")
+    await client.set_active_version(model, "v2")
+    await client.unload_model(model, "v1")
+
+
+async def trace(target: str, rate: float, duration_s: float, swap_at_s: float):
+    """Returns [(sent_at_s, latency_ms, version or None on error)] and the swap's (start, end)."""
+    client = AsyncCoreClient(targets=[target], channels_per_target=2, max_inflight_per_channel=100000)
+    await client.start()
+    await client.load_model("swap-model", "v1")
+    samples, tasks = [], []
+    swap_window = []
+    t0 = time.perf_counter()
+
+    async def one(i):
+        start = time.perf_counter()
+        resp = await client.run_inference(f"req-{i}", [0.5], "swap-model")
+        latency_ms = (time.perf_counter() - start) * 1000.0
+        samples.append((start - t0, latency_ms, None if "error" in resp else resp["model_version"]))
+
+    async def do_swap():
+        await asyncio.sleep(swap_at_s)
+        swap_window.append(time.perf_counter() - t0)
+        await hot_swap(client, "swap-model")
+        swap_window.append(time.perf_counter() - t0)
+
+    swapper = asyncio.create_task(do_swap())
+    interval = 1.0 / rate
+    for i in range(int(rate * duration_s)):
+        # open loop: send on schedule whether or not earlier calls have returned
+        delay = t0 + i * interval - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(one(i)))
+    await asyncio.gather(*tasks, swapper)
+    await client.close()
+    return samples, tuple(swap_window)
+
+
+def print_trace(samples, swap_window, step_s: float):
+    print(f"    {'t(s)':>6} {'n':>5} {'errors':>6} {'p50(ms)':>8} {'p99(ms)':>8}  versions")
+    end = max(t for t, _, _ in samples)
+    t = 0.0
+    while t <= end:
+        window = [s for s in samples if t <= s[0] < t + step_s]
+        lat = sorted(ms for _, ms, v in window if v is not None)
+        errors = sum(1 for _, _, v in window if v is None)
+        versions = ",".join(sorted({v for _, _, v in window if v is not None})) or "-"
+        mark = "  <- swap" if swap_window[0] < t + step_s and swap_window[1] >= t else ""
+        print(f"    {t:6.2f} {len(window):5d} {errors:6d} {_quantile(lat, 0.50):8.2f} {_quantile(lat, 0.99):8.2f}"
+              f"  {versions}{mark}")
+        t += step_s
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency trace of a hot model version swap")
+    parser.add_argument("--rate", type=float, default=200.0, help="requests/s")
+    parser.add_argument("--duration", type=float, default=3.0, help="seconds of traffic")
+    parser.add_argument("--swap-at", type=float, default=1.0, help="seconds into the run")
+    parser.add_argument("--delay-ms", type=float, default=5.0, help="stub service time per call")
+    parser.add_argument("--step", type=float, default=0.25, help="trace interval in seconds")
+    args = parser.parse_args()
+
+    print(f"swap under {args.rate:.0f} req/s of unversioned traffic, stub delay={args.delay_ms}ms")
+    server, port = serve(delay_ms=args.delay_ms, max_workers=256, registry=True)
+    try:
+        samples, window = asyncio.run(trace(f"127.0.0.1:{port}", args.rate, args.duration, args.swap_at))
+    finally:
+        server.stop(None)
+    errors = sum(1 for _, _, v in samples if v is None)
+    lat = sorted(ms for _, ms, v in samples if v is not None)
+    print(f"  swap took {(window[1] - window[0]) * 1000.0:.1f}ms, errors={errors}/{len(samples)}, "
+          f"p99={_quantile(lat, 0.99):.2f}ms")
+    print_trace(samples, window, args.step)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+# control_plane/bench/bench_tensor_payload.py
+# Python-side cost of building and decoding inference messages: `repeated float`
+# from/to lists versus the packed Tensor field from/to NumPy arrays.
+#
+#   cd athena && python -m control_plane.bench.bench_tensor_payload --features 4096
+import time
+import argparse
+
+import numpy as np
+
+from control_plane.app.core_client import build_inference_request, _reply_to_dict, inference_pb2
+
+
+def timed(fn, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6  # us per call
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark repeated float vs packed tensor payloads")
+    parser.add_argument("--features", type=int, default=4096)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    arr = np.random.default_rng(0).random(args.features, dtype=np.float32)
+    as_list = arr.tolist()
+
+    def list_round_trip():
+        wire = build_inference_request("r", as_list).SerializeToString()
+        req = inference_pb2.InferenceRequest.FromString(wire)
+        reply = inference_pb2.InferenceReply(request_id=req.request_id, outputs=req.inputs)
+        _reply_to_dict(inference_pb2.InferenceReply.FromString(reply.SerializeToString()), 0.0)
+
+    def tensor_round_trip():
+        wire = build_inference_request("r", arr).SerializeToString()
+        req = inference_pb2.InferenceRequest.FromString(wire)
+        reply = inference_pb2.InferenceReply(request_id=req.request_id, output_tensor=req.input_tensor)
+        _reply_to_dict(inference_pb2.InferenceReply.FromString(reply.SerializeToString()), 0.0)
+
+    list_us = timed(list_round_trip, args.iterations)
+    tensor_us = timed(tensor_round_trip, args.iterations)
+    print(f"features={args.features} iterations={args.iterations} (encode + decode, request and reply)")
+    print(f"  repeated float (list):   {list_us:9.1f} us/request")
+    print(f"  packed tensor (ndarray): {tensor_us:9.1f} us/request  ({list_us / tensor_us:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
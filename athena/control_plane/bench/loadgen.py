@@ -0,0 +1,352 @@
+# control_plane/bench/loadgen.py
+# Load generator and latency benchmark for the inference path, built on CoreClient.
+#
+#   open    requests go out on a fixed or Poisson arrival schedule at --rate, whether
+#           or not earlier replies have come back
+#   closed  --concurrency workers each send their next request when the previous reply
+#           arrives; --rate > 0 paces them to that total rate
+#
+# Latency is corrected for coordinated omission. Open and paced closed runs measure
+# from each request's scheduled send time, so time spent waiting behind a slow reply
+# counts. Unpaced closed runs back-fill the requests a stall held back, taking the mean
+# latency seen during warm-up as the expected interval. The uncorrected service time
+# (actual send to reply) is reported next to it.
+#
+# Results print as a table, can be saved as JSON (with the histogram) and appended to
+# a CSV (one row per run) for comparing runs; --baseline prints the change against an
+# earlier JSON result. --stub runs against the in-process stub core, so no C++ build
+# is needed.
+#
+#   cd athena && python -m control_plane.bench.loadgen --stub --rate 500 --duration 10 \
+#       --payload 32,256 --models fraud-detector:v1=0.8,churn:v2=0.2 --json run.json --csv runs.csv
+import os
+import csv
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from control_plane.app.core_client import CoreClient
+from control_plane.app.latency import LatencyHistogram
+
+QUANTILES = [0.50, 0.90, 0.95, 0.99, 0.999]
+QUANTILE_NAMES = ["p50", "p90", "p95", "p99", "p999"]
+CSV_FIELDS = ["label", "timestamp", "target", "mode", "arrival", "rate", "concurrency", "duration_s",
+              "payloads", "models", "co_correction", "sent", "completed", "errors", "throughput_rps", "shed_rate",
+              *QUANTILE_NAMES, "max", "mean", "service_p50", "service_p99", "slo_met"]
+
+
+def parse_model_mix(spec: str) -> List[Tuple[str, str, float]]:
+    """"name:version=weight,..." -> [(name, version, weight)]; the weight defaults to 1."""
+    mix = []
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        ref, _, weight = item.partition("=")
+        name, _, version = ref.partition(":")
+        mix.append((name, version, float(weight) if weight else 1.0))
+    if not mix:
+        raise ValueError("model mix is empty")
+    return mix
+
+
+@dataclass
+class Workload:
+    mode: str = "open"                  # "open" or "closed"
+    rate: float = 200.0                 # open: offered req/s; closed: total pacing rate, 0 = unpaced
+    arrival: str = "poisson"            # open loop inter-arrival times: "poisson" or "fixed"
+    concurrency: int = 16               # closed: workers; open: max calls in flight
+    duration_s: float = 10.0            # measured part of the run
+    warmup_s: float = 1.0               # sent but not recorded
+    payloads: List[int] = field(default_factory=lambda: [32])  # input lengths, picked uniformly
+    models: List[Tuple[str, str, float]] = field(default_factory=lambda: [("fraud-detector", "v1", 1.0)])
+    deadline_ms: Optional[float] = None
+    seed: int = 7
+
+
+def _summary(h: LatencyHistogram) -> Dict[str, float]:
+    out = dict(zip(QUANTILE_NAMES, h.quantiles_ms(QUANTILES)))
+    out.update(max=h.max_us / 1000.0, mean=h.mean_ms(), count=h.total)
+    return out
+
+
+class Recorder:
+    """Latencies and errors of one run; safe to call from many threads."""
+
+    def __init__(self, backfill: bool = False):
+        self.backfill = backfill
+        self.corrected = LatencyHistogram()
+        self.service = LatencyHistogram()
+        self.warmup = LatencyHistogram()
+        self.models: Dict[str, LatencyHistogram] = {}
+        self.errors: Dict[str, int] = {}
+        self.sent = 0
+        self._interval_s: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def record(self, model: str, intended: float, sent: float, done: float, result: Dict, measured: bool):
+        latency = done - intended
+        with self._lock:
+            if not measured:
+                if "error" not in result:
+                    self.warmup.record(latency)
+                return
+            self.sent += 1
+            if "error" in result:
+                code = result.get("code", "UNKNOWN")
+                self.errors[code] = self.errors.get(code, 0) + 1
+                return
+            if self.backfill:
+                if self._interval_s is None:
+                    # expected gap between one worker's requests: its typical round trip
+                    self._interval_s = self.warmup.mean_ms() / 1000.0
+                self.corrected.record_corrected(latency, self._interval_s)
+            else:
+                self.corrected.record(latency)
+            self.service.record(done - sent)
+            hist = self.models.get(model)
+            if hist is None:
+                hist = self.models[model] = LatencyHistogram()
+            hist.record(latency)
+
+
+class _Requests:
+    """Pre-built inputs, so generating payloads costs nothing during the run."""
+
+    def __init__(self, w: Workload, rng: random.Random, variants: int = 16):
+        self.models = [(name, version) for name, version, _ in w.models]
+        self.weights = [weight for _, _, weight in w.models]
+        self.inputs = [[[rng.random() for _ in range(n)] for _ in range(variants)] for n in w.payloads]
+
+    def pick(self, rng: random.Random):
+        name, version = rng.choices(self.models, self.weights)[0]
+        return name, version, rng.choice(rng.choice(self.inputs))
+
+
+def _send(client: CoreClient, rec: Recorder, w: Workload, i: int, name: str, version: str, inputs,
+          intended: float, measured: bool):
+    sent = time.perf_counter()
+    result = client.run_inference(f"lg-{i}", inputs, name, version, deadline_ms=w.deadline_ms)
+    rec.record(f"{name}:{version}", intended, sent, time.perf_counter(), result, measured)
+
+
+def run_open(client: CoreClient, w: Workload) -> Recorder:
+    rng = random.Random(w.seed)
+    requests = _Requests(w, rng)
+    rec = Recorder()
+    pool = ThreadPoolExecutor(max_workers=w.concurrency, thread_name_prefix="loadgen")
+    start = time.perf_counter()
+    measure_from = start + w.warmup_s
+    end = measure_from + w.duration_s
+    t, i = start, 0
+    while True:
+        t += rng.expovariate(w.rate) if w.arrival == "poisson" else 1.0 / w.rate
+        if t >= end:
+            break
+        delay = t - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        # if we fell behind, send immediately: latency still counts from `t`
+        name, version, inputs = requests.pick(rng)
+        pool.submit(_send, client, rec, w, i, name, version, inputs, t, t >= measure_from)
+        i += 1
+    pool.shutdown(wait=True)
+    return rec
+
+
+def run_closed(client: CoreClient, w: Workload) -> Recorder:
+    paced = w.rate > 0
+    rec = Recorder(backfill=not paced and w.warmup_s > 0)
+    interval = w.concurrency / w.rate if paced else 0.0
+    requests = _Requests(w, random.Random(w.seed))
+    start = time.perf_counter()
+    measure_from = start + w.warmup_s
+    end = measure_from + w.duration_s
+    counter = iter(range(sys.maxsize))
+
+    def worker(k: int):
+        rng = random.Random(w.seed + k)
+        intended = start + k * interval / w.concurrency  # stagger paced workers
+        while True:
+            if paced:
+                delay = intended - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            else:
+                intended = time.perf_counter()
+            if intended >= end:
+                return
+            name, version, inputs = requests.pick(rng)
+            _send(client, rec, w, next(counter), name, version, inputs, intended, intended >= measure_from)
+            intended += interval
+
+    threads = [threading.Thread(target=worker, args=(k,), name=f"loadgen-{k}") for k in range(w.concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return rec
+
+
+def run(client: CoreClient, w: Workload, label: str = "", target: str = "",
+        slo_quantile: str = "p95", slo_ms: float = 50.0) -> Dict:
+    """Run one workload and return its result as a JSON-ready dict."""
+    rec = run_open(client, w) if w.mode == "open" else run_closed(client, w)
+    latency = _summary(rec.corrected)
+    completed = rec.corrected.total if not rec.backfill else rec.service.total
+    correction = "schedule" if w.mode == "open" or w.rate > 0 else ("backfill" if rec.backfill else "none")
+    return {
+        "label": label,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "target": target,
+        "workload": asdict(w),
+        "co_correction": correction,
+        "sent": rec.sent,
+        "completed": completed,
+        "errors": rec.errors,
+        "duration_s": w.duration_s,
+        "throughput_rps": completed / w.duration_s,  # goodput: successful replies only
+        "shed_rate": rec.errors.get("RESOURCE_EXHAUSTED", 0) / rec.sent if rec.sent else 0.0,
+        "latency_ms": latency,
+        "service_ms": _summary(rec.service),
+        "models": {m: _summary(h) for m, h in sorted(rec.models.items())},
+        "slo": {"quantile": slo_quantile, "target_ms": slo_ms, "value_ms": latency[slo_quantile],
+                "met": completed > 0 and not rec.errors and latency[slo_quantile] <= slo_ms},
+        "histogram_ms": rec.corrected.buckets_ms(),
+    }
+
+
+def write_json(result: Dict, path: str):
+    with open(path, "w") as f:
+        json.dump(result, f, indent=2)
+
+
+def append_csv(result: Dict, path: str):
+    w = result["workload"]
+    row = {
+        "label": result["label"],
+        "timestamp": result["timestamp"],
+        "target": result["target"],
+        "mode": w["mode"],
+        "arrival": w["arrival"] if w["mode"] == "open" else "",
+        "rate": w["rate"],
+        "concurrency": w["concurrency"],
+        "duration_s": w["duration_s"],
+        "payloads": " ".join(str(p) for p in w["payloads"]),
+        "models": " ".join(f"{n}:{v}={weight:g}" for n, v, weight in w["models"]),
+        "co_correction": result["co_correction"],
+        "sent": result["sent"],
+        "completed": result["completed"],
+        "errors": sum(result["errors"].values()),
+        "throughput_rps": round(result["throughput_rps"], 1),
+        "shed_rate": round(result["shed_rate"], 4),
+        **{q: round(result["latency_ms"][q], 3) for q in QUANTILE_NAMES},
+        "max": round(result["latency_ms"]["max"], 3),
+        "mean": round(result["latency_ms"]["mean"], 3),
+        "service_p50": round(result["service_ms"]["p50"], 3),
+        "service_p99": round(result["service_ms"]["p99"], 3),
+        "slo_met": result["slo"]["met"],
+    }
+    new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+    with open(path, "a", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+        if new_file:
+            writer.writeheader()
+        writer.writerow(row)
+
+
+def print_result(result: Dict):
+    lat, svc = result["latency_ms"], result["service_ms"]
+    print(f"{result['label'] or result['workload']['mode']}: sent={result['sent']} completed={result['completed']} "
+          f"errors={sum(result['errors'].values())} shed={result['shed_rate']:.1%} "
+          f"goodput={result['throughput_rps']:.0f} req/s "
+          f"(co-correction: {result['co_correction']})")
+    rows = [("latency", lat), ("service", svc)] + sorted(result["models"].items())
+    width = max(len(name) for name, _ in rows)
+    print(f"  {'':{width}}" + "".join(f"{q:>9}" for q in QUANTILE_NAMES + ["max"]))
+    for name, s in rows:
+        print(f"  {name:{width}}" + "".join(f"{s[q]:9.2f}" for q in QUANTILE_NAMES + ["max"]))
+    slo = result["slo"]
+    print(f"  SLO {slo['quantile']} <= {slo['target_ms']:g} ms: {'met' if slo['met'] else 'MISSED'} "
+          f"({slo['value_ms']:.2f} ms)")
+
+
+def print_comparison(result: Dict, baseline: Dict):
+    print(f"  vs baseline {baseline.get('label') or baseline.get('timestamp')}:")
+    for key in ("p50", "p95", "p99"):
+        old, new = baseline["latency_ms"][key], result["latency_ms"][key]
+        change = (new - old) / old * 100.0 if old else 0.0
+        print(f"    {key:4} {old:9.2f} -> {new:9.2f} ms ({change:+.1f}%)")
+    old, new = baseline["throughput_rps"], result["throughput_rps"]
+    print(f"    rps  {old:9.0f} -> {new:9.0f}     ({(new - old) / old * 100.0 if old else 0.0:+.1f}%)")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Open/closed-loop load generator for the inference path")
+    parser.add_argument("--target", default=None, help="core address (default: CORE_GRPC_HOST/PORT)")
+    parser.add_argument("--stub", action="store_true", help="run against an in-process stub core")
+    parser.add_argument("--stub-delay-ms", type=float, default=5.0, help="stub service time per request")
+    parser.add_argument("--stub-workers", type=int, default=64, help="stub concurrent executions")
+    parser.add_argument("--stub-max-inflight", type=int, default=0,
+                        help="stub refuses calls beyond this many in flight (RESOURCE_EXHAUSTED)")
+    parser.add_argument("--mode", choices=["open", "closed"], default="open")
+    parser.add_argument("--rate", type=float, default=200.0, help="req/s (closed: 0 = unpaced)")
+    parser.add_argument("--arrival", choices=["poisson", "fixed"], default="poisson")
+    parser.add_argument("--concurrency", type=int, default=16, help="closed: workers; open: max in flight")
+    parser.add_argument("--duration", type=float, default=10.0, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=1.0, help="unrecorded seconds before measuring")
+    parser.add_argument("--payload", default="32", help="comma-separated input lengths")
+    parser.add_argument("--models", default="fraud-detector:v1", help='model mix, e.g. "a:v1=0.8,b:v2=0.2"')
+    parser.add_argument("--deadline-ms", type=float, default=None, help="per-request latency budget")
+    parser.add_argument("--timeout-s", type=float, default=5.0)
+    parser.add_argument("--slo-ms", type=float, default=50.0)
+    parser.add_argument("--slo-quantile", choices=QUANTILE_NAMES, default="p95")
+    parser.add_argument("--label", default="")
+    parser.add_argument("--json", help="write the full result (with histogram) to this file")
+    parser.add_argument("--csv", help="append a summary row to this file")
+    parser.add_argument("--baseline", help="earlier --json result to compare against")
+    parser.add_argument("--fail-on-slo", action="store_true", help="exit 1 if the SLO is missed")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    workload = Workload(mode=args.mode, rate=args.rate, arrival=args.arrival, concurrency=args.concurrency,
+                        duration_s=args.duration, warmup_s=args.warmup,
+                        payloads=[int(p) for p in args.payload.split(",")], models=parse_model_mix(args.models),
+                        deadline_ms=args.deadline_ms, seed=args.seed)
+    if workload.mode == "open" and workload.rate <= 0:
+        parser.error("open-loop runs need --rate > 0")
+
+    server = None
+    if args.stub:
+        from control_plane.bench.stub_core import serve
+        server, port = serve(delay_ms=args.stub_delay_ms, max_workers=args.stub_workers,
+                             max_inflight=args.stub_max_inflight)
+        args.target = f"127.0.0.1:{port}"
+    client = CoreClient(target=args.target, timeout_s=args.timeout_s)
+    try:
+        result = run(client, workload, label=args.label, target="stub" if args.stub else client.target,
+                     slo_quantile=args.slo_quantile, slo_ms=args.slo_ms)
+    finally:
+        client.close()
+        if server is not None:
+            server.stop(None)
+
+    print_result(result)
+    if args.baseline:
+        with open(args.baseline) as f:
+            print_comparison(result, json.load(f))
+    if args.json:
+        write_json(result, args.json)
+    if args.csv:
+        append_csv(result, args.csv)
+    return 1 if args.fail_on_slo and not result["slo"]["met"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,420 @@
+# control_plane/bench/stub_core.py
+# In-process Python stand-in for athena-core's InferenceService, used by the benchmarks
+# so they can run without building the C++ core. Mirrors the C++ stub replies.
+import os
+import mmap
+import time
+import heapq
+import argparse
+import itertools
+import threading
+from concurrent import futures
+
+import grpc
+
+from control_plane.app.core_client import inference_pb2, inference_pb2_grpc
+from control_plane.app.local_transport import SHM_DIR
+from control_plane.app.tracing import parse_traceparent
+
+
+class DeadlineScheduler:
+    """Python mirror of the core Dispatcher: `slots` concurrent executions, granted to
+    waiters earliest-deadline-first; a waiter whose deadline passes is shed."""
+
+    def __init__(self, slots: int):
+        self._free = slots
+        self._waiters = []  # heap of [deadline, seq, event, state]; state None = gave up
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    def acquire(self, deadline: float) -> bool:
+        with self._lock:
+            if self._free and not self._waiters:
+                self._free -= 1
+                return True
+            entry = [deadline, next(self._seq), threading.Event(), False]
+            heapq.heappush(self._waiters, entry)
+        entry[2].wait(None if deadline == float("inf") else max(deadline - time.monotonic(), 0.0))
+        with self._lock:
+            if entry[3]:
+                return True
+            entry[3] = None  # dropped lazily by release()
+            return False
+
+    def release(self):
+        with self._lock:
+            while self._waiters:
+                entry = heapq.heappop(self._waiters)
+                if entry[3] is None:
+                    continue
+                entry[3] = True
+                entry[2].set()
+                return
+            self._free += 1
+
+
+class StubModelRegistry:
+    """Python mirror of the core ModelRegistry: loaded versions per model, the active
+    version that unversioned requests resolve to (the first one loaded until another is
+    activated), and unloads that wait for in-flight requests. Models that were never
+    loaded pass through unmanaged."""
+
+    def __init__(self):
+        self._versions = {}  # name -> {version: [state, in_flight]}
+        self._active = {}  # name -> version
+        self._cond = threading.Condition()
+
+    def load(self, name: str, version: str):
+        with self._cond:
+            entry = self._versions.setdefault(name, {}).setdefault(version, ["loaded", 0])
+            entry[0] = "loaded"
+            self._active.setdefault(name, version)
+
+    def activate(self, name: str, version: str) -> bool:
+        with self._cond:
+            entry = self._versions.get(name, {}).get(version)
+            if entry is None or entry[0] != "loaded":
+                return False
+            self._active[name] = version
+            return True
+
+    def unload(self, name: str, version: str, timeout_s: float) -> bool:
+        with self._cond:
+            entry = self._versions.get(name, {}).get(version)
+            if entry is None:
+                return True
+            entry[0] = "draining"
+            if self._active.get(name) == version:
+                del self._active[name]
+            if not self._cond.wait_for(lambda: entry[1] == 0 or entry[0] != "draining", timeout_s):
+                return False
+            if entry[0] == "draining":
+                del self._versions[name][version]
+                if not self._versions[name]:
+                    del self._versions[name]
+            return True
+
+    def acquire(self, name: str, version: str):
+        """The version to run on, with its in-flight count raised; None if not routable."""
+        with self._cond:
+            versions = self._versions.get(name)
+            if versions is None:
+                return version
+            resolved = version or self._active.get(name, "")
+            entry = versions.get(resolved)
+            if entry is None or entry[0] != "loaded":
+                return None
+            entry[1] += 1
+            return resolved
+
+    def release(self, name: str, version: str):
+        with self._cond:
+            entry = self._versions.get(name, {}).get(version)
+            if entry is not None:
+                entry[1] -= 1
+                self._cond.notify_all()
+
+    def status(self, name: str, version: str):
+        with self._cond:
+            entry = self._versions.get(name, {}).get(version)
+            return (entry[0] if entry else "not_loaded"), self._active.get(name, ""), (entry[1] if entry else 0)
+
+
+class StubInferenceService(inference_pb2_grpc.InferenceServiceServicer):
+    def __init__(self, delay_ms: float = 0.0, shed_expired: bool = True, deadline_slots: int = 0,
+                 max_inflight: int = 0, registry: bool = False):
+        # simulated per-call service time (e.g. a slow LoadModel)
+        self.delay_s = delay_ms / 1000.0
+        # like the core: refuse inference whose gRPC deadline passed while it was queued
+        self.shed_expired = shed_expired
+        self.shed = 0
+        # > 0: inference runs through a DeadlineScheduler with this many slots
+        self.scheduler = DeadlineScheduler(deadline_slots) if deadline_slots > 0 else None
+        # > 0: like the core's admission control, RunInference beyond this many in flight
+        # fails fast with RESOURCE_EXHAUSTED and a retry-after-ms trailer
+        self.max_inflight = max_inflight
+        self.inflight = 0
+        self.admitted = 0
+        self.overloaded = {}  # (model_name, version) -> requests refused
+        # like the core's ModelRegistry: Load/Unload/SetActiveVersion take effect and
+        # unversioned requests go to the active version; otherwise the model RPCs are stubs
+        self.registry = StubModelRegistry() if registry else None
+        self.started = time.monotonic()
+        self.model_calls = {}  # (model_name, version) -> unary inference count
+        self.traceparents = []  # traceparent metadata of traced calls, in arrival order
+        # inference RPCs served (unary or batch), for benchmarks/tests
+        self.calls = 0
+        # shared-memory regions of shm:// clients, name -> mmap
+        self.shm_regions = {}
+        self._lock = threading.Lock()
+
+    def _count(self):
+        with self._lock:
+            self.calls += 1
+
+    def _shed_if_expired(self, request_id, context):
+        remaining = context.time_remaining()
+        if self.shed_expired and remaining is not None and remaining <= 0:
+            with self._lock:
+                self.shed += 1
+            context.abort(grpc.StatusCode.DEADLINE_EXCEEDED, f"deadline expired before execution: {request_id}")
+
+    def _admit(self, request, context):
+        if self.max_inflight <= 0:
+            return
+        with self._lock:
+            if self.inflight < self.max_inflight:
+                self.inflight += 1
+                self.admitted += 1
+                return
+            key = (request.model_name, request.model_version)
+            self.overloaded[key] = self.overloaded.get(key, 0) + 1
+        # about when the oldest call in flight finishes
+        context.set_trailing_metadata((("retry-after-ms", str(max(int(self.delay_s * 1000.0), 1))),))
+        context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED,
+                      f"shed by admission control (queue_depth): {request.request_id}")
+
+    def _done(self):
+        if self.max_inflight > 0:
+            with self._lock:
+                self.inflight -= 1
+
+    def _work(self):
+        if self.delay_s:
+            time.sleep(self.delay_s)
+
+    def LoadModel(self, request, context):
+        self._work()
+        if self.registry is not None:
+            self.registry.load(request.model_name, request.version)
+        return inference_pb2.LoadReply(ok=True, message=f"stub: loaded {request.model_name}:{request.version}")
+
+    def UnloadModel(self, request, context):
+        if self.registry is not None:
+            # drain first; the simulated unload work comes after
+            timeout_s = (request.drain_timeout_ms or 30000) / 1000.0
+            if not self.registry.unload(request.model_name, request.version, timeout_s):
+                return inference_pb2.LoadReply(ok=False, message=f"{request.model_name}:{request.version} "
+                                                                 f"still has requests in flight")
+        self._work()
+        return inference_pb2.LoadReply(ok=True, message=f"stub: unloaded {request.model_name}:{request.version}")
+
+    def SetActiveVersion(self, request, context):
+        if self.registry is None:
+            context.abort(grpc.StatusCode.UNIMPLEMENTED, "this core has no model registry")
+        ok = self.registry.activate(request.model_name, request.version)
+        message = f"active {request.model_name}:{request.version}" if ok else \
+            f"{request.model_name}:{request.version} is not loaded"
+        return inference_pb2.LoadReply(ok=ok, message=message)
+
+    def GetModelStatus(self, request, context):
+        if self.registry is None:
+            return inference_pb2.ModelStatusReply(model_name=request.model_name, version=request.version,
+                                                  status="not_loaded")
+        status, active, in_flight = self.registry.status(request.model_name, request.version)
+        return inference_pb2.ModelStatusReply(model_name=request.model_name, version=request.version,
+                                              status=status, active_version=active, in_flight=in_flight)
+
+    def _acquire(self, request, context) -> str:
+        if self.registry is None:
+            return request.model_version
+        version = self.registry.acquire(request.model_name, request.model_version)
+        if version is None:
+            what = (f"{request.model_name}:{request.model_version} is not loaded" if request.model_version
+                    else f"no active version of {request.model_name}")
+            context.abort(grpc.StatusCode.NOT_FOUND, f"{what}: {request.request_id}")
+        return version
+
+    def _release(self, request, version: str):
+        if self.registry is not None:
+            self.registry.release(request.model_name, version)
+
+    def RegisterShmRegion(self, request, context):
+        try:
+            fd = os.open(os.path.join(SHM_DIR, os.path.basename(request.name)), os.O_RDWR)
+            try:
+                region = mmap.mmap(fd, request.size)
+            finally:
+                os.close(fd)
+        except (OSError, ValueError) as e:
+            return inference_pb2.LoadReply(ok=False, message=f"shm region {request.name}: {e}")
+        with self._lock:
+            self.shm_regions[request.name] = region
+        return inference_pb2.LoadReply(ok=True, message=f"registered shm region {request.name}")
+
+    def UnregisterShmRegion(self, request, context):
+        with self._lock:
+            ok = self.shm_regions.pop(request.name, None) is not None
+        return inference_pb2.LoadReply(ok=ok, message=f"{'unregistered' if ok else 'no'} shm region {request.name}")
+
+    def _shm_echo(self, request, reply, context):
+        # like the core: read the inputs out of the client's region, write the outputs back
+        ref, out = request.input_shm, request.output_shm
+        region = self.shm_regions.get(ref.region)
+        if region is None or ref.offset + ref.length > len(region):
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT,
+                          f"input_shm is outside any registered region: {request.request_id}")
+        data = region[ref.offset:ref.offset + ref.length]
+        with self._lock:  # so that once UnregisterShmRegion returns, the region is not written
+            target = self.shm_regions.get(out.region)
+            written = request.HasField("output_shm") and target is not None and len(data) <= out.length \
+                and out.offset + len(data) <= len(target)
+            if written:
+                target[out.offset:out.offset + len(data)] = data
+        if written:
+            reply.output_shm.CopyFrom(inference_pb2.ShmTensorRef(
+                region=out.region, offset=out.offset, length=len(data), dtype=ref.dtype, shape=ref.shape))
+        else:
+            reply.outputs.extend(memoryview(data).cast("f"))
+
+    def _reply(self, request, version: str = None, context=None):
+        reply = inference_pb2.InferenceReply(
+            request_id=request.request_id,
+            outputs=request.inputs,
+            latency_ms=self.delay_s * 1000.0,
+            status="ok",
+            model_version=request.model_version if version is None else version,
+        )
+        if request.HasField("input_tensor"):
+            if request.input_tensor.dtype != inference_pb2.DT_FLOAT32 and context is not None:
+                # the core's models run on float32 only
+                context.abort(grpc.StatusCode.INVALID_ARGUMENT, f"input_tensor must hold float32 values: {request.request_id}")
+            reply.output_tensor.CopyFrom(request.input_tensor)
+        if request.HasField("input_shm"):
+            self._shm_echo(request, reply, context)
+        if context is not None and self._traced(context):
+            # the stub neither queues nor batches: all of it is execution
+            work_ms = self.delay_s * 1000.0
+            reply.timings.CopyFrom(inference_pb2.StageTimings(exec_ms=work_ms, total_ms=work_ms))
+        return reply
+
+    def _traced(self, context) -> bool:
+        for key, value in context.invocation_metadata() or ():
+            if key == "traceparent":
+                parent = parse_traceparent(value)
+                with self._lock:
+                    self.traceparents.append(value)
+                return parent is not None and parent[2]
+        return False
+
+    def RunInference(self, request, context):
+        version = self._acquire(request, context)
+        try:
+            return self._run_inference(request, version, context)
+        finally:
+            self._release(request, version)
+
+    def _run_inference(self, request, version, context):
+        with self._lock:
+            key = (request.model_name, version)
+            self.model_calls[key] = self.model_calls.get(key, 0) + 1
+        if self.scheduler is None:
+            self._shed_if_expired(request.request_id, context)
+            self._admit(request, context)
+            try:
+                self._count()
+                self._work()
+            finally:
+                self._done()
+            return self._reply(request, version, context)
+        remaining = context.time_remaining()
+        deadline = float("inf") if remaining is None else time.monotonic() + remaining
+        if not self.scheduler.acquire(deadline):
+            with self._lock:
+                self.shed += 1
+            context.abort(grpc.StatusCode.DEADLINE_EXCEEDED, f"deadline expired before execution: {request.request_id}")
+        try:
+            self._count()
+            self._work()
+        finally:
+            self.scheduler.release()
+        return self._reply(request, version, context)
+
+    def RunInferenceBatch(self, request, context):
+        # one unit of per-call overhead for the whole batch
+        self._count()
+        self._work()
+        return inference_pb2.InferenceBatchReply(replies=[self._reply(r) for r in request.requests])
+
+    def GetBatcherStats(self, request, context):
+        # the stub does not batch; report a fixed single-request window
+        return inference_pb2.BatcherStats(max_batch_size=1, requests=self.calls, batches=self.calls)
+
+    def _runtime_stats(self):
+        # every call is reported in the bucket that holds the simulated service time
+        delay_ms = self.delay_s * 1000.0
+        bounds = [1.0, 5.0, 10.0, 50.0, 100.0]
+        slot = next((i for i, b in enumerate(bounds) if delay_ms <= b), len(bounds))
+        with self._lock:
+            models, queues = [], []
+            for (name, version), n in sorted(self.model_calls.items()):
+                counts = [0] * (len(bounds) + 1)
+                counts[slot] = n
+                models.append(inference_pb2.ModelLatency(
+                    model_name=name, version=version,
+                    latency_ms=inference_pb2.Histogram(bounds=bounds, counts=counts, count=n, sum=n * delay_ms)))
+                queues.append(inference_pb2.ModelQueueStats(
+                    model_name=name, version=version,
+                    batcher=inference_pb2.BatcherStats(max_batch_size=1, requests=n, batches=n)))
+            shed = [inference_pb2.ShedStats(model_name=name, version=version, reason="queue_depth", count=n)
+                    for (name, version), n in sorted(self.overloaded.items())]
+            return inference_pb2.RuntimeStats(
+                uptime_s=time.monotonic() - self.started,
+                expired_total=self.shed,
+                batch_sizes=inference_pb2.Histogram(bounds=[1.0], counts=[self.calls, 0], count=self.calls, sum=self.calls),
+                models=models,
+                batcher=inference_pb2.BatcherStats(max_batch_size=1, requests=self.calls, batches=self.calls),
+                queues=queues,
+                admitted_total=self.admitted,
+                shed_total=sum(self.overloaded.values()),
+                shed=shed,
+            )
+
+    def GetRuntimeStats(self, request, context):
+        return self._runtime_stats()
+
+    def StreamRuntimeStats(self, request, context):
+        interval_s = (request.interval_ms or 1000) / 1000.0
+        while context.is_active():
+            yield self._runtime_stats()
+            time.sleep(interval_s)
+
+    def StreamInference(self, request_iterator, context):
+        for request in request_iterator:
+            self._count()
+            self._work()
+            yield self._reply(request)
+
+
+def serve(port: int = 0, delay_ms: float = 0.0, max_workers: int = 64, shed_expired: bool = True,
+          deadline_slots: int = 0, max_inflight: int = 0, registry: bool = False, unix_socket: str = None):
+    """Start the stub on `port` (0 picks a free one). Returns (server, bound_port).
+
+    With `deadline_slots` > 0, RunInference executes at most that many requests at once,
+    earliest-deadline-first, like the core; `max_workers` then only bounds waiting callers.
+    With `max_inflight` > 0 (and no deadline slots), RunInference calls beyond that many
+    at once are refused with RESOURCE_EXHAUSTED instead. With `registry`, the model RPCs
+    manage versions and the active-version pointer like the core's ModelRegistry. With
+    `unix_socket`, it also listens on that path, for unix:// and shm:// clients.
+
+    The servicer is reachable as `server.servicer` for inspecting call counts.
+    """
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=max_workers))
+    servicer = StubInferenceService(delay_ms, shed_expired, deadline_slots, max_inflight, registry)
+    inference_pb2_grpc.add_InferenceServiceServicer_to_server(servicer, server)
+    bound = server.add_insecure_port(f"127.0.0.1:{port}")
+    if unix_socket:
+        server.add_insecure_port(f"unix:{unix_socket}")
+    server.start()
+    server.servicer = servicer
+    return server, bound
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a Python stub of athena-core's InferenceService")
+    parser.add_argument("--port", type=int, default=50051)
+    parser.add_argument("--delay-ms", type=float, default=0.0)
+    args = parser.parse_args()
+    server, port = serve(args.port, args.delay_ms)
+    print(f"[stub-core] listening on 127.0.0.1:{port} delay={args.delay_ms}ms")
+    server.wait_for_termination()
@@ -24,7 +24,7 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x15proto/inference.proto\x12\x10\x61thena.inference\"\x07\n\x05\x45mpty\"/\n\x08ModelRef\x12\x12\n\nmodel_name\x18\x01 \x01(\t\x12\x0f\n\x07version\x18\x02 \x01(\t\"(\n\tLoadReply\x12\n\n\x02ok\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\"a\n\x10InferenceRequest\x12\x12\n\nrequest_id\x18\x01 \x01(\t\x12\x0e\n\x06inputs\x18\x02 \x03(\x02\x12\x12\n\nmodel_name\x18\x03 \x01(\t\x12\x15\n\rmodel_version\x18\x04 \x01(\t\"Y\n\x0eInferenceReply\x12\x12\n\nrequest_id\x18\x01 \x01(\t\x12\x0f\n\x07outputs\x18\x02 \x03(\x02\x12\x12\n\nlatency_ms\x18\x03 \x01(\x01\x12\x0e\n\x06status\x18\x04 \x01(\t\"G\n\x10ModelStatusReply\x12\x12\n\nmodel_name\x18\x01 \x01(\t\x12\x0f\n\x07version\x18\x02 \x01(\t\x12\x0e\n\x06status\x18\x03 \x01(\t2\xc8\x02\n\x10InferenceService\x12\x44\n\tLoadModel\x12\x1a.athena.inference.ModelRef\x1a\x1b.athena.inference.LoadReply\x12\x46\n\x0bUnloadModel\x12\x1a.athena.inference.ModelRef\x1a\x1b.athena.inference.LoadReply\x12P\n\x0eGetModelStatus\x12\x1a.athena.inference.ModelRef\x1a\".athena.inference.ModelStatusReply\x12T\n\x0cRunInference\x12\".athena.inference.InferenceRequest\x1a .athena.inference.InferenceReplyB\x12Z\x10\x61thena/inferenceb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x15proto/inference.proto\x12\x10\x61thena.inference\"\x07\n\x05\x45mpty\"I\n\x08ModelRef\x12\x12\n\nmodel_name\x18\x01 \x01(\t\x12\x0f\n\x07version\x18\x02 \x01(\t\x12\x18\n\x10\x64rain_timeout_ms\x18\x03 \x01(\r\"(\n\tLoadReply\x12\n\n\x02ok\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\"P\n\x06Tensor\x12)\n\x05\x64type\x18\x01 \x01(\x0e\x32\x1a.athena.inference.DataType\x12\r\n\x05shape\x18\x02 \x03(\x03\x12\x0c\n\x04\x64\x61ta\x18\x03 \x01(\x0c\"x\n\x0cShmTensorRef\x12\x0e\n\x06region\x18\x01 \x01(\t\x12\x0e\n\x06offset\x18\x02 \x01(\x04\x12\x0e\n\x06length\x18\x03 \x01(\x04\x12)\n\x05\x64type\x18\x04 \x01(\x0e\x32\x1a.athena.inference.DataType\x12\r\n\x05shape\x18\x05 \x03(\x03\"\'\n\tShmRegion\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x0c\n\x04size\x18\x02 \x01(\x04\"\x88\x02\n\x10InferenceRequest\x12\x12\n\nrequest_id\x18\x01 \x01(\t\x12\x0e\n\x06inputs\x18\x02 \x03(\x02\x12\x12\n\nmodel_name\x18\x03 \x01(\t\x12\x15\n\rmodel_version\x18\x04 \x01(\t\x12.\n\x0cinput_tensor\x18\x05 \x01(\x0b\x32\x18.athena.inference.Tensor\x12\x0e\n\x06tenant\x18\x06 \x01(\t\x12\x31\n\tinput_shm\x18\x07 \x01(\x0b\x32\x1e.athena.inference.ShmTensorRef\x12\x32\n\noutput_shm\x18\x08 \x01(\x0b\x32\x1e.athena.inference.ShmTensorRef\"U\n\x0cStageTimings\x12\x10\n\x08queue_ms\x18\x01 \x01(\x01\x12\x10\n\x08\x62\x61tch_ms\x18\x02 \x01(\x01\x12\x0f\n\x07\x65xec_ms\x18\x03 \x01(\x01\x12\x10\n\x08total_ms\x18\x04 \x01(\x01\"\x86\x02\n\x0eInferenceReply\x12\x12\n\nrequest_id\x18\x01 \x01(\t\x12\x0f\n\x07outputs\x18\x02 \x03(\x02\x12\x12\n\nlatency_ms\x18\x03 \x01(\x01\x12\x0e\n\x06status\x18\x04 \x01(\t\x12/\n\routput_tensor\x18\x05 \x01(\x0b\x32\x18.athena.inference.Tensor\x12\x15\n\rmodel_version\x18\x06 \x01(\t\x12\x32\n\noutput_shm\x18\x07 \x01(\x0b\x32\x1e.athena.inference.ShmTensorRef\x12/\n\x07timings\x18\x08 \x01(\x0b\x32\x1e.athena.inference.StageTimings\"M\n\x15InferenceBatchRequest\x12\x34\n\x08requests\x18\x01 \x03(\x0b\x32\".athena.inference.InferenceRequest\"H\n\x13InferenceBatchReply\x12\x31\n\x07replies\x18\x01 \x03(\x0b\x32 .athena.inference.InferenceReply\"r\n\x10ModelStatusReply\x12\x12\n\nmodel_name\x18\x01 \x01(\t\x12\x0f\n\x07version\x18\x02 \x01(\t\x12\x0e\n\x06status\x18\x03 \x01(\t\x12\x16\n\x0e\x61\x63tive_version\x18\x04 \x01(\t\x12\x11\n\tin_flight\x18\x05 \x01(\r\"\xe3\x01\n\x0c\x42\x61tcherStats\x12\x10\n\x08\x61\x64\x61ptive\x18\x01 \x01(\x08\x12\x16\n\x0emax_batch_size\x18\x02 \x01(\r\x12\x13\n\x0bmax_wait_ms\x18\x03 \x01(\x01\x12\x16\n\x0elatency_slo_ms\x18\x04 \x01(\x01\x12\x14\n\x0c\x61rrival_rate\x18\x05 \x01(\x01\x12\x14\n\x0c\x65xec_base_ms\x18\x06 \x01(\x01\x12\x18\n\x10\x65xec_per_item_ms\x18\x07 \x01(\x01\x12\x13\n\x0bqueue_depth\x18\x08 \x01(\r\x12\x0f\n\x07\x62\x61tches\x18\t \x01(\x04\x12\x10\n\x08requests\x18\n \x01(\x04\"G\n\tHistogram\x12\x0e\n\x06\x62ounds\x18\x01 \x03(\x01\x12\x0e\n\x06\x63ounts\x18\x02 \x03(\x04\x12\r\n\x05\x63ount\x18\x03 \x01(\x04\x12\x0b\n\x03sum\x18\x04 \x01(\x01\"d\n\x0cModelLatency\x12\x12\n\nmodel_name\x18\x01 \x01(\t\x12\x0f\n\x07version\x18\x02 \x01(\t\x12/\n\nlatency_ms\x18\x03 \x01(\x0b\x32\x1b.athena.inference.Histogram\"*\n\x13RuntimeStatsRequest\x12\x13\n\x0binterval_ms\x18\x01 \x01(\r\"g\n\x0fModelQueueStats\x12\x12\n\nmodel_name\x18\x01 \x01(\t\x12\x0f\n\x07version\x18\x02 \x01(\t\x12/\n\x07\x62\x61tcher\x18\x03 \x01(\x0b\x32\x1e.athena.inference.BatcherStats\"O\n\tShedStats\x12\x12\n\nmodel_name\x18\x01 \x01(\t\x12\x0f\n\x07version\x18\x02 \x01(\t\x12\x0e\n\x06reason\x18\x03 \x01(\t\x12\r\n\x05\x63ount\x18\x04 \x01(\x04\"\x81\x03\n\x0cRuntimeStats\x12\x10\n\x08uptime_s\x18\x01 \x01(\x01\x12\x13\n\x0bqueue_depth\x18\x02 \x01(\r\x12\x15\n\rexpired_total\x18\x03 \x01(\x04\x12\x16\n\x0erejected_total\x18\x04 \x01(\x04\x12\x30\n\x0b\x62\x61tch_sizes\x18\x05 \x01(\x0b\x32\x1b.athena.inference.Histogram\x12.\n\x06models\x18\x06 \x03(\x0b\x32\x1e.athena.inference.ModelLatency\x12/\n\x07\x62\x61tcher\x18\x07 \x01(\x0b\x32\x1e.athena.inference.BatcherStats\x12\x31\n\x06queues\x18\x08 \x03(\x0b\x32!.athena.inference.ModelQueueStats\x12\x16\n\x0e\x61\x64mitted_total\x18\t \x01(\x04\x12\x12\n\nshed_total\x18\n \x01(\x04\x12)\n\x04shed\x18\x0b \x03(\x0b\x32\x1b.athena.inference.ShedStats*d\n\x08\x44\x61taType\x12\x0e\n\nDT_FLOAT32\x10\x00\x12\x0e\n\nDT_FLOAT64\x10\x01\x12\x0c\n\x08\x44T_INT32\x10\x02\x12\x0c\n\x08\x44T_INT64\x10\x03\x12\x0c\n\x08\x44T_UINT8\x10\x04\x12\x0e\n\nDT_FLOAT16\x10\x05\x32\xfc\x07\n\x10InferenceService\x12\x44\n\tLoadModel\x12\x1a.athena.inference.ModelRef\x1a\x1b.athena.inference.LoadReply\x12\x46\n\x0bUnloadModel\x12\x1a.athena.inference.ModelRef\x1a\x1b.athena.inference.LoadReply\x12K\n\x10SetActiveVersion\x12\x1a.athena.inference.ModelRef\x1a\x1b.athena.inference.LoadReply\x12P\n\x0eGetModelStatus\x12\x1a.athena.inference.ModelRef\x1a\".athena.inference.ModelStatusReply\x12T\n\x0cRunInference\x12\".athena.inference.InferenceRequest\x1a .athena.inference.InferenceReply\x12\x63\n\x11RunInferenceBatch\x12\'.athena.inference.InferenceBatchRequest\x1a%.athena.inference.InferenceBatchReply\x12[\n\x0fStreamInference\x12\".athena.inference.InferenceRequest\x1a .athena.inference.InferenceReply(\x01\x30\x01\x12J\n\x0fGetBatcherStats\x12\x17.athena.inference.Empty\x1a\x1e.athena.inference.BatcherStats\x12X\n\x0fGetRuntimeStats\x12%.athena.inference.RuntimeStatsRequest\x1a\x1e.athena.inference.RuntimeStats\x12]\n\x12StreamRuntimeStats\x12%.athena.inference.RuntimeStatsRequest\x1a\x1e.athena.inference.RuntimeStats0\x01\x12M\n\x11RegisterShmRegion\x12\x1b.athena.inference.ShmRegion\x1a\x1b.athena.inference.LoadReply\x12O\n\x13UnregisterShmRegion\x12\x1b.athena.inference.ShmRegion\x1a\x1b.athena.inference.LoadReplyB\x12Z\x10\x61thena/inferenceb\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -32,18 +32,46 @@ _builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'proto.inference_pb2', _glob
 if not _descriptor._USE_C_DESCRIPTORS:
   _globals['DESCRIPTOR']._loaded_options = None
   _globals['DESCRIPTOR']._serialized_options = b'Z\020athena/inference'
+  _globals['_DATATYPE']._serialized_start=2325
+  _globals['_DATATYPE']._serialized_end=2425
   _globals['_EMPTY']._serialized_start=43
   _globals['_EMPTY']._serialized_end=50
   _globals['_MODELREF']._serialized_start=52
-  _globals['_MODELREF']._serialized_end=99
-  _globals['_LOADREPLY']._serialized_start=101
-  _globals['_LOADREPLY']._serialized_end=141
-  _globals['_INFERENCEREQUEST']._serialized_start=143
-  _globals['_INFERENCEREQUEST']._serialized_end=240
-  _globals['_INFERENCEREPLY']._serialized_start=242
-  _globals['_INFERENCEREPLY']._serialized_end=331
-  _globals['_MODELSTATUSREPLY']._serialized_start=333
-  _globals['_MODELSTATUSREPLY']._serialized_end=404
-  _globals['_INFERENCESERVICE']._serialized_start=407
-  _globals['_INFERENCESERVICE']._serialized_end=735
+  _globals['_MODELREF']._serialized_end=125
+  _globals['_LOADREPLY']._serialized_start=127
+  _globals['_LOADREPLY']._serialized_end=167
+  _globals['_TENSOR']._serialized_start=169
+  _globals['_TENSOR']._serialized_end=249
+  _globals['_SHMTENSORREF']._serialized_start=251
+  _globals['_SHMTENSORREF']._serialized_end=371
+  _globals['_SHMREGION']._serialized_start=373
+  _globals['_SHMREGION']._serialized_end=412
+  _globals['_INFERENCEREQUEST']._serialized_start=415
+  _globals['_INFERENCEREQUEST']._serialized_end=679
+  _globals['_STAGETIMINGS']._serialized_start=681
+  _globals['_STAGETIMINGS']._serialized_end=766
+  _globals['_INFERENCEREPLY']._serialized_start=769
+  _globals['_INFERENCEREPLY']._serialized_end=1031
+  _globals['_INFERENCEBATCHREQUEST']._serialized_start=1033
+  _globals['_INFERENCEBATCHREQUEST']._serialized_end=1110
+  _globals['_INFERENCEBATCHREPLY']._serialized_start=1112
+  _globals['_INFERENCEBATCHREPLY']._serialized_end=1184
+  _globals['_MODELSTATUSREPLY']._serialized_start=1186
+  _globals['_MODELSTATUSREPLY']._serialized_end=1300
+  _globals['_BATCHERSTATS']._serialized_start=1303
+  _globals['_BATCHERSTATS']._serialized_end=1530
+  _globals['_HISTOGRAM']._serialized_start=1532
+  _globals['_HISTOGRAM']._serialized_end=1603
+  _globals['_MODELLATENCY']._serialized_start=1605
+  _globals['_MODELLATENCY']._serialized_end=1705
+  _globals['_RUNTIMESTATSREQUEST']._serialized_start=1707
+  _globals['_RUNTIMESTATSREQUEST']._serialized_end=1749
+  _globals['_MODELQUEUESTATS']._serialized_start=1751
+  _globals['_MODELQUEUESTATS']._serialized_end=1854
+  _globals['_SHEDSTATS']._serialized_start=1856
+  _globals['_SHEDSTATS']._serialized_end=1935
+  _globals['_RUNTIMESTATS']._serialized_start=1938
+  _globals['_RUNTIMESTATS']._serialized_end=2323
+  _globals['_INFERENCESERVICE']._serialized_start=2428
+  _globals['_INFERENCESERVICE']._serialized_end=3448
 # @@protoc_insertion_point(module_scope)
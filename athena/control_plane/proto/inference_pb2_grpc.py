@@ -44,6 +44,11 @@ class InferenceServiceStub(object):
                 request_serializer=proto_dot_inference__pb2.ModelRef.SerializeToString,
                 response_deserializer=proto_dot_inference__pb2.LoadReply.FromString,
                 _registered_method=True)
+        self.SetActiveVersion = channel.unary_unary(
+                '/athena.inference.InferenceService/SetActiveVersion',
+                request_serializer=proto_dot_inference__pb2.ModelRef.SerializeToString,
+                response_deserializer=proto_dot_inference__pb2.LoadReply.FromString,
+                _registered_method=True)
         self.GetModelStatus = channel.unary_unary(
                 '/athena.inference.InferenceService/GetModelStatus',
                 request_serializer=proto_dot_inference__pb2.ModelRef.SerializeToString,
@@ -54,6 +59,41 @@ class InferenceServiceStub(object):
                 request_serializer=proto_dot_inference__pb2.InferenceRequest.SerializeToString,
                 response_deserializer=proto_dot_inference__pb2.InferenceReply.FromString,
                 _registered_method=True)
+        self.RunInferenceBatch = channel.unary_unary(
+                '/athena.inference.InferenceService/RunInferenceBatch',
+                request_serializer=proto_dot_inference__pb2.InferenceBatchRequest.SerializeToString,
+                response_deserializer=proto_dot_inference__pb2.InferenceBatchReply.FromString,
+                _registered_method=True)
+        self.StreamInference = channel.stream_stream(
+                '/athena.inference.InferenceService/StreamInference',
+                request_serializer=proto_dot_inference__pb2.InferenceRequest.SerializeToString,
+                response_deserializer=proto_dot_inference__pb2.InferenceReply.FromString,
+                _registered_method=True)
+        self.GetBatcherStats = channel.unary_unary(
+                '/athena.inference.InferenceService/GetBatcherStats',
+                request_serializer=proto_dot_inference__pb2.Empty.SerializeToString,
+                response_deserializer=proto_dot_inference__pb2.BatcherStats.FromString,
+                _registered_method=True)
+        self.GetRuntimeStats = channel.unary_unary(
+                '/athena.inference.InferenceService/GetRuntimeStats',
+                request_serializer=proto_dot_inference__pb2.RuntimeStatsRequest.SerializeToString,
+                response_deserializer=proto_dot_inference__pb2.RuntimeStats.FromString,
+                _registered_method=True)
+        self.StreamRuntimeStats = channel.unary_stream(
+                '/athena.inference.InferenceService/StreamRuntimeStats',
+                request_serializer=proto_dot_inference__pb2.RuntimeStatsRequest.SerializeToString,
+                response_deserializer=proto_dot_inference__pb2.RuntimeStats.FromString,
+                _registered_method=True)
+        self.RegisterShmRegion = channel.unary_unary(
+                '/athena.inference.InferenceService/RegisterShmRegion',
+                request_serializer=proto_dot_inference__pb2.ShmRegion.SerializeToString,
+                response_deserializer=proto_dot_inference__pb2.LoadReply.FromString,
+                _registered_method=True)
+        self.UnregisterShmRegion = channel.unary_unary(
+                '/athena.inference.InferenceService/UnregisterShmRegion',
+                request_serializer=proto_dot_inference__pb2.ShmRegion.SerializeToString,
+                response_deserializer=proto_dot_inference__pb2.LoadReply.FromString,
+                _registered_method=True)
 
 
 class InferenceServiceServicer(object):
@@ -66,7 +106,15 @@ class InferenceServiceServicer(object):
         raise NotImplementedError('Method not implemented!')
 
     def UnloadModel(self, request, context):
-        """Missing associated documentation comment in .proto file."""
+        """Stops routing to the version, waits for its in-flight requests, then unloads it.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def SetActiveVersion(self, request, context):
+        """Routes requests without a model_version to this (loaded) version from now on.
+        """
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
@@ -83,6 +131,52 @@ class InferenceServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def RunInferenceBatch(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def StreamInference(self, request_iterator, context):
+        """Long-lived stream for steady small requests; replies may arrive out of order
+        and are matched to requests by request_id.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetBatcherStats(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetRuntimeStats(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def StreamRuntimeStats(self, request, context):
+        """Pushes a RuntimeStats snapshot every interval_ms until the client cancels.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def RegisterShmRegion(self, request, context):
+        """Maps a client's shared-memory region so RunInference can reference tensors in it.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def UnregisterShmRegion(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_InferenceServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -96,6 +190,11 @@ def add_InferenceServiceServicer_to_server(servicer, server):
                     request_deserializer=proto_dot_inference__pb2.ModelRef.FromString,
                     response_serializer=proto_dot_inference__pb2.LoadReply.SerializeToString,
             ),
+            'SetActiveVersion': grpc.unary_unary_rpc_method_handler(
+                    servicer.SetActiveVersion,
+                    request_deserializer=proto_dot_inference__pb2.ModelRef.FromString,
+                    response_serializer=proto_dot_inference__pb2.LoadReply.SerializeToString,
+            ),
             'GetModelStatus': grpc.unary_unary_rpc_method_handler(
                     servicer.GetModelStatus,
                     request_deserializer=proto_dot_inference__pb2.ModelRef.FromString,
@@ -106,6 +205,41 @@ def add_InferenceServiceServicer_to_server(servicer, server):
                     request_deserializer=proto_dot_inference__pb2.InferenceRequest.FromString,
                     response_serializer=proto_dot_inference__pb2.InferenceReply.SerializeToString,
             ),
+            'RunInferenceBatch': grpc.unary_unary_rpc_method_handler(
+                    servicer.RunInferenceBatch,
+                    request_deserializer=proto_dot_inference__pb2.InferenceBatchRequest.FromString,
+                    response_serializer=proto_dot_inference__pb2.InferenceBatchReply.SerializeToString,
+            ),
+            'StreamInference': grpc.stream_stream_rpc_method_handler(
+                    servicer.StreamInference,
+                    request_deserializer=proto_dot_inference__pb2.InferenceRequest.FromString,
+                    response_serializer=proto_dot_inference__pb2.InferenceReply.SerializeToString,
+            ),
+            'GetBatcherStats': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetBatcherStats,
+                    request_deserializer=proto_dot_inference__pb2.Empty.FromString,
+                    response_serializer=proto_dot_inference__pb2.BatcherStats.SerializeToString,
+            ),
+            'GetRuntimeStats': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetRuntimeStats,
+                    request_deserializer=proto_dot_inference__pb2.RuntimeStatsRequest.FromString,
+                    response_serializer=proto_dot_inference__pb2.RuntimeStats.SerializeToString,
+            ),
+            'StreamRuntimeStats': grpc.unary_stream_rpc_method_handler(
+                    servicer.StreamRuntimeStats,
+                    request_deserializer=proto_dot_inference__pb2.RuntimeStatsRequest.FromString,
+                    response_serializer=proto_dot_inference__pb2.RuntimeStats.SerializeToString,
+            ),
+            'RegisterShmRegion': grpc.unary_unary_rpc_method_handler(
+                    servicer.RegisterShmRegion,
+                    request_deserializer=proto_dot_inference__pb2.ShmRegion.FromString,
+                    response_serializer=proto_dot_inference__pb2.LoadReply.SerializeToString,
+            ),
+            'UnregisterShmRegion': grpc.unary_unary_rpc_method_handler(
+                    servicer.UnregisterShmRegion,
+                    request_deserializer=proto_dot_inference__pb2.ShmRegion.FromString,
+                    response_serializer=proto_dot_inference__pb2.LoadReply.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'athena.inference.InferenceService', rpc_method_handlers)
@@ -171,6 +305,33 @@ class InferenceService(object):
             metadata,
             _registered_method=True)
 
+    @staticmethod
+    def SetActiveVersion(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/athena.inference.InferenceService/SetActiveVersion',
+            proto_dot_inference__pb2.ModelRef.SerializeToString,
+            proto_dot_inference__pb2.LoadReply.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
     @staticmethod
     def GetModelStatus(request,
             target,
@@ -224,3 +385,192 @@ class InferenceService(object):
             timeout,
             metadata,
             _registered_method=True)
+
+    @staticmethod
+    def RunInferenceBatch(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/athena.inference.InferenceService/RunInferenceBatch',
+            proto_dot_inference__pb2.InferenceBatchRequest.SerializeToString,
+            proto_dot_inference__pb2.InferenceBatchReply.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def StreamInference(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_stream(
+            request_iterator,
+            target,
+            '/athena.inference.InferenceService/StreamInference',
+            proto_dot_inference__pb2.InferenceRequest.SerializeToString,
+            proto_dot_inference__pb2.InferenceReply.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def GetBatcherStats(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/athena.inference.InferenceService/GetBatcherStats',
+            proto_dot_inference__pb2.Empty.SerializeToString,
+            proto_dot_inference__pb2.BatcherStats.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def GetRuntimeStats(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/athena.inference.InferenceService/GetRuntimeStats',
+            proto_dot_inference__pb2.RuntimeStatsRequest.SerializeToString,
+            proto_dot_inference__pb2.RuntimeStats.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def StreamRuntimeStats(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/athena.inference.InferenceService/StreamRuntimeStats',
+            proto_dot_inference__pb2.RuntimeStatsRequest.SerializeToString,
+            proto_dot_inference__pb2.RuntimeStats.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def RegisterShmRegion(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/athena.inference.InferenceService/RegisterShmRegion',
+            proto_dot_inference__pb2.ShmRegion.SerializeToString,
+            proto_dot_inference__pb2.LoadReply.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def UnregisterShmRegion(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/athena.inference.InferenceService/UnregisterShmRegion',
+            proto_dot_inference__pb2.ShmRegion.SerializeToString,
+            proto_dot_inference__pb2.LoadReply.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
@@ -0,0 +1,128 @@
+# control_plane/tests/test_admission.py
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from prometheus_client import REGISTRY
+
+from control_plane.app.admission import AdmissionLimiter
+from control_plane.app.core_client import AsyncCoreClient, CoreClient
+from control_plane.bench.stub_core import serve
+
+
+@pytest.fixture()
+def overloaded_core():
+    # two calls at a time, the rest refused with RESOURCE_EXHAUSTED
+    server, port = serve(delay_ms=50.0, max_inflight=2)
+    yield server, f"127.0.0.1:{port}"
+    server.stop(None)
+
+
+def _parallel(client, n, **kwargs):
+    with ThreadPoolExecutor(max_workers=n) as pool:
+        return list(pool.map(lambda i: client.run_inference(f"req-{i}", [1.0], "m", "v1", **kwargs), range(n)))
+
+
+def _sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_limiter_caps_inflight_calls_per_model():
+    limiter = AdmissionLimiter(max_inflight=2)
+    assert limiter.admit("m") is None
+    assert limiter.admit("m") is None
+    reason, retry_after_ms = limiter.admit("m")
+    assert reason == "inflight" and retry_after_ms >= 1.0
+    assert limiter.admit("other") is None  # per model
+    limiter.release("m", latency_s=0.040)
+    assert limiter.admit("m") is None
+    assert limiter.admit("m") == ("inflight", pytest.approx(40.0))
+    stats = limiter.stats()["models"]["m"]
+    assert stats == {"inflight": 2, "admitted": 3, "shed": {"inflight": 2}}
+
+
+def test_limiter_rate_limits_per_tenant_and_model():
+    limiter = AdmissionLimiter(model_rps=5, tenant_rps=2)
+    assert [limiter.admit("m", "a") for _ in range(3)][2][0] == "tenant_rate"
+    for tenant in ("b", "b", "c"):
+        assert limiter.admit("m", tenant) is None
+    reason, retry_after_ms = limiter.admit("m", "d")
+    assert reason == "model_rate"
+    assert 1.0 <= retry_after_ms <= 200.0
+
+
+def test_limiter_bounds_tenant_buckets(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr("control_plane.app.admission.time.monotonic", lambda: clock[0])
+    unlimited = AdmissionLimiter(max_inflight=1)
+    assert unlimited.admit("m", "t") is None and unlimited.stats()["tenant_buckets"] == 0
+    limiter = AdmissionLimiter(tenant_rps=1, max_tenants=3)
+    for i in range(3):
+        assert limiter.admit("m", f"t{i}") is None
+    # over the cap, new tenants share one bucket
+    assert limiter.admit("m", "x") is None
+    assert limiter.admit("m", "y")[0] == "tenant_rate"
+    assert limiter.stats()["tenant_buckets"] == 3
+    # refilled buckets are forgotten, making room again
+    clock[0] += 2.0
+    assert limiter.admit("m", "y") is None
+    assert limiter.stats()["tenant_buckets"] == 1
+
+
+def test_core_overload_fails_fast_with_a_retry_hint(overloaded_core):
+    server, target = overloaded_core
+    client = CoreClient(target=target)
+    shed_before = _sample("inference_requests_total", model="m", outcome="shed")
+    results = _parallel(client, 6)
+    client.close()
+
+    shed = [r for r in results if r.get("code") == "RESOURCE_EXHAUSTED"]
+    assert len(shed) == 4 and server.servicer.calls == 2
+    assert all(r["retry_after_ms"] == 50.0 for r in shed)
+    assert _sample("inference_requests_total", model="m", outcome="shed") - shed_before == 4
+    assert server.servicer._runtime_stats().shed_total == 4
+
+
+def test_shed_calls_are_retried_after_the_hint(overloaded_core):
+    server, target = overloaded_core
+    client = CoreClient(target=target, overload_retries=10)
+    results = _parallel(client, 6, deadline_ms=2000)
+    client.close()
+    assert all("error" not in r for r in results)
+    assert server.servicer.calls == 6
+
+
+def test_retries_stop_when_the_deadline_cannot_be_met(overloaded_core):
+    _, target = overloaded_core
+    client = CoreClient(target=target, overload_retries=10)
+    results = _parallel(client, 6, deadline_ms=40)
+    client.close()
+    assert sum(r.get("code") == "RESOURCE_EXHAUSTED" for r in results) == 4
+
+
+def test_control_plane_limiter_sheds_before_calling_the_core():
+    server, port = serve(delay_ms=50.0)
+    client = CoreClient(target=f"127.0.0.1:{port}", admission=AdmissionLimiter(max_inflight=1))
+    results = _parallel(client, 4)
+    client.close()
+    server.stop(None)
+
+    shed = [r for r in results if "error" in r]
+    assert len(shed) == 3 and server.servicer.calls == 1
+    assert all(r["shed_by"] == "control_plane" and r["reason"] == "inflight" for r in shed)
+    assert client.admission.stats()["models"]["m"]["inflight"] == 0
+
+
+def test_async_client_retries_shed_calls(overloaded_core):
+    server, target = overloaded_core
+
+    async def scenario():
+        client = AsyncCoreClient(targets=[target], overload_retries=10)
+        results = await asyncio.gather(*(client.run_inference(f"req-{i}", [1.0], "m", "v1", tenant="t")
+                                         for i in range(6)))
+        await client.close()
+        return results
+
+    results = asyncio.run(scenario())
+    assert all("error" not in r for r in results)
+    assert server.servicer.calls == 6
@@ -0,0 +1,129 @@
+# control_plane/tests/test_async_core_client.py
+import asyncio
+import pytest
+
+from control_plane.app.core_client import AsyncCoreClient
+from control_plane.bench.stub_core import serve
+
+
+@pytest.fixture(scope="module")
+def stub_targets():
+    servers = [serve() for _ in range(2)]
+    yield [f"127.0.0.1:{port}" for _, port in servers]
+    for server, _ in servers:
+        server.stop(None)
+
+
+def test_async_client_round_robins_across_targets(stub_targets):
+    async def scenario():
+        client = AsyncCoreClient(targets=stub_targets, channels_per_target=1)
+        results = [await client.load_model("fraud-detector", "v0.1") for _ in range(4)]
+        used = [ch.target for ch in client._channels]
+        await client.close()
+        return results, used
+
+    results, used = asyncio.run(scenario())
+    assert all(r["ok"] for r in results)
+    assert sorted(used) == sorted(stub_targets)
+
+
+def test_async_client_caps_inflight_per_channel(stub_targets):
+    async def scenario():
+        client = AsyncCoreClient(targets=stub_targets[:1], channels_per_target=1, max_inflight_per_channel=2)
+        client._ensure_pool()
+        ch = client._channels[0]
+        real_call = ch.stub.RunInference
+        inflight = peak = 0
+
+        async def tracked_call(req, timeout):
+            nonlocal inflight, peak
+            inflight += 1
+            peak = max(peak, inflight)
+            await asyncio.sleep(0.01)
+            try:
+                return await real_call(req, timeout=timeout)
+            finally:
+                inflight -= 1
+
+        ch.stub.RunInference = tracked_call
+        results = await asyncio.gather(*(client.run_inference(f"req-{i}", [1.0, 2.0]) for i in range(8)))
+        await client.close()
+        return results, peak
+
+    results, peak = asyncio.run(scenario())
+    assert [r["request_id"] for r in results] == [f"req-{i}" for i in range(8)]
+    assert results[0]["outputs"] == [1.0, 2.0]
+    assert peak == 2
+
+
+def test_async_client_reports_unreachable_core():
+    async def scenario():
+        client = AsyncCoreClient(targets=["127.0.0.1:1"], timeout_s=0.5)
+        resp = await client.load_model("fraud-detector", "v0.1")
+        await client.close()
+        return resp
+
+    resp = asyncio.run(scenario())
+    assert resp["ok"] is False
+
+
+def test_stream_matches_concurrent_replies_by_request_id(stub_targets):
+    async def scenario():
+        client = AsyncCoreClient(targets=stub_targets[:1])
+        async with await client.open_stream(max_outstanding=4) as stream:
+            results = await asyncio.gather(*(stream.infer(f"req-{i}", [float(i)]) for i in range(20)))
+        await client.close()
+        return results
+
+    results = asyncio.run(scenario())
+    assert [r["request_id"] for r in results] == [f"req-{i}" for i in range(20)]
+    assert [r["outputs"] for r in results] == [[float(i)] for i in range(20)]
+
+
+def test_stream_gives_its_channel_slot_back_once(stub_targets):
+    async def scenario():
+        client = AsyncCoreClient(targets=stub_targets[:1], channels_per_target=1, max_inflight_per_channel=2)
+        async with await client.open_stream() as stream:
+            await stream.infer("req-0", [1.0])
+            await stream.close()
+        await stream.close()
+        free = client._channels[0].slots._value
+        await client.close()
+        return free
+
+    assert asyncio.run(scenario()) == 2
+
+
+def test_stream_that_fails_to_open_frees_its_slot(stub_targets):
+    async def scenario():
+        client = AsyncCoreClient(targets=stub_targets[:1], channels_per_target=1, max_inflight_per_channel=2)
+        client._ensure_pool()
+        ch = client._channels[0]
+
+        def broken_call():
+            raise RuntimeError("channel closed")
+
+        ch.stub.StreamInference = broken_call
+        with pytest.raises(RuntimeError):
+            await client.open_stream()
+        free = ch.slots._value
+        await client.close()
+        return free
+
+    assert asyncio.run(scenario()) == 2
+
+
+def test_stream_inference_async_iterator(stub_targets):
+    async def requests():
+        for i in range(10):
+            yield {"request_id": f"req-{i}", "inputs": [1.0], "model_name": "fraud-detector"}
+
+    async def scenario():
+        client = AsyncCoreClient(targets=stub_targets[:1])
+        replies = [r async for r in client.stream_inference(requests(), max_outstanding=3)]
+        await client.close()
+        return replies
+
+    replies = asyncio.run(scenario())
+    assert sorted(r["request_id"] for r in replies) == sorted(f"req-{i}" for i in range(10))
+    assert all(r["status"] == "ok" for r in replies)
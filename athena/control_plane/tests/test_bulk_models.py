@@ -0,0 +1,51 @@
+# control_plane/tests/test_bulk_models.py
+import asyncio
+
+from fastapi.testclient import TestClient
+import pytest
+
+from control_plane.app import main
+from control_plane.app.main import app
+
+client = TestClient(app)
+
+
+@pytest.fixture()
+def fake_core(monkeypatch):
+    calls = {"inflight": 0, "peak": 0}
+
+    async def fake_call(model_name, version):
+        calls["inflight"] += 1
+        calls["peak"] = max(calls["peak"], calls["inflight"])
+        await asyncio.sleep(0.01)
+        calls["inflight"] -= 1
+        if model_name == "broken":
+            return {"ok": False, "message": "no such artifact"}
+        return {"ok": True, "message": f"stub: {model_name}:{version}"}
+
+    monkeypatch.setattr(main.core_client, "load_model", fake_call)
+    monkeypatch.setattr(main.core_client, "unload_model", fake_call)
+    return calls
+
+
+def test_bulk_load_reports_each_item(fake_core):
+    refs = [{"model_name": f"bulk-{i}", "version": "v1"} for i in range(6)] + [{"model_name": "broken", "version": "v1"}]
+    r = client.post("/models/load/bulk", json={"models": refs, "concurrency": 3})
+    assert r.status_code == 200
+    data = r.json()
+    assert data["succeeded"] == 6 and data["failed"] == 1
+    by_name = {item["model_name"]: item for item in data["results"]}
+    assert by_name["bulk-0"]["status"] == "loaded" and by_name["bulk-0"]["id"] is not None
+    assert by_name["broken"]["ok"] is False and by_name["broken"]["status"] == "failed"
+    assert fake_core["peak"] <= 3
+
+    assert client.get("/models/bulk-3").json()["status"] == "loaded"
+
+
+def test_bulk_unload_upserts_existing_rows(fake_core):
+    refs = [{"model_name": f"bulk-{i}", "version": "v1"} for i in range(2)]
+    first = client.post("/models/load/bulk", json={"models": refs}).json()
+    second = client.post("/models/unload/bulk", json={"models": refs}).json()
+    assert [i["status"] for i in second["results"]] == ["not_loaded", "not_loaded"]
+    # same rows were updated in place, not duplicated
+    assert [i["id"] for i in second["results"]] == [i["id"] for i in first["results"]]
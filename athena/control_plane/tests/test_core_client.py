@@ -0,0 +1,80 @@
+# control_plane/tests/test_core_client.py
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+
+from control_plane.app.core_client import CoreClient
+from control_plane.bench.stub_core import serve
+
+
+@pytest.fixture()
+def stub_core():
+    server, port = serve(delay_ms=2.0)
+    yield server, f"127.0.0.1:{port}"
+    server.stop(None)
+
+
+def test_run_inference_batch_keeps_request_order(stub_core):
+    _, target = stub_core
+    client = CoreClient(target=target)
+    results = client.run_inference_batch([
+        {"request_id": "a", "inputs": [1.0]},
+        {"request_id": "b", "inputs": [2.0, 3.0], "model_name": "fraud-detector"},
+    ])
+    client.close()
+    assert [r["request_id"] for r in results] == ["a", "b"]
+    assert results[1]["outputs"] == [2.0, 3.0]
+
+
+def test_failed_batch_gives_each_caller_its_own_error():
+    client = CoreClient(target="127.0.0.1:1", timeout_s=0.5)
+    results = client.run_inference_batch([{"request_id": "a", "inputs": [1.0]}, {"request_id": "b", "inputs": [2.0]}])
+    client.close()
+    assert "error" in results[0]
+    results[0]["request_id"] = "a"  # callers annotate their own reply
+    assert "request_id" not in results[1]
+
+
+def test_micro_batcher_coalesces_concurrent_calls(stub_core):
+    server, target = stub_core
+    client = CoreClient(target=target, batch_window_ms=20, max_batch_size=16)
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        results = list(pool.map(lambda i: client.run_inference(f"req-{i}", [float(i)]), range(16)))
+    client.close()
+
+    # every caller gets its own reply back
+    assert [r["request_id"] for r in results] == [f"req-{i}" for i in range(16)]
+    assert [r["outputs"] for r in results] == [[float(i)] for i in range(16)]
+    # and they shared far fewer RPCs than one per call
+    assert server.servicer.calls < 16
+
+
+def test_deadline_is_sent_as_grpc_deadline():
+    server, port = serve(delay_ms=50.0)
+    client = CoreClient(target=f"127.0.0.1:{port}", timeout_s=5.0)
+    ok = client.run_inference("fast", [1.0], deadline_ms=1000)
+    late = client.run_inference("slow", [1.0], deadline_ms=10)  # stub takes 50 ms
+    client.close()
+    server.stop(None)
+    assert ok["outputs"] == [1.0]
+    assert late["code"] == "DEADLINE_EXCEEDED"
+
+
+def test_micro_batcher_drops_requests_expired_before_send(stub_core):
+    server, target = stub_core
+    client = CoreClient(target=target, batch_window_ms=20, max_batch_size=16)
+    # the 20 ms batching window outlives a 1 ms budget, so the request never reaches the core
+    result = client.run_inference("req-0", [1.0], deadline_ms=1)
+    client.close()
+    assert result["code"] == "DEADLINE_EXCEEDED"
+    assert server.servicer.calls == 0
+
+
+def test_get_batcher_stats(stub_core):
+    _, target = stub_core
+    client = CoreClient(target=target)
+    client.run_inference("req-0", [1.0])
+    stats = client.get_batcher_stats()
+    client.close()
+    assert stats["max_batch_size"] == 1
+    assert stats["requests"] == 1
+    assert {"adaptive", "max_wait_ms", "arrival_rate", "queue_depth"} <= stats.keys()
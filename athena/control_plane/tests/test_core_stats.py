@@ -0,0 +1,80 @@
+# control_plane/tests/test_core_stats.py
+import asyncio
+
+import pytest
+from prometheus_client import CollectorRegistry, generate_latest
+
+from control_plane.app.core_client import AsyncCoreClient, CoreClient
+from control_plane.app.core_stats import CoreStatsCollector, CoreStatsSampler
+from control_plane.bench.stub_core import serve
+
+
+@pytest.fixture()
+def stub_target():
+    server, port = serve(delay_ms=2.0)
+    yield f"127.0.0.1:{port}"
+    server.stop(None)
+
+
+def test_get_runtime_stats_reports_per_model_latency(stub_target):
+    client = CoreClient(target=stub_target)
+    for i in range(3):
+        client.run_inference(f"req-{i}", [1.0], "fraud-detector", "v1")
+    stats = client.get_runtime_stats()
+    client.close()
+    [model] = stats["models"]
+    assert (model["model_name"], model["version"]) == ("fraud-detector", "v1")
+    assert model["latency_ms"]["count"] == 3
+    assert len(model["latency_ms"]["counts"]) == len(model["latency_ms"]["bounds"]) + 1
+    [queue] = stats["queues"]
+    assert (queue["model_name"], queue["version"]) == ("fraud-detector", "v1")
+    assert queue["batcher"]["requests"] == 3
+
+
+@pytest.mark.parametrize("stream", [True, False])
+def test_sampler_caches_snapshots_in_the_background(stub_target, stream):
+    async def scenario():
+        client = AsyncCoreClient(targets=[stub_target])
+        await client.run_inference("req-0", [1.0], "fraud-detector", "v1")
+        sampler = CoreStatsSampler(client, interval_s=0.1, stream=stream)
+        await sampler.start()
+        for _ in range(50):
+            if sampler.latest is not None:
+                break
+            await asyncio.sleep(0.05)
+        await sampler.close()
+        await client.close()
+        return sampler
+
+    sampler = asyncio.run(scenario())
+    assert sampler.latest["models"][0]["latency_ms"]["count"] == 1
+    assert sampler.summary()["age_s"] is not None
+
+
+def test_collector_exports_cached_snapshot():
+    sampler = CoreStatsSampler(client=None)
+    registry = CollectorRegistry()
+    registry.register(CoreStatsCollector(sampler))
+    assert b"dispatcher_queue_depth" not in generate_latest(registry)  # nothing sampled yet
+
+    sampler._update({
+        "queue_depth": 7,
+        "expired_total": 2,
+        "rejected_total": 1,
+        "batch_sizes": {"bounds": [1.0, 2.0], "counts": [3, 1, 0], "count": 4, "sum": 5.0},
+        "models": [{"model_name": "m", "version": "v1",
+                    "latency_ms": {"bounds": [10.0], "counts": [4, 1], "count": 5, "sum": 60.0}}],
+        "batcher": {"max_batch_size": 16, "max_wait_ms": 2.5},
+        "queues": [{"model_name": "m", "version": "v1", "batcher": {"queue_depth": 3}}],
+        "admitted_total": 40,
+        "shed_total": 6,
+        "shed": [{"model_name": "m", "version": "v1", "reason": "queue_delay", "count": 6}],
+    })
+    text = generate_latest(registry).decode()
+    assert "dispatcher_queue_depth 7.0" in text
+    assert "core_requests_expired_total 2.0" in text
+    assert 'core_model_queue_depth{model="m",version="v1"} 3.0' in text
+    assert 'core_requests_shed_total{model="m",reason="queue_delay",version="v1"} 6.0' in text
+    assert 'core_batch_size_bucket{le="2.0"} 4.0' in text
+    assert 'core_inference_latency_seconds_bucket{le="0.01",model="m",version="v1"} 4.0' in text
+    assert 'core_inference_latency_seconds_count{model="m",version="v1"} 5.0' in text
@@ -1,29 +1,95 @@
 # control_plane/tests/test_db.py
+import asyncio
 import pytest
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from control_plane.app.db import Base
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from control_plane.app.db import Base, to_async_url
 from control_plane.app import models, crud
 
-# Use an in-memory SQLite for unit tests
+# Use an in-memory SQLite (through aiosqlite) for unit tests
 @pytest.fixture(scope="function")
-def db_session():
-    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
-    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-    Base.metadata.create_all(bind=engine)
-    db = TestingSessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-def test_create_and_get_model(db_session):
-    m = crud.create_or_update_model(db_session, "fraud-detector", "v0.1", models.ModelStatus.LOADED)
-    assert m.id is not None
-    assert m.name == "fraud-detector"
-    assert m.version == "v0.1"
-    assert m.status == models.ModelStatus.LOADED
-
-    fetched = crud.get_model_by_name(db_session, "fraud-detector")
-    assert fetched is not None
-    assert fetched.name == "fraud-detector"
+def run_db():
+    def run(scenario):
+        async def main():
+            engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+            TestingSessionLocal = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+            try:
+                async with TestingSessionLocal() as db:
+                    return await scenario(db)
+            finally:
+                await engine.dispose()
+        return asyncio.run(main())
+    return run
+
+def test_create_and_get_model(run_db):
+    async def scenario(db):
+        m = await crud.create_or_update_model(db, "fraud-detector", "v0.1", models.ModelStatus.LOADED)
+        assert m.id is not None
+        assert m.name == "fraud-detector"
+        assert m.version == "v0.1"
+        assert m.status == models.ModelStatus.LOADED
+
+        fetched = await crud.get_model_by_name(db, "fraud-detector")
+        assert fetched is not None
+        assert fetched.name == "fraud-detector"
+    run_db(scenario)
+
+def test_async_url_uses_async_drivers():
+    assert to_async_url("postgresql://u:p@db:5432/athena") == "postgresql+asyncpg://u:p@db:5432/athena"
+    assert to_async_url("sqlite:///./local.db") == "sqlite+aiosqlite:///./local.db"
+
+def test_unique_index_is_added_to_an_existing_models_table(tmp_path):
+    from sqlalchemy import create_engine, text
+    url = f"sqlite:///{tmp_path / 'legacy.db'}"
+    legacy = create_engine(url)
+    with legacy.begin() as conn:
+        # the models table as created before uq_models_name_version
+        conn.execute(text("CREATE TABLE models (id INTEGER PRIMARY KEY, name VARCHAR(255) NOT NULL, "
+                          "version VARCHAR(255) NOT NULL, status VARCHAR(10) NOT NULL, "
+                          "created_at DATETIME DEFAULT CURRENT_TIMESTAMP NOT NULL, "
+                          "updated_at DATETIME DEFAULT CURRENT_TIMESTAMP NOT NULL)"))
+        conn.execute(text("INSERT INTO models (name, version, status) VALUES "
+                          "('m', 'v1', 'NOT_LOADED'), ('m', 'v1', 'LOADED'), ('n', 'v1', 'LOADED')"))
+    with legacy.begin() as conn:
+        Base.metadata.create_all(conn)
+        models.ensure_model_unique_index(conn)
+        models.ensure_model_unique_index(conn)  # idempotent
+        rows = conn.execute(text("SELECT id, name, status FROM models ORDER BY id")).all()
+    legacy.dispose()
+    assert [(r.id, r.name, r.status) for r in rows] == [(2, "m", "LOADED"), (3, "n", "LOADED")]
+
+    async def upsert():
+        engine = create_async_engine(to_async_url(url))
+        try:
+            async with async_sessionmaker(engine, expire_on_commit=False)() as db:
+                return await crud.bulk_upsert_models(db, [("m", "v1", models.ModelStatus.FAILED),
+                                                          ("o", "v1", models.ModelStatus.LOADED)])
+        finally:
+            await engine.dispose()
+    records = asyncio.run(upsert())
+    assert [(r.id, r.name, r.status) for r in records] == [(2, "m", models.ModelStatus.FAILED),
+                                                           (4, "o", models.ModelStatus.LOADED)]
+
+def test_postgres_status_type_gets_the_newer_statuses():
+    from sqlalchemy import create_mock_engine
+    statements = []
+    postgres = create_mock_engine("postgresql://", lambda sql, *args, **kw: statements.append(str(sql)))
+    models.ensure_model_status_values(postgres)
+    assert "ALTER TYPE modelstatus ADD VALUE IF NOT EXISTS 'WARMING'" in statements
+    assert "ALTER TYPE modelstatus ADD VALUE IF NOT EXISTS 'DRAINING'" in statements
+    assert len(statements) == len(models.ModelStatus)
+
+    sqlite = create_mock_engine("sqlite://", lambda sql, *args, **kw: statements.append(str(sql)))
+    models.ensure_model_status_values(sqlite)  # the status is a plain string there
+    assert len(statements) == len(models.ModelStatus)
+
+def test_placements_replace_the_previous_assignment(run_db):
+    async def scenario(db):
+        await crud.set_placements(db, "placed", "v1", ["core-0:50051", "core-1:50051"], 512.0)
+        await crud.set_placements(db, "placed", "v1", ["core-1:50051", "core-2:50051"], 512.0)
+        await crud.set_placements(db, "gone", "v1", ["core-0:50051"])
+        await crud.set_placements(db, "gone", "v1", [])
+        assert sorted(await crud.list_placements(db)) == [
+            ("placed", "v1", "core-1:50051", 512.0), ("placed", "v1", "core-2:50051", 512.0)]
+    run_db(scenario)
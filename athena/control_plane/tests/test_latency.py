@@ -0,0 +1,65 @@
+# control_plane/tests/test_latency.py
+import random
+
+from control_plane.app.latency import LatencyHistogram, LatencyRegistry
+
+
+def test_histogram_quantiles_within_relative_error():
+    rng = random.Random(7)
+    values = [rng.lognormvariate(-4, 1) for _ in range(50000)]
+    h = LatencyHistogram()
+    for v in values:
+        h.record(v)
+    values.sort()
+    for q, got in zip((0.5, 0.95, 0.99), h.quantiles_ms([0.5, 0.95, 0.99])):
+        exact = values[int(q * len(values))] * 1000
+        assert abs(got - exact) / exact < 0.03
+
+
+def test_rolling_window_drops_old_slices():
+    reg = LatencyRegistry(slice_s=1.0, slices=60)
+    now = 1_000_000.0
+    for _ in range(100):
+        reg.record("/old", 0.200, now=now - 30)   # outside a 10 s window
+    for _ in range(50):
+        reg.record("/models/{model_name}", 0.005, now=now - 1)
+
+    s = reg.summary(window_s=10, now=now)
+    assert s["count"] == 50
+    assert s["rps"] == 5.0
+    assert abs(s["p95"] - 5.0) < 0.1
+    assert reg.summary("/old", window_s=10, now=now)["count"] == 0
+    assert reg.summary("/old", window_s=60, now=now)["count"] == 100
+
+
+def test_registry_caps_its_series():
+    reg = LatencyRegistry(max_series=4)
+    for i in range(100):
+        reg.record(f"/random/{i}", 0.001, now=1_000_000.0)
+    assert sorted(reg.endpoints()) == ["/random/0", "/random/1", "/random/2", LatencyRegistry.OTHER]
+    assert reg.summary(LatencyRegistry.OTHER, window_s=10, now=1_000_000.0)["count"] == 97
+    assert reg.summary(window_s=10, now=1_000_000.0)["count"] == 100
+    # one slice written, the rest of the ring not allocated
+    assert sum(h is not None for h in reg._series["/random/0"]._slices) == 1
+
+
+def test_history_points_are_real_windows():
+    reg = LatencyRegistry()
+    now = 2_000_000.0
+    reg.record("/health", 0.002, now=now - 12)
+    reg.record("/health", 0.008, now=now)
+    hist = reg.history(points=3, step_s=5.0, now=now)
+    assert [p["count"] for p in hist] == [1, 0, 1]
+    assert hist[0]["p95"] < hist[2]["p95"]
+
+
+def test_corrected_recording_backfills_stalled_requests():
+    h = LatencyHistogram()
+    for _ in range(99):
+        h.record_corrected(0.001, expected_interval_s=0.010)
+    # one ~1 s stall hides the 99 requests that would have been sent during it
+    h.record_corrected(1.005, expected_interval_s=0.010)
+    assert h.total == 99 + 1 + 99
+    p50, p99 = h.quantiles_ms([0.5, 0.99])
+    assert p50 > 10.0  # uncorrected, the median would still be 1 ms
+    assert 950.0 < p99 <= 1005.0
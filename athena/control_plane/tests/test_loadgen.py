@@ -0,0 +1,78 @@
+# control_plane/tests/test_loadgen.py
+import csv
+import json
+
+import pytest
+
+from control_plane.app.core_client import CoreClient
+from control_plane.bench import loadgen
+from control_plane.bench.stub_core import serve
+
+
+@pytest.fixture()
+def client():
+    server, port = serve(delay_ms=2.0)
+    c = CoreClient(target=f"127.0.0.1:{port}")
+    yield c
+    c.close()
+    server.stop(None)
+
+
+def test_parse_model_mix():
+    assert loadgen.parse_model_mix("a:v1=0.8, b:v2=0.2") == [("a", "v1", 0.8), ("b", "v2", 0.2)]
+    assert loadgen.parse_model_mix("a:v1") == [("a", "v1", 1.0)]
+    with pytest.raises(ValueError):
+        loadgen.parse_model_mix(" , ")
+
+
+def test_open_loop_run(client):
+    w = loadgen.Workload(mode="open", rate=200, arrival="fixed", duration_s=0.5, warmup_s=0.1,
+                         payloads=[4, 16], models=[("a", "v1", 1.0), ("b", "v1", 1.0)])
+    result = loadgen.run(client, w, label="open")
+    assert result["co_correction"] == "schedule"
+    assert result["sent"] == result["completed"] == pytest.approx(100, abs=2)
+    assert result["errors"] == {}
+    assert set(result["models"]) == {"a:v1", "b:v1"}
+    lat = result["latency_ms"]
+    assert 0 < lat["p50"] <= lat["p99"] <= lat["max"] + 1e-9
+    assert sum(c for _, c in result["histogram_ms"]) == result["completed"]
+
+
+def test_closed_loop_runs_paced_and_unpaced(client):
+    paced = loadgen.run(client, loadgen.Workload(mode="closed", rate=100, concurrency=2, duration_s=0.5,
+                                                 warmup_s=0.1))
+    assert paced["co_correction"] == "schedule"
+    assert paced["completed"] == pytest.approx(50, abs=3)
+
+    unpaced = loadgen.run(client, loadgen.Workload(mode="closed", rate=0, concurrency=2, duration_s=0.3,
+                                                   warmup_s=0.1))
+    assert unpaced["co_correction"] == "backfill"
+    assert unpaced["completed"] > 0
+    assert unpaced["latency_ms"]["count"] >= unpaced["service_ms"]["count"]
+
+
+def test_errors_are_counted_by_code():
+    server, port = serve(delay_ms=50.0)
+    slow = CoreClient(target=f"127.0.0.1:{port}")
+    w = loadgen.Workload(mode="open", rate=100, arrival="fixed", duration_s=0.2, warmup_s=0, deadline_ms=5)
+    result = loadgen.run(slow, w)
+    slow.close()
+    server.stop(None)
+    assert result["errors"] == {"DEADLINE_EXCEEDED": result["sent"]}
+    assert result["slo"]["met"] is False
+
+
+def test_json_and_csv_export(client, tmp_path):
+    w = loadgen.Workload(mode="open", rate=100, duration_s=0.2, warmup_s=0)
+    result = loadgen.run(client, w, label="baseline")
+    loadgen.write_json(result, tmp_path / "run.json")
+    assert json.loads((tmp_path / "run.json").read_text())["label"] == "baseline"
+
+    path = str(tmp_path / "runs.csv")
+    loadgen.append_csv(result, path)
+    loadgen.append_csv(result, path)
+    with open(path) as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 2
+    assert rows[0]["label"] == "baseline" and rows[0]["mode"] == "open"
+    assert float(rows[0]["p99"]) == round(result["latency_ms"]["p99"], 3)
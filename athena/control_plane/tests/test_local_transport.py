@@ -0,0 +1,146 @@
+# control_plane/tests/test_local_transport.py
+import asyncio
+import os
+
+import numpy as np
+import pytest
+from prometheus_client import REGISTRY
+
+from control_plane.app import local_transport
+from control_plane.app.core_client import AsyncCoreClient, CoreClient
+from control_plane.app.local_transport import ShmRing, parse_target
+from control_plane.bench.stub_core import serve
+
+
+@pytest.fixture()
+def local_core(tmp_path):
+    socket = str(tmp_path / "core.sock")
+    server, _ = serve(unix_socket=socket)
+    yield server, socket
+    server.stop(None)
+
+
+def test_parse_target():
+    assert parse_target("localhost:50051") == ("localhost:50051", False)
+    assert parse_target("unix:///run/core.sock") == ("unix:/run/core.sock", False)
+    assert parse_target("shm:///run/core.sock") == ("unix:/run/core.sock", True)
+    assert parse_target("shm://") == (f"unix:{local_transport.DEFAULT_UNIX_SOCKET}", True)
+
+
+def test_unix_socket_target(local_core):
+    _, socket = local_core
+    core = CoreClient(target=f"unix://{socket}")
+    assert core.shm is None
+    assert core.run_inference("r1", [1.0, 2.0], "m")["outputs"] == [1.0, 2.0]
+    core.close()
+
+
+def test_shm_target_passes_tensors_through_shared_memory(local_core):
+    server, socket = local_core
+    core = CoreClient(target=f"shm://{socket}")
+    assert core.run_inference("r1", [1.0, 2.5], "m")["outputs"] == [1.0, 2.5]
+    assert list(server.servicer.shm_regions) == [core.shm.name]
+
+    arr = np.arange(12, dtype=np.float32).reshape(3, 4)
+    resp = core.run_inference("r2", arr, "m")
+    assert resp["outputs"].shape == (3, 4)
+    np.testing.assert_array_equal(resp["outputs"], arr)
+    # float64 has no shm path, and inline the core refuses it: its models run on float32
+    assert core.run_inference("r3", arr.astype(np.float64), "m")["code"] == "INVALID_ARGUMENT"
+
+    path = core.shm.path
+    core.close()
+    assert server.servicer.shm_regions == {}
+    assert not os.path.exists(path)
+
+
+def test_shm_outputs_are_written_by_the_core(local_core):
+    server, socket = local_core
+    core = CoreClient(target=f"shm://{socket}")
+    core.run_inference("warm", [0.0], "m")
+    seen = []
+    real_reply = server.servicer._reply
+
+    def spy(request, version=None, context=None):
+        reply = real_reply(request, version, context)
+        seen.append((request.HasField("input_shm"), reply.HasField("output_shm"), len(reply.outputs)))
+        return reply
+
+    server.servicer._reply = spy
+    assert core.run_inference("r1", [3.0] * 1000, "m")["outputs"] == [3.0] * 1000
+    assert seen == [(True, True, 0)]
+    core.close()
+
+
+def test_payloads_larger_than_a_slot_go_inline(local_core):
+    _, socket = local_core
+    core = CoreClient(target=f"shm://{socket}")
+    core.shm.close()
+    core.shm = ShmRing(slots=2, slot_bytes=1024)
+    big = np.ones(1024, dtype=np.float32)
+    np.testing.assert_array_equal(core.run_inference("big", big, "m")["outputs"], big)
+    assert core.shm.registered and len(core.shm._free) == 2
+    core.close()
+
+
+def test_lost_region_falls_back_inline_then_re_registers(local_core):
+    server, socket = local_core
+    core = CoreClient(target=f"shm://{socket}")
+    core.run_inference("r1", [1.0], "m")
+    server.servicer.shm_regions.clear()  # as if the core had restarted
+
+    assert core.run_inference("r2", [2.0], "m")["outputs"] == [2.0]
+    assert not core.shm.registered
+    assert core.run_inference("r3", [3.0], "m")["outputs"] == [3.0]
+    assert list(server.servicer.shm_regions) == [core.shm.name]
+    core.close()
+
+
+def test_retired_slots_come_back_when_the_ring_is_re_registered(tmp_path):
+    socket = str(tmp_path / "core.sock")
+    server, _ = serve(delay_ms=100.0, unix_socket=socket)
+    core = CoreClient(target=f"shm://{socket}")
+    core.shm.close()
+    core.shm = ShmRing(slots=4, slot_bytes=1024)
+    gauge = REGISTRY.get_sample_value("core_shm_slots_retired")
+
+    # the core may still write the late call's slot, so it is held back
+    assert core.run_inference("late", [1.0], "m", deadline_ms=20)["code"] == "DEADLINE_EXCEEDED"
+    assert core.shm.retired == 1 and not core.shm.registered
+    assert REGISTRY.get_sample_value("core_shm_slots_retired") == gauge + 1
+    old = core.shm.name
+
+    # the next call unregisters that name and registers the ring under a new one
+    assert core.run_inference("r2", [2.0], "m")["outputs"] == [2.0]
+    assert core.shm.name != old and list(server.servicer.shm_regions) == [core.shm.name]
+    assert core.shm.retired == 0 and len(core.shm._free) == 4
+    assert REGISTRY.get_sample_value("core_shm_slots_retired") == gauge
+    path = core.shm.path
+    core.close()
+    server.stop(None)
+    assert not os.path.exists(path)
+
+
+def test_shm_without_a_core_stays_inline(tmp_path):
+    core = CoreClient(target=f"shm://{tmp_path}/missing.sock", timeout_s=0.2)
+    assert core.run_inference("r1", [1.0], "m")["code"] == "UNAVAILABLE"
+    assert not core.shm.registered and not core.shm.disabled  # retried on the next call
+    core.close()
+
+
+def test_async_client_shm_target(local_core):
+    server, socket = local_core
+
+    async def scenario():
+        client = AsyncCoreClient(targets=[f"shm://{socket}"], channels_per_target=2)
+        replies = await asyncio.gather(*(client.run_inference(f"r{i}", [float(i)] * 8, "m") for i in range(20)))
+        regions = list(server.servicer.shm_regions)
+        ring = client._shm[f"shm://{socket}"]
+        await client.close()
+        return replies, regions, ring
+
+    replies, regions, ring = asyncio.run(scenario())
+    assert [r["outputs"] for r in replies] == [[float(i)] * 8 for i in range(20)]
+    assert regions == [ring.name]
+    assert server.servicer.shm_regions == {}
+    ring.close()
@@ -0,0 +1,60 @@
+# control_plane/tests/test_log_bus.py
+import asyncio
+import threading
+
+from control_plane.app.log_bus import LogBus
+
+
+def test_fan_out_reaches_every_subscriber():
+    async def scenario():
+        bus = LogBus()
+        subs = [bus.subscribe() for _ in range(3)]
+        bus.publish("INFO", "hello")
+        got = [(await s.get(timeout=1)).format() for s in subs]
+        for s in subs:
+            s.close()
+        return got, bus.subscriber_count()
+
+    got, remaining = asyncio.run(scenario())
+    assert got == ["[INFO] hello"] * 3
+    assert remaining == 0
+
+
+def test_full_buffer_drops_oldest():
+    async def scenario():
+        bus = LogBus(buffer_size=3)
+        sub = bus.subscribe()
+        for i in range(10):
+            bus.publish("INFO", f"line {i}")
+        got = [(await sub.get(timeout=1)).message for _ in range(3)]
+        return got, sub.dropped
+
+    got, dropped = asyncio.run(scenario())
+    assert got == ["line 7", "line 8", "line 9"]
+    assert dropped == 7
+
+
+def test_level_and_model_filters():
+    async def scenario():
+        bus = LogBus()
+        errors = bus.subscribe(levels=["error"])
+        fraud = bus.subscribe(model="fraud-detector")
+        bus.publish("MODEL", "loading", model="fraud-detector")
+        bus.publish("ERROR", "boom", model="ranker")
+        return (await errors.get(timeout=1)).message, (await fraud.get(timeout=1)).message, \
+            await errors.get(timeout=0.05)
+
+    err, fraud, nothing_else = asyncio.run(scenario())
+    assert err == "boom"
+    assert fraud == "loading"
+    assert nothing_else is None
+
+
+def test_publish_from_worker_thread_wakes_subscriber():
+    async def scenario():
+        bus = LogBus()
+        sub = bus.subscribe()
+        threading.Thread(target=bus.publish, args=("INFO", "from thread")).start()
+        return await sub.get(timeout=1)
+
+    assert asyncio.run(scenario()).message == "from thread"
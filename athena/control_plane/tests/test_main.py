@@ -36,4 +36,26 @@ def test_get_model_not_found():
     assert r.status_code == 200
     
     # NOTE: The app now returns a dictionary, which includes the 'status' field correctly.
-    assert r.json().get("status") == "not_loaded"
\ No newline at end of file
+    assert r.json().get("status") == "not_loaded"
+
+def test_ui_metrics_reports_recorded_latency():
+    client.get("/health")
+    r = client.get("/api/metrics")
+    assert r.status_code == 200
+    data = r.json()
+    assert float(data["rps"]) > 0
+    assert data["p95"].endswith("ms")
+    assert len(data["history"]) == 10
+    assert "/health" in data["endpoints"]
+
+def test_unmatched_paths_share_one_latency_series():
+    for i in range(3):
+        assert client.get(f"/no-such-page-{i}").status_code == 404
+    endpoints = client.get("/api/metrics").json()["endpoints"]
+    assert "<unmatched>" in endpoints
+    assert not any(e.startswith("/no-such-page") for e in endpoints)
+
+def test_prometheus_metrics_endpoint():
+    r = client.get("/metrics")
+    assert r.status_code == 200
+    assert "http_requests_total" in r.text
@@ -0,0 +1,79 @@
+# control_plane/tests/test_model_cache.py
+import asyncio
+import pytest
+from sqlalchemy import event, update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from control_plane.app.db import Base
+from control_plane.app import models, crud
+from control_plane.app.model_cache import cache_for, REGISTRY_VERSION_BUMP
+
+
+@pytest.fixture(scope="function")
+def run_db(tmp_path):
+    """Run `scenario(engine, SessionLocal, statements)` against a fresh SQLite file."""
+    def run(scenario):
+        async def main():
+            engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'registry.db'}")
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+            statements = []
+            event.listen(engine.sync_engine, "before_cursor_execute",
+                         lambda conn, cur, stmt, *a: statements.append(stmt))
+            SessionLocal = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+            try:
+                return await scenario(engine, SessionLocal, statements)
+            finally:
+                await engine.dispose()
+        return asyncio.run(main())
+    return run
+
+
+def _model_selects(statements):
+    return [s for s in statements if "FROM models" in s]
+
+
+def test_lookups_are_served_from_cache_until_a_write(run_db):
+    async def scenario(engine, SessionLocal, statements):
+        async with SessionLocal() as db:
+            await crud.create_or_update_model(db, "fraud-detector", "v0.1", models.ModelStatus.LOADED)
+
+            statements.clear()
+            for _ in range(50):
+                assert (await crud.get_model_by_name(db, "fraud-detector")).status == models.ModelStatus.LOADED
+                assert len(await crud.list_models(db)) == 1
+            assert len(_model_selects(statements)) == 2  # one miss per query shape
+
+            await crud.create_or_update_model(db, "fraud-detector", "v0.1", models.ModelStatus.FAILED)
+            assert (await crud.get_model_by_name(db, "fraud-detector")).status == models.ModelStatus.FAILED
+    run_db(scenario)
+
+
+def test_remote_write_is_detected_through_version_counter(run_db):
+    async def scenario(engine, SessionLocal, statements):
+        async with SessionLocal() as db:
+            await crud.create_or_update_model(db, "fraud-detector", "v0.1", models.ModelStatus.LOADED)
+            cache = cache_for(db.get_bind())
+            cache.coherence_interval_s = 0.0
+            await crud.get_model_by_name(db, "fraud-detector")
+            assert len(cache) == 1
+
+            # another replica changes the row and bumps the counter without touching our cache
+            async with SessionLocal() as other:
+                await other.execute(update(models.Model).values(status=models.ModelStatus.NOT_LOADED))
+                await other.execute(REGISTRY_VERSION_BUMP)
+                await other.commit()
+
+            assert (await crud.get_model_by_name(db, "fraud-detector")).status == models.ModelStatus.NOT_LOADED
+    run_db(scenario)
+
+
+def test_cache_evicts_least_recently_used(run_db):
+    async def scenario(engine, SessionLocal, statements):
+        async with SessionLocal() as db:
+            cache = cache_for(db.get_bind())
+            cache.max_entries = 2
+            for name in ("a", "b", "c"):
+                await crud.get_model_by_name(db, name)
+            assert len(cache) == 2
+    run_db(scenario)
@@ -0,0 +1,147 @@
+# control_plane/tests/test_model_swap.py
+import threading
+import time
+
+from fastapi.testclient import TestClient
+import pytest
+
+from control_plane.app import main
+from control_plane.app.core_client import CoreClient
+from control_plane.app.main import app
+from control_plane.bench.stub_core import serve
+
+client = TestClient(app)
+
+
+@pytest.fixture()
+def versioned_core():
+    server, port = serve(delay_ms=10.0, registry=True)
+    core = CoreClient(target=f"127.0.0.1:{port}")
+    yield server, core
+    core.close()
+    server.stop(None)
+
+
+def test_unversioned_traffic_switches_versions_without_errors(versioned_core):
+    _, core = versioned_core
+    assert core.load_model("m", "v1")["ok"]
+    results, stop = [], threading.Event()
+
+    def traffic(worker):
+        i = 0
+        while not stop.is_set():
+            results.append((worker, core.run_inference(f"{worker}-{i}", [1.0], "m")))
+            i += 1
+
+    workers = [threading.Thread(target=traffic, args=(w,)) for w in range(4)]
+    for t in workers:
+        t.start()
+    time.sleep(0.1)
+    assert core.load_model("m", "v2")["ok"]
+    assert core.get_model_status("m", "v2")["active_version"] == "v1"  # loaded, not yet routed to
+    assert core.set_active_version("m", "v2")["ok"]
+    assert core.unload_model("m", "v1")["ok"]  # returns once v1's requests have finished
+    time.sleep(0.1)
+    stop.set()
+    for t in workers:
+        t.join()
+
+    assert results and all("error" not in r for _, r in results)
+    for w in range(4):
+        versions = [r["model_version"] for worker, r in results if worker == w]
+        # each caller sees v1 until the switch and v2 after it, never back
+        assert versions == sorted(versions) and versions[0] == "v1" and versions[-1] == "v2"
+    assert core.get_model_status("m", "v1")["status"] == "not_loaded"
+
+
+def test_unload_reports_requests_that_did_not_drain(versioned_core):
+    server, core = versioned_core
+    server.servicer.delay_s = 0.3
+    core.load_model("m", "v1")
+    slow = threading.Thread(target=core.run_inference, args=("slow", [1.0], "m"))
+    slow.start()
+    while core.get_model_status("m", "v1")["in_flight"] == 0:
+        time.sleep(0.005)
+
+    resp = core.unload_model("m", "v1", drain_timeout_ms=20)
+    assert not resp["ok"] and "in flight" in resp["message"]
+    assert core.get_model_status("m", "v1")["status"] == "draining"
+    assert core.run_inference("late", [1.0], "m", "v1")["code"] == "NOT_FOUND"
+    slow.join()
+    assert core.unload_model("m", "v1", drain_timeout_ms=20)["ok"]
+
+
+@pytest.fixture()
+def fake_core(monkeypatch):
+    calls = []
+    active = {}  # like the core: the first loaded version is active until another is set
+
+    def fake(method, ok=True):
+        async def call(model_name, version, *args):
+            calls.append((method, version))
+            if method == "LoadModel":
+                active.setdefault(model_name, version)
+            elif method == "SetActiveVersion":
+                active[model_name] = version
+            elif method == "UnloadModel" and active.get(model_name) == version:
+                del active[model_name]
+            return {"ok": ok, "message": f"{method} {model_name}:{version}"}
+        return call
+
+    async def get_model_status(model_name, version):
+        return {"model_name": model_name, "version": version, "active_version": active.get(model_name, "")}
+
+    async def run_inference(request_id, inputs, model_name, model_version="", **kwargs):
+        calls.append(("RunInference", model_version))
+        return {"error": "cold"} if model_version == "bad" else {"request_id": request_id, "outputs": inputs}
+
+    monkeypatch.setattr(main.core_client, "load_model", fake("LoadModel"))
+    monkeypatch.setattr(main.core_client, "unload_model", fake("UnloadModel"))
+    monkeypatch.setattr(main.core_client, "set_active_version", fake("SetActiveVersion"))
+    monkeypatch.setattr(main.core_client, "run_inference", run_inference)
+    monkeypatch.setattr(main.core_client, "get_model_status", get_model_status)
+    return calls
+
+
+def test_swap_endpoint_warms_up_switches_then_drains(fake_core):
+    first = client.post("/models/swap", json={"model_name": "swap-model", "version": "v1", "warmup": False})
+    assert first.status_code == 200
+    assert first.json() == {"model_name": "swap-model", "active_version": "v1", "previous_version": None,
+                            "drained": True, "message": ""}
+    fake_core.clear()
+
+    r = client.post("/models/swap", json={"model_name": "swap-model", "version": "v2"})
+    assert r.status_code == 200
+    assert r.json()["previous_version"] == "v1" and r.json()["drained"]
+    # warm-up traffic ran on v2 before it was activated, and v1 went away last
+    steps = [method for method, _ in fake_core if method != "RunInference"]
+    assert steps == ["LoadModel", "SetActiveVersion", "UnloadModel"]
+    activate = fake_core.index(("SetActiveVersion", "v2"))
+    assert ("RunInference", "v2") in fake_core[:activate]
+    assert fake_core[-1] == ("UnloadModel", "v1")
+
+    model = client.get("/models/swap-model").json()
+    assert model["active_version"] == "v2"
+    assert client.post("/models/swap", json={"model_name": "swap-model", "version": "v2"}).json()["message"] == \
+        "already active"
+
+
+def test_failed_warm_up_keeps_the_old_version_active(fake_core):
+    client.post("/models/swap", json={"model_name": "swap-keep", "version": "v1", "warmup": False})
+    r = client.post("/models/swap", json={"model_name": "swap-keep", "version": "bad"})
+    assert r.status_code == 500
+    assert ("SetActiveVersion", "bad") not in fake_core
+    assert fake_core[-1] == ("UnloadModel", "bad")
+    assert client.get("/models/swap-keep").json()["active_version"] == "v1"
+
+
+def test_swap_drains_a_version_loaded_without_a_swap(fake_core):
+    assert client.post("/models/load", json={"model_name": "swap-loaded", "version": "v1"}).status_code == 200
+    fake_core.clear()
+
+    r = client.post("/models/swap", json={"model_name": "swap-loaded", "version": "v2", "warmup": False})
+    assert r.status_code == 200
+    assert r.json()["previous_version"] == "v1" and r.json()["drained"]
+    assert fake_core[-1] == ("UnloadModel", "v1")
+    versions = {m["version"]: m["status"] for m in client.get("/api/models").json() if m["name"] == "swap-loaded"}
+    assert versions == {"v1": "not_loaded", "v2": "loaded"}
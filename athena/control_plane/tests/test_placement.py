@@ -0,0 +1,120 @@
+# control_plane/tests/test_placement.py
+import asyncio
+
+import pytest
+
+from control_plane.app.core_client import AsyncCoreClient
+from control_plane.app.placement import PlacementEngine, PlacementError, parse_replication
+from control_plane.bench.stub_core import serve
+
+
+@pytest.fixture()
+def cores():
+    servers = [serve(registry=True) for _ in range(3)]
+    yield [s for s, _ in servers], [f"127.0.0.1:{port}" for _, port in servers]
+    for s, _ in servers:
+        s.stop(None)
+
+
+def test_parse_replication():
+    assert parse_replication("fraud=3, ranker=2,,bad") == {"fraud": 3, "ranker": 2}
+
+
+def test_place_tops_up_to_the_replication_factor():
+    engine = PlacementEngine(["a", "b", "c"], replication={"hot": 2})
+    assert engine.place("cold", "v1") and len(engine.place("cold", "v1")) == 1
+    assert len(engine.place("hot", "v1")) == 2
+    assert len(PlacementEngine(["a"], replication={"hot": 5}).place("hot", "v1")) == 1  # capped at the replicas
+
+    engine.assign("hot", "v1", ["b"])
+    placed = engine.place("hot", "v1")
+    assert placed[0] == "b" and len(placed) == 2  # keeps the existing copy
+    engine.set_replication("hot", 1)
+    assert engine.place("hot", "v1") == ["b"]
+
+
+def test_place_prefers_idle_replicas_with_room():
+    engine = PlacementEngine(["a", "b", "c"], replica_memory_mb=1000, model_memory_mb=400)
+    engine.assign("m1", "v1", ["a"])
+    engine.assign("m2", "v1", ["a"])
+    engine.observe_load("b", 10)
+    assert engine.place("m3", "v1") == ["c"]  # a is full, b is busy
+    # a new version goes next to the old one while it fits
+    engine.assign("m3", "v1", ["c"])
+    assert engine.place("m3", "v2") == ["c"]
+
+    engine.assign("m4", "v1", ["b", "c"])
+    engine.set_memory("big", 700)
+    with pytest.raises(PlacementError):
+        engine.place("big", "v1")
+
+
+def test_unversioned_requests_follow_the_active_version():
+    engine = PlacementEngine(["a", "b"])
+    engine.assign("m", "v1", ["a"])
+    engine.assign("m", "v2", ["b"])
+    assert engine.hosts("m") == ["a", "b"]
+    engine.set_active("m", "v2")
+    assert engine.hosts("m") == ["b"] and engine.hosts("m", "v1") == ["a"]
+
+
+def test_restore_keeps_runtime_replication():
+    engine = PlacementEngine(["a", "b", "c"])
+    engine.restore([("hot", "v1", "a", 0.0), ("hot", "v1", "b", 0.0), ("m", "v1", "gone:50051", 0.0)])
+    assert engine.hosts("hot", "v1") == ["a", "b"] and engine.replication_for("hot") == 2
+    assert engine.hosts("m") == []
+
+
+def test_pick_routes_to_the_least_busy_host():
+    async def scenario():
+        client = AsyncCoreClient(targets=["a:1", "b:1", "c:1"], channels_per_target=2)
+        client._ensure_pool()
+        for ch in client._channels:
+            ch.outstanding = {"a:1": 5, "b:1": 1, "c:1": 0}[ch.target]
+        picks = {client._pick(["a:1", "b:1"]).target for _ in range(10)}
+        for ch in client._channels:
+            if ch.target == "b:1":
+                ch.healthy = False
+        fallback = client._pick(["a:1", "b:1"]).target
+        await client.close()
+        return picks, fallback
+
+    picks, fallback = asyncio.run(scenario())
+    assert picks == {"b:1"}
+    assert fallback == "a:1"
+
+
+def test_models_load_on_their_replicas_and_inference_follows(cores):
+    servers, targets = cores
+
+    async def scenario():
+        engine = PlacementEngine(targets, replication={"hot": 2})
+        client = AsyncCoreClient(targets=targets, placement=engine)
+        hot = await client.load_model("hot", "v1")
+        cold = await client.load_model("cold", "v1")
+        replies = await asyncio.gather(*(client.run_inference(f"r{i}", [1.0], "hot" if i % 2 else "cold")
+                                         for i in range(40)))
+        engine.set_replication("hot", 1)
+        trimmed = await client.load_model("hot", "v1")
+        unloaded = await client.unload_model("cold", "v1")
+        status = await client.get_model_status("hot", "v1")
+        await client.close()
+        return hot, cold, replies, trimmed, unloaded, status, engine
+
+    hot, cold, replies, trimmed, unloaded, status, engine = asyncio.run(scenario())
+    assert hot["ok"] and len(hot["replicas"]) == 2
+    assert cold["ok"] and len(cold["replicas"]) == 1
+    assert cold["replicas"][0] not in hot["replicas"]  # the idle replica
+    # only the hosts saw inference, and the registry would have refused it anywhere else
+    assert all("error" not in r for r in replies)
+    for server, target in zip(servers, targets):
+        calls = server.servicer.model_calls
+        assert (calls.get(("hot", "v1"), 0) > 0) == (target in hot["replicas"])
+        assert (calls.get(("cold", "v1"), 0) > 0) == (target in cold["replicas"])
+
+    assert trimmed["ok"] and len(trimmed["replicas"]) == 1
+    dropped = [t for t in hot["replicas"] if t not in trimmed["replicas"]][0]
+    assert servers[targets.index(dropped)].servicer.registry.status("hot", "v1")[0] == "not_loaded"
+    assert unloaded["ok"] and engine.hosts("cold") == []
+    assert status["status"] == "loaded"
+
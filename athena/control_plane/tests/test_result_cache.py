@@ -0,0 +1,125 @@
+# control_plane/tests/test_result_cache.py
+import asyncio
+import time
+
+import pytest
+
+from control_plane.app.core_client import AsyncCoreClient, CoreClient, build_inference_request
+from control_plane.app.result_cache import ResultCache
+from control_plane.bench.stub_core import serve
+
+
+@pytest.fixture()
+def stub_core():
+    server, port = serve(delay_ms=2.0)
+    yield server, f"127.0.0.1:{port}"
+    server.stop(None)
+
+
+def _req(request_id, inputs, model="fraud-detector", version="v1"):
+    return build_inference_request(request_id, inputs, model, version)
+
+
+def _reply(request_id, outputs):
+    return {"request_id": request_id, "outputs": outputs, "latency_ms": 5.0, "status": "ok"}
+
+
+def test_hit_returns_cached_outputs_under_the_callers_request_id():
+    cache = ResultCache(models=["fraud-detector"])
+    hit, token = cache.lookup(_req("a", [1.0, 2.0]))
+    assert hit is None
+    cache.store(token, _reply("a", [0.9]))
+
+    hit, token = cache.lookup(_req("b", [1.0, 2.0]))
+    assert token is None
+    assert hit["request_id"] == "b"
+    assert hit["outputs"] == [0.9]
+    assert hit["cached"] is True
+    # different inputs, version or model never share an entry
+    assert cache.lookup(_req("c", [1.0, 2.5]))[0] is None
+    assert cache.lookup(_req("d", [1.0, 2.0], version="v2"))[0] is None
+    assert cache.stats()["models"]["fraud-detector"] == {"hits": 1, "misses": 3, "hit_rate": 0.25}
+
+
+def test_only_enabled_models_are_cached():
+    cache = ResultCache(models=["fraud-detector"])
+    assert cache.lookup(_req("a", [1.0], model="other")) == (None, None)
+    cache.enable("other")
+    assert cache.lookup(_req("a", [1.0], model="other"))[1] is not None
+    cache.disable("other")
+    assert not cache.enabled("other")
+    assert ResultCache(models=["*"]).enabled("anything")
+
+
+def test_entries_expire_after_ttl():
+    cache = ResultCache(models=["fraud-detector"], ttl_s=0.05)
+    _, token = cache.lookup(_req("a", [1.0]))
+    cache.store(token, _reply("a", [1.0]))
+    assert cache.lookup(_req("b", [1.0]))[0] is not None
+    time.sleep(0.06)
+    assert cache.lookup(_req("c", [1.0]))[0] is None
+    assert len(cache) == 0
+
+
+def test_byte_budget_evicts_least_recently_used():
+    # each entry is 256 bytes of overhead + 32 per output
+    cache = ResultCache(models=["fraud-detector"], max_bytes=3 * (256 + 32))
+    for i in range(3):
+        _, token = cache.lookup(_req(f"r{i}", [float(i)]))
+        cache.store(token, _reply(f"r{i}", [float(i)]))
+    cache.lookup(_req("touch", [0.0]))  # entry 0 becomes most recently used
+    _, token = cache.lookup(_req("r3", [3.0]))
+    cache.store(token, _reply("r3", [3.0]))
+
+    assert len(cache) == 3
+    assert cache.stats()["bytes"] <= cache.max_bytes
+    assert cache.lookup(_req("x", [1.0]))[0] is None  # entry 1 was evicted
+    assert cache.lookup(_req("y", [0.0]))[0] is not None
+
+
+def test_errors_are_not_cached():
+    cache = ResultCache(models=["fraud-detector"])
+    _, token = cache.lookup(_req("a", [1.0]))
+    cache.store(token, {"error": "boom", "code": "UNAVAILABLE"})
+    assert len(cache) == 0
+
+
+def test_reply_in_flight_during_a_model_change_is_not_stored():
+    cache = ResultCache(models=["fraud-detector"])
+    _, token = cache.lookup(_req("a", [1.0]))
+    cache.invalidate("fraud-detector")  # e.g. LoadModel of a new version meanwhile
+    cache.store(token, _reply("a", [1.0]))
+    assert len(cache) == 0
+
+
+def test_client_serves_duplicates_from_cache_and_invalidates_on_load(stub_core):
+    server, target = stub_core
+    cache = ResultCache(models=["fraud-detector"])
+    client = CoreClient(target=target, cache=cache)
+    first = client.run_inference("a", [1.0, 2.0], "fraud-detector", "v1")
+    retry = client.run_inference("a-retry", [1.0, 2.0], "fraud-detector", "v1")
+    assert server.servicer.calls == 1
+    assert retry["request_id"] == "a-retry"
+    assert retry["outputs"] == first["outputs"]
+
+    assert client.load_model("fraud-detector", "v2")["ok"]
+    client.run_inference("b", [1.0, 2.0], "fraud-detector", "v1")
+    client.close()
+    assert server.servicer.calls == 2
+
+
+def test_async_client_uses_the_cache(stub_core):
+    server, target = stub_core
+
+    async def scenario():
+        cache = ResultCache(models=["fraud-detector"])
+        client = AsyncCoreClient(targets=[target], cache=cache)
+        results = [await client.run_inference(f"req-{i}", [3.0], "fraud-detector", "v1") for i in range(5)]
+        await client.unload_model("fraud-detector", "v1")
+        results.append(await client.run_inference("after-unload", [3.0], "fraud-detector", "v1"))
+        await client.close()
+        return results
+
+    results = asyncio.run(scenario())
+    assert [r["request_id"] for r in results] == [f"req-{i}" for i in range(5)] + ["after-unload"]
+    assert server.servicer.calls == 2
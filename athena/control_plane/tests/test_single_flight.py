@@ -0,0 +1,89 @@
+# control_plane/tests/test_single_flight.py
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from control_plane.app.core_client import AsyncCoreClient, CoreClient
+from control_plane.app.result_cache import ResultCache
+from control_plane.app.single_flight import SingleFlight
+from control_plane.bench.stub_core import serve
+
+
+@pytest.fixture()
+def slow_core():
+    server, port = serve(delay_ms=50.0)
+    yield server, f"127.0.0.1:{port}"
+    server.stop(None)
+
+
+def _burst(target, requests, **client_args):
+    async def scenario():
+        client = AsyncCoreClient(targets=[target], **client_args)
+        results = await asyncio.gather(*(client.run_inference(*r) for r in requests))
+        await client.close()
+        return results
+    return asyncio.run(scenario())
+
+
+def test_concurrent_identical_requests_share_one_call(slow_core):
+    server, target = slow_core
+    flight = SingleFlight(models=["fraud-detector"])
+    results = _burst(target, [(f"req-{i}", [1.0, 2.0], "fraud-detector", "v1") for i in range(20)],
+                     single_flight=flight)
+
+    assert server.servicer.calls == 1
+    assert [r["request_id"] for r in results] == [f"req-{i}" for i in range(20)]
+    assert all(r["outputs"] == [1.0, 2.0] for r in results)
+    assert sum(bool(r.get("coalesced")) for r in results) == 19
+    assert flight.stats()["models"]["fraud-detector"] == {"calls": 1, "coalesced": 19}
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_different_inputs_and_disabled_models_are_not_coalesced(slow_core):
+    server, target = slow_core
+    flight = SingleFlight(models=["fraud-detector"])
+    _burst(target, [("a", [1.0], "fraud-detector", "v1"), ("b", [2.0], "fraud-detector", "v1"),
+                    ("c", [1.0], "fraud-detector", "v2"), ("d", [1.0], "other", "v1"),
+                    ("e", [1.0], "other", "v1")], single_flight=flight)
+    assert server.servicer.calls == 5
+
+
+def test_threads_share_one_call(slow_core):
+    server, target = slow_core
+    client = CoreClient(target=target, single_flight=SingleFlight(models=["*"]))
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda i: client.run_inference(f"req-{i}", [3.0], "fraud-detector", "v1"), range(8)))
+    client.close()
+    assert server.servicer.calls == 1
+    assert [r["request_id"] for r in results] == [f"req-{i}" for i in range(8)]
+
+
+def test_followers_outlive_a_leader_whose_deadline_expired(slow_core):
+    server, target = slow_core
+
+    async def scenario():
+        client = AsyncCoreClient(targets=[target], single_flight=SingleFlight(models=["fraud-detector"]))
+        leader = asyncio.ensure_future(client.run_inference("tight", [1.0], "fraud-detector", "v1", deadline_ms=10))
+        await asyncio.sleep(0)
+        follower = await client.run_inference("loose", [1.0], "fraud-detector", "v1")
+        results = await leader, follower
+        await client.close()
+        return results
+
+    leader, follower = asyncio.run(scenario())
+    assert leader["code"] == "DEADLINE_EXCEEDED"
+    assert follower["outputs"] == [1.0]
+    assert server.servicer.calls == 2
+
+
+def test_cache_is_filled_once_by_the_leader(slow_core):
+    server, target = slow_core
+    cache = ResultCache(models=["fraud-detector"])
+    flight = SingleFlight(models=["fraud-detector"])
+    _burst(target, [(f"req-{i}", [4.0], "fraud-detector", "v1") for i in range(10)],
+           cache=cache, single_flight=flight)
+    [retry] = _burst(target, [("retry", [4.0], "fraud-detector", "v1")], cache=cache, single_flight=flight)
+    assert retry["cached"] is True
+    assert server.servicer.calls == 1
+    assert len(cache) == 1
@@ -0,0 +1,44 @@
+# control_plane/tests/test_tensor.py
+import array
+import pytest
+
+from control_plane.app.core_client import CoreClient
+from control_plane.app.tensor import from_tensor, to_tensor
+from control_plane.bench.stub_core import serve
+
+
+def test_memoryview_round_trip():
+    t = to_tensor(memoryview(array.array("f", [1.0, 2.0, 3.0, 4.0])).cast("B").cast("f", [2, 2]))
+    assert list(t.shape) == [2, 2]
+    assert len(t.data) == 16
+    out = from_tensor(t, as_numpy=False)
+    assert out.format == "f"
+    assert out.tolist() == [[1.0, 2.0], [3.0, 4.0]]
+
+
+def test_numpy_round_trip_is_little_endian():
+    np = pytest.importorskip("numpy")
+    arr = np.arange(6, dtype=">f8").reshape(3, 2)  # big-endian input is normalised
+    t = to_tensor(arr)
+    assert t.data == arr.astype("<f8").tobytes()
+    out = from_tensor(t)
+    assert out.dtype == np.dtype("<f8")
+    assert out.shape == (3, 2)
+    assert (out == arr).all()
+
+
+def test_unsupported_dtype_is_rejected():
+    with pytest.raises(TypeError):
+        to_tensor(memoryview(b"\x00" * 4).cast("h"))
+
+
+def test_core_client_sends_packed_tensor():
+    np = pytest.importorskip("numpy")
+    server, port = serve()
+    client = CoreClient(target=f"127.0.0.1:{port}")
+    features = np.linspace(0.0, 1.0, 4096, dtype=np.float32)
+    r = client.run_inference("req-1", features, "fraud-detector", "v0.1")
+    client.close()
+    server.stop(None)
+    assert isinstance(r["outputs"], np.ndarray)
+    assert np.array_equal(r["outputs"], features)
@@ -0,0 +1,107 @@
+# control_plane/tests/test_tracing.py
+import json
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from control_plane.app import main
+from control_plane.app.core_client import AsyncCoreClient
+from control_plane.app.tracing import (FileSpanExporter, InMemorySpanExporter, Tracer, add_stage_spans,
+                                       parse_traceparent)
+from control_plane.bench.stub_core import serve
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+PARENT = f"00-{TRACE_ID}-00f067aa0ba902b7-01"
+
+
+@pytest.fixture()
+def stub():
+    server, port = serve(delay_ms=2.0)
+    yield server.servicer, f"127.0.0.1:{port}"
+    server.stop(None)
+
+
+def test_parse_traceparent():
+    assert parse_traceparent(PARENT) == (TRACE_ID, "00f067aa0ba902b7", True)
+    assert parse_traceparent(PARENT[:-2] + "00")[2] is False
+    assert parse_traceparent(f"01-{TRACE_ID}-00f067aa0ba902b7-01-extra") is not None  # future versions
+    for bad in (None, "", "garbage", PARENT.upper(), f"00-{'0' * 32}-00f067aa0ba902b7-01",
+                f"ff-{TRACE_ID}-00f067aa0ba902b7-01", PARENT + "-extra"):
+        assert parse_traceparent(bad) is None, bad
+
+
+def test_sampling_follows_the_caller_then_the_rate():
+    never = Tracer(InMemorySpanExporter(), sample_rate=0.0)
+    assert never.start_span("r") is None
+    span = never.start_span("r", PARENT)
+    assert span.trace_id == TRACE_ID and span.parent_span_id == "00f067aa0ba902b7"
+    assert Tracer(InMemorySpanExporter(), sample_rate=1.0).start_span("r", PARENT[:-2] + "00") is None
+    assert Tracer(InMemorySpanExporter(), sample_rate=1.0).start_span("r").parent_span_id == ""
+    assert Tracer(None, sample_rate=1.0).start_span("r", PARENT) is None  # nowhere to export
+
+
+def test_stage_spans_fill_the_core_time():
+    exporter = InMemorySpanExporter()
+    rpc = Tracer(exporter).start_span("rpc", PARENT)
+    ms = 1_000_000
+    rpc.start_ns = 0
+    add_stage_spans(rpc, {"queue_ms": 1.0, "batch_ms": 2.0, "exec_ms": 3.0, "total_ms": 8.0}, 10 * ms)
+    spans = {s.name: s for s in exporter.get_finished_spans()}
+    core = spans["athena.core/server"]
+    assert (core.start_ns, core.end_ns) == (1 * ms, 9 * ms)  # network time split around it
+    assert [(spans[f"athena.core/{n}"].start_ns, spans[f"athena.core/{n}"].end_ns)
+            for n in ("queue_wait", "batch_wait", "exec")] == [(3 * ms, 4 * ms), (4 * ms, 6 * ms), (6 * ms, 9 * ms)]
+    assert all(spans[f"athena.core/{n}"].parent_span_id == core.span_id for n in ("queue_wait", "batch_wait", "exec"))
+
+
+def test_traced_inference_carries_context_to_the_core(stub):
+    servicer, target = stub
+    exporter = InMemorySpanExporter()
+    tracer = Tracer(exporter, sample_rate=0.0)
+
+    async def scenario():
+        client = AsyncCoreClient(targets=[target])
+        untraced = await client.run_inference("plain", [1.0], "m")
+        with tracer.start_span("request", PARENT) as root:
+            traced = await client.run_inference("traced", [1.0], "m")
+        await client.close()
+        return untraced, traced, root
+
+    untraced, traced, root = asyncio.run(scenario())
+    assert "timings" not in untraced
+    assert traced["timings"]["exec_ms"] == pytest.approx(2.0) and traced["timings"]["total_ms"] >= 2.0
+    assert len(servicer.traceparents) == 1 and TRACE_ID in servicer.traceparents[0]
+
+    spans = {s.name: s for s in exporter.get_finished_spans(TRACE_ID)}
+    rpc = spans["athena.core/RunInference"]
+    assert rpc.parent_span_id == root.span_id and servicer.traceparents[0] == rpc.traceparent()
+    assert spans["athena.core/server"].parent_span_id == rpc.span_id
+    assert rpc.start_ns <= spans["athena.core/exec"].start_ns <= spans["athena.core/exec"].end_ns <= rpc.end_ns
+
+
+def test_file_exporter_writes_otlp_json_lines(tmp_path):
+    path = tmp_path / "spans.jsonl"
+    exporter = FileSpanExporter(str(path))
+    span = Tracer(exporter).start_span("request", PARENT, {"model": "m", "batch": 4})
+    span.child("athena.core/RunInference").end()
+    span.set_error("boom")
+    span.end()
+    exporter.close()
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [l["name"] for l in lines] == ["athena.core/RunInference", "request"]
+    assert lines[0]["parentSpanId"] == lines[1]["spanId"] and lines[1]["traceId"] == TRACE_ID
+    assert {"key": "batch", "value": {"intValue": "4"}} in lines[1]["attributes"]
+    assert lines[1]["status"] == {"code": "STATUS_CODE_ERROR", "message": "boom"}
+
+
+def test_http_requests_are_traced(monkeypatch):
+    monkeypatch.setattr(main, "tracer", Tracer(InMemorySpanExporter(), sample_rate=0.0))
+    client = TestClient(main.app)
+    assert "traceparent" not in client.get("/health").headers
+    r = client.get("/health", headers={"traceparent": PARENT})
+    assert parse_traceparent(r.headers["traceparent"])[0] == TRACE_ID
+
+    spans = client.get("/api/traces", params={"trace_id": TRACE_ID}).json()["spans"]
+    assert [s["name"] for s in spans] == ["GET /health"]
+    assert {"key": "http.response.status_code", "value": {"intValue": "200"}} in spans[0]["attributes"]
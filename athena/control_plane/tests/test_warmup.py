@@ -0,0 +1,79 @@
+# control_plane/tests/test_warmup.py
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from control_plane.app import main
+from control_plane.app.core_client import AsyncCoreClient
+from control_plane.app.result_cache import ResultCache
+from control_plane.app.single_flight import SingleFlight
+from control_plane.app.warmup import WarmupConfig, warm_up_model
+from control_plane.bench.stub_core import serve
+
+
+class FakeCore:
+    """Latency starts high (cold) and decays to a floor, like a JIT-ing backend."""
+
+    def __init__(self, cold_ms=20.0, warm_ms=2.0, fail=False):
+        self.latency_ms = cold_ms
+        self.warm_ms = warm_ms
+        self.fail = fail
+        self.calls = 0
+
+    async def run_inference(self, request_id, inputs, model_name="", model_version="", use_cache=True,
+                            coalesce=True):
+        self.calls += 1
+        if self.fail:
+            return {"error": "model not loaded"}
+        await asyncio.sleep(self.latency_ms / 1000.0)
+        self.latency_ms = max(self.warm_ms, self.latency_ms * 0.7)
+        return {"request_id": request_id, "outputs": inputs, "latency_ms": self.latency_ms, "status": "ok"}
+
+
+def test_warm_up_runs_until_latency_settles():
+    cfg = WarmupConfig(batch_size=2, max_rounds=40, settle_rounds=3, settle_tolerance=0.2)
+    result = asyncio.run(warm_up_model(FakeCore(), "fraud-detector", "v0.2", cfg))
+    assert result.ok and result.settled
+    assert result.curve_ms[0] > result.curve_ms[-1]
+    assert len(result.curve_ms) < cfg.max_rounds
+
+
+def test_warm_up_aborts_when_core_rejects_everything():
+    core = FakeCore(fail=True)
+    result = asyncio.run(warm_up_model(core, "fraud-detector", "v0.2", WarmupConfig(batch_size=4)))
+    assert not result.ok and result.aborted
+    assert core.calls == 4
+
+
+def test_warm_up_skips_the_result_cache_and_coalescing():
+    server, port = serve(delay_ms=5.0)  # long enough for each round's calls to overlap
+    cache = ResultCache(models=["fraud-detector"])
+    cfg = WarmupConfig(batch_size=4, min_rounds=3, max_rounds=3)
+
+    async def scenario():
+        client = AsyncCoreClient(targets=[f"127.0.0.1:{port}"], cache=cache,
+                                 single_flight=SingleFlight(models=["fraud-detector"]))
+        result = await warm_up_model(client, "fraud-detector", "v0.2", cfg)
+        await client.close()
+        return result
+
+    result = asyncio.run(scenario())
+    server.stop(None)
+    assert len(result.curve_ms) == 3
+    # every call of every round reached the core, and none of it took cache space
+    assert server.servicer.calls == 12
+    assert len(cache) == 0
+
+
+def test_readiness_reflects_in_flight_warmups():
+    client = TestClient(main.app)
+    assert client.get("/health/ready").status_code == 200
+
+    result = main.warmups.begin("fraud-detector", "v0.2")
+    r = client.get("/health/ready")
+    assert r.status_code == 503
+    assert r.json()["models"] == ["fraud-detector:v0.2"]
+    assert client.get("/models/fraud-detector/warmup", params={"version": "v0.2"}).json()["in_progress"]
+
+    main.warmups.finish(result)
+    assert client.get("/health/ready").status_code == 200
@@ -0,0 +1,146 @@
+// core/bench/bench_batch_buffers.cpp
+// Batch tensor assembly microbenchmark: heap allocations and time per batch to gather
+// a batch's inputs, run a (copying) model step and hand outputs back, comparing
+//   per-request  outputs copied into a fresh vector per request (the original engine)
+//   contiguous   one input and one output vector allocated per batch, outputs then
+//                copied out per request
+//   pooled       InferenceEngine: pooled aligned input/output buffers, outputs handed
+//                back as views of the output buffer
+//
+// Allocations are counted by replacing the global operator new; the engine's mock
+// latency is turned off so only the data movement is timed.
+//
+//   ./bench_batch_buffers [features] [batches_per_size]
+#include "inference.h"
+#include <algorithm>
+#include <atomic>
+#include <cstdio>
+#include <cstdlib>
+#include <new>
+#include <vector>
+
+using Clock = std::chrono::steady_clock;
+
+static std::atomic<uint64_t> g_allocations{0};
+
+// GCC cannot see that these replace the global operators, so pairing malloc with
+// operator delete looks mismatched to it.
+#if defined(__GNUC__) && !defined(__clang__)
+#pragma GCC diagnostic ignored "-Wmismatched-new-delete"
+#endif
+
+void *operator new(std::size_t size)
+{
+    g_allocations.fetch_add(1, std::memory_order_relaxed);
+    if (void *p = std::malloc(size ? size : 1))
+        return p;
+    throw std::bad_alloc();
+}
+
+void *operator new(std::size_t size, std::align_val_t align)
+{
+    g_allocations.fetch_add(1, std::memory_order_relaxed);
+    size_t a = static_cast<size_t>(align);
+    if (void *p = std::aligned_alloc(a, (size + a - 1) / a * a))
+        return p;
+    throw std::bad_alloc();
+}
+
+void operator delete(void *p) noexcept { std::free(p); }
+void operator delete(void *p, std::size_t) noexcept { std::free(p); }
+void operator delete(void *p, std::align_val_t) noexcept { std::free(p); }
+void operator delete(void *p, std::size_t, std::align_val_t) noexcept { std::free(p); }
+
+namespace
+{
+    struct Result
+    {
+        double allocs_per_batch;
+        double mean_us;
+        double p99_us;
+    };
+
+    // The batch's outputs for the two baselines, one vector per request.
+    using Outputs = std::vector<std::vector<float>>;
+
+    void per_request(const std::vector<RequestPtr> &batch, Outputs &outputs)
+    {
+        outputs = Outputs(batch.size());
+        for (size_t i = 0; i < batch.size(); i++)
+            outputs[i].assign(batch[i]->inputs.begin(), batch[i]->inputs.end());
+    }
+
+    void contiguous(const std::vector<RequestPtr> &batch, size_t features, Outputs &outputs)
+    {
+        std::vector<float> input(batch.size() * features);
+        for (size_t i = 0; i < batch.size(); i++)
+            std::copy(batch[i]->inputs.begin(), batch[i]->inputs.end(), input.begin() + i * features);
+        std::vector<float> output(input);
+        outputs = Outputs(batch.size());
+        for (size_t i = 0; i < batch.size(); i++)
+            outputs[i].assign(output.begin() + i * features, output.begin() + (i + 1) * features);
+    }
+
+    template <typename F>
+    Result measure(int batches, F &&step)
+    {
+        for (int i = 0; i < 16; i++) // warm-up: let pools and vectors reach their sizes
+            step();
+        std::vector<double> us(batches);
+        uint64_t before = g_allocations.load();
+        for (int i = 0; i < batches; i++)
+        {
+            auto start = Clock::now();
+            step();
+            us[i] = std::chrono::duration<double, std::micro>(Clock::now() - start).count();
+        }
+        double allocs = static_cast<double>(g_allocations.load() - before) / batches;
+        double mean = 0;
+        for (double u : us)
+            mean += u;
+        std::sort(us.begin(), us.end());
+        return {allocs, mean / batches, us[std::min(us.size() - 1, static_cast<size_t>(0.99 * us.size()))]};
+    }
+}
+
+int main(int argc, char *argv[])
+{
+    size_t features = argc > 1 ? static_cast<size_t>(std::atoi(argv[1])) : 256;
+    int batches = argc > 2 ? std::atoi(argv[2]) : 2000;
+
+    InferenceEngineConfig config;
+    config.simulate_latency = false;
+    InferenceEngine engine(config);
+
+    std::printf("%zu features per request, %d batches per size\n", features, batches);
+    std::printf("%-6s %-13s %14s %10s %10s\n", "batch", "assembly", "allocs/batch", "mean us", "p99 us");
+    for (size_t size : {1, 4, 16, 64, 256})
+    {
+        std::vector<RequestPtr> batch;
+        for (size_t i = 0; i < size; i++)
+        {
+            auto r = std::make_shared<Request>();
+            r->inputs.assign(features, static_cast<float>(i));
+            batch.push_back(std::move(r));
+        }
+        Outputs outputs;
+        Result rows[] = {
+            measure(batches, [&]
+                    { per_request(batch, outputs); }),
+            measure(batches, [&]
+                    { contiguous(batch, features, outputs); }),
+            // the previous batch's views are dropped as the new ones are assigned
+            measure(batches, [&]
+                    { engine.run_batch(batch); }),
+        };
+        const char *names[] = {"per-request", "contiguous", "pooled"};
+        for (int m = 0; m < 3; m++)
+            std::printf("%-6zu %-13s %14.2f %10.2f %10.2f\n", size, names[m], rows[m].allocs_per_batch,
+                        rows[m].mean_us, rows[m].p99_us);
+    }
+    BatchBufferStats s = engine.buffer_stats();
+    std::printf("\npool: %llu acquired, %llu allocations, %llu misses, %zu buffers (%zu KiB)\n",
+                static_cast<unsigned long long>(s.acquired), static_cast<unsigned long long>(s.allocations),
+                static_cast<unsigned long long>(s.misses), s.pooled, s.pooled_bytes / 1024);
+    return 0;
+}
@@ -0,0 +1,99 @@
+// core/bench/bench_dispatcher.cpp
+// Dispatcher queue microbenchmark: N producer threads push requests while one
+// consumer drains them with pop_batch(), comparing
+//   mutex        the original mutex + condition variable queue, make_shared per request
+//   ring         lock-free MPSC ring, make_shared per request
+//   ring+pool    lock-free MPSC ring with pooled Request objects
+//
+// "push" is the producers' rate (until the last push returns), "pop" the consumer's
+// rate (until the last request is drained).
+//
+//   ./bench_dispatcher [max_producers] [requests_per_producer]
+#include "dispatcher.h"
+#include <algorithm>
+#include <atomic>
+#include <cstdio>
+#include <cstdlib>
+#include <thread>
+#include <vector>
+
+using Clock = std::chrono::steady_clock;
+
+namespace
+{
+    struct Result
+    {
+        double push_mops;
+        double pop_mops;
+    };
+
+    Result run(const DispatcherConfig &config, int producers, int per_producer)
+    {
+        Dispatcher dispatcher(config);
+        const int total = producers * per_producer;
+        std::atomic<bool> go{false};
+        std::atomic<Clock::rep> last_push{0};
+        std::vector<std::thread> threads;
+        for (int p = 0; p < producers; p++)
+        {
+            threads.emplace_back([&, p]
+                                 {
+                                     while (!go.load())
+                                         std::this_thread::yield();
+                                     for (int i = 0; i < per_producer; i++)
+                                     {
+                                         auto r = dispatcher.make_request();
+                                         r->id = p * per_producer + i;
+                                         dispatcher.push_request(std::move(r));
+                                     }
+                                     auto done = Clock::now().time_since_epoch().count();
+                                     auto prev = last_push.load();
+                                     while (prev < done && !last_push.compare_exchange_weak(prev, done))
+                                     {
+                                     } });
+        }
+
+        auto start = Clock::now();
+        go = true;
+        int received = 0;
+        while (received < total)
+        {
+            auto batch = dispatcher.pop_batch(64, std::chrono::milliseconds(1));
+            received += static_cast<int>(batch.size());
+            dispatcher.recycle(batch);
+        }
+        auto drained = Clock::now();
+        for (auto &t : threads)
+            t.join();
+        double pop_s = std::chrono::duration<double>(drained - start).count();
+        double push_s = std::chrono::duration<double>(Clock::time_point(Clock::duration(last_push.load())) - start).count();
+        return {total / push_s / 1e6, total / pop_s / 1e6};
+    }
+}
+
+int main(int argc, char *argv[])
+{
+    int max_producers = argc > 1 ? std::atoi(argv[1]) : static_cast<int>(std::max(1u, std::thread::hardware_concurrency()));
+    int per_producer = argc > 2 ? std::atoi(argv[2]) : 200000;
+
+    DispatcherConfig mutex_queue;
+    DispatcherConfig ring;
+    ring.ring_capacity = 4096;
+    ring.block_when_full = true; // backpressure, so every request is counted
+    DispatcherConfig ring_pool = ring;
+    ring_pool.pool_size = 8192;
+
+    std::printf("%d requests per producer, consumer pops batches of up to 64\n", per_producer);
+    std::printf("%-10s %-10s %12s %12s\n", "producers", "queue", "push Mreq/s", "pop Mreq/s");
+    for (int producers = 1; producers <= max_producers; producers *= 2)
+    {
+        std::pair<const char *, const DispatcherConfig *> modes[] = {
+            {"mutex", &mutex_queue}, {"ring", &ring}, {"ring+pool", &ring_pool}};
+        for (const auto &mode : modes)
+        {
+            Result r = run(*mode.second, producers, per_producer);
+            std::printf("%-10d %-10s %12.2f %12.2f\n", producers, mode.first, r.push_mops, r.pop_mops);
+        }
+    }
+    return 0;
+}
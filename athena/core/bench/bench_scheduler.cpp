@@ -0,0 +1,169 @@
+// core/bench/bench_scheduler.cpp
+// ModelScheduler benchmarks:
+//   1. throughput vs worker count, CPU-bound batches spread over several models
+//   2. isolation: fast-model latency while a slow model is busy, single shared
+//      DynamicBatcher queue vs per-model queues on a worker pool
+//
+//   ./bench_scheduler [max_workers] [requests]
+#include "batcher.h"
+#include "scheduler.h"
+#include <algorithm>
+#include <cstdio>
+#include <cstdlib>
+#include <map>
+#include <memory>
+#include <mutex>
+#include <thread>
+#include <vector>
+
+using Clock = std::chrono::steady_clock;
+
+namespace
+{
+    // Burn CPU instead of sleeping, so extra workers only help if there are cores for them
+    void spin_for(std::chrono::microseconds d)
+    {
+        auto end = Clock::now() + d;
+        while (Clock::now() < end)
+        {
+        }
+    }
+
+    RequestPtr model_request(int id, const std::string &name)
+    {
+        auto r = std::make_shared<Request>();
+        r->id = id;
+        r->model_name = name;
+        r->model_version = "v1";
+        return r;
+    }
+
+    double scaling_run(size_t workers, int requests)
+    {
+        WorkerPoolConfig config;
+        config.workers = workers;
+        config.default_queue.max_batch_size = 16;
+        config.default_queue.max_wait = std::chrono::milliseconds(0);
+        std::atomic<int> done{0};
+        ModelScheduler scheduler(config, [&](const ModelKey &, const std::vector<RequestPtr> &batch)
+                                 {
+                                     spin_for(std::chrono::microseconds(200 + 20 * batch.size()));
+                                     done.fetch_add(static_cast<int>(batch.size()));
+                                 });
+        const char *models[] = {"m0", "m1", "m2", "m3", "m4", "m5", "m6", "m7"};
+        for (int i = 0; i < requests; i++)
+            scheduler.push_request(model_request(i, models[i % 8]));
+
+        auto start = Clock::now();
+        scheduler.start();
+        while (done.load() < requests)
+            std::this_thread::sleep_for(std::chrono::microseconds(200));
+        double elapsed = std::chrono::duration<double>(Clock::now() - start).count();
+        scheduler.stop();
+        return requests / elapsed;
+    }
+
+    struct LatencyRecorder
+    {
+        std::mutex mu;
+        std::map<int, Clock::time_point> enqueued;
+        std::vector<double> fast_ms;
+
+        void finished(const std::vector<RequestPtr> &batch)
+        {
+            auto now = Clock::now();
+            std::lock_guard<std::mutex> lk(mu);
+            for (const auto &r : batch)
+            {
+                if (r->model_name == "fast")
+                    fast_ms.push_back(std::chrono::duration<double, std::milli>(now - enqueued[r->id]).count());
+            }
+        }
+
+        void print(const char *label)
+        {
+            std::lock_guard<std::mutex> lk(mu);
+            std::sort(fast_ms.begin(), fast_ms.end());
+            auto q = [&](double p)
+            { return fast_ms.empty() ? 0.0 : fast_ms[std::min(fast_ms.size() - 1, static_cast<size_t>(p * fast_ms.size()))]; };
+            std::printf("  %-28s fast model: n=%zu p50=%7.2fms p99=%7.2fms\n", label, fast_ms.size(), q(0.50), q(0.99));
+        }
+    };
+
+    void handle(const std::vector<RequestPtr> &batch)
+    {
+        // the slow model costs 20 ms per batch, the fast one 0.2 ms
+        bool slow = batch.front()->model_name == "slow";
+        spin_for(std::chrono::microseconds(slow ? 20000 : 200));
+    }
+
+    // 2 s of traffic: slow model 40 req/s, fast model 500 req/s
+    template <typename Push>
+    void isolation_traffic(LatencyRecorder &rec, Push push)
+    {
+        auto start = Clock::now();
+        for (int i = 0; i < 1080; i++)
+        {
+            bool slow = i % 27 == 0;
+            auto due = start + std::chrono::microseconds(i * 1852);
+            std::this_thread::sleep_until(due);
+            auto r = model_request(i, slow ? "slow" : "fast");
+            {
+                std::lock_guard<std::mutex> lk(rec.mu);
+                rec.enqueued[i] = Clock::now();
+            }
+            push(r);
+        }
+        std::this_thread::sleep_for(std::chrono::milliseconds(200));
+    }
+}
+
+int main(int argc, char *argv[])
+{
+    size_t max_workers = argc > 1 ? std::strtoul(argv[1], nullptr, 10) : std::max(1u, std::thread::hardware_concurrency());
+    int requests = argc > 2 ? std::atoi(argv[2]) : 20000;
+
+    std::printf("throughput vs workers (%d requests over 8 models, CPU-bound batches)\n", requests);
+    double base = 0.0;
+    for (size_t w = 1; w <= max_workers; w *= 2)
+    {
+        double rps = scaling_run(w, requests);
+        if (w == 1)
+            base = rps;
+        std::printf("  workers=%-3zu %10.0f req/s  speedup=%.2fx\n", w, rps, rps / base);
+    }
+
+    std::printf("isolation (slow model 20 ms/batch at 40 req/s, fast model 0.2 ms at 500 req/s)\n");
+    {
+        LatencyRecorder rec;
+        auto dispatcher = std::make_shared<Dispatcher>();
+        DynamicBatcher shared(dispatcher, 1, std::chrono::milliseconds(0), [&](const std::vector<RequestPtr> &batch)
+                              {
+                                  handle(batch);
+                                  rec.finished(batch);
+                              });
+        shared.start();
+        isolation_traffic(rec, [&](RequestPtr r)
+                          { dispatcher->push_request(r); });
+        shared.stop();
+        rec.print("shared queue, 1 thread:");
+    }
+    {
+        LatencyRecorder rec;
+        WorkerPoolConfig config;
+        config.workers = 2;
+        config.default_queue.max_batch_size = 1;
+        config.default_queue.max_wait = std::chrono::milliseconds(0);
+        ModelScheduler scheduler(config, [&](const ModelKey &, const std::vector<RequestPtr> &batch)
+                                 {
+                                     handle(batch);
+                                     rec.finished(batch);
+                                 });
+        scheduler.start();
+        isolation_traffic(rec, [&](RequestPtr r)
+                          { scheduler.push_request(r); });
+        scheduler.stop();
+        rec.print("per-model queues, 2 workers:");
+    }
+    return 0;
+}
@@ -0,0 +1,201 @@
+// core/src/admission.cpp
+#include "admission.h"
+#include <algorithm>
+#include <cmath>
+
+namespace
+{
+    std::chrono::milliseconds ceil_ms(double ms)
+    {
+        return std::chrono::milliseconds(static_cast<long long>(std::ceil(std::max(ms, 1.0))));
+    }
+}
+
+const char *shed_reason_name(ShedReason reason)
+{
+    switch (reason)
+    {
+    case ShedReason::None:
+        return "none";
+    case ShedReason::ModelRate:
+        return "model_rate";
+    case ShedReason::TenantRate:
+        return "tenant_rate";
+    case ShedReason::QueueDepth:
+        return "queue_depth";
+    case ShedReason::QueueDelay:
+        return "queue_delay";
+    case ShedReason::Deadline:
+        return "deadline";
+    }
+    return "unknown";
+}
+
+AdmissionController::AdmissionController(AdmissionConfig config)
+    : config_(config)
+{
+}
+
+double AdmissionController::estimated_wait_ms(const BatcherStats &queue, size_t n)
+{
+    // the last of the n arrivals waits behind everything queued plus the others
+    double ahead = static_cast<double>(queue.queue_depth + std::max<size_t>(n, 1) - 1);
+    if (ahead <= 0)
+        return 0.0;
+    double batch = static_cast<double>(std::max<size_t>(queue.max_batch_size, 1));
+    return std::ceil(ahead / batch) * queue.exec_base_ms + ahead * queue.exec_per_item_ms;
+}
+
+std::chrono::milliseconds AdmissionController::bucket_wait(Bucket &b, const TokenBucketConfig &config, size_t n,
+                                                           Clock::time_point now)
+{
+    if (config.rate <= 0)
+        return std::chrono::milliseconds(0);
+    double burst = config.burst > 0 ? config.burst : config.rate;
+    if (b.tokens < 0)
+        b.tokens = burst;
+    else
+        b.tokens = std::min(burst, b.tokens + std::chrono::duration<double>(now - b.refilled).count() * config.rate);
+    b.refilled = now;
+    double missing = static_cast<double>(n) - b.tokens;
+    if (missing <= 0)
+        return std::chrono::milliseconds(0);
+    return ceil_ms(missing / config.rate * 1000.0);
+}
+
+/**
+ * @brief The key's bucket; only created while fewer than `cap` exist.
+ *
+ * At the cap, buckets that have been idle long enough to refill completely are dropped
+ * (at most once a second): a new bucket starts full, so forgetting them changes
+ * nothing. Keys that still find no room share the overflow bucket.
+ */
+template <typename Key>
+AdmissionController::Bucket &AdmissionController::bounded_bucket(std::map<Key, Bucket> &buckets, const Key &key,
+                                                                 const TokenBucketConfig &config, size_t cap,
+                                                                 Bucket &overflow, Clock::time_point &last_sweep,
+                                                                 Clock::time_point now)
+{
+    auto it = buckets.find(key);
+    if (it != buckets.end())
+        return it->second;
+    if (buckets.size() >= cap && now - last_sweep >= std::chrono::seconds(1))
+    {
+        last_sweep = now;
+        double burst = config.burst > 0 ? config.burst : config.rate;
+        for (auto b = buckets.begin(); b != buckets.end();)
+        {
+            double idle_s = std::chrono::duration<double>(now - b->second.refilled).count();
+            if (b->second.tokens < 0 || b->second.tokens + idle_s * config.rate >= burst)
+                b = buckets.erase(b);
+            else
+                ++b;
+        }
+    }
+    if (buckets.size() >= cap)
+        return overflow;
+    return buckets[key];
+}
+
+/**
+ * @brief Whether the model's estimated delay has stayed above target_delay for an interval.
+ *
+ * Only models currently above the target have an entry, and no more than max_models:
+ * past that, a model's delay is not tracked until others drop back.
+ */
+bool AdmissionController::standing_queue(const ModelKey &key, double wait_ms, Clock::time_point now)
+{
+    auto it = delay_.find(key);
+    if (wait_ms <= static_cast<double>(config_.target_delay.count()))
+    {
+        if (it != delay_.end())
+            delay_.erase(it);
+        return false;
+    }
+    if (it == delay_.end())
+    {
+        if (delay_.size() >= config_.max_models)
+            return false;
+        it = delay_.emplace(key, now).first;
+    }
+    return now - it->second >= config_.interval;
+}
+
+AdmissionDecision AdmissionController::reject(const std::string &model_name, const std::string &version,
+                                              ShedReason reason, std::chrono::milliseconds retry_after, size_t n)
+{
+    auto key = std::make_tuple(model_name, version, reason);
+    if (shed_.size() >= config_.max_models && shed_.find(key) == shed_.end())
+        key = std::make_tuple(std::string("<other>"), std::string(), reason);
+    shed_[key] += n;
+    AdmissionDecision d;
+    d.reason = reason;
+    d.retry_after = retry_after;
+    return d;
+}
+
+AdmissionDecision AdmissionController::admit(const std::string &model_name, const std::string &version,
+                                             const std::string &tenant, const BatcherStats &queue,
+                                             Clock::time_point deadline, size_t n, Clock::time_point now)
+{
+    double wait_ms = estimated_wait_ms(queue, n);
+    std::lock_guard<std::mutex> lk(mu_);
+
+    // buckets only exist for enabled limits; the tenant string is client-supplied
+    Bucket *tenant_limit = config_.per_tenant.rate > 0
+                               ? &bounded_bucket(tenant_buckets_, tenant, config_.per_tenant, config_.max_tenants,
+                                                 overflow_bucket_, last_sweep_, now)
+                               : nullptr;
+    if (tenant_limit)
+    {
+        auto tenant_wait = bucket_wait(*tenant_limit, config_.per_tenant, n, now);
+        if (tenant_wait.count() > 0)
+            return reject(model_name, version, ShedReason::TenantRate, tenant_wait, n);
+    }
+    Bucket *model_limit = config_.per_model.rate > 0
+                              ? &bounded_bucket(model_buckets_, ModelKey(model_name, version), config_.per_model,
+                                                config_.max_models, model_overflow_bucket_, last_model_sweep_, now)
+                              : nullptr;
+    if (model_limit)
+    {
+        auto model_wait = bucket_wait(*model_limit, config_.per_model, n, now);
+        if (model_wait.count() > 0)
+            return reject(model_name, version, ShedReason::ModelRate, model_wait, n);
+    }
+
+    if (config_.max_queue_depth > 0 && queue.queue_depth + n > config_.max_queue_depth)
+    {
+        // without a cost model, suggest one CoDel interval
+        double drain_ms = estimated_wait_ms(queue, 1);
+        return reject(model_name, version, ShedReason::QueueDepth,
+                      drain_ms > 0 ? ceil_ms(drain_ms) : config_.interval, n);
+    }
+    if (config_.target_delay.count() > 0 && standing_queue(ModelKey(model_name, version), wait_ms, now))
+        return reject(model_name, version, ShedReason::QueueDelay,
+                      ceil_ms(wait_ms - static_cast<double>(config_.target_delay.count())), n);
+    if (config_.reject_hopeless && deadline != Clock::time_point::max() && wait_ms > 0 &&
+        now + std::chrono::duration_cast<Clock::duration>(std::chrono::duration<double, std::milli>(wait_ms)) > deadline)
+        return reject(model_name, version, ShedReason::Deadline, ceil_ms(wait_ms), n);
+
+    if (tenant_limit)
+        tenant_limit->tokens -= static_cast<double>(n);
+    if (model_limit)
+        model_limit->tokens -= static_cast<double>(n);
+    admitted_ += n;
+    return AdmissionDecision{};
+}
+
+AdmissionSnapshot AdmissionController::snapshot()
+{
+    std::lock_guard<std::mutex> lk(mu_);
+    AdmissionSnapshot s;
+    s.admitted = admitted_;
+    s.tenant_buckets = tenant_buckets_.size();
+    s.model_buckets = model_buckets_.size();
+    for (const auto &entry : shed_)
+    {
+        s.shed += entry.second;
+        s.by_model.push_back({std::get<0>(entry.first), std::get<1>(entry.first), std::get<2>(entry.first), entry.second});
+    }
+    return s;
+}
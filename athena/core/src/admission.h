@@ -0,0 +1,138 @@
+// core/src/admission.h
+#pragma once
+#include "batcher.h"
+#include <chrono>
+#include <cstdint>
+#include <map>
+#include <mutex>
+#include <string>
+#include <tuple>
+#include <utility>
+#include <vector>
+
+struct TokenBucketConfig
+{
+    double rate = 0.0;  // requests per second; 0 means no limit
+    double burst = 0.0; // bucket size; 0 means one second's worth of rate
+};
+
+struct AdmissionConfig
+{
+    TokenBucketConfig per_model;  // each (name, version)
+    TokenBucketConfig per_tenant; // each tenant; untagged requests share tenant ""
+    // tenant buckets kept at most; tenants beyond it share one bucket until idle ones
+    // (refilled to full, so indistinguishable from new) are dropped
+    size_t max_tenants = 10000;
+    // the same for per-model buckets and queue-delay state, which are keyed by
+    // client-supplied model names; shed counts past this many are kept under "<other>"
+    size_t max_models = 1024;
+    // reject when the model's queue already holds this many requests; 0 = no cap
+    size_t max_queue_depth = 0;
+    // CoDel-style shedding on the estimated queueing delay: short bursts above
+    // target_delay are absorbed, but once it has stayed above for a whole interval new
+    // arrivals are rejected until it drops back. 0 disables.
+    std::chrono::milliseconds target_delay{0};
+    std::chrono::milliseconds interval{100};
+    // reject requests whose deadline falls before the estimated wait is over
+    bool reject_hopeless = true;
+};
+
+enum class ShedReason
+{
+    None,
+    ModelRate,
+    TenantRate,
+    QueueDepth,
+    QueueDelay,
+    Deadline,
+};
+
+const char *shed_reason_name(ShedReason reason);
+
+struct AdmissionDecision
+{
+    ShedReason reason = ShedReason::None;
+    // when a retry has a fair chance, for the client's backoff
+    std::chrono::milliseconds retry_after{0};
+
+    bool admitted() const { return reason == ShedReason::None; }
+};
+
+struct ShedCount
+{
+    std::string model_name;
+    std::string version;
+    ShedReason reason;
+    uint64_t count;
+};
+
+struct AdmissionSnapshot
+{
+    uint64_t admitted = 0;
+    uint64_t shed = 0;
+    size_t tenant_buckets = 0;
+    size_t model_buckets = 0;
+    std::vector<ShedCount> by_model;
+};
+
+/**
+ * @brief Decides at arrival whether a request may join its model's queue.
+ *
+ * Checks, in order: per-tenant and per-model token buckets, the queue depth cap, and
+ * the queue's estimated wait (from the batch cost model of an adaptive queue: pending
+ * batches times base cost plus per-item cost). Rejecting early keeps the queue short
+ * enough that admitted requests still meet their deadlines under overload, instead of
+ * every request waiting and then expiring. Safe to call from any thread.
+ */
+class AdmissionController
+{
+public:
+    using Clock = std::chrono::steady_clock;
+
+    explicit AdmissionController(AdmissionConfig config);
+
+    // `queue` is the model's current queue state; `n` requests arrive together
+    // (RunInferenceBatch). Tokens are only taken when the request is admitted.
+    AdmissionDecision admit(const std::string &model_name, const std::string &version, const std::string &tenant,
+                            const BatcherStats &queue, Clock::time_point deadline, size_t n = 1,
+                            Clock::time_point now = Clock::now());
+
+    AdmissionSnapshot snapshot();
+    const AdmissionConfig &config() const { return config_; }
+
+    // Estimated wait before a request arriving now starts executing, in ms; 0 when the
+    // queue has no cost model yet (fixed-window queues).
+    static double estimated_wait_ms(const BatcherStats &queue, size_t n = 1);
+
+private:
+    struct Bucket
+    {
+        double tokens = -1.0; // < 0: not yet filled
+        Clock::time_point refilled{};
+    };
+
+    using ModelKey = std::pair<std::string, std::string>;
+
+    // mu_ held; 0 if `n` tokens are available now, else how long until they are
+    std::chrono::milliseconds bucket_wait(Bucket &b, const TokenBucketConfig &config, size_t n, Clock::time_point now);
+    // mu_ held; the key's bucket, or `overflow` once `buckets` holds `cap` non-idle ones
+    template <typename Key>
+    Bucket &bounded_bucket(std::map<Key, Bucket> &buckets, const Key &key, const TokenBucketConfig &config,
+                           size_t cap, Bucket &overflow, Clock::time_point &last_sweep, Clock::time_point now);
+    bool standing_queue(const ModelKey &key, double wait_ms, Clock::time_point now); // mu_ held
+    AdmissionDecision reject(const std::string &model_name, const std::string &version, ShedReason reason,
+                             std::chrono::milliseconds retry_after, size_t n); // mu_ held
+
+    AdmissionConfig config_;
+    std::mutex mu_;
+    std::map<ModelKey, Bucket> model_buckets_;
+    Bucket model_overflow_bucket_; // shared by models over max_models
+    Clock::time_point last_model_sweep_{};
+    std::map<std::string, Bucket> tenant_buckets_;
+    Bucket overflow_bucket_; // shared by tenants over max_tenants
+    Clock::time_point last_sweep_{};
+    // when each model's estimated delay went above target_delay; only models above it
+    std::map<ModelKey, Clock::time_point> delay_;
+    uint64_t admitted_ = 0;
+    std::map<std::tuple<std::string, std::string, ShedReason>, uint64_t> shed_;
+};
@@ -0,0 +1,79 @@
+// core/src/batch_buffer.cpp
+#include "batch_buffer.h"
+#include <new>
+
+static size_t round_up_pow2(size_t n)
+{
+    size_t p = 1;
+    while (p < n)
+        p <<= 1;
+    return p;
+}
+
+BatchBuffer::~BatchBuffer()
+{
+    if (data_)
+        ::operator delete(data_, std::align_val_t(kBatchBufferAlignment));
+}
+
+bool BatchBuffer::reserve(size_t floats)
+{
+    if (floats <= capacity_)
+        return false;
+    size_t capacity = round_up_pow2(floats);
+    float *data = static_cast<float *>(::operator new(capacity * sizeof(float), std::align_val_t(kBatchBufferAlignment)));
+    if (data_)
+        ::operator delete(data_, std::align_val_t(kBatchBufferAlignment));
+    data_ = data;
+    capacity_ = capacity;
+    return true;
+}
+
+std::shared_ptr<BatchBuffer> BatchBufferPool::acquire(size_t floats)
+{
+    std::lock_guard<std::mutex> lk(mu_);
+    stats_.acquired++;
+    // only the pool holds it: nobody else can take a reference concurrently
+    std::shared_ptr<BatchBuffer> *best = nullptr;
+    std::shared_ptr<BatchBuffer> *largest_free = nullptr;
+    for (auto &buffer : buffers_)
+    {
+        if (buffer.use_count() != 1)
+            continue;
+        if (buffer->capacity() >= floats && (!best || buffer->capacity() < (*best)->capacity()))
+            best = &buffer;
+        if (!largest_free || buffer->capacity() > (*largest_free)->capacity())
+            largest_free = &buffer;
+    }
+    if (best)
+        return *best;
+
+    std::shared_ptr<BatchBuffer> buffer;
+    if (largest_free)
+    {
+        buffer = *largest_free;
+    }
+    else if (buffers_.size() < max_buffers_)
+    {
+        buffer = std::make_shared<BatchBuffer>();
+        buffers_.push_back(buffer);
+    }
+    else
+    {
+        stats_.misses++;
+        buffer = std::make_shared<BatchBuffer>();
+    }
+    if (buffer->reserve(floats))
+        stats_.allocations++;
+    return buffer;
+}
+
+BatchBufferStats BatchBufferPool::stats() const
+{
+    std::lock_guard<std::mutex> lk(mu_);
+    BatchBufferStats s = stats_;
+    s.pooled = buffers_.size();
+    for (const auto &buffer : buffers_)
+        s.pooled_bytes += buffer->capacity() * sizeof(float);
+    return s;
+}
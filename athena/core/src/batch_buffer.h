@@ -0,0 +1,105 @@
+// core/src/batch_buffer.h
+#pragma once
+#include <cstddef>
+#include <cstdint>
+#include <memory>
+#include <mutex>
+#include <vector>
+
+// One cache line; also the widest SIMD load (AVX-512) a backend may use on a row.
+constexpr size_t kBatchBufferAlignment = 64;
+
+// Aligned float storage. reserve() only ever grows it, so a reused buffer keeps its
+// memory from batch to batch.
+class BatchBuffer
+{
+public:
+    BatchBuffer() = default;
+    ~BatchBuffer();
+    BatchBuffer(const BatchBuffer &) = delete;
+    BatchBuffer &operator=(const BatchBuffer &) = delete;
+
+    float *data() { return data_; }
+    const float *data() const { return data_; }
+    size_t capacity() const { return capacity_; }
+    // Room for at least `floats` (rounded up to a power of two); contents are lost
+    // when it has to grow. True if it allocated.
+    bool reserve(size_t floats);
+
+private:
+    float *data_ = nullptr;
+    size_t capacity_ = 0;
+};
+
+// Read-only window into a batch buffer, e.g. one request's row of the batch output.
+// Holding a view keeps the whole buffer alive and out of the pool.
+class FloatView
+{
+public:
+    FloatView() = default;
+    FloatView(std::shared_ptr<const BatchBuffer> owner, const float *data, size_t size)
+        : owner_(std::move(owner)), data_(data), size_(size) {}
+
+    const float *data() const { return data_; }
+    size_t size() const { return size_; }
+    bool empty() const { return size_ == 0; }
+    const float *begin() const { return data_; }
+    const float *end() const { return data_ + size_; }
+    float operator[](size_t i) const { return data_[i]; }
+    void reset()
+    {
+        owner_.reset();
+        data_ = nullptr;
+        size_ = 0;
+    }
+
+private:
+    std::shared_ptr<const BatchBuffer> owner_;
+    const float *data_ = nullptr;
+    size_t size_ = 0;
+};
+
+// A [rows, cols] row-major tensor in a pooled buffer.
+struct BatchTensor
+{
+    std::shared_ptr<BatchBuffer> buffer;
+    size_t rows = 0;
+    size_t cols = 0;
+
+    float *row(size_t i) { return buffer->data() + i * cols; }
+    const float *row(size_t i) const { return buffer->data() + i * cols; }
+};
+
+struct BatchBufferStats
+{
+    uint64_t acquired = 0;    // acquire() calls
+    uint64_t allocations = 0; // buffers allocated or grown
+    uint64_t misses = 0;      // every pooled buffer was in use: handed out an unpooled one
+    size_t pooled = 0;        // buffers owned by the pool
+    size_t pooled_bytes = 0;
+};
+
+/**
+ * @brief Aligned float buffers reused across batches instead of allocated per batch.
+ *
+ * A buffer is free again once the pool holds its only reference, i.e. when the batch
+ * that used it and every FloatView into it are gone (RequestPool uses the same test).
+ * acquire() hands out the smallest free buffer that fits, grows a free one that is too
+ * small, or adds a buffer while the pool has fewer than `max_buffers`. Sizes are
+ * rounded up to powers of two, so after a few batches of a given shape the pool stops
+ * allocating. Thread-safe; buffers may be released from any thread.
+ */
+class BatchBufferPool
+{
+public:
+    explicit BatchBufferPool(size_t max_buffers = 16) : max_buffers_(max_buffers) {}
+
+    std::shared_ptr<BatchBuffer> acquire(size_t floats);
+    BatchBufferStats stats() const;
+
+private:
+    mutable std::mutex mu_;
+    std::vector<std::shared_ptr<BatchBuffer>> buffers_;
+    size_t max_buffers_;
+    BatchBufferStats stats_;
+};
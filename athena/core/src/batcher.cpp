@@ -1,15 +1,177 @@
 // core/src/batcher.cpp
 #include "batcher.h"
+#include <algorithm>
 #include <chrono>
+#include <cmath>
 #include <iostream>
+#include <utility>
+
+namespace
+{
+    // How long an idle batcher blocks before re-checking running_
+    constexpr std::chrono::milliseconds kIdleWait(50);
+    // Time constant of the arrival-rate EWMA
+    constexpr double kRateTauS = 0.05;
+    // Weight kept by older batches in the cost fit each time a batch completes
+    constexpr double kFitDecay = 0.95;
+    // Batch for a little more than the arrival rate strictly requires
+    constexpr double kHeadroom = 1.25;
+}
+
+AdaptiveBatchPolicy::AdaptiveBatchPolicy(AdaptiveBatchConfig config)
+    : config_(config)
+{
+    config_.min_batch_size = std::max<size_t>(config_.min_batch_size, 1);
+    config_.max_batch_size = std::max(config_.max_batch_size, config_.min_batch_size);
+}
+
+void AdaptiveBatchPolicy::observe_arrivals(uint64_t total_pushed, std::chrono::steady_clock::time_point now)
+{
+    if (last_sample_ == std::chrono::steady_clock::time_point{})
+    {
+        last_sample_ = now;
+        last_pushed_ = total_pushed;
+        return;
+    }
+    double dt = std::chrono::duration<double>(now - last_sample_).count();
+    if (dt < 0.001)
+        return; // too short to measure a rate
+    double instant = static_cast<double>(total_pushed - last_pushed_) / dt;
+    double alpha = 1.0 - std::exp(-dt / kRateTauS);
+    rate_ += alpha * (instant - rate_);
+    last_sample_ = now;
+    last_pushed_ = total_pushed;
+}
+
+void AdaptiveBatchPolicy::observe_batch(size_t size, double exec_ms)
+{
+    double n = static_cast<double>(size);
+    s_w_ = kFitDecay * s_w_ + 1.0;
+    s_n_ = kFitDecay * s_n_ + n;
+    s_t_ = kFitDecay * s_t_ + exec_ms;
+    s_nn_ = kFitDecay * s_nn_ + n * n;
+    s_nt_ = kFitDecay * s_nt_ + n * exec_ms;
+
+    double var = s_w_ * s_nn_ - s_n_ * s_n_;
+    if (var > 1e-6 * s_w_ * s_w_)
+    {
+        per_item_ms_ = std::max(0.0, (s_w_ * s_nt_ - s_n_ * s_t_) / var);
+        base_ms_ = std::max(0.0, (s_t_ - per_item_ms_ * s_n_) / s_w_);
+    }
+    else
+    {
+        // all recent batches had the same size: charge the whole cost per item
+        per_item_ms_ = s_t_ / std::max(s_n_, 1.0);
+        base_ms_ = 0.0;
+    }
+}
+
+BatchWindow AdaptiveBatchPolicy::next_window(size_t queue_depth) const
+{
+    const double slo_ms = static_cast<double>(config_.latency_slo.count());
+    const double lo = static_cast<double>(config_.min_batch_size);
+    const double hi = static_cast<double>(config_.max_batch_size);
+
+    // Largest batch whose execution fits in its share of the SLO
+    double cap = hi;
+    if (per_item_ms_ > 0.0)
+        cap = std::clamp(std::floor((slo_ms * config_.exec_share - base_ms_) / per_item_ms_), lo, hi);
+
+    // Smallest batch that keeps up with arrivals: size / rate >= exec(size)
+    double rate_per_ms = rate_ / 1000.0;
+    double need = cap;
+    double denom = 1.0 - rate_per_ms * per_item_ms_;
+    if (denom > 0.0)
+        need = std::clamp(std::ceil(kHeadroom * rate_per_ms * base_ms_ / denom), lo, cap);
+
+    BatchWindow w{static_cast<size_t>(cap), std::chrono::microseconds::zero()};
+    // The window opens once the first request is in hand
+    double have = std::max(static_cast<double>(queue_depth), 1.0);
+    if (have < need && rate_per_ms > 0.0)
+    {
+        // Wait to gather `need`, but never longer than the SLO left after execution
+        double fill_ms = (need - have) / rate_per_ms;
+        double budget_ms = std::max(0.0, slo_ms - predict_exec_ms(need));
+        double wait_ms = std::min({fill_ms, budget_ms, config_.max_wait.count() / 1000.0});
+        // Holding a batch for less than one expected arrival only adds latency
+        if (wait_ms * rate_per_ms >= 1.0)
+            w.max_wait = std::chrono::microseconds(static_cast<int64_t>(wait_ms * 1000.0));
+    }
+    return w;
+}
+
+BatchQueue::BatchQueue(std::shared_ptr<Dispatcher> dispatcher, size_t max_batch_size, std::chrono::milliseconds max_wait)
+    : dispatcher_(std::move(dispatcher)),
+      fixed_{max_batch_size, std::chrono::duration_cast<std::chrono::microseconds>(max_wait)},
+      window_(fixed_)
+{
+}
+
+BatchQueue::BatchQueue(std::shared_ptr<Dispatcher> dispatcher, AdaptiveBatchConfig config)
+    : dispatcher_(std::move(dispatcher)),
+      fixed_{config.max_batch_size, std::chrono::microseconds::zero()},
+      policy_(std::make_unique<AdaptiveBatchPolicy>(config)),
+      window_(fixed_)
+{
+}
+
+std::vector<RequestPtr> BatchQueue::pop_batch(std::chrono::milliseconds idle_wait)
+{
+    BatchWindow window = fixed_;
+    if (policy_)
+    {
+        std::lock_guard<std::mutex> lk(mu_);
+        policy_->observe_arrivals(dispatcher_->pushed_count(), std::chrono::steady_clock::now());
+        window = policy_->next_window(dispatcher_->size());
+        window_ = window;
+    }
+    return dispatcher_->pop_batch(window.max_batch_size, idle_wait, window.max_wait);
+}
+
+void BatchQueue::record_batch(size_t size, double exec_ms)
+{
+    std::lock_guard<std::mutex> lk(mu_);
+    batches_++;
+    requests_ += size;
+    if (policy_)
+        policy_->observe_batch(size, exec_ms);
+}
+
+BatcherStats BatchQueue::stats()
+{
+    std::lock_guard<std::mutex> lk(mu_);
+    BatcherStats s{};
+    s.adaptive = policy_ != nullptr;
+    s.max_batch_size = window_.max_batch_size;
+    s.max_wait_ms = window_.max_wait.count() / 1000.0;
+    s.queue_depth = dispatcher_->size();
+    s.expired = dispatcher_->expired_count();
+    s.rejected = dispatcher_->rejected_count();
+    s.batches = batches_;
+    s.requests = requests_;
+    if (policy_)
+    {
+        s.latency_slo_ms = static_cast<double>(policy_->config().latency_slo.count());
+        s.arrival_rate = policy_->arrival_rate();
+        s.exec_base_ms = policy_->exec_base_ms();
+        s.exec_per_item_ms = policy_->exec_per_item_ms();
+    }
+    return s;
+}
 
 DynamicBatcher::DynamicBatcher(std::shared_ptr<Dispatcher> dispatcher,
                                size_t max_batch_size,
                                std::chrono::milliseconds max_wait,
                                Handler handler)
-    : dispatcher_(dispatcher),
-      max_batch_size_(max_batch_size),
-      max_wait_(max_wait),
+    : queue_(dispatcher, max_batch_size, max_wait),
+      handler_(handler)
+{
+}
+
+DynamicBatcher::DynamicBatcher(std::shared_ptr<Dispatcher> dispatcher,
+                               AdaptiveBatchConfig config,
+                               Handler handler)
+    : queue_(dispatcher, config),
       handler_(handler)
 {
 }
@@ -35,18 +197,25 @@ void DynamicBatcher::stop()
     }
 }
 
+BatcherStats DynamicBatcher::stats()
+{
+    return queue_.stats();
+}
+
 void DynamicBatcher::loop()
 {
     while (running_)
     {
-        // pop up to max_batch_size_, but wait up to max_wait_ for items.
-        std::vector<RequestPtr> batch = dispatcher_->pop_batch(max_batch_size_, max_wait_);
-        if (!batch.empty())
-        {
-            // For now, just call handler directly
-            handler_(batch);
-        }
-        // small sleep to avoid tight loop if nothing
-        std::this_thread::sleep_for(std::chrono::milliseconds(1));
+        // Block until work arrives, then hold the batch open for the window.
+        // No sleep between batches: an idle loop is parked inside pop_batch.
+        std::vector<RequestPtr> batch = queue_.pop_batch(kIdleWait);
+        if (batch.empty())
+            continue;
+
+        auto t0 = std::chrono::steady_clock::now();
+        handler_(batch);
+        double exec_ms = std::chrono::duration<double, std::milli>(std::chrono::steady_clock::now() - t0).count();
+        queue_.record_batch(batch.size(), exec_ms);
+        queue_.dispatcher().recycle(batch);
     }
-}
+}
\ No newline at end of file
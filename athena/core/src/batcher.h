@@ -4,6 +4,110 @@
 #include <functional>
 #include <thread>
 #include <atomic>
+#include <mutex>
+
+// How the next batch is formed: take up to max_batch_size requests, holding a
+// partial batch open for at most max_wait while more arrive.
+struct BatchWindow
+{
+    size_t max_batch_size;
+    std::chrono::microseconds max_wait;
+};
+
+struct AdaptiveBatchConfig
+{
+    std::chrono::milliseconds latency_slo{50}; // target queueing + execution time per request
+    double exec_share = 0.5;                   // part of the SLO a batch may spend executing
+    size_t min_batch_size = 1;
+    size_t max_batch_size = 256;
+    std::chrono::microseconds max_wait{20000};
+};
+
+/**
+ * @brief Online batch-window tuning from arrival rate, queue depth and batch cost.
+ *
+ * Batch execution time is modelled as base + per_item * size, fitted with exponentially
+ * decayed least squares over completed batches. The batch cap is the largest batch
+ * whose predicted cost fits in exec_share of the SLO. The wait window only stretches
+ * far enough to gather the smallest batch that keeps up with the current arrival
+ * rate, so light traffic runs immediately and heavy traffic gets large batches.
+ */
+class AdaptiveBatchPolicy
+{
+public:
+    explicit AdaptiveBatchPolicy(AdaptiveBatchConfig config);
+
+    // total_pushed is the dispatcher's cumulative arrival count
+    void observe_arrivals(uint64_t total_pushed, std::chrono::steady_clock::time_point now);
+    void observe_batch(size_t size, double exec_ms);
+    BatchWindow next_window(size_t queue_depth) const;
+
+    const AdaptiveBatchConfig &config() const { return config_; }
+    double arrival_rate() const { return rate_; } // requests per second
+    double exec_base_ms() const { return base_ms_; }
+    double exec_per_item_ms() const { return per_item_ms_; }
+
+private:
+    double predict_exec_ms(double size) const { return base_ms_ + per_item_ms_ * size; }
+
+    AdaptiveBatchConfig config_;
+    // arrival rate (EWMA, 50 ms time constant)
+    double rate_ = 0.0;
+    uint64_t last_pushed_ = 0;
+    std::chrono::steady_clock::time_point last_sample_{};
+    // decayed sums for the base + per_item * n fit
+    double s_w_ = 0, s_n_ = 0, s_t_ = 0, s_nn_ = 0, s_nt_ = 0;
+    double base_ms_ = 0.0;
+    double per_item_ms_ = 0.0;
+};
+
+struct BatcherStats
+{
+    bool adaptive;
+    size_t max_batch_size; // current window
+    double max_wait_ms;
+    double latency_slo_ms; // 0 when not adaptive
+    double arrival_rate;
+    double exec_base_ms;
+    double exec_per_item_ms;
+    size_t queue_depth;
+    uint64_t expired;  // shed by the dispatcher
+    uint64_t rejected; // refused by a full dispatcher ring
+    uint64_t batches;
+    uint64_t requests;
+};
+
+/**
+ * @brief One request queue plus the policy that forms its batches.
+ *
+ * Fixed queues always use the same window; adaptive ones re-tune it before every
+ * batch. The queue does not own a thread: DynamicBatcher drives one from a single
+ * thread, ModelScheduler drives many from a worker pool.
+ */
+class BatchQueue
+{
+public:
+    BatchQueue(std::shared_ptr<Dispatcher> dispatcher, size_t max_batch_size, std::chrono::milliseconds max_wait);
+    BatchQueue(std::shared_ptr<Dispatcher> dispatcher, AdaptiveBatchConfig config);
+
+    // Wait up to idle_wait for work, then form a batch under the current window.
+    std::vector<RequestPtr> pop_batch(std::chrono::milliseconds idle_wait);
+    // Feed a finished batch back into the counters and the cost model.
+    void record_batch(size_t size, double exec_ms);
+
+    BatcherStats stats();
+    Dispatcher &dispatcher() { return *dispatcher_; }
+
+private:
+    std::shared_ptr<Dispatcher> dispatcher_;
+    BatchWindow fixed_;
+    std::unique_ptr<AdaptiveBatchPolicy> policy_; // null in fixed mode
+
+    std::mutex mu_;
+    BatchWindow window_;
+    uint64_t batches_ = 0;
+    uint64_t requests_ = 0;
+};
 
 class DynamicBatcher
 {
@@ -11,22 +115,29 @@ public:
     // handler receives a vector of requests to process
     using Handler = std::function<void(const std::vector<RequestPtr> &)>;
 
+    // Fixed window: batches of up to max_batch_size, held open for up to max_wait.
     DynamicBatcher(std::shared_ptr<Dispatcher> dispatcher,
                    size_t max_batch_size,
                    std::chrono::milliseconds max_wait,
                    Handler handler);
 
+    // Adaptive window tuned online towards config.latency_slo.
+    DynamicBatcher(std::shared_ptr<Dispatcher> dispatcher,
+                   AdaptiveBatchConfig config,
+                   Handler handler);
+
     ~DynamicBatcher();
 
     void start();
     void stop();
 
+    // Thread-safe snapshot of the live window and counters.
+    BatcherStats stats();
+
 private:
     void loop();
 
-    std::shared_ptr<Dispatcher> dispatcher_;
-    size_t max_batch_size_;
-    std::chrono::milliseconds max_wait_;
+    BatchQueue queue_;
     Handler handler_;
     std::thread thr_;
     std::atomic<bool> running_{false};
@@ -1,49 +1,238 @@
 // core/src/dispatcher.cpp
 #include "dispatcher.h"
+#include "request_pool.h"
+#include "ring_buffer.h"
+#include <algorithm>
 #include <stdexcept>
+#include <thread>
+#include <utility>
 
-// NOTE: Dispatcher::Dispatcher() = default; is defined in the header.
+namespace
+{
+    // Requests moved from the ring into the deadline heap per drain step
+    constexpr size_t kDrainChunk = 256;
+}
+
+Dispatcher::Dispatcher(ExpiredHandler on_expired)
+    : Dispatcher(DispatcherConfig{}, std::move(on_expired))
+{
+}
+
+Dispatcher::Dispatcher(DispatcherConfig config, ExpiredHandler on_expired)
+    : on_expired_(std::move(on_expired)), config_(config)
+{
+    if (config_.ring_capacity > 0)
+    {
+        ring_ = std::make_unique<BoundedRing<RequestPtr>>(config_.ring_capacity);
+        drained_.reserve(kDrainChunk);
+    }
+    if (config_.pool_size > 0)
+        pool_ = std::make_unique<RequestPool>(config_.pool_size);
+}
+
+Dispatcher::~Dispatcher() = default;
+
+/**
+ * @brief Returns an empty request, reusing a pooled one when pooling is enabled.
+ */
+RequestPtr Dispatcher::make_request()
+{
+    return pool_ ? pool_->acquire() : std::make_shared<Request>();
+}
+
+/**
+ * @brief Gives finished requests back to the pool and empties the batch.
+ */
+void Dispatcher::recycle(std::vector<RequestPtr> &batch)
+{
+    if (pool_)
+    {
+        for (auto &r : batch)
+            pool_->release(std::move(r));
+    }
+    batch.clear();
+}
 
 /**
  * @brief Adds a request to the queue and notifies a waiting thread.
  */
-void Dispatcher::push_request(RequestPtr r)
+bool Dispatcher::push_request(RequestPtr r)
 {
+    r->timing.enqueued = std::chrono::steady_clock::now();
+    if (ring_)
+        return ring_push(r);
     {
         // Renamed from 'push' to 'push_request' to match the header
         std::lock_guard<std::mutex> lk(mu_);
-        queue_.push(r);
+        queue_.push(Entry{std::move(r), next_seq_++});
+        pushed_.fetch_add(1, std::memory_order_relaxed);
     }
     cv_.notify_one();
+    return true;
 }
 
 /**
- * @brief Pops up to max_items from the queue, waiting up to the timeout.
+ * @brief Ring mode push: claims a ring slot without locking.
+ *
+ * When the ring is full the request is rejected, or with block_when_full the producer
+ * backs off until the consumer frees a slot. The mutex is only taken to wake a
+ * consumer that is parked waiting for work.
  */
-std::vector<RequestPtr> Dispatcher::pop_batch(size_t max_items, std::chrono::milliseconds timeout)
+bool Dispatcher::ring_push(RequestPtr &req)
 {
-    std::unique_lock<std::mutex> lk(mu_);
+    // counted before it becomes visible, so the consumer can never take it below zero
+    queued_.fetch_add(1);
+    int attempts = 0;
+    while (!ring_->try_push(std::move(req)))
+    {
+        if (!config_.block_when_full)
+        {
+            queued_.fetch_sub(1);
+            rejected_.fetch_add(1, std::memory_order_relaxed);
+            return false;
+        }
+        if (++attempts < 64)
+            std::this_thread::yield();
+        else
+            std::this_thread::sleep_for(std::chrono::microseconds(50));
+    }
+    pushed_.fetch_add(1, std::memory_order_relaxed);
 
-    // Wait until queue is non-empty or timeout expires
-    if (queue_.empty())
+    // Pairs with the fence in ring_wait(): either the consumer sees this request before
+    // it blocks, or we see it waiting and wake it.
+    std::atomic_thread_fence(std::memory_order_seq_cst);
+    if (consumer_waiting_.load(std::memory_order_relaxed))
     {
-        cv_.wait_for(lk, timeout, [&]
-                     { return !queue_.empty(); });
+        std::lock_guard<std::mutex> lk(mu_);
+        cv_.notify_one();
     }
+    return true;
+}
 
-    std::vector<RequestPtr> out;
+/**
+ * @brief Moves what producers have published so far from the ring into the heap.
+ *
+ * Takes at most one ring's worth per call so a steady stream of producers cannot
+ * keep the consumer here forever.
+ */
+void Dispatcher::ring_drain()
+{
+    size_t budget = ring_->capacity();
+    size_t n;
+    while (budget > 0 && (n = ring_->drain(drained_, std::min(budget, kDrainChunk))) > 0)
+    {
+        for (auto &r : drained_)
+            queue_.push(Entry{std::move(r), next_seq_++});
+        drained_.clear();
+        budget -= n;
+    }
+}
+
+/**
+ * @brief Ring mode: drains until the heap holds `want` requests or `until` passes.
+ */
+bool Dispatcher::ring_wait(std::chrono::steady_clock::time_point until, size_t want)
+{
+    for (;;)
+    {
+        ring_drain();
+        if (queue_.size() >= want)
+            return true;
+        if (std::chrono::steady_clock::now() >= until)
+            return !queue_.empty();
+
+        std::unique_lock<std::mutex> lk(mu_);
+        consumer_waiting_.store(true, std::memory_order_relaxed);
+        std::atomic_thread_fence(std::memory_order_seq_cst);
+        cv_.wait_until(lk, until, [&]
+                       { return queue_.size() + ring_->size_approx() >= want; });
+        consumer_waiting_.store(false, std::memory_order_relaxed);
+    }
+}
+
+/**
+ * @brief Takes up to max_items off the heap in deadline order, setting expired ones aside.
+ */
+void Dispatcher::pop_ready(size_t max_items, std::chrono::milliseconds timeout, std::chrono::steady_clock::time_point opened,
+                           std::vector<RequestPtr> &out, std::vector<RequestPtr> &expired)
+{
     auto start = std::chrono::steady_clock::now();
 
     // Collect items until queue is empty, max_items is reached, or effective timeout occurs
     while (!queue_.empty() && out.size() < max_items)
     {
-        out.push_back(queue_.front());
+        RequestPtr r = queue_.top().req;
         queue_.pop();
 
-        // Simple deadline check (kept the original logic for consistency)
-        if (std::chrono::steady_clock::now() - start > timeout)
+        // Running a request nobody is waiting for only delays the ones behind it
+        if (r->deadline <= start)
+        {
+            expired.push_back(std::move(r));
+            continue;
+        }
+        r->timing.batched = opened;
+        out.push_back(std::move(r));
+
+        // A zero timeout (the caller already knows work is queued) bounds nothing here:
+        // the batch is limited by max_items and the fill window instead
+        if (timeout.count() > 0 && std::chrono::steady_clock::now() - start > timeout)
             break;
     }
+}
+
+/**
+ * @brief Pops up to max_items from the queue in deadline order, waiting up to the timeout.
+ *
+ * Expired requests encountered on the way are dropped from the batch and reported
+ * to the expired handler after the lock is released.
+ */
+std::vector<RequestPtr> Dispatcher::pop_batch(size_t max_items, std::chrono::milliseconds timeout,
+                                              std::chrono::microseconds fill_window)
+{
+    std::vector<RequestPtr> out;
+    std::vector<RequestPtr> expired;
+    // when the first request was there and the batch started forming
+    std::chrono::steady_clock::time_point opened;
+    if (ring_)
+    {
+        // Hold a partial batch open while more requests arrive
+        bool ready = ring_wait(std::chrono::steady_clock::now() + timeout, 1);
+        opened = std::chrono::steady_clock::now();
+        if (ready && queue_.size() < max_items && fill_window.count() > 0)
+            ring_wait(opened + fill_window, max_items);
+
+        pop_ready(max_items, timeout, opened, out, expired);
+        queued_.fetch_sub(out.size() + expired.size());
+    }
+    else
+    {
+        std::unique_lock<std::mutex> lk(mu_);
+
+        // Wait until queue is non-empty or timeout expires
+        if (queue_.empty())
+        {
+            cv_.wait_for(lk, timeout, [&]
+                         { return !queue_.empty(); });
+        }
+
+        // Hold a partial batch open while more requests arrive
+        opened = std::chrono::steady_clock::now();
+        if (!queue_.empty() && queue_.size() < max_items && fill_window.count() > 0)
+        {
+            cv_.wait_for(lk, fill_window, [&]
+                         { return queue_.size() >= max_items; });
+        }
+
+        pop_ready(max_items, timeout, opened, out, expired);
+    }
+    expired_.fetch_add(expired.size(), std::memory_order_relaxed);
+
+    if (on_expired_)
+    {
+        for (const auto &r : expired)
+            on_expired_(r);
+    }
+    recycle(expired);
     return out;
 }
 
@@ -52,6 +241,32 @@ std::vector<RequestPtr> Dispatcher::pop_batch(size_t max_items, std::chrono::mil
  */
 size_t Dispatcher::size()
 {
+    if (ring_)
+        return queued_.load();
     std::lock_guard<std::mutex> lk(mu_);
     return queue_.size();
-}
\ No newline at end of file
+}
+
+/**
+ * @brief Returns how many requests have been pushed since construction.
+ */
+uint64_t Dispatcher::pushed_count()
+{
+    return pushed_.load(std::memory_order_relaxed);
+}
+
+/**
+ * @brief Returns how many requests have been shed because their deadline passed.
+ */
+uint64_t Dispatcher::expired_count()
+{
+    return expired_.load(std::memory_order_relaxed);
+}
+
+/**
+ * @brief Returns how many requests push_request() refused because the ring was full.
+ */
+uint64_t Dispatcher::rejected_count()
+{
+    return rejected_.load(std::memory_order_relaxed);
+}
@@ -1,6 +1,11 @@
 // core/src/dispatcher.h
 #pragma once
 
+#include "batch_buffer.h"
+#include "trace.h"
+
+#include <atomic>
+#include <cstdint>
 #include <functional>
 #include <memory>
 #include <queue>
@@ -12,32 +17,137 @@
 
 // Forward declaration
 class Dispatcher;
+class RequestPool;
+template <typename T>
+class BoundedRing;
+
+enum class RequestStatus
+{
+    Ok,      // its batch ran; outputs are set
+    Expired, // shed after its deadline passed, never ran
+};
 
 struct Request
 {
-    int id;
-    std::chrono::steady_clock::time_point deadline;
+    int id = 0;
+    // Latest useful completion time; time_point::max() means no deadline.
+    std::chrono::steady_clock::time_point deadline = std::chrono::steady_clock::time_point::max();
     std::string payload;
+    // routes the request to its model's queue in ModelScheduler
+    std::string model_name;
+    std::string model_version;
+    std::vector<float> inputs;
+    // filled by InferenceEngine::run_batch: a view of this request's row of the batch's
+    // output buffer, which stays out of the pool until the view is reset
+    FloatView outputs;
+    // when it reached each stage; reported in the reply if `traced` (a sampled trace)
+    RequestTiming timing;
+    bool traced = false;
+    // Completion handle: called once, on the worker thread, when the request's batch
+    // has run or it was shed, so the caller can answer without waiting on a thread.
+    std::function<void(Request &, RequestStatus)> on_complete;
+
+    void complete(RequestStatus status)
+    {
+        if (!on_complete)
+            return;
+        auto done = std::move(on_complete);
+        on_complete = nullptr;
+        done(*this, status);
+    }
 };
 
 using RequestPtr = std::shared_ptr<Request>;
 
+struct DispatcherConfig
+{
+    // 0 keeps the mutex-guarded queue; otherwise producers push into a lock-free ring
+    // of this many slots (rounded up to a power of two)
+    size_t ring_capacity = 0;
+    // ring mode, ring full: wait for space (backpressure) or fail push_request (reject)
+    bool block_when_full = false;
+    // Request objects kept for make_request()/recycle(); 0 disables pooling
+    size_t pool_size = 0;
+};
+
 /**
  * @brief Handles dispatching and batching requests using a thread-safe queue.
+ *
+ * Requests are served earliest-deadline-first (FIFO among equal deadlines). Requests
+ * whose deadline has already passed when they reach the front are shed: they are
+ * never returned by pop_batch() and are handed to the expired handler instead, so
+ * the owner can fail them (e.g. with DEADLINE_EXCEEDED).
+ *
+ * In ring mode (DispatcherConfig::ring_capacity > 0) producers never take a lock:
+ * push_request() claims a slot in a bounded lock-free ring, and pop_batch() drains the
+ * ring into a deadline heap owned by the consumer. pop_batch() must then be called by
+ * one thread at a time.
  */
 class Dispatcher
 {
 public:
-    Dispatcher() = default; // Declaration of the default constructor
+    using ExpiredHandler = std::function<void(const RequestPtr &)>;
+
+    explicit Dispatcher(ExpiredHandler on_expired = nullptr);
+    explicit Dispatcher(DispatcherConfig config, ExpiredHandler on_expired = nullptr);
+    ~Dispatcher();
+
+    // A cleared request, from the pool when pooling is enabled.
+    RequestPtr make_request();
+    // Hand finished requests back to the pool (no-op without one); clears `batch`.
+    void recycle(std::vector<RequestPtr> &batch);
 
     // Public method declarations (signatures)
-    void push_request(RequestPtr req);
-    std::vector<RequestPtr> pop_batch(size_t max_size, std::chrono::milliseconds timeout);
+    // Returns false if the request was rejected because the ring is full.
+    bool push_request(RequestPtr req);
+    // Waits up to `timeout` for a first request, then up to `fill_window` for the
+    // batch to reach max_size before taking what is there.
+    std::vector<RequestPtr> pop_batch(size_t max_size, std::chrono::milliseconds timeout,
+                                      std::chrono::microseconds fill_window = std::chrono::microseconds::zero());
     size_t size();
+    uint64_t pushed_count();
+    uint64_t expired_count();
+    uint64_t rejected_count();
 
 private:
+    struct Entry
+    {
+        RequestPtr req;
+        uint64_t seq; // arrival order, breaks deadline ties
+    };
+
+    // priority_queue keeps the "largest" on top, so order later deadlines lower
+    struct LaterDeadline
+    {
+        bool operator()(const Entry &a, const Entry &b) const
+        {
+            if (a.req->deadline != b.req->deadline)
+                return a.req->deadline > b.req->deadline;
+            return a.seq > b.seq;
+        }
+    };
+
+    bool ring_push(RequestPtr &req);
+    void ring_drain();
+    bool ring_wait(std::chrono::steady_clock::time_point until, size_t want);
+    void pop_ready(size_t max_items, std::chrono::milliseconds timeout, std::chrono::steady_clock::time_point opened,
+                   std::vector<RequestPtr> &out, std::vector<RequestPtr> &expired);
+
     // Private members required for the implementation in dispatcher.cpp
-    std::queue<RequestPtr> queue_;
+    // Mutex mode: shared under mu_. Ring mode: owned by the consumer.
+    std::priority_queue<Entry, std::vector<Entry>, LaterDeadline> queue_;
     std::mutex mu_;
     std::condition_variable cv_;
+    uint64_t next_seq_ = 0;
+    std::atomic<uint64_t> pushed_{0};
+    std::atomic<uint64_t> expired_{0};
+    std::atomic<uint64_t> rejected_{0};
+    ExpiredHandler on_expired_;
+
+    DispatcherConfig config_;
+    std::unique_ptr<BoundedRing<RequestPtr>> ring_;
+    std::unique_ptr<RequestPool> pool_;
+    std::atomic<size_t> queued_{0};      // ring mode: in the ring or the heap
+    std::atomic<bool> consumer_waiting_{false};
+    std::vector<RequestPtr> drained_;    // ring mode scratch
 };
\ No newline at end of file
@@ -1,7 +1,16 @@
 // core/src/grpc_server.cpp
 #include "grpc_server.h"
+#include "dispatcher.h"
+#include "trace.h"
 #include "inference.pb.h"
 #include "inference.grpc.pb.h"
+#include <algorithm>
+#include <condition_variable>
+#include <cstring>
+#include <deque>
+#include <future>
+#include <map>
+#include <tuple>
 #include <iostream>
 #include <thread>
 #include <chrono>
@@ -11,11 +20,17 @@ using grpc::ServerBuilder;
 using grpc::ServerContext;
 using grpc::Status;
 
+static const std::chrono::milliseconds kDefaultDrainTimeout{30000};
+// requests a StreamInference call may have in flight before it stops reading
+static const size_t kStreamMaxOutstanding = 128;
+
 Status InferenceServiceImpl::LoadModel(ServerContext *context, const athena::inference::ModelRef *req,
                                        athena::inference::LoadReply *reply)
 {
-    // TODO: integrate with core model manager / loader
-    std::string msg = "stub: loaded " + req->model_name() + ":" + req->version();
+    // TODO: integrate with core model manager / loader; only the registry tracks it for now
+    if (registry_)
+        registry_->load(req->model_name(), req->version());
+    std::string msg = std::string(registry_ ? "" : "stub: ") + "loaded " + req->model_name() + ":" + req->version();
     reply->set_ok(true);
     reply->set_message(msg);
     std::cout << "[gRPC] LoadModel: " << msg << std::endl;
@@ -25,44 +40,846 @@ Status InferenceServiceImpl::LoadModel(ServerContext *context, const athena::inf
 Status InferenceServiceImpl::UnloadModel(ServerContext *context, const athena::inference::ModelRef *req,
                                          athena::inference::LoadReply *reply)
 {
-    std::string msg = "stub: unloaded " + req->model_name() + ":" + req->version();
+    if (registry_)
+    {
+        // Blocks this call, not the model's traffic, until the version has drained
+        auto timeout = req->drain_timeout_ms() ? std::chrono::milliseconds(req->drain_timeout_ms()) : kDefaultDrainTimeout;
+        std::string error;
+        if (!registry_->unload(req->model_name(), req->version(), timeout, &error))
+        {
+            reply->set_ok(false);
+            reply->set_message(error);
+            std::cout << "[gRPC] UnloadModel: " << error << std::endl;
+            return Status::OK;
+        }
+        if (scheduler_)
+            scheduler_->remove_model(req->model_name(), req->version());
+    }
+    std::string msg = std::string(registry_ ? "" : "stub: ") + "unloaded " + req->model_name() + ":" + req->version();
     reply->set_ok(true);
     reply->set_message(msg);
     std::cout << "[gRPC] UnloadModel: " << msg << std::endl;
     return Status::OK;
 }
 
+Status InferenceServiceImpl::SetActiveVersion(ServerContext *context, const athena::inference::ModelRef *req,
+                                              athena::inference::LoadReply *reply)
+{
+    if (!registry_)
+        return Status(grpc::StatusCode::UNIMPLEMENTED, "this core has no model registry");
+    std::string error;
+    bool ok = registry_->activate(req->model_name(), req->version(), &error);
+    reply->set_ok(ok);
+    reply->set_message(ok ? "active " + req->model_name() + ":" + req->version() : error);
+    std::cout << "[gRPC] SetActiveVersion: " << reply->message() << std::endl;
+    return Status::OK;
+}
+
+static const char *model_state_name(ModelRegistry::State state)
+{
+    switch (state)
+    {
+    case ModelRegistry::State::Loaded:
+        return "loaded";
+    case ModelRegistry::State::Draining:
+        return "draining";
+    default:
+        return "not_loaded";
+    }
+}
+
 Status InferenceServiceImpl::GetModelStatus(ServerContext *context, const athena::inference::ModelRef *req,
                                             athena::inference::ModelStatusReply *reply)
 {
     reply->set_model_name(req->model_name());
     reply->set_version(req->version());
-    reply->set_status("not_loaded"); // stub
+    if (!registry_)
+    {
+        reply->set_status("not_loaded"); // stub
+        return Status::OK;
+    }
+    reply->set_status(model_state_name(registry_->state(req->model_name(), req->version())));
+    reply->set_active_version(registry_->active_version(req->model_name()));
+    reply->set_in_flight(registry_->in_flight(req->model_name(), req->version()));
+    return Status::OK;
+}
+
+// The client's gRPC deadline on the steady clock used by Request::deadline.
+// No deadline (infinite) maps to time_point::max().
+static std::chrono::steady_clock::time_point request_deadline(const ServerContext *context)
+{
+    auto deadline = context->deadline();
+    if (deadline == std::chrono::system_clock::time_point::max())
+        return std::chrono::steady_clock::time_point::max();
+    auto remaining = deadline - std::chrono::system_clock::now();
+    return std::chrono::steady_clock::now() +
+           std::chrono::duration_cast<std::chrono::steady_clock::duration>(remaining);
+}
+
+// The client sent a sampled W3C trace context: report its stage timings
+static bool traced(const ServerContext *context)
+{
+    const auto &metadata = context->client_metadata();
+    auto it = metadata.find("traceparent");
+    return it != metadata.end() && traceparent_sampled(std::string(it->second.data(), it->second.size()));
+}
+
+// From the model queue's request pool when there is a scheduler to queue it on
+static RequestPtr make_request(ModelScheduler *scheduler, const ServerContext *context,
+                               const athena::inference::InferenceRequest &req, const std::string &version)
+{
+    RequestPtr r;
+    if (scheduler)
+    {
+        r = scheduler->make_request(req.model_name(), version);
+    }
+    else
+    {
+        r = std::make_shared<Request>();
+        r->model_name = req.model_name();
+        r->model_version = version;
+    }
+    r->timing.arrived = std::chrono::steady_clock::now();
+    r->traced = traced(context);
+    r->deadline = request_deadline(context);
+    r->payload = req.request_id();
+    return r;
+}
+
+static Status expired_status(const std::string &request_id)
+{
+    return Status(grpc::StatusCode::DEADLINE_EXCEEDED, "deadline expired before execution: " + request_id);
+}
+
+static Status queue_full_status(const std::string &request_id)
+{
+    return Status(grpc::StatusCode::RESOURCE_EXHAUSTED, "model queue full: " + request_id);
+}
+
+// Fail fast instead of queueing work that would miss its deadline anyway; the
+// retry-after-ms trailer (or, without a context, the message) tells the client when a
+// retry has a fair chance.
+static Status shed_status(ServerContext *context, const AdmissionDecision &d, const std::string &request_id)
+{
+    std::string retry_after = std::to_string(d.retry_after.count());
+    if (context)
+        context->AddTrailingMetadata("retry-after-ms", retry_after);
+    return Status(grpc::StatusCode::RESOURCE_EXHAUSTED,
+                  std::string("shed by admission control (") + shed_reason_name(d.reason) + ")" +
+                      (context ? "" : ", retry after " + retry_after + " ms") + ": " + request_id);
+}
+
+AdmissionDecision InferenceServiceImpl::admit(const athena::inference::InferenceRequest &req, const std::string &version,
+                                              std::chrono::steady_clock::time_point deadline, size_t n)
+{
+    if (!admission_)
+        return AdmissionDecision{};
+    BatcherStats queue = scheduler_ ? scheduler_->queue_stats(req.model_name(), version) : BatcherStats{};
+    return admission_->admit(req.model_name(), version, req.tenant(), queue, deadline, n);
+}
+
+// Pins the version the request runs on (the active one if it names none) until the
+// lease is dropped, so an unload waits for it.
+ModelLease InferenceServiceImpl::acquire(const athena::inference::InferenceRequest &req)
+{
+    if (!registry_)
+        return ModelLease::unmanaged(req.model_version());
+    return registry_->acquire(req.model_name(), req.model_version());
+}
+
+static std::string not_routable_message(const athena::inference::InferenceRequest &req)
+{
+    if (req.model_version().empty())
+        return "no active version of " + req.model_name() + ": " + req.request_id();
+    return req.model_name() + ":" + req.model_version() + " is not loaded: " + req.request_id();
+}
+
+// The float32 inputs an input_shm reference points at, or nullptr with `error` set
+static const float *shm_inputs(const ShmRegions &shm, const athena::inference::InferenceRequest &req,
+                               std::shared_ptr<ShmMapping> &region, size_t *count, std::string *error)
+{
+    const auto &ref = req.input_shm();
+    if (ref.dtype() != athena::inference::DT_FLOAT32 || ref.length() % sizeof(float) != 0)
+    {
+        *error = "input_shm must hold float32 values: " + req.request_id();
+        return nullptr;
+    }
+    region = shm.find(ref.region());
+    const char *data = region ? region->span(ref.offset(), ref.length()) : nullptr;
+    if (!data)
+    {
+        *error = "input_shm is outside any registered region: " + req.request_id();
+        return nullptr;
+    }
+    *count = ref.length() / sizeof(float);
+    return reinterpret_cast<const float *>(data);
+}
+
+// Decodes a float32 input_tensor into `out`; false with `error` set for other dtypes
+static bool tensor_inputs(const athena::inference::InferenceRequest &req, std::vector<float> &out, std::string *error)
+{
+    const auto &tensor = req.input_tensor();
+    if (tensor.dtype() != athena::inference::DT_FLOAT32 || tensor.data().size() % sizeof(float) != 0)
+    {
+        *error = "input_tensor must hold float32 values: " + req.request_id();
+        return false;
+    }
+    out.resize(tensor.data().size() / sizeof(float));
+    if (!out.empty())
+        std::memcpy(out.data(), tensor.data().data(), tensor.data().size());
+    return true;
+}
+
+// Packed requests get their outputs back as a float32 output_tensor
+static void set_output_tensor(const athena::inference::InferenceRequest &req, const float *begin, const float *end,
+                              athena::inference::InferenceReply *reply)
+{
+    size_t count = static_cast<size_t>(end - begin);
+    auto *out = reply->mutable_output_tensor();
+    out->set_dtype(athena::inference::DT_FLOAT32);
+    // outputs the size of the inputs keep their shape
+    if (req.input_tensor().data().size() == count * sizeof(float) && req.input_tensor().shape_size() > 0)
+        *out->mutable_shape() = req.input_tensor().shape();
+    else
+        out->add_shape(static_cast<int64_t>(count));
+    out->set_data(reinterpret_cast<const char *>(begin), count * sizeof(float));
+}
+
+// Outputs go into the request's output_shm when it has room for them, inline otherwise
+static void set_outputs(const athena::inference::InferenceRequest &req, const float *begin, const float *end,
+                        const ShmRegions &shm, athena::inference::InferenceReply *reply)
+{
+    size_t bytes = static_cast<size_t>(end - begin) * sizeof(float);
+    if (req.has_output_shm() && bytes <= req.output_shm().length())
+    {
+        const auto &ref = req.output_shm();
+        if (shm.write(ref.region(), ref.offset(), begin, bytes))
+        {
+            auto *out = reply->mutable_output_shm();
+            out->set_region(ref.region());
+            out->set_offset(ref.offset());
+            out->set_length(bytes);
+            out->set_dtype(athena::inference::DT_FLOAT32);
+            // the mock echoes its inputs, so they keep their shape
+            if (req.has_input_shm() && req.input_shm().length() == bytes)
+                *out->mutable_shape() = req.input_shm().shape();
+            else
+                out->add_shape(end - begin);
+            return;
+        }
+    }
+    reply->mutable_outputs()->Add(begin, end);
+}
+
+static double ms_since(std::chrono::steady_clock::time_point start)
+{
+    return std::chrono::duration<double, std::milli>(std::chrono::steady_clock::now() - start).count();
+}
+
+static void set_timings(const StageBreakdown &s, athena::inference::InferenceReply *reply)
+{
+    auto *timings = reply->mutable_timings();
+    timings->set_queue_ms(s.queue_ms);
+    timings->set_batch_ms(s.batch_ms);
+    timings->set_exec_ms(s.exec_ms);
+    timings->set_total_ms(s.total_ms);
+}
+
+// Simple mock: copy inputs to outputs to simulate work. `start` is when the request
+// arrived; with `traced`, all of its time counts as execution.
+static void fill_mock_reply(const athena::inference::InferenceRequest &req, const std::string &version,
+                            const ShmRegions &shm, std::chrono::steady_clock::time_point start, bool traced,
+                            athena::inference::InferenceReply *reply)
+{
+    std::shared_ptr<ShmMapping> region;
+    size_t count = 0;
+    std::string error;
+    const float *inputs = req.has_input_shm() ? shm_inputs(shm, req, region, &count, &error) : nullptr;
+    if (inputs)
+        set_outputs(req, inputs, inputs + count, shm, reply);
+    else
+        set_outputs(req, req.inputs().data(), req.inputs().data() + req.inputs_size(), shm, reply);
+    if (req.has_input_tensor())
+    {
+        // packed payloads are echoed back packed
+        *reply->mutable_output_tensor() = req.input_tensor();
+    }
+    reply->set_request_id(req.request_id());
+    reply->set_model_version(version);
+    reply->set_status("ok");
+    double ms = ms_since(start);
+    reply->set_latency_ms(ms);
+    if (traced)
+    {
+        StageBreakdown s;
+        s.exec_ms = s.total_ms = ms;
+        set_timings(s, reply);
+    }
+}
+
+// Reply for a request whose batch has run
+static void fill_batch_reply(const athena::inference::InferenceRequest &req, const Request &done, double latency_ms,
+                             const ShmRegions &shm, athena::inference::InferenceReply *reply)
+{
+    if (req.has_input_tensor())
+        set_output_tensor(req, done.outputs.begin(), done.outputs.end(), reply);
+    else
+        set_outputs(req, done.outputs.begin(), done.outputs.end(), shm, reply);
+    reply->set_request_id(req.request_id());
+    reply->set_model_version(done.model_version);
+    reply->set_latency_ms(latency_ms);
+    reply->set_status("ok");
+    if (done.traced)
+        set_timings(stage_breakdown(done.timing, std::chrono::steady_clock::now()), reply);
+}
+
+Status InferenceServiceImpl::prepare(ServerContext *context, const athena::inference::InferenceRequest &req,
+                                     ModelLease &lease, RequestPtr &request, Admission admission)
+{
+    lease = acquire(req);
+    if (!lease)
+        return Status(grpc::StatusCode::NOT_FOUND, not_routable_message(req));
+    // Shed work whose caller has already given up instead of running it
+    auto deadline = request_deadline(context);
+    if (deadline <= std::chrono::steady_clock::now())
+    {
+        if (stats_)
+            stats_->record_rejected();
+        return expired_status(req.request_id());
+    }
+    if (admission != Admission::Skip)
+    {
+        AdmissionDecision admitted = admit(req, lease.version(), deadline);
+        if (!admitted.admitted())
+            return shed_status(admission == Admission::Trailer ? context : nullptr, admitted, req.request_id());
+    }
+    // only now, so refused requests never make the scheduler set up a queue for their model
+    request = make_request(scheduler_, context, req, lease.version());
+    if (req.has_input_shm())
+    {
+        // one copy out of the client's memory, no protobuf decoding
+        std::shared_ptr<ShmMapping> region;
+        size_t count = 0;
+        std::string error;
+        const float *inputs = shm_inputs(shm_, req, region, &count, &error);
+        if (!inputs)
+            return Status(grpc::StatusCode::INVALID_ARGUMENT, error);
+        request->inputs.assign(inputs, inputs + count);
+    }
+    else if (req.has_input_tensor())
+    {
+        std::string error;
+        if (!tensor_inputs(req, request->inputs, &error))
+            return Status(grpc::StatusCode::INVALID_ARGUMENT, error);
+    }
+    else
+    {
+        request->inputs.assign(req.inputs().begin(), req.inputs().end());
+    }
     return Status::OK;
 }
 
 Status InferenceServiceImpl::RunInference(ServerContext *context, const athena::inference::InferenceRequest *req,
                                           athena::inference::InferenceReply *reply)
 {
-    // Simple mock: copy inputs to outputs and sleep to simulate work
-    for (int i = 0; i < req->inputs_size(); ++i)
+    auto start = std::chrono::steady_clock::now();
+    ModelLease lease;
+    RequestPtr request;
+    Status status = prepare(context, *req, lease, request);
+    if (!status.ok())
+        return status;
+
+    if (!scheduler_)
     {
-        reply->add_outputs(req->inputs(i));
+        fill_mock_reply(*req, lease.version(), shm_, start, request->traced, reply);
     }
-    reply->set_request_id(req->request_id());
-    reply->set_latency_ms(1.0);
-    reply->set_status("ok");
-    std::cout << "[gRPC] RunInference for request: " << req->request_id() << " inputs=" << req->inputs_size() << "\n";
+    else
+    {
+        // This thread waits out the queue and the batch; AsyncInferenceService does not
+        std::promise<RequestStatus> done;
+        auto finished = done.get_future();
+        request->on_complete = [&done](Request &, RequestStatus s)
+        { done.set_value(s); };
+        if (!scheduler_->push_request(request))
+            return queue_full_status(req->request_id());
+        if (finished.get() == RequestStatus::Expired)
+            return expired_status(req->request_id());
+        fill_batch_reply(*req, *request, ms_since(start), shm_, reply);
+    }
+    if (stats_)
+        stats_->record_inference(req->model_name(), lease.version(), ms_since(start));
     return Status::OK;
 }
 
-void run_grpc_server(const std::string &listen_addr)
+// One RunInference RPC, from arrival to reply. It deletes itself once the reply is
+// sent; the ModelLease it holds keeps an unload waiting until then.
+class AsyncInferenceService::Call
 {
-    InferenceServiceImpl service;
+public:
+    Call(AsyncInferenceService *service, grpc::ServerCompletionQueue *cq)
+        : service_(service), cq_(cq), responder_(&context_)
+    {
+        service_->RequestRunInference(&context_, &req_, &responder_, cq_, cq_, this);
+    }
+
+    // A completion-queue event for this call: the RPC arrived, or its reply went out
+    void proceed(bool ok)
+    {
+        if (replied_ || !ok)
+        {
+            delete this;
+            return;
+        }
+        new Call(service_, cq_); // keep a call waiting for the next RPC
+        start();
+    }
+
+private:
+    void start()
+    {
+        start_ = std::chrono::steady_clock::now();
+        RequestPtr request;
+        Status status = service_->prepare(&context_, req_, lease_, request);
+        if (!status.ok())
+            return finish(status);
+        request->on_complete = [this](Request &done, RequestStatus s)
+        { on_done(done, s); };
+        // Once pushed, the call may be answered and deleted at any moment
+        if (!service_->scheduler_->push_request(request))
+        {
+            request->on_complete = nullptr;
+            finish(queue_full_status(req_.request_id()));
+        }
+    }
+
+    // On the worker thread that ran (or shed) the request
+    void on_done(Request &done, RequestStatus status)
+    {
+        if (status == RequestStatus::Expired)
+            return finish(expired_status(req_.request_id()));
+        double ms = ms_since(start_);
+        fill_batch_reply(req_, done, ms, service_->shm_, &reply_);
+        if (service_->stats_)
+            service_->stats_->record_inference(req_.model_name(), done.model_version, ms);
+        replied_ = true;
+        responder_.Finish(reply_, Status::OK, this);
+    }
+
+    void finish(const Status &status)
+    {
+        replied_ = true;
+        responder_.FinishWithError(status, this);
+    }
+
+    AsyncInferenceService *service_;
+    grpc::ServerCompletionQueue *cq_;
+    ServerContext context_;
+    athena::inference::InferenceRequest req_;
+    athena::inference::InferenceReply reply_;
+    grpc::ServerAsyncResponseWriter<athena::inference::InferenceReply> responder_;
+    ModelLease lease_;
+    std::chrono::steady_clock::time_point start_;
+    bool replied_ = false;
+};
+
+AsyncInferenceService::AsyncInferenceService(ModelScheduler *scheduler, RuntimeStats *stats,
+                                             AdmissionController *admission, ModelRegistry *registry)
+{
+    scheduler_ = scheduler;
+    stats_ = stats;
+    admission_ = admission;
+    registry_ = registry;
+}
+
+void AsyncInferenceService::serve(grpc::ServerCompletionQueue *cq)
+{
+    new Call(this, cq);
+    void *tag;
+    bool ok;
+    while (cq->Next(&tag, &ok))
+        static_cast<Call *>(tag)->proceed(ok);
+}
+
+Status InferenceServiceImpl::RunInferenceBatch(ServerContext *context, const athena::inference::InferenceBatchRequest *req,
+                                               athena::inference::InferenceBatchReply *reply)
+{
+    // The batch shares one RPC deadline; if it has passed, none of it is worth running
+    auto start = std::chrono::steady_clock::now();
+    auto deadline = request_deadline(context);
+    std::string batch_id = "batch of " + std::to_string(req->requests_size());
+    if (deadline <= start)
+    {
+        if (stats_)
+            stats_->record_rejected();
+        return expired_status(batch_id);
+    }
+    // Every request resolves its version up front, so one batch never straddles a swap
+    size_t n = static_cast<size_t>(req->requests_size());
+    std::vector<ModelLease> leases(n);
+    std::vector<RequestPtr> requests(n);
+    for (size_t i = 0; i < n; ++i)
+    {
+        Status status = prepare(context, req->requests(i), leases[i], requests[i], Admission::Skip);
+        if (!status.ok())
+            return status;
+    }
+    // Admission per (model, version, tenant) group; the batch runs whole or not at all
+    std::map<std::tuple<std::string, std::string, std::string>, std::pair<const athena::inference::InferenceRequest *, size_t>> groups;
+    for (size_t i = 0; i < n; ++i)
+    {
+        const auto &r = req->requests(i);
+        auto &group = groups[std::make_tuple(r.model_name(), leases[i].version(), r.tenant())];
+        group.first = &r;
+        ++group.second;
+    }
+    for (const auto &group : groups)
+    {
+        AdmissionDecision admitted = admit(*group.second.first, std::get<1>(group.first), deadline, group.second.second);
+        if (!admitted.admitted())
+            return shed_status(context, admitted, batch_id);
+    }
+
+    // Replies are returned in request order so clients can match them by index.
+    reply->mutable_replies()->Reserve(req->requests_size());
+    if (!scheduler_)
+    {
+        for (size_t i = 0; i < n; ++i)
+            fill_mock_reply(req->requests(i), leases[i].version(), shm_, start, requests[i]->traced, reply->add_replies());
+    }
+    else
+    {
+        // Each request joins its model's queue like a RunInference; this thread waits for all of them
+        std::mutex mu;
+        std::condition_variable cv;
+        size_t pending = n;
+        bool expired = false, full = false;
+        for (auto &request : requests)
+        {
+            request->on_complete = [&](Request &, RequestStatus s)
+            {
+                std::lock_guard<std::mutex> lk(mu);
+                expired = expired || s == RequestStatus::Expired;
+                if (--pending == 0)
+                    cv.notify_all();
+            };
+            if (!scheduler_->push_request(request))
+            {
+                request->on_complete = nullptr;
+                std::lock_guard<std::mutex> lk(mu);
+                full = true;
+                --pending;
+            }
+        }
+        std::unique_lock<std::mutex> lk(mu);
+        cv.wait(lk, [&]
+                { return pending == 0; });
+        if (full)
+            return queue_full_status(batch_id);
+        if (expired)
+            return expired_status(batch_id);
+        double ms = ms_since(start);
+        for (size_t i = 0; i < n; ++i)
+            fill_batch_reply(req->requests(i), *requests[i], ms, shm_, reply->add_replies());
+    }
+    if (stats_)
+    {
+        // every request in the batch waited for the whole batch
+        double ms = ms_since(start);
+        for (size_t i = 0; i < n; ++i)
+            stats_->record_inference(req->requests(i).model_name(), leases[i].version(), ms);
+    }
+    return Status::OK;
+}
+
+static const char *status_code_name(grpc::StatusCode code)
+{
+    switch (code)
+    {
+    case grpc::StatusCode::NOT_FOUND:
+        return "not_found";
+    case grpc::StatusCode::INVALID_ARGUMENT:
+        return "invalid_argument";
+    case grpc::StatusCode::DEADLINE_EXCEEDED:
+        return "deadline_exceeded";
+    case grpc::StatusCode::RESOURCE_EXHAUSTED:
+        return "resource_exhausted";
+    default:
+        return "error";
+    }
+}
+
+// A stream request that failed keeps the stream open; only its reply says so
+static athena::inference::InferenceReply stream_error_reply(const athena::inference::InferenceRequest &req,
+                                                            const Status &status)
+{
+    athena::inference::InferenceReply reply;
+    reply.set_request_id(req.request_id());
+    reply.set_status(std::string(status_code_name(status.error_code())) + ": " + status.error_message());
+    return reply;
+}
+
+// One request read from a StreamInference call, kept until its reply is queued
+struct StreamRequest
+{
+    athena::inference::InferenceRequest req;
+    ModelLease lease;
+    std::chrono::steady_clock::time_point start;
+};
+
+Status InferenceServiceImpl::StreamInference(ServerContext *context,
+                                             grpc::ServerReaderWriter<athena::inference::InferenceReply,
+                                                                      athena::inference::InferenceRequest> *stream)
+{
+    // Each request goes through the same checks and model queue as RunInference, and a
+    // writer thread sends its reply as soon as it completes, in completion order. Past
+    // kStreamMaxOutstanding unanswered requests this thread stops reading, so the HTTP/2
+    // flow-control window fills up and pushes back on the client.
+    std::mutex mu;
+    std::condition_variable cv;
+    std::deque<athena::inference::InferenceReply> ready;
+    size_t outstanding = 0; // read and not yet written
+    bool reading = true, writable = true;
+    auto send = [&](athena::inference::InferenceReply reply)
+    {
+        std::lock_guard<std::mutex> lk(mu);
+        ready.push_back(std::move(reply));
+        cv.notify_all();
+    };
+    std::thread writer([&]
+                       {
+        std::unique_lock<std::mutex> lk(mu);
+        while (true)
+        {
+            cv.wait(lk, [&]
+                    { return !ready.empty() || (!reading && outstanding == 0); });
+            if (ready.empty())
+                return;
+            athena::inference::InferenceReply reply = std::move(ready.front());
+            ready.pop_front();
+            lk.unlock();
+            bool ok = writable && stream->Write(reply);
+            lk.lock();
+            writable = ok; // once the client is gone, the rest are dropped
+            --outstanding;
+            cv.notify_all();
+        } });
+
+    while (!context->IsCancelled())
+    {
+        auto call = std::make_shared<StreamRequest>();
+        if (!stream->Read(&call->req))
+            break;
+        {
+            std::unique_lock<std::mutex> lk(mu);
+            cv.wait(lk, [&]
+                    { return outstanding < kStreamMaxOutstanding; });
+            if (!writable)
+                break;
+            ++outstanding;
+        }
+        call->start = std::chrono::steady_clock::now();
+        RequestPtr request;
+        Status status = prepare(context, call->req, call->lease, request, Admission::Message);
+        if (!status.ok())
+        {
+            send(stream_error_reply(call->req, status));
+            continue;
+        }
+        if (!scheduler_)
+        {
+            athena::inference::InferenceReply reply;
+            fill_mock_reply(call->req, call->lease.version(), shm_, call->start, request->traced, &reply);
+            if (stats_)
+                stats_->record_inference(call->req.model_name(), call->lease.version(), ms_since(call->start));
+            send(std::move(reply));
+            continue;
+        }
+        request->on_complete = [this, call, send](Request &done, RequestStatus s)
+        {
+            if (s == RequestStatus::Expired)
+                return send(stream_error_reply(call->req, expired_status(call->req.request_id())));
+            athena::inference::InferenceReply reply;
+            double ms = ms_since(call->start);
+            fill_batch_reply(call->req, done, ms, shm_, &reply);
+            if (stats_)
+                stats_->record_inference(call->req.model_name(), done.model_version, ms);
+            call->lease = ModelLease(); // answered: an unload need not wait for the write
+            send(std::move(reply));
+        };
+        if (!scheduler_->push_request(request))
+        {
+            request->on_complete = nullptr;
+            send(stream_error_reply(call->req, queue_full_status(call->req.request_id())));
+        }
+    }
+    {
+        // the writer finishes once every request read so far has been answered
+        std::lock_guard<std::mutex> lk(mu);
+        reading = false;
+        cv.notify_all();
+    }
+    writer.join();
+    return Status::OK;
+}
+
+static void fill_batcher_stats(const BatcherStats &s, athena::inference::BatcherStats *reply)
+{
+    reply->set_adaptive(s.adaptive);
+    reply->set_max_batch_size(static_cast<uint32_t>(s.max_batch_size));
+    reply->set_max_wait_ms(s.max_wait_ms);
+    reply->set_latency_slo_ms(s.latency_slo_ms);
+    reply->set_arrival_rate(s.arrival_rate);
+    reply->set_exec_base_ms(s.exec_base_ms);
+    reply->set_exec_per_item_ms(s.exec_per_item_ms);
+    reply->set_queue_depth(static_cast<uint32_t>(s.queue_depth));
+    reply->set_batches(s.batches);
+    reply->set_requests(s.requests);
+}
+
+static void fill_histogram(const HistogramSnapshot &h, athena::inference::Histogram *out)
+{
+    for (double b : h.bounds)
+        out->add_bounds(b);
+    for (uint64_t c : h.counts)
+        out->add_counts(c);
+    out->set_count(h.count);
+    out->set_sum(h.sum);
+}
+
+Status InferenceServiceImpl::GetBatcherStats(ServerContext *context, const athena::inference::Empty *req,
+                                             athena::inference::BatcherStats *reply)
+{
+    if (scheduler_)
+        fill_batcher_stats(scheduler_->stats(), reply);
+    return Status::OK;
+}
+
+void InferenceServiceImpl::fill_runtime_stats(athena::inference::RuntimeStats *reply)
+{
+    if (scheduler_)
+    {
+        BatcherStats b = scheduler_->stats();
+        reply->set_queue_depth(static_cast<uint32_t>(b.queue_depth));
+        reply->set_expired_total(b.expired);
+        reply->set_rejected_total(b.rejected);
+        fill_batcher_stats(b, reply->mutable_batcher());
+        for (const auto &q : scheduler_->model_stats())
+        {
+            auto *out = reply->add_queues();
+            out->set_model_name(q.first.first);
+            out->set_version(q.first.second);
+            fill_batcher_stats(q.second, out->mutable_batcher());
+        }
+    }
+    if (stats_)
+    {
+        RuntimeSnapshot s = stats_->snapshot();
+        reply->set_uptime_s(s.uptime_s);
+        reply->set_rejected_total(reply->rejected_total() + s.rejected);
+        fill_histogram(s.batch_sizes, reply->mutable_batch_sizes());
+        for (const auto &m : s.models)
+        {
+            auto *out = reply->add_models();
+            out->set_model_name(m.model_name);
+            out->set_version(m.version);
+            fill_histogram(m.latency_ms, out->mutable_latency_ms());
+        }
+    }
+    if (admission_)
+    {
+        AdmissionSnapshot a = admission_->snapshot();
+        reply->set_admitted_total(a.admitted);
+        reply->set_shed_total(a.shed);
+        for (const auto &s : a.by_model)
+        {
+            auto *out = reply->add_shed();
+            out->set_model_name(s.model_name);
+            out->set_version(s.version);
+            out->set_reason(shed_reason_name(s.reason));
+            out->set_count(s.count);
+        }
+    }
+}
+
+Status InferenceServiceImpl::GetRuntimeStats(ServerContext *context, const athena::inference::RuntimeStatsRequest *req,
+                                             athena::inference::RuntimeStats *reply)
+{
+    fill_runtime_stats(reply);
+    return Status::OK;
+}
+
+Status InferenceServiceImpl::StreamRuntimeStats(ServerContext *context, const athena::inference::RuntimeStatsRequest *req,
+                                                grpc::ServerWriter<athena::inference::RuntimeStats> *writer)
+{
+    auto interval = std::chrono::milliseconds(std::max<uint32_t>(req->interval_ms() ? req->interval_ms() : 1000, 100));
+    while (!context->IsCancelled())
+    {
+        athena::inference::RuntimeStats snapshot;
+        fill_runtime_stats(&snapshot);
+        if (!writer->Write(snapshot))
+            break; // client went away
+        // sleep in short steps so a cancelled stream frees its thread promptly
+        auto next = std::chrono::steady_clock::now() + interval;
+        while (!context->IsCancelled() && std::chrono::steady_clock::now() < next)
+            std::this_thread::sleep_for(std::chrono::milliseconds(50));
+    }
+    return Status::OK;
+}
+
+Status InferenceServiceImpl::RegisterShmRegion(ServerContext *context, const athena::inference::ShmRegion *req,
+                                               athena::inference::LoadReply *reply)
+{
+    std::string error;
+    bool ok = shm_.attach(req->name(), req->size(), &error);
+    reply->set_ok(ok);
+    reply->set_message(ok ? "registered shm region " + req->name() : error);
+    std::cout << "[gRPC] RegisterShmRegion: " << reply->message() << std::endl;
+    return Status::OK;
+}
+
+Status InferenceServiceImpl::UnregisterShmRegion(ServerContext *context, const athena::inference::ShmRegion *req,
+                                                 athena::inference::LoadReply *reply)
+{
+    bool ok = shm_.detach(req->name());
+    reply->set_ok(ok);
+    reply->set_message((ok ? "unregistered shm region " : "no shm region ") + req->name());
+    return Status::OK;
+}
+
+void run_grpc_server(const std::string &listen_addr, ModelScheduler *scheduler, RuntimeStats *stats,
+                     AdmissionController *admission, ModelRegistry *registry, GrpcServerOptions options)
+{
+    // async needs the scheduler to answer from; without one RunInference is a mock anyway
+    bool async = options.async_inference && scheduler;
+    std::unique_ptr<InferenceServiceImpl> service;
+    AsyncInferenceService *async_service = nullptr;
+    if (async)
+        service.reset(async_service = new AsyncInferenceService(scheduler, stats, admission, registry));
+    else
+        service = std::make_unique<InferenceServiceImpl>(scheduler, stats, admission, registry);
+
     ServerBuilder builder;
     builder.AddListeningPort(listen_addr, grpc::InsecureServerCredentials());
-    builder.RegisterService(&service);
+    if (!options.unix_socket.empty())
+        builder.AddListeningPort("unix:" + options.unix_socket, grpc::InsecureServerCredentials());
+    builder.RegisterService(service.get());
+    std::vector<std::unique_ptr<grpc::ServerCompletionQueue>> cqs;
+    for (size_t i = 0; async && i < std::max<size_t>(options.cq_threads, 1); i++)
+        cqs.push_back(builder.AddCompletionQueue());
     std::unique_ptr<Server> server(builder.BuildAndStart());
-    std::cout << "[gRPC] Server listening on " << listen_addr << std::endl;
+
+    std::vector<std::thread> cq_threads;
+    for (auto &cq : cqs)
+        cq_threads.emplace_back([async_service, cq = cq.get()]
+                                { async_service->serve(cq); });
+    std::cout << "[gRPC] Server listening on " << listen_addr << " (RunInference "
+              << (async ? "async, " + std::to_string(cqs.size()) + " completion queue(s)" : std::string("sync"))
+              << ")" << (options.unix_socket.empty() ? "" : " and unix:" + options.unix_socket) << std::endl;
     server->Wait();
+
+    // the server is shut down: drain the queues so every pending call is freed
+    for (auto &cq : cqs)
+        cq->Shutdown();
+    for (auto &t : cq_threads)
+        t.join();
 }
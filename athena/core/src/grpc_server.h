@@ -5,11 +5,22 @@
 #include <vector>
 #include <grpcpp/grpcpp.h>
 #include "inference.grpc.pb.h"
+#include "scheduler.h"
+#include "runtime_stats.h"
+#include "admission.h"
+#include "model_registry.h"
+#include "shm_region.h"
 
-class InferenceServiceImpl final : public athena::inference::InferenceService::Service
+class InferenceServiceImpl : public athena::inference::InferenceService::Service
 {
 public:
-    InferenceServiceImpl() = default;
+    // scheduler and stats may be null; the stats RPCs then report empty values, and the
+    // inference RPCs answer inline with a mock echo instead of going through the batcher.
+    // Without an admission controller every request is admitted; without a registry the
+    // model RPCs are stubs and requests run on the version they name.
+    explicit InferenceServiceImpl(ModelScheduler *scheduler = nullptr, RuntimeStats *stats = nullptr,
+                                  AdmissionController *admission = nullptr, ModelRegistry *registry = nullptr)
+        : scheduler_(scheduler), stats_(stats), admission_(admission), registry_(registry) {}
 
     grpc::Status LoadModel(grpc::ServerContext *context, const athena::inference::ModelRef *req,
                            athena::inference::LoadReply *reply) override;
@@ -17,12 +28,95 @@ public:
     grpc::Status UnloadModel(grpc::ServerContext *context, const athena::inference::ModelRef *req,
                              athena::inference::LoadReply *reply) override;
 
+    grpc::Status SetActiveVersion(grpc::ServerContext *context, const athena::inference::ModelRef *req,
+                                  athena::inference::LoadReply *reply) override;
+
     grpc::Status GetModelStatus(grpc::ServerContext *context, const athena::inference::ModelRef *req,
                                 athena::inference::ModelStatusReply *reply) override;
 
     grpc::Status RunInference(grpc::ServerContext *context, const athena::inference::InferenceRequest *req,
                               athena::inference::InferenceReply *reply) override;
+
+    grpc::Status RunInferenceBatch(grpc::ServerContext *context, const athena::inference::InferenceBatchRequest *req,
+                                   athena::inference::InferenceBatchReply *reply) override;
+
+    grpc::Status StreamInference(grpc::ServerContext *context,
+                                 grpc::ServerReaderWriter<athena::inference::InferenceReply,
+                                                          athena::inference::InferenceRequest> *stream) override;
+
+    grpc::Status GetBatcherStats(grpc::ServerContext *context, const athena::inference::Empty *req,
+                                 athena::inference::BatcherStats *reply) override;
+
+    grpc::Status GetRuntimeStats(grpc::ServerContext *context, const athena::inference::RuntimeStatsRequest *req,
+                                 athena::inference::RuntimeStats *reply) override;
+
+    grpc::Status StreamRuntimeStats(grpc::ServerContext *context, const athena::inference::RuntimeStatsRequest *req,
+                                    grpc::ServerWriter<athena::inference::RuntimeStats> *writer) override;
+
+    grpc::Status RegisterShmRegion(grpc::ServerContext *context, const athena::inference::ShmRegion *req,
+                                   athena::inference::LoadReply *reply) override;
+
+    grpc::Status UnregisterShmRegion(grpc::ServerContext *context, const athena::inference::ShmRegion *req,
+                                     athena::inference::LoadReply *reply) override;
+
+protected:
+    void fill_runtime_stats(athena::inference::RuntimeStats *reply);
+    AdmissionDecision admit(const athena::inference::InferenceRequest &req, const std::string &version,
+                            std::chrono::steady_clock::time_point deadline, size_t n = 1);
+    ModelLease acquire(const athena::inference::InferenceRequest &req);
+    // How prepare() applies admission: shed with a retry-after-ms trailer (unary), with
+    // the hint in the message instead (streams carry one set of trailers per call), or
+    // not at all (batches admit each group themselves).
+    enum class Admission
+    {
+        Trailer,
+        Message,
+        Skip,
+    };
+    // Lease, deadline and admission checks shared by every inference RPC. On OK,
+    // `request` is ready to be pushed to the scheduler.
+    grpc::Status prepare(grpc::ServerContext *context, const athena::inference::InferenceRequest &req,
+                         ModelLease &lease, RequestPtr &request, Admission admission = Admission::Trailer);
+
+    ModelScheduler *scheduler_;
+    RuntimeStats *stats_;
+    AdmissionController *admission_;
+    ModelRegistry *registry_;
+    // regions of co-located clients that pass tensors through shared memory
+    ShmRegions shm_;
+};
+
+/**
+ * @brief RunInference on completion queues; every other RPC stays synchronous.
+ *
+ * Each RPC is pushed into the scheduler with a completion handle and answered from the
+ * worker thread when its batch finishes, so in-flight requests hold no server thread:
+ * the sync handler parks one thread per request for the whole queue wait and batch.
+ */
+class AsyncInferenceService final
+    : public athena::inference::InferenceService::WithAsyncMethod_RunInference<InferenceServiceImpl>
+{
+public:
+    AsyncInferenceService(ModelScheduler *scheduler, RuntimeStats *stats = nullptr,
+                          AdmissionController *admission = nullptr, ModelRegistry *registry = nullptr);
+
+    // Accepts and drives RunInference calls on `cq` until it is shut down.
+    void serve(grpc::ServerCompletionQueue *cq);
+
+private:
+    class Call;
+};
+
+struct GrpcServerOptions
+{
+    // RunInference on completion queues (AsyncInferenceService) or one thread per call
+    bool async_inference = true;
+    size_t cq_threads = 2;
+    // also listen on this Unix domain socket (for unix:// and shm:// clients on this host)
+    std::string unix_socket;
 };
 
 // helper to run server
-void run_grpc_server(const std::string &listen_addr = "0.0.0.0:50051");
+void run_grpc_server(const std::string &listen_addr = "0.0.0.0:50051", ModelScheduler *scheduler = nullptr,
+                     RuntimeStats *stats = nullptr, AdmissionController *admission = nullptr,
+                     ModelRegistry *registry = nullptr, GrpcServerOptions options = GrpcServerOptions{});
@@ -1,17 +1,56 @@
 // core/src/inference.cpp
 #include "inference.h"
+#include <algorithm>
 #include <thread>
 #include <chrono>
+#include <cstring>
 #include <iostream>
 
+BatchTensor InferenceEngine::assemble(const std::vector<RequestPtr> &batch)
+{
+    BatchTensor tensor;
+    tensor.rows = batch.size();
+    for (const auto &r : batch)
+        tensor.cols = std::max(tensor.cols, r->inputs.size());
+    tensor.buffer = buffers_.acquire(tensor.rows * tensor.cols);
+    for (size_t i = 0; i < tensor.rows; i++)
+    {
+        const auto &inputs = batch[i]->inputs;
+        float *row = tensor.row(i);
+        std::copy(inputs.begin(), inputs.end(), row);
+        std::fill(row + inputs.size(), row + tensor.cols, 0.0f);
+    }
+    return tensor;
+}
+
 void InferenceEngine::run_batch(const std::vector<RequestPtr> &batch)
 {
+    auto exec_start = std::chrono::steady_clock::now();
+    BatchTensor input = assemble(batch);
+    BatchTensor output{buffers_.acquire(input.rows * input.cols), input.rows, input.cols};
+    // Mock model: the output tensor is the input tensor
+    if (input.rows * input.cols > 0)
+        std::memcpy(output.row(0), input.row(0), input.rows * input.cols * sizeof(float));
     // Mock work to simulate inference latency that grows slightly with batch size
     int batch_size = static_cast<int>(batch.size());
-    int base_ms = 2;     // base latency
-    int per_item_ms = 1; // per-request cost
-    int total_ms = base_ms + per_item_ms * batch_size;
-    std::this_thread::sleep_for(std::chrono::milliseconds(total_ms));
-    // print debug
-    std::cout << "[InferenceEngine] processed batch size=" << batch_size << " took " << total_ms << "ms\n";
+    if (config_.simulate_latency)
+    {
+        int base_ms = 2;     // base latency
+        int per_item_ms = 1; // per-request cost
+        int total_ms = base_ms + per_item_ms * batch_size;
+        std::this_thread::sleep_for(std::chrono::milliseconds(total_ms));
+        // print debug
+        std::cout << "[InferenceEngine] processed batch size=" << batch_size << " took " << total_ms << "ms\n";
+    }
+    // Hand each request its row without copying; the output buffer goes back to the
+    // pool once every request has been answered and released.
+    std::shared_ptr<const BatchBuffer> owner = output.buffer;
+    for (size_t i = 0; i < output.rows; i++)
+        batch[i]->outputs = FloatView(owner, output.row(i), batch[i]->inputs.size());
+    auto exec_end = std::chrono::steady_clock::now();
+    for (const auto &r : batch)
+    {
+        r->timing.exec_start = exec_start;
+        r->timing.exec_end = exec_end;
+    }
 }
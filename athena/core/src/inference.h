@@ -1,12 +1,33 @@
 // core/src/inference.h
 #pragma once
+#include "batch_buffer.h"
 #include "dispatcher.h"
 #include <vector>
 
+struct InferenceEngineConfig
+{
+    // sleep 2 ms + 1 ms per item per batch, roughly what a real model would take
+    bool simulate_latency = true;
+    // input/output batch buffers kept for reuse; each batch in flight holds two
+    size_t pooled_buffers = 16;
+};
+
 class InferenceEngine
 {
 public:
-    InferenceEngine() = default;
-    // simulate running inference on a batch (synchronous)
+    explicit InferenceEngine(InferenceEngineConfig config = InferenceEngineConfig())
+        : config_(config), buffers_(config.pooled_buffers) {}
+
+    // simulate running inference on a batch (synchronous). The batch's inputs are
+    // gathered into one contiguous tensor and the outputs written into another; each
+    // request's `outputs` is a view of its row of that buffer (the mock echoes inputs).
     void run_batch(const std::vector<RequestPtr> &batch);
+    // Gather the batch's inputs into a pooled, aligned [batch size, widest input]
+    // tensor; shorter inputs are zero-padded.
+    BatchTensor assemble(const std::vector<RequestPtr> &batch);
+    BatchBufferStats buffer_stats() const { return buffers_.stats(); }
+
+private:
+    InferenceEngineConfig config_;
+    BatchBufferPool buffers_;
 };
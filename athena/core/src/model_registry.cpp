@@ -0,0 +1,173 @@
+// core/src/model_registry.cpp
+#include "model_registry.h"
+
+ModelLease::ModelLease(ModelRegistry *registry, std::string name, std::string version)
+    : registry_(registry), name_(std::move(name)), version_(std::move(version))
+{
+}
+
+ModelLease::ModelLease(ModelLease &&other) noexcept
+    : registry_(other.registry_), unmanaged_(other.unmanaged_),
+      name_(std::move(other.name_)), version_(std::move(other.version_))
+{
+    other.registry_ = nullptr;
+    other.unmanaged_ = false;
+}
+
+ModelLease &ModelLease::operator=(ModelLease &&other) noexcept
+{
+    if (this != &other)
+    {
+        reset();
+        registry_ = other.registry_;
+        unmanaged_ = other.unmanaged_;
+        name_ = std::move(other.name_);
+        version_ = std::move(other.version_);
+        other.registry_ = nullptr;
+        other.unmanaged_ = false;
+    }
+    return *this;
+}
+
+ModelLease::~ModelLease()
+{
+    reset();
+}
+
+void ModelLease::reset()
+{
+    if (registry_)
+        registry_->release(name_, version_);
+    registry_ = nullptr;
+    unmanaged_ = false;
+}
+
+ModelLease ModelLease::unmanaged(std::string version)
+{
+    ModelLease lease;
+    lease.unmanaged_ = true;
+    lease.version_ = std::move(version);
+    return lease;
+}
+
+void ModelRegistry::load(const std::string &name, const std::string &version)
+{
+    std::lock_guard<std::mutex> lk(mu_);
+    Model &model = models_[name];
+    model.versions[version].state = State::Loaded;
+    if (model.active.empty())
+        model.active = version;
+}
+
+bool ModelRegistry::activate(const std::string &name, const std::string &version, std::string *error)
+{
+    std::lock_guard<std::mutex> lk(mu_);
+    auto it = models_.find(name);
+    if (it == models_.end() || it->second.versions.count(version) == 0 ||
+        it->second.versions[version].state != State::Loaded)
+    {
+        if (error)
+            *error = name + ":" + version + " is not loaded";
+        return false;
+    }
+    it->second.active = version;
+    return true;
+}
+
+bool ModelRegistry::unload(const std::string &name, const std::string &version,
+                           std::chrono::milliseconds drain_timeout, std::string *error)
+{
+    std::unique_lock<std::mutex> lk(mu_);
+    auto it = models_.find(name);
+    if (it == models_.end() || it->second.versions.count(version) == 0)
+        return true; // nothing to do
+    Model &model = it->second;
+    model.versions[version].state = State::Draining;
+    if (model.active == version)
+        model.active.clear();
+
+    bool drained = drained_.wait_for(lk, drain_timeout, [&]
+                                     {
+                                         auto m = models_.find(name);
+                                         if (m == models_.end())
+                                             return true;
+                                         auto v = m->second.versions.find(version);
+                                         // reloaded while we waited, or already gone
+                                         return v == m->second.versions.end() || v->second.state != State::Draining ||
+                                                v->second.leases == 0; });
+    auto m = models_.find(name);
+    if (m == models_.end())
+        return true;
+    auto v = m->second.versions.find(version);
+    if (v == m->second.versions.end() || v->second.state != State::Draining)
+        return true;
+    if (!drained)
+    {
+        if (error)
+            *error = name + ":" + version + " still has " + std::to_string(v->second.leases) + " request(s) in flight";
+        return false;
+    }
+    m->second.versions.erase(v);
+    if (m->second.versions.empty())
+        models_.erase(m);
+    return true;
+}
+
+ModelLease ModelRegistry::acquire(const std::string &name, const std::string &version)
+{
+    std::lock_guard<std::mutex> lk(mu_);
+    auto it = models_.find(name);
+    if (it == models_.end())
+        return ModelLease::unmanaged(version);
+    const std::string &resolved = version.empty() ? it->second.active : version;
+    auto v = it->second.versions.find(resolved);
+    if (resolved.empty() || v == it->second.versions.end() || v->second.state != State::Loaded)
+        return ModelLease();
+    ++v->second.leases;
+    return ModelLease(this, name, resolved);
+}
+
+void ModelRegistry::release(const std::string &name, const std::string &version)
+{
+    bool notify = false;
+    {
+        std::lock_guard<std::mutex> lk(mu_);
+        auto it = models_.find(name);
+        if (it == models_.end())
+            return;
+        auto v = it->second.versions.find(version);
+        if (v == it->second.versions.end())
+            return;
+        if (--v->second.leases == 0 && v->second.state == State::Draining)
+            notify = true;
+    }
+    if (notify)
+        drained_.notify_all();
+}
+
+ModelRegistry::State ModelRegistry::state(const std::string &name, const std::string &version)
+{
+    std::lock_guard<std::mutex> lk(mu_);
+    auto it = models_.find(name);
+    if (it == models_.end())
+        return State::NotLoaded;
+    auto v = it->second.versions.find(version);
+    return v == it->second.versions.end() ? State::NotLoaded : v->second.state;
+}
+
+std::string ModelRegistry::active_version(const std::string &name)
+{
+    std::lock_guard<std::mutex> lk(mu_);
+    auto it = models_.find(name);
+    return it == models_.end() ? std::string() : it->second.active;
+}
+
+uint32_t ModelRegistry::in_flight(const std::string &name, const std::string &version)
+{
+    std::lock_guard<std::mutex> lk(mu_);
+    auto it = models_.find(name);
+    if (it == models_.end())
+        return 0;
+    auto v = it->second.versions.find(version);
+    return v == it->second.versions.end() ? 0 : v->second.leases;
+}
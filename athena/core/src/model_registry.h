@@ -0,0 +1,101 @@
+// core/src/model_registry.h
+#pragma once
+#include <chrono>
+#include <condition_variable>
+#include <cstdint>
+#include <map>
+#include <mutex>
+#include <string>
+#include <utility>
+
+class ModelRegistry;
+
+// Keeps one model version in use for the lifetime of a request; see ModelRegistry.
+class ModelLease
+{
+public:
+    ModelLease() = default;
+    ModelLease(ModelRegistry *registry, std::string name, std::string version);
+    ModelLease(ModelLease &&other) noexcept;
+    ModelLease &operator=(ModelLease &&other) noexcept;
+    ModelLease(const ModelLease &) = delete;
+    ModelLease &operator=(const ModelLease &) = delete;
+    ~ModelLease();
+
+    explicit operator bool() const { return registry_ != nullptr || unmanaged_; }
+    const std::string &version() const { return version_; }
+
+    // For models the registry does not manage: routed as requested, nothing to release.
+    static ModelLease unmanaged(std::string version);
+
+private:
+    void reset();
+
+    ModelRegistry *registry_ = nullptr;
+    bool unmanaged_ = false;
+    std::string name_;
+    std::string version_;
+};
+
+/**
+ * @brief Loaded versions of each model and the active version unversioned requests use.
+ *
+ * A request resolves its version once, on arrival, and holds a lease on it until it has
+ * been answered. activate() moves the active pointer in one step, so every request runs
+ * entirely on the old or the new version. unload() first stops new requests from
+ * reaching the version, then waits for its leases to drain before dropping it, which
+ * together make a zero-downtime swap: load v2, warm it, activate v2, unload v1.
+ *
+ * Models that were never loaded are not managed: their requests pass through with the
+ * version they name.
+ */
+class ModelRegistry
+{
+public:
+    enum class State
+    {
+        NotLoaded,
+        Loaded,
+        Draining, // being unloaded; no new requests
+    };
+
+    // Idempotent; a draining version becomes routable again. The first version loaded
+    // (or the first after the active one was unloaded) becomes active.
+    void load(const std::string &name, const std::string &version);
+    // Route unversioned requests for `name` to `version`. Fails if it is not loaded.
+    bool activate(const std::string &name, const std::string &version, std::string *error = nullptr);
+    // Stop routing to `version` (clearing the active pointer if it was active), wait up
+    // to `drain_timeout` for its in-flight requests, then forget it. Returns false, with
+    // the version left draining, if requests are still in flight at the timeout.
+    bool unload(const std::string &name, const std::string &version, std::chrono::milliseconds drain_timeout,
+                std::string *error = nullptr);
+
+    // Lease on the version a request should run on; an empty version means the active
+    // one. False (empty lease) if that version is not routable.
+    ModelLease acquire(const std::string &name, const std::string &version);
+
+    State state(const std::string &name, const std::string &version);
+    std::string active_version(const std::string &name);
+    uint32_t in_flight(const std::string &name, const std::string &version);
+
+private:
+    friend class ModelLease;
+
+    struct Version
+    {
+        State state = State::Loaded;
+        uint32_t leases = 0;
+    };
+
+    struct Model
+    {
+        std::string active;
+        std::map<std::string, Version> versions;
+    };
+
+    void release(const std::string &name, const std::string &version);
+
+    std::mutex mu_;
+    std::condition_variable drained_;
+    std::map<std::string, Model> models_;
+};
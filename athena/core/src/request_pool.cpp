@@ -0,0 +1,46 @@
+// core/src/request_pool.cpp
+#include "request_pool.h"
+#include <utility>
+
+RequestPool::RequestPool(size_t capacity)
+    : free_(capacity)
+{
+    for (size_t i = 0; i < free_.capacity(); i++)
+        free_.try_push(std::make_shared<Request>());
+}
+
+/**
+ * @brief Takes a cleared request from the pool, or allocates one if it is empty.
+ */
+RequestPtr RequestPool::acquire()
+{
+    RequestPtr req;
+    if (free_.try_pop(req))
+        return req;
+    misses_.fetch_add(1, std::memory_order_relaxed);
+    return std::make_shared<Request>();
+}
+
+/**
+ * @brief Returns a finished request to the pool.
+ *
+ * Requests still referenced elsewhere are left alone; they are freed normally when
+ * the last reference goes. Strings and vectors are cleared rather than reassigned
+ * so their buffers are reused by the next request.
+ */
+void RequestPool::release(RequestPtr req)
+{
+    if (!req || req.use_count() != 1)
+        return;
+    req->id = 0;
+    req->deadline = std::chrono::steady_clock::time_point::max();
+    req->payload.clear();
+    req->model_name.clear();
+    req->model_version.clear();
+    req->inputs.clear();
+    req->outputs.reset();
+    req->timing = RequestTiming{};
+    req->traced = false;
+    req->on_complete = nullptr;
+    free_.try_push(std::move(req));
+}
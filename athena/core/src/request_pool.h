@@ -0,0 +1,30 @@
+// core/src/request_pool.h
+#pragma once
+#include "dispatcher.h"
+#include "ring_buffer.h"
+#include <atomic>
+#include <cstdint>
+
+/**
+ * @brief Preallocated Request objects handed out and taken back without locks.
+ *
+ * acquire() reuses a pooled request (its shared_ptr control block included) instead of
+ * allocating one per call; release() resets a request and returns it once the caller
+ * holds the last reference. When the pool runs dry acquire() falls back to make_shared,
+ * counted as a miss, and release() lets requests go when the pool is full.
+ */
+class RequestPool
+{
+public:
+    explicit RequestPool(size_t capacity);
+
+    RequestPtr acquire();
+    void release(RequestPtr req);
+
+    size_t capacity() const { return free_.capacity(); }
+    uint64_t misses() const { return misses_.load(std::memory_order_relaxed); }
+
+private:
+    BoundedRing<RequestPtr> free_;
+    std::atomic<uint64_t> misses_{0};
+};
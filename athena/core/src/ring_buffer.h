@@ -0,0 +1,121 @@
+// core/src/ring_buffer.h
+#pragma once
+#include <atomic>
+#include <cstddef>
+#include <cstdint>
+#include <memory>
+#include <utility>
+#include <vector>
+
+/**
+ * @brief Bounded lock-free queue (Vyukov's sequence-numbered ring).
+ *
+ * Any number of threads may push and pop. Every slot carries a sequence number that
+ * says whether it is free for the producer at position `pos` (seq == pos) or holds the
+ * value for the consumer at `pos` (seq == pos + 1), so producers only contend on one
+ * CAS of the enqueue position and never wait for each other. Capacity is rounded up
+ * to a power of two.
+ */
+template <typename T>
+class BoundedRing
+{
+public:
+    explicit BoundedRing(size_t capacity)
+    {
+        size_t n = 2;
+        while (n < capacity)
+            n <<= 1;
+        mask_ = n - 1;
+        cells_.reset(new Cell[n]);
+        for (size_t i = 0; i < n; i++)
+            cells_[i].seq.store(i, std::memory_order_relaxed);
+    }
+
+    BoundedRing(const BoundedRing &) = delete;
+    BoundedRing &operator=(const BoundedRing &) = delete;
+
+    // Returns false (leaving `value` untouched) when the ring is full.
+    bool try_push(T &&value)
+    {
+        Cell *cell;
+        size_t pos = enqueue_pos_.load(std::memory_order_relaxed);
+        for (;;)
+        {
+            cell = &cells_[pos & mask_];
+            size_t seq = cell->seq.load(std::memory_order_acquire);
+            auto dif = static_cast<intptr_t>(seq) - static_cast<intptr_t>(pos);
+            if (dif == 0)
+            {
+                if (enqueue_pos_.compare_exchange_weak(pos, pos + 1, std::memory_order_relaxed))
+                    break;
+            }
+            else if (dif < 0)
+                return false; // the slot still holds a value from one lap ago
+            else
+                pos = enqueue_pos_.load(std::memory_order_relaxed);
+        }
+        cell->value = std::move(value);
+        cell->seq.store(pos + 1, std::memory_order_release);
+        return true;
+    }
+
+    bool try_pop(T &value)
+    {
+        Cell *cell;
+        size_t pos = dequeue_pos_.load(std::memory_order_relaxed);
+        for (;;)
+        {
+            cell = &cells_[pos & mask_];
+            size_t seq = cell->seq.load(std::memory_order_acquire);
+            auto dif = static_cast<intptr_t>(seq) - static_cast<intptr_t>(pos + 1);
+            if (dif == 0)
+            {
+                if (dequeue_pos_.compare_exchange_weak(pos, pos + 1, std::memory_order_relaxed))
+                    break;
+            }
+            else if (dif < 0)
+                return false; // empty, or the producer of this slot has not finished yet
+            else
+                pos = dequeue_pos_.load(std::memory_order_relaxed);
+        }
+        value = std::move(cell->value);
+        cell->seq.store(pos + mask_ + 1, std::memory_order_release);
+        return true;
+    }
+
+    // Pops up to `max` values onto `out`; returns how many were taken.
+    size_t drain(std::vector<T> &out, size_t max)
+    {
+        size_t n = 0;
+        T value;
+        while (n < max && try_pop(value))
+        {
+            out.push_back(std::move(value));
+            n++;
+        }
+        return n;
+    }
+
+    size_t capacity() const { return mask_ + 1; }
+
+    // Claimed slots; may briefly include values that are still being written.
+    size_t size_approx() const
+    {
+        size_t tail = dequeue_pos_.load(std::memory_order_relaxed);
+        size_t head = enqueue_pos_.load(std::memory_order_relaxed);
+        return head > tail ? head - tail : 0;
+    }
+
+private:
+    // one cache line per slot, so neighbouring producers do not false-share
+    struct alignas(64) Cell
+    {
+        std::atomic<size_t> seq;
+        T value;
+    };
+
+    std::unique_ptr<Cell[]> cells_;
+    size_t mask_ = 0;
+    alignas(64) std::atomic<size_t> enqueue_pos_{0};
+    alignas(64) std::atomic<size_t> dequeue_pos_{0};
+};
@@ -0,0 +1,65 @@
+// core/src/runtime_stats.cpp
+#include "runtime_stats.h"
+#include <algorithm>
+
+namespace
+{
+    const std::vector<double> kBatchSizeBounds = {1, 2, 4, 8, 16, 32, 64, 128, 256};
+    const std::vector<double> kLatencyBoundsMs = {0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000};
+}
+
+FixedHistogram::FixedHistogram(std::vector<double> bounds)
+    : bounds_(std::move(bounds)), counts_(bounds_.size() + 1, 0)
+{
+}
+
+void FixedHistogram::record(double value)
+{
+    auto it = std::lower_bound(bounds_.begin(), bounds_.end(), value);
+    counts_[static_cast<size_t>(it - bounds_.begin())]++;
+    count_++;
+    sum_ += value;
+}
+
+HistogramSnapshot FixedHistogram::snapshot() const
+{
+    return HistogramSnapshot{bounds_, counts_, count_, sum_};
+}
+
+RuntimeStats::RuntimeStats()
+    : started_(std::chrono::steady_clock::now()), batch_sizes_(kBatchSizeBounds)
+{
+}
+
+void RuntimeStats::record_batch(size_t size)
+{
+    std::lock_guard<std::mutex> lk(mu_);
+    batch_sizes_.record(static_cast<double>(size));
+}
+
+void RuntimeStats::record_inference(const std::string &model_name, const std::string &version, double latency_ms)
+{
+    std::lock_guard<std::mutex> lk(mu_);
+    auto it = models_.find({model_name, version});
+    if (it == models_.end())
+        it = models_.emplace(std::make_pair(model_name, version), FixedHistogram(kLatencyBoundsMs)).first;
+    it->second.record(latency_ms);
+}
+
+void RuntimeStats::record_rejected()
+{
+    std::lock_guard<std::mutex> lk(mu_);
+    rejected_++;
+}
+
+RuntimeSnapshot RuntimeStats::snapshot()
+{
+    std::lock_guard<std::mutex> lk(mu_);
+    RuntimeSnapshot s;
+    s.uptime_s = std::chrono::duration<double>(std::chrono::steady_clock::now() - started_).count();
+    s.rejected = rejected_;
+    s.batch_sizes = batch_sizes_.snapshot();
+    for (const auto &entry : models_)
+        s.models.push_back(ModelLatencySnapshot{entry.first.first, entry.first.second, entry.second.snapshot()});
+    return s;
+}
\ No newline at end of file
@@ -0,0 +1,74 @@
+// core/src/runtime_stats.h
+#pragma once
+#include <chrono>
+#include <cstdint>
+#include <map>
+#include <mutex>
+#include <string>
+#include <utility>
+#include <vector>
+
+// Cumulative histogram data: counts[i] counts values <= bounds[i] and above the
+// previous bound; the last count is the overflow (+Inf) bucket.
+struct HistogramSnapshot
+{
+    std::vector<double> bounds;
+    std::vector<uint64_t> counts; // bounds.size() + 1 entries
+    uint64_t count = 0;
+    double sum = 0.0;
+};
+
+class FixedHistogram
+{
+public:
+    explicit FixedHistogram(std::vector<double> bounds);
+    void record(double value);
+    HistogramSnapshot snapshot() const;
+
+private:
+    std::vector<double> bounds_;
+    std::vector<uint64_t> counts_;
+    uint64_t count_ = 0;
+    double sum_ = 0.0;
+};
+
+struct ModelLatencySnapshot
+{
+    std::string model_name;
+    std::string version;
+    HistogramSnapshot latency_ms;
+};
+
+struct RuntimeSnapshot
+{
+    double uptime_s;
+    uint64_t rejected;
+    HistogramSnapshot batch_sizes;
+    std::vector<ModelLatencySnapshot> models;
+};
+
+/**
+ * @brief Process-wide counters and histograms reported by GetRuntimeStats.
+ *
+ * Everything is cumulative since start, so a sampler can compute rates from two
+ * snapshots and a missed sample loses no data. Safe to record from any thread.
+ */
+class RuntimeStats
+{
+public:
+    RuntimeStats();
+
+    void record_batch(size_t size);
+    void record_inference(const std::string &model_name, const std::string &version, double latency_ms);
+    // refused before reaching the dispatcher (e.g. deadline already passed)
+    void record_rejected();
+
+    RuntimeSnapshot snapshot();
+
+private:
+    std::mutex mu_;
+    std::chrono::steady_clock::time_point started_;
+    uint64_t rejected_ = 0;
+    FixedHistogram batch_sizes_;
+    std::map<std::pair<std::string, std::string>, FixedHistogram> models_;
+};
\ No newline at end of file
@@ -0,0 +1,295 @@
+// core/src/scheduler.cpp
+#include "scheduler.h"
+#include <algorithm>
+#include <iostream>
+#ifdef __linux__
+#include <pthread.h>
+#include <sched.h>
+#endif
+
+namespace
+{
+    // How long an idle worker blocks before re-checking running_
+    constexpr std::chrono::milliseconds kIdleWait(50);
+
+    void pin_current_thread(int cpu)
+    {
+#ifdef __linux__
+        cpu_set_t set;
+        CPU_ZERO(&set);
+        CPU_SET(cpu, &set);
+        if (pthread_setaffinity_np(pthread_self(), sizeof(set), &set) != 0)
+            std::cerr << "[ModelScheduler] could not pin worker to cpu " << cpu << "\n";
+#else
+        (void)cpu; // pinning is only supported on Linux
+#endif
+    }
+
+    std::unique_ptr<BatchQueue> make_queue(const ModelQueueConfig &config, Dispatcher::ExpiredHandler on_expired)
+    {
+        auto dispatcher = std::make_shared<Dispatcher>(config.dispatcher, std::move(on_expired));
+        if (config.adaptive)
+            return std::make_unique<BatchQueue>(dispatcher, config.adaptive_config);
+        return std::make_unique<BatchQueue>(dispatcher, config.max_batch_size, config.max_wait);
+    }
+}
+
+ModelScheduler::ModelQueue::ModelQueue(const ModelKey &key, const ModelQueueConfig &config,
+                                       Dispatcher::ExpiredHandler on_expired)
+    : key(key),
+      queue(make_queue(config, std::move(on_expired))),
+      weight(std::max(config.weight, 1u))
+{
+}
+
+ModelScheduler::ModelScheduler(WorkerPoolConfig config, Handler handler)
+    : config_(std::move(config)), handler_(std::move(handler))
+{
+    config_.workers = std::max<size_t>(config_.workers, 1);
+}
+
+ModelScheduler::~ModelScheduler()
+{
+    stop();
+}
+
+void ModelScheduler::configure_model(const std::string &name, const std::string &version, ModelQueueConfig config)
+{
+    std::lock_guard<std::mutex> lk(mu_);
+    std::unique_lock<std::shared_mutex> map_lk(queues_mu_);
+    ModelKey key{name, version};
+    auto it = queues_.find(key);
+    if (it != queues_.end() &&
+        (it->second->busy || it->second->pushers.load() > 0 || it->second->queue->dispatcher().size() > 0))
+        return; // keep a queue that is in use
+    auto queue = std::make_shared<ModelQueue>(key, config, config_.on_expired);
+    queue->pass = virtual_time_;
+    queue->configured = true;
+    queues_[key] = std::move(queue);
+}
+
+/**
+ * @brief Drops the least recently pushed queue that is idle, empty and not configured.
+ *
+ * False if there is none to drop.
+ */
+bool ModelScheduler::evict_idle_queue()
+{
+    auto victim = queues_.end();
+    for (auto it = queues_.begin(); it != queues_.end(); ++it)
+    {
+        const ModelQueue &q = *it->second;
+        if (q.configured || q.busy || q.pushers.load() > 0 || q.queue->dispatcher().size() != 0)
+            continue;
+        if (victim == queues_.end() || q.last_push.load() < victim->second->last_push.load())
+            victim = it;
+    }
+    if (victim == queues_.end())
+        return false;
+    queues_.erase(victim);
+    return true;
+}
+
+/**
+ * @brief The model's queue, created with the default settings if it does not exist.
+ *
+ * With `pushing` the caller is counted in the queue's pushers and must decrement it
+ * once its push is done. Null if the queue does not exist and max_queues leaves no
+ * room for it.
+ */
+ModelScheduler::QueuePtr ModelScheduler::find_queue(const ModelKey &key, bool pushing)
+{
+    {
+        std::shared_lock<std::shared_mutex> map_lk(queues_mu_);
+        auto it = queues_.find(key);
+        if (it != queues_.end())
+        {
+            if (pushing)
+                it->second->pushers.fetch_add(1);
+            return it->second;
+        }
+    }
+    std::lock_guard<std::mutex> lk(mu_);
+    std::unique_lock<std::shared_mutex> map_lk(queues_mu_);
+    auto it = queues_.find(key);
+    if (it == queues_.end())
+    {
+        if (config_.max_queues > 0 && queues_.size() >= config_.max_queues && !evict_idle_queue())
+            return nullptr;
+        auto queue = std::make_shared<ModelQueue>(key, config_.default_queue, config_.on_expired);
+        queue->pass = virtual_time_;
+        it = queues_.emplace(key, std::move(queue)).first;
+    }
+    if (pushing)
+        it->second->pushers.fetch_add(1);
+    return it->second;
+}
+
+RequestPtr ModelScheduler::make_request(const std::string &name, const std::string &version)
+{
+    QueuePtr q = find_queue({name, version}, false);
+    // without a queue the push will be refused; the request still needs an object
+    RequestPtr r = q ? q->queue->dispatcher().make_request() : std::make_shared<Request>();
+    r->model_name = name;
+    r->model_version = version;
+    return r;
+}
+
+bool ModelScheduler::push_request(RequestPtr req)
+{
+    QueuePtr q = find_queue({req->model_name, req->model_version}, true);
+    if (!q)
+        return false;
+    q->last_push.store(std::chrono::steady_clock::now().time_since_epoch().count());
+    Dispatcher &dispatcher = q->queue->dispatcher();
+    if (dispatcher.size() == 0)
+    {
+        // a model returning from idle competes from now on, without banked credit
+        std::lock_guard<std::mutex> lk(mu_);
+        q->pass = std::max(q->pass, virtual_time_);
+    }
+    // No scheduler lock here: a producer waiting on a full ring only blocks its own model
+    bool pushed = dispatcher.push_request(std::move(req));
+    q->pushers.fetch_sub(1);
+    if (!pushed)
+        return false;
+    {
+        // orders the notify after a worker that just found nothing has started waiting
+        std::lock_guard<std::mutex> lk(mu_);
+    }
+    cv_.notify_one();
+    return true;
+}
+
+ModelScheduler::QueuePtr ModelScheduler::next_ready()
+{
+    std::shared_lock<std::shared_mutex> map_lk(queues_mu_);
+    QueuePtr best;
+    for (auto &entry : queues_)
+    {
+        const QueuePtr &q = entry.second;
+        if (q->busy || q->queue->dispatcher().size() == 0)
+            continue;
+        if (!best || q->pass < best->pass)
+            best = q;
+    }
+    return best;
+}
+
+void ModelScheduler::start()
+{
+    running_ = true;
+    for (size_t i = 0; i < config_.workers; i++)
+        workers_.emplace_back(&ModelScheduler::worker_loop, this, i);
+}
+
+void ModelScheduler::stop()
+{
+    if (running_)
+    {
+        running_ = false;
+        cv_.notify_all();
+        for (auto &t : workers_)
+        {
+            if (t.joinable())
+                t.join();
+        }
+        workers_.clear();
+    }
+}
+
+void ModelScheduler::worker_loop(size_t index)
+{
+    if (!config_.cpus.empty())
+        pin_current_thread(config_.cpus[index % config_.cpus.size()]);
+
+    while (running_)
+    {
+        QueuePtr q;
+        {
+            std::unique_lock<std::mutex> lk(mu_);
+            cv_.wait_for(lk, kIdleWait, [&]
+                         { return !running_ || (q = next_ready()) != nullptr; });
+            if (!q || !running_)
+                continue;
+            q->busy = true;
+            virtual_time_ = q->pass;
+        }
+
+        // The queue already holds work; this only waits out the fill window
+        std::vector<RequestPtr> batch = q->queue->pop_batch(std::chrono::milliseconds(0));
+        double exec_ms = 0.0;
+        if (!batch.empty())
+        {
+            auto t0 = std::chrono::steady_clock::now();
+            handler_(q->key, batch);
+            exec_ms = std::chrono::duration<double, std::milli>(std::chrono::steady_clock::now() - t0).count();
+            q->queue->record_batch(batch.size(), exec_ms);
+            q->queue->dispatcher().recycle(batch);
+        }
+
+        {
+            std::lock_guard<std::mutex> lk(mu_);
+            q->busy = false;
+            // even an empty (all expired) turn costs a little, so it cannot spin at the front
+            q->pass += std::max(exec_ms, 0.001) / q->weight;
+        }
+        cv_.notify_one(); // the queue may be ready again for another worker
+    }
+}
+
+BatcherStats ModelScheduler::stats()
+{
+    auto per_model = model_stats();
+    BatcherStats total{};
+    const BatcherStats *busiest = nullptr;
+    for (const auto &entry : per_model)
+    {
+        if (!busiest || entry.second.requests > busiest->requests)
+            busiest = &entry.second;
+    }
+    if (busiest)
+        total = *busiest;
+    total.queue_depth = 0;
+    total.expired = total.rejected = total.batches = total.requests = 0;
+    for (const auto &entry : per_model)
+    {
+        total.queue_depth += entry.second.queue_depth;
+        total.expired += entry.second.expired;
+        total.rejected += entry.second.rejected;
+        total.batches += entry.second.batches;
+        total.requests += entry.second.requests;
+    }
+    return total;
+}
+
+std::vector<std::pair<ModelKey, BatcherStats>> ModelScheduler::model_stats()
+{
+    std::shared_lock<std::shared_mutex> map_lk(queues_mu_);
+    std::vector<std::pair<ModelKey, BatcherStats>> out;
+    for (auto &entry : queues_)
+        out.emplace_back(entry.first, entry.second->queue->stats());
+    return out;
+}
+
+BatcherStats ModelScheduler::queue_stats(const std::string &name, const std::string &version)
+{
+    std::shared_lock<std::shared_mutex> map_lk(queues_mu_);
+    auto it = queues_.find({name, version});
+    if (it == queues_.end())
+        return BatcherStats{};
+    return it->second->queue->stats();
+}
+
+bool ModelScheduler::remove_model(const std::string &name, const std::string &version)
+{
+    std::lock_guard<std::mutex> lk(mu_);
+    std::unique_lock<std::shared_mutex> map_lk(queues_mu_);
+    auto it = queues_.find({name, version});
+    if (it == queues_.end())
+        return true;
+    if (it->second->busy || it->second->pushers.load() > 0 || it->second->queue->dispatcher().size() != 0)
+        return false;
+    queues_.erase(it);
+    return true;
+}
@@ -0,0 +1,121 @@
+// core/src/scheduler.h
+#pragma once
+#include "batcher.h"
+#include <atomic>
+#include <condition_variable>
+#include <cstdint>
+#include <map>
+#include <memory>
+#include <mutex>
+#include <shared_mutex>
+#include <string>
+#include <thread>
+#include <utility>
+#include <vector>
+
+using ModelKey = std::pair<std::string, std::string>; // (model_name, model_version)
+
+struct ModelQueueConfig
+{
+    // fixed window, used unless adaptive is set
+    size_t max_batch_size = 16;
+    std::chrono::milliseconds max_wait{2};
+    bool adaptive = false;
+    AdaptiveBatchConfig adaptive_config;
+    // share of worker time relative to other models with pending work
+    unsigned weight = 1;
+    // queue implementation: mutex queue by default, or a lock-free ring with pooling
+    DispatcherConfig dispatcher;
+};
+
+struct WorkerPoolConfig
+{
+    size_t workers = 1;
+    // worker i is pinned to cpus[i % cpus.size()]; empty means no pinning
+    std::vector<int> cpus;
+    // batching settings for models that were never configure_model()'d
+    ModelQueueConfig default_queue;
+    // queues kept at most. Model names come from clients, so past this a new model
+    // replaces the least recently used idle queue that was never configure_model()'d,
+    // and its requests are refused if there is none. 0 = no cap.
+    size_t max_queues = 256;
+    Dispatcher::ExpiredHandler on_expired;
+};
+
+/**
+ * @brief Per-model request queues served by a pool of worker threads.
+ *
+ * Every (name, version) gets its own Dispatcher and batching settings, so a slow
+ * model's backlog never sits in front of a fast model's requests. Workers pick the
+ * ready queue with the lowest "pass" and advance it by the batch's execution time
+ * divided by the queue's weight (stride scheduling), which splits worker time between
+ * busy models in proportion to their weights. A queue is served by one worker at a
+ * time, so each Dispatcher keeps a single consumer.
+ *
+ * Producers find their model's queue under a shared lock and push into it without
+ * holding any scheduler lock, so a full ring (block_when_full) only holds up its own
+ * model's producers.
+ */
+class ModelScheduler
+{
+public:
+    using Handler = std::function<void(const ModelKey &, const std::vector<RequestPtr> &)>;
+
+    ModelScheduler(WorkerPoolConfig config, Handler handler);
+    ~ModelScheduler();
+
+    // Set batching/weight for a model; call before its first request.
+    void configure_model(const std::string &name, const std::string &version, ModelQueueConfig config);
+    // A cleared request from the model's queue pool (pool_size), created on first use.
+    RequestPtr make_request(const std::string &name, const std::string &version);
+    // Routed by req->model_name / req->model_version. False if the model's ring is full,
+    // or it has no queue and none can be made room for (max_queues).
+    bool push_request(RequestPtr req);
+
+    void start();
+    void stop();
+
+    // Totals across all queues (window fields come from the busiest queue).
+    BatcherStats stats();
+    std::vector<std::pair<ModelKey, BatcherStats>> model_stats();
+    // One model's queue; a default (empty) BatcherStats if it has not been created yet.
+    BatcherStats queue_stats(const std::string &name, const std::string &version);
+    // Drop a model's queue once it is idle and empty (after an unload has drained it).
+    // False if it still has queued or running work.
+    bool remove_model(const std::string &name, const std::string &version);
+
+private:
+    struct ModelQueue
+    {
+        ModelQueue(const ModelKey &key, const ModelQueueConfig &config, Dispatcher::ExpiredHandler on_expired);
+
+        ModelKey key;
+        std::unique_ptr<BatchQueue> queue;
+        unsigned weight;
+        double pass = 0.0;
+        bool busy = false;
+        bool configured = false; // by configure_model(), so never evicted
+        std::atomic<int64_t> last_push{0}; // steady_clock ticks
+        // producers between finding this queue and finishing their push; it is not
+        // removed while any remain
+        std::atomic<int> pushers{0};
+    };
+    using QueuePtr = std::shared_ptr<ModelQueue>;
+
+    QueuePtr find_queue(const ModelKey &key, bool pushing);
+    bool evict_idle_queue(); // mu_ and queues_mu_ held
+    QueuePtr next_ready(); // mu_ held
+    void worker_loop(size_t index);
+
+    WorkerPoolConfig config_;
+    Handler handler_;
+    // mu_ guards scheduling state (pass, busy, virtual_time_); queues_mu_ guards the map.
+    // Lock order: mu_, then queues_mu_.
+    std::mutex mu_;
+    std::condition_variable cv_;
+    std::shared_mutex queues_mu_;
+    std::map<ModelKey, QueuePtr> queues_;
+    double virtual_time_ = 0.0; // pass of the most recently scheduled queue
+    std::vector<std::thread> workers_;
+    std::atomic<bool> running_{false};
+};
\ No newline at end of file
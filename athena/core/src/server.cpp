@@ -1,34 +1,128 @@
 // core/src/server.cpp
-#include "dispatcher.h"
-#include "batcher.h"
+#include "scheduler.h"
 #include "inference.h"
+#include "runtime_stats.h"
+#include "admission.h"
+#include "model_registry.h"
 #include <memory>
 #include <iostream>
 #include <thread>
 #include <chrono>
+#include <algorithm>
+#include <cstdlib>
+#include <sstream>
+#include <string>
 #include "grpc_server.h"
 
+// CORE_WORKERS: batcher worker threads (default: one per hardware thread)
+// CORE_PIN_CPUS: optional comma-separated CPU list, e.g. "0,1,2,3"; worker i is pinned
+//                to the (i mod n)-th entry
+// CORE_MAX_QUEUES: model queues kept at most (default 256); idle ones of models that
+//                were never configured make room for new models
+static WorkerPoolConfig worker_pool_config()
+{
+    WorkerPoolConfig config;
+    config.workers = std::max(1u, std::thread::hardware_concurrency());
+    if (const char *workers = std::getenv("CORE_WORKERS"))
+        config.workers = std::max(1, std::atoi(workers));
+    if (const char *queues = std::getenv("CORE_MAX_QUEUES"))
+        config.max_queues = static_cast<size_t>(std::max(1, std::atoi(queues)));
+    if (const char *cpus = std::getenv("CORE_PIN_CPUS"))
+    {
+        std::stringstream list(cpus);
+        std::string cpu;
+        while (std::getline(list, cpu, ','))
+            if (!cpu.empty())
+                config.cpus.push_back(std::atoi(cpu.c_str()));
+    }
+    return config;
+}
+
+// CORE_ADMIT_MODEL_RPS / CORE_ADMIT_TENANT_RPS: token-bucket rate per model / per tenant
+//                (burst: one second's worth); unset or 0 means unlimited
+// CORE_ADMIT_MAX_MODELS: models admission keeps rate, delay and shed state for
+//                (default 1024); the rest share one entry
+// CORE_MAX_QUEUE_DEPTH: reject arrivals once a model's queue holds this many requests
+// CORE_TARGET_QUEUE_DELAY_MS: shed while a model's estimated queueing delay stays above
+//                this for 100 ms (default 25, half the latency SLO; 0 disables)
+static AdmissionConfig admission_config()
+{
+    AdmissionConfig config;
+    config.target_delay = std::chrono::milliseconds(25);
+    if (const char *rps = std::getenv("CORE_ADMIT_MODEL_RPS"))
+        config.per_model.rate = std::atof(rps);
+    if (const char *rps = std::getenv("CORE_ADMIT_TENANT_RPS"))
+        config.per_tenant.rate = std::atof(rps);
+    if (const char *tenants = std::getenv("CORE_ADMIT_MAX_TENANTS"))
+        config.max_tenants = static_cast<size_t>(std::max(1, std::atoi(tenants)));
+    if (const char *models = std::getenv("CORE_ADMIT_MAX_MODELS"))
+        config.max_models = static_cast<size_t>(std::max(1, std::atoi(models)));
+    if (const char *depth = std::getenv("CORE_MAX_QUEUE_DEPTH"))
+        config.max_queue_depth = static_cast<size_t>(std::max(0, std::atoi(depth)));
+    if (const char *delay = std::getenv("CORE_TARGET_QUEUE_DELAY_MS"))
+        config.target_delay = std::chrono::milliseconds(std::max(0, std::atoi(delay)));
+    return config;
+}
+
+// CORE_GRPC_MODE: "async" (default) answers RunInference from completion queues as
+//                batches finish; "sync" parks one server thread per in-flight call
+// CORE_GRPC_CQ_THREADS: completion queues, one thread each (default 2)
+// CORE_UNIX_SOCKET: also listen on this Unix domain socket path, for clients on the same
+//                host (unix:// and shm:// targets)
+static GrpcServerOptions grpc_server_options()
+{
+    GrpcServerOptions options;
+    if (const char *mode = std::getenv("CORE_GRPC_MODE"))
+        options.async_inference = std::string(mode) != "sync";
+    if (const char *threads = std::getenv("CORE_GRPC_CQ_THREADS"))
+        options.cq_threads = static_cast<size_t>(std::max(1, std::atoi(threads)));
+    if (const char *socket = std::getenv("CORE_UNIX_SOCKET"))
+        options.unix_socket = socket;
+    return options;
+}
+
 int main()
 {
-    // Initialize core components: Dispatcher manages the request queue.
-    auto dispatcher = std::make_shared<Dispatcher>();
     InferenceEngine engine;
+    RuntimeStats stats; // reported by GetRuntimeStats / StreamRuntimeStats
+    // Under overload, refuse new requests quickly (RESOURCE_EXHAUSTED) rather than let
+    // every queued request miss its deadline.
+    AdmissionController admission(admission_config());
+    ModelRegistry registry;
 
-    // Initialize and configure the batcher thread (the worker).
-    DynamicBatcher batcher(dispatcher,
-                           /*max_batch_size=*/16,
-                           std::chrono::milliseconds(10),
-                           [&](const std::vector<RequestPtr> &batch)
-                           {
-                               // Processing function called by the batcher thread.
-                               engine.run_batch(batch);
-                           });
+    // Each model gets its own queue, and a pool of worker threads serves the queues
+    // fairly, so one slow model cannot hold up the others. Batch windows are tuned
+    // online per model so requests stay within the latency SLO (P95 <= 50 ms).
+    WorkerPoolConfig pool_config = worker_pool_config();
+    pool_config.default_queue.adaptive = true;
+    pool_config.default_queue.adaptive_config.latency_slo = std::chrono::milliseconds(50);
+    pool_config.default_queue.adaptive_config.max_batch_size = 64;
+    pool_config.default_queue.adaptive_config.max_wait = std::chrono::milliseconds(10);
+    // Producers claim ring slots without taking the scheduler's lock, and requests come
+    // from a per-model pool; a model with 4096 requests queued rejects more.
+    pool_config.default_queue.dispatcher.ring_capacity = 4096;
+    pool_config.default_queue.dispatcher.pool_size = 1024;
+    // Requests shed after their deadline are answered with DEADLINE_EXCEEDED
+    pool_config.on_expired = [](const RequestPtr &r)
+    { r->complete(RequestStatus::Expired); };
+    ModelScheduler scheduler(pool_config,
+                             [&](const ModelKey &, const std::vector<RequestPtr> &batch)
+                             {
+                                 // Processing function called by a worker thread.
+                                 stats.record_batch(batch.size());
+                                 engine.run_batch(batch);
+                                 // answer each RPC as soon as its batch is done
+                                 for (const auto &r : batch)
+                                     r->complete(RequestStatus::Ok);
+                             });
 
-    batcher.start();
+    scheduler.start();
+    std::cout << "Batcher pool started with " << pool_config.workers << " worker(s).\n";
 
     // Start the gRPC server in a separate thread.
-    std::thread grpc_thread([]
-                            { run_grpc_server("0.0.0.0:50051"); });
+    std::thread grpc_thread([&]
+                            { run_grpc_server("0.0.0.0:50051", &scheduler, &stats, &admission, &registry,
+                                              grpc_server_options()); });
 
     std::cout << "Server setup complete. Waiting for gRPC server to terminate.\n";
 
@@ -37,7 +131,7 @@ int main()
     grpc_thread.join();
 
     // NOTE: For proper exit, a signal handler should be implemented to stop
-    // the gRPC server and call batcher.stop() before exiting.
+    // the gRPC server and call scheduler.stop() before exiting.
 
     std::cout << "Server finished\n";
     return 0;
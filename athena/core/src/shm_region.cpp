@@ -0,0 +1,87 @@
+// core/src/shm_region.cpp
+#include "shm_region.h"
+#include <algorithm>
+#include <cctype>
+#include <cerrno>
+#include <cstring>
+#include <fcntl.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include <unistd.h>
+
+ShmMapping::~ShmMapping()
+{
+    munmap(base_, size_);
+}
+
+char *ShmMapping::span(uint64_t offset, uint64_t length) const
+{
+    if (offset > size_ || length > size_ - offset)
+        return nullptr;
+    return base_ + offset;
+}
+
+static bool valid_name(const std::string &name)
+{
+    return !name.empty() && name.size() < 256 && name != "." && name != ".." &&
+           std::all_of(name.begin(), name.end(), [](unsigned char c)
+                       { return std::isalnum(c) || c == '.' || c == '_' || c == '-'; });
+}
+
+bool ShmRegions::attach(const std::string &name, size_t size, std::string *error)
+{
+    auto fail = [&](const std::string &msg)
+    {
+        if (error)
+            *error = "shm region " + name + ": " + msg;
+        return false;
+    };
+    if (!valid_name(name))
+        return fail("invalid name");
+    int fd = shm_open(("/" + name).c_str(), O_RDWR, 0);
+    if (fd < 0)
+        return fail(std::strerror(errno));
+    struct stat st;
+    if (fstat(fd, &st) != 0 || static_cast<uint64_t>(st.st_size) < size || size == 0)
+    {
+        close(fd);
+        return fail("smaller than " + std::to_string(size) + " bytes");
+    }
+    void *base = mmap(nullptr, size, PROT_READ | PROT_WRITE, MAP_SHARED, fd, 0);
+    close(fd); // the mapping keeps the object alive
+    if (base == MAP_FAILED)
+        return fail(std::strerror(errno));
+    std::lock_guard<std::mutex> lk(mu_);
+    regions_[name] = std::make_shared<ShmMapping>(base, size); // re-registering remaps
+    return true;
+}
+
+bool ShmRegions::detach(const std::string &name)
+{
+    {
+        std::lock_guard<std::mutex> lk(mu_);
+        if (regions_.erase(name) == 0)
+            return false;
+    }
+    // a write that found the region before it was erased may still be copying
+    std::unique_lock<std::shared_mutex> drain(writes_);
+    return true;
+}
+
+bool ShmRegions::write(const std::string &name, uint64_t offset, const void *src, size_t bytes) const
+{
+    std::shared_lock<std::shared_mutex> writing(writes_);
+    auto region = find(name);
+    char *dst = region ? region->span(offset, bytes) : nullptr;
+    if (!dst)
+        return false;
+    std::memcpy(dst, src, bytes);
+    return true;
+}
+
+std::shared_ptr<ShmMapping> ShmRegions::find(const std::string &name) const
+{
+    std::lock_guard<std::mutex> lk(mu_);
+    auto it = regions_.find(name);
+    return it == regions_.end() ? nullptr : it->second;
+}
@@ -0,0 +1,58 @@
+// core/src/shm_region.h
+#pragma once
+#include <cstddef>
+#include <cstdint>
+#include <map>
+#include <memory>
+#include <mutex>
+#include <shared_mutex>
+#include <string>
+
+// One mapped region. Unmapped when the last holder lets go, so a request that is
+// reading or writing it is safe from a concurrent unregister.
+class ShmMapping
+{
+public:
+    ShmMapping(void *base, size_t size) : base_(static_cast<char *>(base)), size_(size) {}
+    ~ShmMapping();
+    ShmMapping(const ShmMapping &) = delete;
+    ShmMapping &operator=(const ShmMapping &) = delete;
+
+    size_t size() const { return size_; }
+    // [offset, offset + length) of the region, or nullptr if it does not fit
+    char *span(uint64_t offset, uint64_t length) const;
+
+private:
+    char *base_;
+    size_t size_;
+};
+
+/**
+ * @brief Shared-memory regions that clients on this host have registered.
+ *
+ * A co-located client creates a POSIX shared memory object, registers it by name, and
+ * then sends RunInference inputs and receives outputs as (region, offset, length)
+ * references into it instead of protobuf payloads, so large tensors skip encoding and
+ * the socket. The core maps each region once; the client may unlink the object as soon
+ * as it is registered. Names are restricted to [A-Za-z0-9._-].
+ *
+ * Outputs go in through write(), and detach() returns only once no write is in progress,
+ * so after UnregisterShmRegion the core never touches the region again and the client
+ * may reuse every slot it had handed out under that name.
+ */
+class ShmRegions
+{
+public:
+    bool attach(const std::string &name, size_t size, std::string *error = nullptr);
+    bool detach(const std::string &name);
+    // Copies `bytes` into [offset, offset + bytes) of a registered region; false if it
+    // is not registered or the range does not fit
+    bool write(const std::string &name, uint64_t offset, const void *src, size_t bytes) const;
+    // The mapping, or null if no region of that name is registered
+    std::shared_ptr<ShmMapping> find(const std::string &name) const;
+
+private:
+    mutable std::mutex mu_;
+    mutable std::shared_mutex writes_; // shared by each write, exclusive to wait them out
+    std::map<std::string, std::shared_ptr<ShmMapping>> regions_;
+};
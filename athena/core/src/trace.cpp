@@ -0,0 +1,62 @@
+// core/src/trace.cpp
+#include "trace.h"
+#include <algorithm>
+
+using Clock = std::chrono::steady_clock;
+
+static double ms_between(Clock::time_point from, Clock::time_point to)
+{
+    if (from == Clock::time_point{} || to == Clock::time_point{})
+        return 0.0;
+    return std::max(0.0, std::chrono::duration<double, std::milli>(to - from).count());
+}
+
+StageBreakdown stage_breakdown(const RequestTiming &t, Clock::time_point now)
+{
+    StageBreakdown s;
+    // a request that arrived while its batch was already forming did not queue
+    s.queue_ms = ms_between(t.enqueued, t.batched);
+    s.batch_ms = ms_between(std::max(t.enqueued, t.batched), t.exec_start);
+    s.exec_ms = ms_between(t.exec_start, t.exec_end);
+    s.total_ms = ms_between(t.arrived, now);
+    return s;
+}
+
+static int hex_digit(char c)
+{
+    if (c >= '0' && c <= '9')
+        return c - '0';
+    if (c >= 'a' && c <= 'f')
+        return c - 'a' + 10;
+    return -1; // upper case is invalid in trace context
+}
+
+static bool is_hex(const std::string &s, size_t pos, size_t len)
+{
+    for (size_t i = pos; i < pos + len; i++)
+        if (hex_digit(s[i]) < 0)
+            return false;
+    return true;
+}
+
+static bool is_zero(const std::string &s, size_t pos, size_t len)
+{
+    return s.find_first_not_of('0', pos) >= pos + len;
+}
+
+bool traceparent_sampled(const std::string &tp)
+{
+    if (tp.size() < 55 || tp[2] != '-' || tp[35] != '-' || tp[52] != '-')
+        return false;
+    if (!is_hex(tp, 0, 2) || tp.compare(0, 2, "ff") == 0)
+        return false;
+    // version 00 is exactly 55 characters; later versions may append "-..." fields
+    if (tp.size() > 55 && (tp.compare(0, 2, "00") == 0 || tp[55] != '-'))
+        return false;
+    if (!is_hex(tp, 3, 32) || !is_hex(tp, 36, 16) || !is_hex(tp, 53, 2))
+        return false;
+    // all-zero trace and parent ids are invalid
+    if (is_zero(tp, 3, 32) || is_zero(tp, 36, 16))
+        return false;
+    return hex_digit(tp[54]) & 1;
+}
@@ -0,0 +1,32 @@
+// core/src/trace.h
+#pragma once
+#include <chrono>
+#include <string>
+
+// When a request reached each stage of the core; a default (epoch) time point means it
+// never did, e.g. requests the mock path answers without queueing.
+struct RequestTiming
+{
+    std::chrono::steady_clock::time_point arrived;    // the RPC handler took it
+    std::chrono::steady_clock::time_point enqueued;   // pushed into its model's queue
+    std::chrono::steady_clock::time_point batched;    // the batch it ended up in started forming
+    std::chrono::steady_clock::time_point exec_start; // its batch started running
+    std::chrono::steady_clock::time_point exec_end;
+};
+
+// Per-stage durations in ms, as returned in InferenceReply.timings
+struct StageBreakdown
+{
+    double queue_ms = 0.0; // queued before its batch started forming
+    double batch_ms = 0.0; // waiting for the batch to fill and reach a worker
+    double exec_ms = 0.0;  // running the batch
+    double total_ms = 0.0; // arrival to `now`
+};
+
+StageBreakdown stage_breakdown(const RequestTiming &t, std::chrono::steady_clock::time_point now);
+
+// True if `traceparent` is a well-formed W3C trace context header
+// ("00-<32 hex trace id>-<16 hex parent id>-<2 hex flags>") with the sampled flag set.
+// Only sampled requests get their stage timings reported; the caller builds the spans
+// from them, so the core needs no tracing SDK.
+bool traceparent_sampled(const std::string &traceparent);
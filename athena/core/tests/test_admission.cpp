@@ -0,0 +1,177 @@
+// core/tests/test_admission.cpp
+#include <catch2/catch_all.hpp>
+#include "../src/admission.h"
+
+namespace
+{
+    using Clock = std::chrono::steady_clock;
+    constexpr Clock::time_point kNoDeadline = Clock::time_point::max();
+
+    BatcherStats queue_with(size_t depth, double base_ms = 0.0, double per_item_ms = 0.0, size_t batch = 8)
+    {
+        BatcherStats s{};
+        s.queue_depth = depth;
+        s.max_batch_size = batch;
+        s.exec_base_ms = base_ms;
+        s.exec_per_item_ms = per_item_ms;
+        return s;
+    }
+}
+
+TEST_CASE("admission without limits admits everything", "[admission]")
+{
+    AdmissionController admission(AdmissionConfig{});
+    for (int i = 0; i < 100; i++)
+        REQUIRE(admission.admit("m", "v1", "", queue_with(1000), kNoDeadline).admitted());
+    REQUIRE(admission.snapshot().admitted == 100);
+    REQUIRE(admission.snapshot().shed == 0);
+}
+
+TEST_CASE("token buckets limit per model and per tenant", "[admission]")
+{
+    AdmissionConfig config;
+    config.per_model.rate = 10; // burst 10
+    config.per_tenant.rate = 100;
+    config.per_tenant.burst = 4;
+    AdmissionController admission(config);
+    auto now = Clock::now();
+
+    // tenant "a" runs out after its burst of 4, with a retry hint of one token's refill
+    for (int i = 0; i < 4; i++)
+        REQUIRE(admission.admit("m", "v1", "a", queue_with(0), kNoDeadline, 1, now).admitted());
+    auto d = admission.admit("m", "v1", "a", queue_with(0), kNoDeadline, 1, now);
+    REQUIRE(d.reason == ShedReason::TenantRate);
+    REQUIRE(d.retry_after == std::chrono::milliseconds(10));
+
+    // other tenants still get in until the model's own bucket is empty
+    for (int i = 0; i < 6; i++)
+        REQUIRE(admission.admit("m", "v1", "b" + std::to_string(i), queue_with(0), kNoDeadline, 1, now).admitted());
+    REQUIRE(admission.admit("m", "v1", "c", queue_with(0), kNoDeadline, 1, now).reason == ShedReason::ModelRate);
+    // a different model has its own bucket
+    REQUIRE(admission.admit("other", "v1", "c", queue_with(0), kNoDeadline, 1, now).admitted());
+
+    // refills over time
+    REQUIRE(admission.admit("m", "v1", "c", queue_with(0), kNoDeadline, 1, now + std::chrono::milliseconds(100)).admitted());
+
+    auto snapshot = admission.snapshot();
+    REQUIRE(snapshot.admitted == 12);
+    REQUIRE(snapshot.shed == 2);
+}
+
+TEST_CASE("tenant buckets are bounded", "[admission]")
+{
+    // no tenant limit: no buckets, whatever tenants clients send
+    AdmissionController unlimited(AdmissionConfig{});
+    for (int i = 0; i < 100; i++)
+        unlimited.admit("m", "v1", "t" + std::to_string(i), queue_with(0), kNoDeadline);
+    REQUIRE(unlimited.snapshot().tenant_buckets == 0);
+
+    AdmissionConfig config;
+    config.per_tenant.rate = 10;
+    config.per_tenant.burst = 2;
+    config.max_tenants = 4;
+    AdmissionController admission(config);
+    auto now = Clock::now();
+    for (int i = 0; i < 4; i++)
+        REQUIRE(admission.admit("m", "v1", "t" + std::to_string(i), queue_with(0), kNoDeadline, 2, now).admitted());
+    // tenants over the cap share one bucket while the others are still draining
+    REQUIRE(admission.admit("m", "v1", "x", queue_with(0), kNoDeadline, 2, now).admitted());
+    REQUIRE(admission.admit("m", "v1", "y", queue_with(0), kNoDeadline, 1, now).reason == ShedReason::TenantRate);
+    REQUIRE(admission.snapshot().tenant_buckets == 4);
+
+    // once the old buckets have refilled they are forgotten and new tenants get their own
+    auto later = now + std::chrono::seconds(2);
+    REQUIRE(admission.admit("m", "v1", "y", queue_with(0), kNoDeadline, 2, later).admitted());
+    REQUIRE(admission.snapshot().tenant_buckets == 1);
+}
+
+TEST_CASE("per-model state is bounded", "[admission]")
+{
+    AdmissionConfig config;
+    config.per_model.rate = 10;
+    config.per_model.burst = 1;
+    config.max_models = 3;
+    config.target_delay = std::chrono::milliseconds(10);
+    AdmissionController admission(config);
+    auto now = Clock::now();
+    auto long_queue = queue_with(64, 4.0, 0.5);
+    // m0-m2 get buckets; m3-m9 share one, so m3 takes its token and m4-m9 are shed
+    for (int i = 0; i < 10; i++)
+        admission.admit("m" + std::to_string(i), "v1", "", long_queue, kNoDeadline, 1, now);
+    REQUIRE(admission.snapshot().model_buckets == 3);
+    // now every bucket is empty; shed counts past the first three models go to "<other>"
+    for (int i = 0; i < 10; i++)
+        REQUIRE(admission.admit("m" + std::to_string(i), "v1", "", long_queue, kNoDeadline, 1, now).reason ==
+                ShedReason::ModelRate);
+    auto snapshot = admission.snapshot();
+    REQUIRE(snapshot.model_buckets == 3);
+    REQUIRE(snapshot.by_model.size() == 4);
+    REQUIRE(snapshot.by_model[0].model_name == "<other>");
+    REQUIRE(snapshot.by_model[0].count == 10);
+    REQUIRE(snapshot.shed == 16);
+}
+
+TEST_CASE("queue depth cap rejects with a drain-time hint", "[admission]")
+{
+    AdmissionConfig config;
+    config.max_queue_depth = 16;
+    AdmissionController admission(config);
+    REQUIRE(admission.admit("m", "v1", "", queue_with(15), kNoDeadline).admitted());
+    auto d = admission.admit("m", "v1", "", queue_with(16, 2.0, 0.5), kNoDeadline);
+    REQUIRE(d.reason == ShedReason::QueueDepth);
+    // 16 queued = 2 batches of 8: 2 * 2 ms + 16 * 0.5 ms
+    REQUIRE(d.retry_after == std::chrono::milliseconds(12));
+    // a batch that would overflow the cap is refused as a whole
+    REQUIRE(admission.admit("m", "v1", "", queue_with(10), kNoDeadline, 8).reason == ShedReason::QueueDepth);
+}
+
+TEST_CASE("estimated wait follows the batch cost model", "[admission]")
+{
+    REQUIRE(AdmissionController::estimated_wait_ms(queue_with(0, 2.0, 0.5)) == 0.0);
+    REQUIRE(AdmissionController::estimated_wait_ms(queue_with(8, 2.0, 0.5)) == Approx(6.0));
+    REQUIRE(AdmissionController::estimated_wait_ms(queue_with(9, 2.0, 0.5)) == Approx(8.5));
+    REQUIRE(AdmissionController::estimated_wait_ms(queue_with(4, 2.0, 0.5), 5) == Approx(6.0));
+    // fixed-window queues have no cost model
+    REQUIRE(AdmissionController::estimated_wait_ms(queue_with(100)) == 0.0);
+}
+
+TEST_CASE("requests that cannot make their deadline are rejected", "[admission]")
+{
+    AdmissionController admission(AdmissionConfig{});
+    auto now = Clock::now();
+    auto queue = queue_with(64, 4.0, 0.5); // 8 batches: 32 + 32 = 64 ms
+    auto d = admission.admit("m", "v1", "", queue, now + std::chrono::milliseconds(20), 1, now);
+    REQUIRE(d.reason == ShedReason::Deadline);
+    REQUIRE(d.retry_after == std::chrono::milliseconds(64));
+    REQUIRE(admission.admit("m", "v1", "", queue, now + std::chrono::milliseconds(100), 1, now).admitted());
+    REQUIRE(admission.admit("m", "v1", "", queue, kNoDeadline, 1, now).admitted());
+}
+
+TEST_CASE("a standing queue is shed but a short burst is not", "[admission]")
+{
+    AdmissionConfig config;
+    config.target_delay = std::chrono::milliseconds(10);
+    config.interval = std::chrono::milliseconds(100);
+    AdmissionController admission(config);
+    auto t0 = Clock::now();
+    auto long_queue = queue_with(64, 4.0, 0.5); // ~64 ms estimated wait
+    auto ms = [](int n)
+    { return std::chrono::milliseconds(n); };
+
+    // above target, but not yet for a whole interval
+    REQUIRE(admission.admit("m", "v1", "", long_queue, kNoDeadline, 1, t0).admitted());
+    REQUIRE(admission.admit("m", "v1", "", long_queue, kNoDeadline, 1, t0 + ms(50)).admitted());
+    // the burst drained in time: the clock restarts
+    REQUIRE(admission.admit("m", "v1", "", queue_with(0, 4.0, 0.5), kNoDeadline, 1, t0 + ms(90)).admitted());
+    REQUIRE(admission.admit("m", "v1", "", long_queue, kNoDeadline, 1, t0 + ms(150)).admitted());
+    // still above target a full interval later: shed until it drops back
+    auto d = admission.admit("m", "v1", "", long_queue, kNoDeadline, 1, t0 + ms(260));
+    REQUIRE(d.reason == ShedReason::QueueDelay);
+    REQUIRE(d.retry_after == ms(54));
+    REQUIRE(admission.admit("m", "v1", "", queue_with(1, 4.0, 0.5), kNoDeadline, 1, t0 + ms(270)).admitted());
+
+    auto snapshot = admission.snapshot();
+    REQUIRE(snapshot.by_model.size() == 1);
+    REQUIRE(snapshot.by_model[0].reason == ShedReason::QueueDelay);
+    REQUIRE(std::string(shed_reason_name(snapshot.by_model[0].reason)) == "queue_delay");
+}
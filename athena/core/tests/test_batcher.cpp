@@ -4,8 +4,13 @@
 #include "../src/dispatcher.h"
 #include "../src/batcher.h"
 #include "../src/inference.h"
+#include "../src/runtime_stats.h"
 #include <memory>
 #include <atomic>
+#include <algorithm>
+#include <mutex>
+#include <random>
+#include <thread>
 
 TEST_CASE("batcher groups up to max size", "[batcher]")
 {
@@ -39,6 +44,408 @@ TEST_CASE("batcher groups up to max size", "[batcher]")
     REQUIRE(processed_batches.load() >= 3); // 4+4+2 => 3 batches expected
 }
 
+TEST_CASE("dispatcher pops earliest deadline first", "[dispatcher]")
+{
+    Dispatcher dispatcher;
+    auto now = std::chrono::steady_clock::now();
+    const int offsets_ms[] = {300, 100, 200, 100};
+    for (int i = 0; i < 4; i++)
+    {
+        auto r = std::make_shared<Request>();
+        r->id = i;
+        r->deadline = now + std::chrono::milliseconds(offsets_ms[i]);
+        dispatcher.push_request(r);
+    }
+    auto no_deadline = std::make_shared<Request>();
+    no_deadline->id = 4;
+    dispatcher.push_request(no_deadline);
+
+    auto batch = dispatcher.pop_batch(5, std::chrono::milliseconds(10));
+    REQUIRE(batch.size() == 5);
+    // equal deadlines keep arrival order; requests without a deadline go last
+    REQUIRE(batch[0]->id == 1);
+    REQUIRE(batch[1]->id == 3);
+    REQUIRE(batch[2]->id == 2);
+    REQUIRE(batch[3]->id == 0);
+    REQUIRE(batch[4]->id == 4);
+}
+
+TEST_CASE("dispatcher sheds requests whose deadline has passed", "[dispatcher]")
+{
+    std::vector<int> shed;
+    Dispatcher dispatcher([&](const RequestPtr &r)
+                          { shed.push_back(r->id); });
+    auto now = std::chrono::steady_clock::now();
+    for (int i = 0; i < 6; i++)
+    {
+        auto r = std::make_shared<Request>();
+        r->id = i;
+        r->deadline = (i % 2 == 0) ? now - std::chrono::milliseconds(1) : now + std::chrono::seconds(1);
+        dispatcher.push_request(r);
+    }
+
+    auto batch = dispatcher.pop_batch(10, std::chrono::milliseconds(10));
+    REQUIRE(batch.size() == 3);
+    for (const auto &r : batch)
+        REQUIRE(r->id % 2 == 1);
+    REQUIRE(shed == std::vector<int>{0, 2, 4});
+    REQUIRE(dispatcher.expired_count() == 3);
+    REQUIRE(dispatcher.size() == 0);
+}
+
+TEST_CASE("ring dispatcher keeps deadline order and rejects when full", "[dispatcher][ring]")
+{
+    DispatcherConfig config;
+    config.ring_capacity = 4;
+    Dispatcher dispatcher(config);
+    auto now = std::chrono::steady_clock::now();
+    const int offsets_ms[] = {300, 100, 200, 100};
+    for (int i = 0; i < 4; i++)
+    {
+        auto r = dispatcher.make_request();
+        r->id = i;
+        r->deadline = now + std::chrono::milliseconds(offsets_ms[i]);
+        REQUIRE(dispatcher.push_request(r));
+    }
+    REQUIRE_FALSE(dispatcher.push_request(dispatcher.make_request()));
+    REQUIRE(dispatcher.rejected_count() == 1);
+    REQUIRE(dispatcher.size() == 4);
+
+    auto batch = dispatcher.pop_batch(4, std::chrono::milliseconds(10));
+    REQUIRE(batch.size() == 4);
+    REQUIRE(batch[0]->id == 1);
+    REQUIRE(batch[1]->id == 3);
+    REQUIRE(batch[2]->id == 2);
+    REQUIRE(batch[3]->id == 0);
+    REQUIRE(dispatcher.size() == 0);
+    REQUIRE(dispatcher.push_request(dispatcher.make_request()));
+}
+
+TEST_CASE("ring dispatcher delivers every request from concurrent producers", "[dispatcher][ring]")
+{
+    DispatcherConfig config;
+    config.ring_capacity = 64; // small, so producers hit backpressure
+    config.block_when_full = true;
+    config.pool_size = 256;
+    Dispatcher dispatcher(config);
+
+    const int producers = 4;
+    const int per_producer = 5000;
+    std::vector<std::thread> threads;
+    for (int p = 0; p < producers; p++)
+    {
+        threads.emplace_back([&, p]
+                             {
+                                 for (int i = 0; i < per_producer; i++)
+                                 {
+                                     auto r = dispatcher.make_request();
+                                     r->id = p * per_producer + i;
+                                     dispatcher.push_request(std::move(r));
+                                 } });
+    }
+
+    std::vector<int> seen(producers * per_producer, 0);
+    int received = 0;
+    auto give_up = std::chrono::steady_clock::now() + std::chrono::seconds(10);
+    while (received < producers * per_producer && std::chrono::steady_clock::now() < give_up)
+    {
+        auto batch = dispatcher.pop_batch(32, std::chrono::milliseconds(5));
+        for (const auto &r : batch)
+            seen[r->id]++;
+        received += static_cast<int>(batch.size());
+        dispatcher.recycle(batch);
+    }
+    for (auto &t : threads)
+        t.join();
+
+    REQUIRE(received == producers * per_producer);
+    REQUIRE(std::all_of(seen.begin(), seen.end(), [](int n)
+                        { return n == 1; }));
+    REQUIRE(dispatcher.rejected_count() == 0);
+    REQUIRE(dispatcher.pushed_count() == static_cast<uint64_t>(producers * per_producer));
+}
+
+TEST_CASE("recycled requests come back cleared from the pool", "[dispatcher][ring]")
+{
+    DispatcherConfig config;
+    config.ring_capacity = 8;
+    config.pool_size = 2;
+    Dispatcher dispatcher(config);
+
+    auto r = dispatcher.make_request();
+    Request *raw = r.get();
+    r->id = 7;
+    r->payload = "req-7";
+    r->model_name = "fraud-detector";
+    dispatcher.push_request(std::move(r));
+    auto batch = dispatcher.pop_batch(8, std::chrono::milliseconds(10));
+    REQUIRE(batch.size() == 1);
+    dispatcher.recycle(batch);
+    REQUIRE(batch.empty());
+
+    // the pool hands out its other preallocated request first, then the recycled one
+    auto first = dispatcher.make_request();
+    auto second = dispatcher.make_request();
+    REQUIRE((first.get() == raw || second.get() == raw));
+    Request *reused = first.get() == raw ? first.get() : second.get();
+    REQUIRE(reused->id == 0);
+    REQUIRE(reused->payload.empty());
+    REQUIRE(reused->model_name.empty());
+}
+
+// Load scenario: a backlog of relaxed requests is already queued when a burst of
+// tight-deadline requests arrives. FIFO would serve the burst last and miss every
+// deadline; EDF runs it first, and stale requests are shed instead of executed.
+TEST_CASE("deadline-aware batching keeps tight requests on time under a spike", "[dispatcher][load]")
+{
+    std::atomic<int> shed{0};
+    auto dispatcher = std::make_shared<Dispatcher>([&](const RequestPtr &)
+                                                   { shed.fetch_add(1); });
+    std::mutex mu;
+    std::vector<std::pair<RequestPtr, std::chrono::steady_clock::time_point>> done;
+
+    DynamicBatcher batcher(dispatcher, 8, std::chrono::milliseconds(5),
+                           [&](const std::vector<RequestPtr> &batch)
+                           {
+                               // same cost model as InferenceEngine::run_batch: 2 ms + 1 ms per item
+                               std::this_thread::sleep_for(std::chrono::milliseconds(2 + batch.size()));
+                               auto finished = std::chrono::steady_clock::now();
+                               std::lock_guard<std::mutex> lk(mu);
+                               for (const auto &r : batch)
+                                   done.emplace_back(r, finished);
+                           });
+
+    auto now = std::chrono::steady_clock::now();
+    int id = 0;
+    for (int i = 0; i < 96; i++) // ~12 batches of relaxed work, ~120 ms
+    {
+        auto r = std::make_shared<Request>();
+        r->id = id++;
+        r->deadline = now + std::chrono::seconds(5);
+        dispatcher->push_request(r);
+    }
+    for (int i = 0; i < 16; i++) // the spike: 100 ms budget each
+    {
+        auto r = std::make_shared<Request>();
+        r->id = id++;
+        r->deadline = now + std::chrono::milliseconds(100);
+        dispatcher->push_request(r);
+    }
+    for (int i = 0; i < 8; i++) // callers that already gave up
+    {
+        auto r = std::make_shared<Request>();
+        r->id = id++;
+        r->deadline = now - std::chrono::milliseconds(1);
+        dispatcher->push_request(r);
+    }
+
+    batcher.start();
+    std::this_thread::sleep_for(std::chrono::milliseconds(500));
+    batcher.stop();
+
+    std::lock_guard<std::mutex> lk(mu);
+    REQUIRE(done.size() == 112);
+    REQUIRE(shed.load() == 8);
+    int late = 0;
+    for (const auto &entry : done)
+    {
+        if (entry.second > entry.first->deadline)
+            late++;
+    }
+    REQUIRE(late == 0);
+}
+
+TEST_CASE("adaptive policy learns batch cost and sizes the window to the SLO", "[batcher][adaptive]")
+{
+    AdaptiveBatchConfig config;
+    config.latency_slo = std::chrono::milliseconds(50);
+    config.max_batch_size = 256;
+    AdaptiveBatchPolicy policy(config);
+
+    for (int round = 0; round < 4; round++)
+        for (size_t n = 1; n <= 32; n++)
+            policy.observe_batch(n, 2.0 + 0.5 * static_cast<double>(n));
+    REQUIRE(policy.exec_base_ms() == Approx(2.0).margin(0.01));
+    REQUIRE(policy.exec_per_item_ms() == Approx(0.5).margin(0.01));
+
+    // (50 ms * 0.5 - 2 ms) / 0.5 ms per item; no traffic measured, so no waiting
+    BatchWindow idle = policy.next_window(0);
+    REQUIRE(idle.max_batch_size >= 45);
+    REQUIRE(idle.max_batch_size <= 46);
+    REQUIRE(idle.max_wait.count() == 0);
+}
+
+namespace
+{
+    using Clock = std::chrono::steady_clock;
+
+    // Records when each request (by id) was pushed and when its batch finished.
+    struct Workload
+    {
+        explicit Workload(size_t n) : enqueued(n), completed(n) {}
+
+        DynamicBatcher::Handler handler(std::chrono::microseconds base, std::chrono::microseconds per_item)
+        {
+            return [this, base, per_item](const std::vector<RequestPtr> &batch)
+            {
+                std::this_thread::sleep_for(base + per_item * static_cast<int>(batch.size()));
+                auto finished = Clock::now();
+                std::lock_guard<std::mutex> lk(mu);
+                for (const auto &r : batch)
+                    completed[r->id] = finished;
+            };
+        }
+
+        // Push requests on a precomputed schedule (spinning for accuracy), then wait for them
+        void run(Dispatcher &dispatcher, const std::vector<std::chrono::microseconds> &gaps)
+        {
+            auto next = Clock::now();
+            for (size_t i = 0; i < gaps.size(); i++)
+            {
+                next += gaps[i];
+                while (Clock::now() < next)
+                    std::this_thread::yield();
+                auto r = std::make_shared<Request>();
+                r->id = static_cast<int>(i);
+                enqueued[i] = Clock::now();
+                dispatcher.push_request(r);
+            }
+            for (int i = 0; i < 400; i++)
+            {
+                {
+                    std::lock_guard<std::mutex> lk(mu);
+                    if (std::none_of(completed.begin(), completed.end(), [](const Clock::time_point &t)
+                                     { return t == Clock::time_point{}; }))
+                        return;
+                }
+                std::this_thread::sleep_for(std::chrono::milliseconds(5));
+            }
+        }
+
+        std::vector<double> latencies_ms()
+        {
+            std::lock_guard<std::mutex> lk(mu);
+            std::vector<double> out;
+            for (size_t i = 0; i < enqueued.size(); i++)
+                out.push_back(std::chrono::duration<double, std::milli>(completed[i] - enqueued[i]).count());
+            std::sort(out.begin(), out.end());
+            return out;
+        }
+
+        double makespan_ms()
+        {
+            std::lock_guard<std::mutex> lk(mu);
+            auto last = *std::max_element(completed.begin(), completed.end());
+            return std::chrono::duration<double, std::milli>(last - enqueued.front()).count();
+        }
+
+        std::mutex mu;
+        std::vector<Clock::time_point> enqueued;
+        std::vector<Clock::time_point> completed;
+    };
+
+    double percentile(const std::vector<double> &sorted, double q)
+    {
+        return sorted[std::min(sorted.size() - 1, static_cast<size_t>(q * sorted.size()))];
+    }
+
+    std::vector<std::chrono::microseconds> poisson_gaps(size_t n, double mean_us, unsigned seed)
+    {
+        std::mt19937 rng(seed);
+        std::exponential_distribution<double> gap(1.0 / mean_us);
+        std::vector<std::chrono::microseconds> out;
+        for (size_t i = 0; i < n; i++)
+            out.emplace_back(static_cast<int64_t>(gap(rng)));
+        return out;
+    }
+}
+
+TEST_CASE("adaptive window does not hold back light traffic", "[batcher][adaptive][load]")
+{
+    // ~200 req/s Poisson arrivals: a fixed 10 ms window makes nearly every request wait it out
+    auto gaps = poisson_gaps(80, 5000.0, 1);
+
+    auto fixed_dispatcher = std::make_shared<Dispatcher>();
+    Workload fixed_load(gaps.size());
+    DynamicBatcher fixed(fixed_dispatcher, 16, std::chrono::milliseconds(10),
+                         fixed_load.handler(std::chrono::microseconds(1000), std::chrono::microseconds(100)));
+    fixed.start();
+    fixed_load.run(*fixed_dispatcher, gaps);
+    fixed.stop();
+
+    AdaptiveBatchConfig config;
+    config.latency_slo = std::chrono::milliseconds(20);
+    auto adaptive_dispatcher = std::make_shared<Dispatcher>();
+    Workload adaptive_load(gaps.size());
+    DynamicBatcher adaptive(adaptive_dispatcher, config,
+                            adaptive_load.handler(std::chrono::microseconds(1000), std::chrono::microseconds(100)));
+    adaptive.start();
+    adaptive_load.run(*adaptive_dispatcher, gaps);
+    adaptive.stop();
+
+    auto fixed_lat = fixed_load.latencies_ms();
+    auto adaptive_lat = adaptive_load.latencies_ms();
+    REQUIRE(percentile(adaptive_lat, 0.50) < percentile(fixed_lat, 0.50) / 2);
+    REQUIRE(percentile(adaptive_lat, 0.95) < static_cast<double>(config.latency_slo.count()));
+    REQUIRE(adaptive.stats().requests == gaps.size());
+}
+
+TEST_CASE("adaptive window grows batches to keep up with heavy traffic", "[batcher][adaptive][load]")
+{
+    // ~20k req/s for 0.2 s; 2 ms fixed cost per batch makes small batches fall behind
+    std::vector<std::chrono::microseconds> gaps(4000, std::chrono::microseconds(50));
+    auto base = std::chrono::microseconds(2000);
+    auto per_item = std::chrono::microseconds(20);
+
+    auto fixed_dispatcher = std::make_shared<Dispatcher>();
+    Workload fixed_load(gaps.size());
+    DynamicBatcher fixed(fixed_dispatcher, 16, std::chrono::milliseconds(10), fixed_load.handler(base, per_item));
+    fixed.start();
+    fixed_load.run(*fixed_dispatcher, gaps);
+    fixed.stop();
+
+    AdaptiveBatchConfig config;
+    config.latency_slo = std::chrono::milliseconds(50);
+    auto adaptive_dispatcher = std::make_shared<Dispatcher>();
+    Workload adaptive_load(gaps.size());
+    DynamicBatcher adaptive(adaptive_dispatcher, config, adaptive_load.handler(base, per_item));
+    adaptive.start();
+    adaptive_load.run(*adaptive_dispatcher, gaps);
+    BatcherStats stats = adaptive.stats();
+    adaptive.stop();
+
+    auto fixed_lat = fixed_load.latencies_ms();
+    auto adaptive_lat = adaptive_load.latencies_ms();
+    REQUIRE(stats.requests == gaps.size());
+    REQUIRE(stats.max_batch_size > 16);
+    REQUIRE(adaptive_load.makespan_ms() < fixed_load.makespan_ms());
+    REQUIRE(percentile(adaptive_lat, 0.95) < percentile(fixed_lat, 0.95));
+    REQUIRE(percentile(adaptive_lat, 0.95) < 2.0 * static_cast<double>(config.latency_slo.count()));
+}
+
+TEST_CASE("runtime stats bucket batch sizes and per-model latency", "[stats]")
+{
+    RuntimeStats stats;
+    for (size_t size : {1, 3, 4, 300})
+        stats.record_batch(size);
+    stats.record_inference("fraud-detector", "v1", 0.8);
+    stats.record_inference("fraud-detector", "v1", 12.0);
+    stats.record_inference("fraud-detector", "v2", 3.0);
+    stats.record_rejected();
+
+    RuntimeSnapshot s = stats.snapshot();
+    REQUIRE(s.rejected == 1);
+    REQUIRE(s.batch_sizes.count == 4);
+    REQUIRE(s.batch_sizes.counts.size() == s.batch_sizes.bounds.size() + 1);
+    REQUIRE(s.batch_sizes.counts[0] == 1);       // <= 1
+    REQUIRE(s.batch_sizes.counts[2] == 2);       // (2, 4]
+    REQUIRE(s.batch_sizes.counts.back() == 1);   // +Inf
+    REQUIRE(s.models.size() == 2);
+    REQUIRE(s.models[0].version == "v1");
+    REQUIRE(s.models[0].latency_ms.count == 2);
+    REQUIRE(s.models[0].latency_ms.sum == Approx(12.8));
+}
+
 int main(int argc, char *argv[])
 {
     return Catch::Session().run(argc, argv);
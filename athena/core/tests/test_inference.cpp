@@ -0,0 +1,103 @@
+// core/tests/test_inference.cpp
+#include <catch2/catch_all.hpp>
+#include <cstdint>
+#include "../src/inference.h"
+
+namespace
+{
+    std::vector<RequestPtr> make_batch(const std::vector<std::vector<float>> &inputs)
+    {
+        std::vector<RequestPtr> batch;
+        for (const auto &in : inputs)
+        {
+            auto r = std::make_shared<Request>();
+            r->inputs = in;
+            batch.push_back(std::move(r));
+        }
+        return batch;
+    }
+
+    InferenceEngineConfig no_latency()
+    {
+        InferenceEngineConfig config;
+        config.simulate_latency = false;
+        return config;
+    }
+}
+
+TEST_CASE("batch inputs are assembled into one aligned, padded tensor", "[inference]")
+{
+    InferenceEngine engine(no_latency());
+    auto batch = make_batch({{1, 2, 3}, {4}, {5, 6}});
+    BatchTensor tensor = engine.assemble(batch);
+
+    REQUIRE(tensor.rows == 3);
+    REQUIRE(tensor.cols == 3);
+    REQUIRE(reinterpret_cast<std::uintptr_t>(tensor.row(0)) % kBatchBufferAlignment == 0);
+    std::vector<float> dense(tensor.row(0), tensor.row(0) + 9);
+    REQUIRE(dense == std::vector<float>{1, 2, 3, 4, 0, 0, 5, 6, 0});
+}
+
+TEST_CASE("outputs are views of one shared output buffer", "[inference]")
+{
+    InferenceEngine engine(no_latency());
+    auto batch = make_batch({{1, 2}, {3}, {4, 5}});
+    engine.run_batch(batch);
+
+    REQUIRE(std::vector<float>(batch[0]->outputs.begin(), batch[0]->outputs.end()) == std::vector<float>{1, 2});
+    REQUIRE(std::vector<float>(batch[1]->outputs.begin(), batch[1]->outputs.end()) == std::vector<float>{3});
+    REQUIRE(batch[2]->outputs.size() == 2);
+    REQUIRE(batch[2]->outputs[1] == 5.0f);
+    // rows of the same [3, 2] tensor, not separate copies
+    REQUIRE(batch[1]->outputs.data() == batch[0]->outputs.data() + 2);
+    REQUIRE(batch[2]->outputs.data() == batch[0]->outputs.data() + 4);
+}
+
+TEST_CASE("batch buffers are reused once their outputs are released", "[inference][pool]")
+{
+    InferenceEngine engine(no_latency());
+    auto batch = make_batch({{1, 2, 3, 4}, {5, 6, 7, 8}});
+    engine.run_batch(batch);
+    const float *first = batch[0]->outputs.data();
+    uint64_t allocations = engine.buffer_stats().allocations;
+    REQUIRE(allocations == 2); // input and output tensor
+
+    // while a request still holds its view, the output buffer stays out of the pool
+    auto held = batch[0]->outputs;
+    for (const auto &r : batch)
+        r->outputs.reset();
+    engine.run_batch(batch);
+    REQUIRE(batch[0]->outputs.data() != first);
+    REQUIRE(held[0] == 1.0f);
+
+    held.reset();
+    for (int i = 0; i < 50; i++)
+    {
+        for (const auto &r : batch)
+            r->outputs.reset();
+        engine.run_batch(batch);
+    }
+    BatchBufferStats stats = engine.buffer_stats();
+    REQUIRE(stats.allocations == allocations + 1);
+    REQUIRE(stats.misses == 0);
+    REQUIRE(stats.pooled == 3);
+}
+
+TEST_CASE("the pool hands out the smallest free buffer that fits", "[pool]")
+{
+    BatchBufferPool pool(2);
+    auto small = pool.acquire(10);
+    auto large = pool.acquire(1000);
+    REQUIRE(small->capacity() == 16); // rounded up to a power of two
+    REQUIRE(large->capacity() == 1024);
+    const BatchBuffer *small_ptr = small.get();
+    small.reset();
+    large.reset();
+    REQUIRE(pool.acquire(12).get() == small_ptr);
+
+    auto a = pool.acquire(8);
+    auto b = pool.acquire(8);
+    auto c = pool.acquire(8); // both pooled buffers in use
+    REQUIRE(pool.stats().misses == 1);
+    REQUIRE(pool.stats().pooled == 2);
+}
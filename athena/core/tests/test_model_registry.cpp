@@ -0,0 +1,95 @@
+// core/tests/test_model_registry.cpp
+#include <catch2/catch_all.hpp>
+#include <atomic>
+#include <thread>
+#include "../src/model_registry.h"
+
+namespace
+{
+    using ms = std::chrono::milliseconds;
+}
+
+TEST_CASE("unversioned requests follow the active version", "[registry]")
+{
+    ModelRegistry registry;
+    registry.load("m", "v1"); // the first version loaded becomes active
+    REQUIRE(registry.active_version("m") == "v1");
+    {
+        ModelLease lease = registry.acquire("m", "");
+        REQUIRE(lease);
+        REQUIRE(lease.version() == "v1");
+        REQUIRE(registry.in_flight("m", "v1") == 1);
+    }
+    REQUIRE(registry.in_flight("m", "v1") == 0);
+
+    std::string error;
+    REQUIRE_FALSE(registry.activate("m", "v2", &error));
+    REQUIRE(error == "m:v2 is not loaded");
+    registry.load("m", "v2");
+    REQUIRE(registry.acquire("m", "").version() == "v1"); // loading alone does not switch
+    REQUIRE(registry.activate("m", "v2"));
+    REQUIRE(registry.acquire("m", "").version() == "v2");
+    REQUIRE(registry.acquire("m", "v1").version() == "v1"); // explicit versions still work
+    REQUIRE(registry.active_version("m") == "v2");
+}
+
+TEST_CASE("models that were never loaded pass through", "[registry]")
+{
+    ModelRegistry registry;
+    ModelLease lease = registry.acquire("unmanaged", "v7");
+    REQUIRE(lease);
+    REQUIRE(lease.version() == "v7");
+    REQUIRE(registry.state("unmanaged", "v7") == ModelRegistry::State::NotLoaded);
+}
+
+TEST_CASE("unload waits for in-flight requests to drain", "[registry]")
+{
+    ModelRegistry registry;
+    registry.load("m", "v1");
+    registry.load("m", "v2");
+    registry.activate("m", "v1");
+    auto lease = std::make_unique<ModelLease>(registry.acquire("m", ""));
+    registry.activate("m", "v2");
+
+    std::atomic<bool> unloaded{false};
+    std::thread unloader([&]
+                         {
+                             REQUIRE(registry.unload("m", "v1", ms(5000)));
+                             unloaded = true; });
+    while (registry.state("m", "v1") != ModelRegistry::State::Draining)
+        std::this_thread::yield();
+    // draining: no new requests, the old one keeps its version
+    REQUIRE_FALSE(registry.acquire("m", "v1"));
+    REQUIRE(registry.acquire("m", "").version() == "v2");
+    std::this_thread::sleep_for(ms(20));
+    REQUIRE_FALSE(unloaded);
+
+    lease.reset();
+    unloader.join();
+    REQUIRE(unloaded);
+    REQUIRE(registry.state("m", "v1") == ModelRegistry::State::NotLoaded);
+    REQUIRE(registry.active_version("m") == "v2");
+}
+
+TEST_CASE("an unload that cannot drain in time leaves the version draining", "[registry]")
+{
+    ModelRegistry registry;
+    registry.load("m", "v1");
+    registry.activate("m", "v1");
+    ModelLease lease = registry.acquire("m", "");
+
+    std::string error;
+    REQUIRE_FALSE(registry.unload("m", "v1", ms(10), &error));
+    REQUIRE(error == "m:v1 still has 1 request(s) in flight");
+    REQUIRE(registry.state("m", "v1") == ModelRegistry::State::Draining);
+    REQUIRE(registry.active_version("m").empty()); // its only version is going away
+    REQUIRE_FALSE(registry.acquire("m", ""));
+
+    lease = ModelLease();
+    registry.load("m", "v2"); // takes over as the only routable version
+    REQUIRE(registry.acquire("m", "").version() == "v2");
+    REQUIRE(registry.unload("m", "v2", ms(10)));
+    REQUIRE(registry.unload("m", "v1", ms(10)));
+    // with no versions left the model is unmanaged again
+    REQUIRE(registry.acquire("m", "").version().empty());
+}
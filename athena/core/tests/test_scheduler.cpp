@@ -0,0 +1,274 @@
+// core/tests/test_scheduler.cpp
+#include <catch2/catch_all.hpp>
+#include "../src/scheduler.h"
+#include "../src/inference.h"
+#include <algorithm>
+#include <atomic>
+#include <future>
+#include <map>
+#include <memory>
+#include <mutex>
+#include <thread>
+
+namespace
+{
+    RequestPtr model_request(int id, const std::string &name, const std::string &version = "v1")
+    {
+        auto r = std::make_shared<Request>();
+        r->id = id;
+        r->model_name = name;
+        r->model_version = version;
+        return r;
+    }
+}
+
+TEST_CASE("scheduler batches each model separately", "[scheduler]")
+{
+    std::mutex mu;
+    std::map<ModelKey, int> served;
+    bool mixed = false;
+
+    WorkerPoolConfig config;
+    config.workers = 2;
+    ModelScheduler scheduler(config, [&](const ModelKey &key, const std::vector<RequestPtr> &batch)
+                             {
+                                 std::lock_guard<std::mutex> lk(mu);
+                                 for (const auto &r : batch)
+                                 {
+                                     mixed |= ModelKey{r->model_name, r->model_version} != key;
+                                     served[key]++;
+                                 }
+                             });
+    ModelQueueConfig small;
+    small.max_batch_size = 2;
+    scheduler.configure_model("a", "v1", small);
+    scheduler.start();
+
+    for (int i = 0; i < 12; i++)
+        scheduler.push_request(model_request(i, i % 3 == 0 ? "a" : "b", i % 2 ? "v1" : "v2"));
+    std::this_thread::sleep_for(std::chrono::milliseconds(200));
+    scheduler.stop();
+
+    std::lock_guard<std::mutex> lk(mu);
+    REQUIRE_FALSE(mixed);
+    int total = 0;
+    for (const auto &entry : served)
+        total += entry.second;
+    REQUIRE(total == 12);
+    REQUIRE(scheduler.model_stats().size() == 4);
+    REQUIRE(scheduler.stats().requests == 12);
+}
+
+TEST_CASE("a slow model does not hold up a fast one", "[scheduler][isolation]")
+{
+    std::mutex mu;
+    std::map<int, std::chrono::steady_clock::time_point> done;
+
+    WorkerPoolConfig config;
+    config.workers = 2;
+    config.default_queue.max_batch_size = 1;
+    config.default_queue.max_wait = std::chrono::milliseconds(0);
+    ModelScheduler scheduler(config, [&](const ModelKey &key, const std::vector<RequestPtr> &batch)
+                             {
+                                 std::this_thread::sleep_for(std::chrono::milliseconds(key.first == "slow" ? 40 : 1));
+                                 std::lock_guard<std::mutex> lk(mu);
+                                 for (const auto &r : batch)
+                                     done[r->id] = std::chrono::steady_clock::now();
+                             });
+    scheduler.start();
+
+    // ~400 ms of slow work is queued ahead of the fast requests
+    auto start = std::chrono::steady_clock::now();
+    for (int i = 0; i < 10; i++)
+        scheduler.push_request(model_request(i, "slow"));
+    for (int i = 10; i < 20; i++)
+        scheduler.push_request(model_request(i, "fast"));
+    std::this_thread::sleep_for(std::chrono::milliseconds(100));
+
+    std::lock_guard<std::mutex> lk(mu);
+    for (int i = 10; i < 20; i++)
+    {
+        REQUIRE(done.count(i) == 1);
+        REQUIRE(done[i] - start < std::chrono::milliseconds(80));
+    }
+}
+
+TEST_CASE("a backlogged queue is served in full batches", "[scheduler][batching]")
+{
+    auto mode = GENERATE(0, 1, 2); // mutex queue, lock-free ring, adaptive window
+    std::mutex mu;
+    std::vector<size_t> sizes;
+
+    WorkerPoolConfig config;
+    config.workers = 1;
+    ModelScheduler scheduler(config, [&](const ModelKey &, const std::vector<RequestPtr> &batch)
+                             {
+                                 std::lock_guard<std::mutex> lk(mu);
+                                 sizes.push_back(batch.size());
+                             });
+    ModelQueueConfig queue;
+    queue.max_batch_size = 8;
+    queue.adaptive = mode == 2;
+    queue.adaptive_config.max_batch_size = 8;
+    if (mode == 1)
+        queue.dispatcher.ring_capacity = 64;
+    scheduler.configure_model("m", "v1", queue);
+
+    for (int i = 0; i < 40; i++)
+        REQUIRE(scheduler.push_request(model_request(i, "m")));
+    scheduler.start();
+    std::this_thread::sleep_for(std::chrono::milliseconds(200));
+    scheduler.stop();
+
+    std::lock_guard<std::mutex> lk(mu);
+    size_t total = 0;
+    for (size_t n : sizes)
+        total += n;
+    REQUIRE(total == 40);
+    REQUIRE(*std::max_element(sizes.begin(), sizes.end()) > 1);
+    REQUIRE(sizes.size() < 40);
+}
+
+TEST_CASE("a producer waiting on a full ring does not block other models", "[scheduler][ring]")
+{
+    std::atomic<int> served{0};
+    WorkerPoolConfig config;
+    config.workers = 1;
+    ModelScheduler scheduler(config, [&](const ModelKey &, const std::vector<RequestPtr> &batch)
+                             { served.fetch_add(static_cast<int>(batch.size())); });
+    ModelQueueConfig ring;
+    ring.dispatcher.ring_capacity = 2;
+    ring.dispatcher.block_when_full = true;
+    ring.dispatcher.pool_size = 4;
+    scheduler.configure_model("full", "v1", ring);
+
+    auto pooled = scheduler.make_request("full", "v1");
+    REQUIRE(pooled->model_name == "full");
+    REQUIRE(pooled->model_version == "v1");
+    REQUIRE(scheduler.push_request(pooled));
+    REQUIRE(scheduler.push_request(model_request(1, "full")));
+    // no worker is running yet, so this producer waits for ring space
+    std::atomic<bool> third_pushed{false};
+    std::thread producer([&]
+                         {
+                             scheduler.push_request(model_request(2, "full"));
+                             third_pushed = true; });
+    std::this_thread::sleep_for(std::chrono::milliseconds(20));
+    REQUIRE_FALSE(third_pushed.load());
+
+    // other models are still accepted while it waits
+    auto pushed = std::async(std::launch::async, [&]
+                             { return scheduler.push_request(model_request(3, "other")); });
+    REQUIRE(pushed.wait_for(std::chrono::milliseconds(500)) == std::future_status::ready);
+    REQUIRE(pushed.get());
+
+    scheduler.start();
+    producer.join();
+    for (int i = 0; i < 100 && served.load() < 4; i++)
+        std::this_thread::sleep_for(std::chrono::milliseconds(5));
+    scheduler.stop();
+    REQUIRE(served.load() == 4);
+}
+
+TEST_CASE("worker time is shared by weight between backlogged models", "[scheduler][fairness]")
+{
+    std::atomic<int> heavy{0};
+    std::atomic<int> light{0};
+
+    WorkerPoolConfig config;
+    config.workers = 1;
+    ModelScheduler scheduler(config, [&](const ModelKey &key, const std::vector<RequestPtr> &batch)
+                             {
+                                 std::this_thread::sleep_for(std::chrono::milliseconds(2));
+                                 (key.first == "heavy" ? heavy : light).fetch_add(static_cast<int>(batch.size()));
+                             });
+    ModelQueueConfig weighted;
+    weighted.max_batch_size = 1;
+    weighted.weight = 3;
+    scheduler.configure_model("heavy", "v1", weighted);
+    weighted.weight = 1;
+    scheduler.configure_model("light", "v1", weighted);
+
+    // both stay backlogged for the whole run
+    for (int i = 0; i < 400; i++)
+    {
+        scheduler.push_request(model_request(i, "heavy"));
+        scheduler.push_request(model_request(i, "light"));
+    }
+    scheduler.start();
+    std::this_thread::sleep_for(std::chrono::milliseconds(300));
+    scheduler.stop();
+
+    REQUIRE(light.load() > 0);
+    double ratio = static_cast<double>(heavy.load()) / light.load();
+    REQUIRE(ratio > 2.0);
+    REQUIRE(ratio < 4.5);
+}
+
+TEST_CASE("model queues are capped and idle ones make room", "[scheduler][queues]")
+{
+    std::atomic<int> served{0};
+    WorkerPoolConfig config;
+    config.workers = 1;
+    config.max_queues = 2;
+    ModelScheduler scheduler(config, [&](const ModelKey &, const std::vector<RequestPtr> &batch)
+                             { served += static_cast<int>(batch.size()); });
+    scheduler.configure_model("a", "v1", ModelQueueConfig{});
+
+    REQUIRE(scheduler.push_request(model_request(1, "b")));
+    // "a" is configured and "b" still holds a request: no room for a third model
+    REQUIRE_FALSE(scheduler.push_request(model_request(2, "c")));
+    REQUIRE(scheduler.make_request("c", "v1")); // still usable, just not queued
+
+    scheduler.start();
+    for (int i = 0; i < 100 && served.load() < 1; i++)
+        std::this_thread::sleep_for(std::chrono::milliseconds(10));
+    REQUIRE(served.load() == 1);
+    // once "b" has drained, "c" takes its place
+    REQUIRE(scheduler.push_request(model_request(3, "c")));
+    std::vector<ModelKey> keys;
+    for (const auto &entry : scheduler.model_stats())
+        keys.push_back(entry.first);
+    REQUIRE(keys == std::vector<ModelKey>{{"a", "v1"}, {"c", "v1"}});
+    scheduler.stop();
+}
+
+TEST_CASE("requests are completed when their batch has run", "[scheduler][completion]")
+{
+    // The wiring server.cpp uses: the engine runs the batch, then every request's
+    // completion handle fires on the worker thread; shed requests complete as expired.
+    InferenceEngine engine;
+    WorkerPoolConfig config;
+    config.workers = 1;
+    config.default_queue.max_batch_size = 4;
+    config.on_expired = [](const RequestPtr &r)
+    { r->complete(RequestStatus::Expired); };
+    ModelScheduler scheduler(config, [&](const ModelKey &, const std::vector<RequestPtr> &batch)
+                             {
+                                 engine.run_batch(batch);
+                                 for (const auto &r : batch)
+                                     r->complete(RequestStatus::Ok); });
+    scheduler.start();
+
+    std::vector<std::promise<std::pair<RequestStatus, std::vector<float>>>> replies(6);
+    for (int i = 0; i < 6; i++)
+    {
+        auto r = model_request(i, "m");
+        r->inputs = {static_cast<float>(i), 0.5f};
+        if (i == 5)
+            r->deadline = std::chrono::steady_clock::now() - std::chrono::milliseconds(1);
+        auto *reply = &replies[i];
+        r->on_complete = [reply](Request &done, RequestStatus status)
+        { reply->set_value({status, std::vector<float>(done.outputs.begin(), done.outputs.end())}); };
+        REQUIRE(scheduler.push_request(r));
+    }
+
+    for (int i = 0; i < 5; i++)
+    {
+        auto reply = replies[i].get_future().get();
+        REQUIRE(reply.first == RequestStatus::Ok);
+        REQUIRE(reply.second == std::vector<float>{static_cast<float>(i), 0.5f});
+    }
+    REQUIRE(replies[5].get_future().get().first == RequestStatus::Expired);
+    scheduler.stop();
+}
@@ -0,0 +1,85 @@
+// core/tests/test_shm_region.cpp
+#include <catch2/catch_all.hpp>
+#include <cstring>
+#include <fcntl.h>
+#include <sys/mman.h>
+#include <unistd.h>
+#include "../src/shm_region.h"
+
+namespace
+{
+    // What a co-located client does: create the object and size it
+    std::string create_region(size_t size)
+    {
+        std::string name = "athena-test-" + std::to_string(getpid());
+        int fd = shm_open(("/" + name).c_str(), O_CREAT | O_RDWR | O_TRUNC, 0600);
+        REQUIRE(fd >= 0);
+        REQUIRE(ftruncate(fd, static_cast<off_t>(size)) == 0);
+        close(fd);
+        return name;
+    }
+}
+
+TEST_CASE("registered regions are mapped and bounds-checked", "[shm]")
+{
+    std::string name = create_region(4096);
+    ShmRegions regions;
+    REQUIRE(regions.attach(name, 4096));
+    shm_unlink(("/" + name).c_str()); // the mapping outlives the name
+
+    auto region = regions.find(name);
+    REQUIRE(region);
+    REQUIRE(region->size() == 4096);
+    REQUIRE(region->span(0, 4096) != nullptr);
+    REQUIRE(region->span(4000, 96) != nullptr);
+    REQUIRE(region->span(4000, 97) == nullptr);
+    REQUIRE(region->span(5000, 0) == nullptr);
+    REQUIRE(regions.find("unknown") == nullptr);
+
+    float value = 1.5f;
+    std::memcpy(region->span(64, sizeof(float)), &value, sizeof(float));
+    REQUIRE(regions.detach(name));
+    REQUIRE(regions.find(name) == nullptr);
+    // still mapped for whoever holds it
+    float read = 0;
+    std::memcpy(&read, region->span(64, sizeof(float)), sizeof(float));
+    REQUIRE(read == 1.5f);
+}
+
+TEST_CASE("outputs are written into registered regions only", "[shm]")
+{
+    std::string name = create_region(4096);
+    ShmRegions regions;
+    REQUIRE(regions.attach(name, 4096));
+    shm_unlink(("/" + name).c_str());
+    auto region = regions.find(name);
+
+    float value = 2.5f;
+    REQUIRE(regions.write(name, 128, &value, sizeof(float)));
+    float read = 0;
+    std::memcpy(&read, region->span(128, sizeof(float)), sizeof(float));
+    REQUIRE(read == 2.5f);
+    REQUIRE_FALSE(regions.write(name, 4094, &value, sizeof(float)));
+    REQUIRE_FALSE(regions.write("unknown", 0, &value, sizeof(float)));
+
+    // once detached, the region is never written again
+    REQUIRE(regions.detach(name));
+    value = 7.0f;
+    REQUIRE_FALSE(regions.write(name, 128, &value, sizeof(float)));
+    std::memcpy(&read, region->span(128, sizeof(float)), sizeof(float));
+    REQUIRE(read == 2.5f);
+}
+
+TEST_CASE("bad registrations are refused", "[shm]")
+{
+    ShmRegions regions;
+    std::string error;
+    REQUIRE_FALSE(regions.attach("../etc/passwd", 16, &error));
+    REQUIRE(error == "shm region ../etc/passwd: invalid name");
+    REQUIRE_FALSE(regions.attach("athena-test-missing", 16, &error));
+
+    std::string name = create_region(64);
+    REQUIRE_FALSE(regions.attach(name, 128, &error)); // larger than the object
+    REQUIRE(error == "shm region " + name + ": smaller than 128 bytes");
+    shm_unlink(("/" + name).c_str());
+}
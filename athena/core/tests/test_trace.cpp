@@ -0,0 +1,81 @@
+// core/tests/test_trace.cpp
+#include <catch2/catch_all.hpp>
+#include <thread>
+#include "../src/dispatcher.h"
+#include "../src/inference.h"
+#include "../src/trace.h"
+
+using namespace std::chrono;
+
+TEST_CASE("only well-formed, sampled trace contexts are traced", "[trace]")
+{
+    const std::string trace = "4bf92f3577b34da6a3ce929d0e0e4736";
+    const std::string parent = "00f067aa0ba902b7";
+    REQUIRE(traceparent_sampled("00-" + trace + "-" + parent + "-01"));
+    REQUIRE(traceparent_sampled("00-" + trace + "-" + parent + "-03"));
+    REQUIRE_FALSE(traceparent_sampled("00-" + trace + "-" + parent + "-00"));
+    // future versions may append fields; version 00 may not
+    REQUIRE(traceparent_sampled("01-" + trace + "-" + parent + "-01-extra"));
+    REQUIRE_FALSE(traceparent_sampled("00-" + trace + "-" + parent + "-01-extra"));
+    REQUIRE_FALSE(traceparent_sampled("ff-" + trace + "-" + parent + "-01"));
+    REQUIRE_FALSE(traceparent_sampled("00-" + std::string(32, '0') + "-" + parent + "-01"));
+    REQUIRE_FALSE(traceparent_sampled("00-" + trace + "-" + std::string(16, '0') + "-01"));
+    REQUIRE_FALSE(traceparent_sampled("00-4BF92F3577B34DA6A3CE929D0E0E4736-" + parent + "-01"));
+    REQUIRE_FALSE(traceparent_sampled(""));
+    REQUIRE_FALSE(traceparent_sampled("00-" + trace + "-" + parent));
+}
+
+TEST_CASE("stage breakdown splits queueing, batch forming and execution", "[trace]")
+{
+    auto t0 = steady_clock::now();
+    RequestTiming t;
+    t.arrived = t0;
+    t.enqueued = t0 + milliseconds(1);
+    t.batched = t0 + milliseconds(4);
+    t.exec_start = t0 + milliseconds(6);
+    t.exec_end = t0 + milliseconds(9);
+    StageBreakdown s = stage_breakdown(t, t0 + milliseconds(10));
+    REQUIRE(s.queue_ms == Approx(3.0));
+    REQUIRE(s.batch_ms == Approx(2.0));
+    REQUIRE(s.exec_ms == Approx(3.0));
+    REQUIRE(s.total_ms == Approx(10.0));
+
+    // joined while the batch was already forming: no queueing
+    t.enqueued = t0 + milliseconds(5);
+    s = stage_breakdown(t, t0 + milliseconds(10));
+    REQUIRE(s.queue_ms == Approx(0.0));
+    REQUIRE(s.batch_ms == Approx(1.0));
+
+    // never queued (mock path): only the total
+    RequestTiming mock;
+    mock.arrived = t0;
+    s = stage_breakdown(mock, t0 + milliseconds(2));
+    REQUIRE(s.queue_ms == 0.0);
+    REQUIRE(s.exec_ms == 0.0);
+    REQUIRE(s.total_ms == Approx(2.0));
+}
+
+TEST_CASE("requests are stamped as they move through the dispatcher and engine", "[trace]")
+{
+    for (size_t ring : {size_t(0), size_t(64)})
+    {
+        DispatcherConfig config;
+        config.ring_capacity = ring;
+        Dispatcher dispatcher(config);
+        auto first = dispatcher.make_request();
+        first->inputs = {1.0f};
+        dispatcher.push_request(first);
+        std::this_thread::sleep_for(milliseconds(5));
+
+        auto batch = dispatcher.pop_batch(2, milliseconds(10), microseconds(2000));
+        REQUIRE(batch.size() == 1);
+        InferenceEngine engine(InferenceEngineConfig{false});
+        engine.run_batch(batch);
+
+        const RequestTiming &t = batch[0]->timing;
+        REQUIRE(t.enqueued != steady_clock::time_point{});
+        REQUIRE(t.batched - t.enqueued >= milliseconds(5));
+        REQUIRE(t.exec_start >= t.batched + milliseconds(1)); // the fill window
+        REQUIRE(t.exec_end >= t.exec_start);
+    }
+}